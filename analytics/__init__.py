@@ -0,0 +1,7 @@
+"""
+Módulo de análisis de la carga de trabajo para la aplicación de gestión de tareas.
+"""
+
+from .workload import NUMPY_AVAILABLE, TaskColumns, workload_report
+
+__all__ = ['NUMPY_AVAILABLE', 'TaskColumns', 'workload_report']
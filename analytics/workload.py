@@ -0,0 +1,227 @@
+"""
+Informes de carga de trabajo calculados con NumPy.
+
+Las columnas que interesan (persona, prioridad, status, effort_hours y fecha
+de creación) se cargan una sola vez en arrays (TaskColumns), desde objetos
+Task del almacén JSON o desde tuplas de una consulta sobre Tarea. Esa carga
+recorre las tareas una vez en Python y es la parte más cara de un informe sin
+cache (en torno a un segundo con un millón de tareas). Todas las agrupaciones
+se hacen después con operaciones vectorizadas (bincount, percentile, unique),
+sin volver a recorrer las tareas en Python.
+
+NumPy es opcional: si no está instalado, NUMPY_AVAILABLE es False y crear
+un TaskColumns lanza RuntimeError.
+"""
+
+from datetime import date, datetime
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # NumPy no instalado
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+# Valores admitidos, en el orden de sus códigos
+PRIORITIES = ('baja', 'media', 'alta', 'bloqueante')
+STATUSES = ('pendiente', 'en_progreso', 'en_revision', 'completada')
+COMPLETED = STATUSES.index('completada')
+
+PERCENTILES = (50, 75, 90, 95, 99)
+
+
+def _parse_day(value):
+    """Fecha de un valor 'YYYY-MM-DD' o date; None si no es una fecha válida."""
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, date) else None
+
+
+class TaskColumns:
+    """Columnas de las tareas en arrays NumPy, una posición por tarea"""
+
+    def __init__(self, assignees, assignee_codes, priority_codes, status_codes, effort_hours, created_days):
+        """
+        Inicializa las columnas (usar from_tasks o from_rows)
+
+        Args:
+            assignees: Lista de personas (None = sin asignar); el código de cada una es su índice
+            assignee_codes: Lista de códigos de persona
+            priority_codes: Lista de índices en PRIORITIES (-1 = desconocida)
+            status_codes: Lista de índices en STATUSES (-1 = desconocido)
+            effort_hours: Lista de horas estimadas (None o nan = sin estimar)
+            created_days: Lista de fechas 'YYYY-MM-DD' o date de creación (None o
+                no válida = sin fecha)
+
+        Raises:
+            RuntimeError: Si NumPy no está instalado
+        """
+        if np is None:
+            raise RuntimeError("Los informes de carga requieren numpy (pip install numpy)")
+        self.assignees = assignees
+        self.assignee = np.array(assignee_codes, dtype=np.int32)
+        self.priority = np.array(priority_codes, dtype=np.int8)
+        self.status = np.array(status_codes, dtype=np.int8)
+        self.effort = np.array(effort_hours, dtype=np.float64)
+        try:
+            self.created = np.array(created_days, dtype='datetime64[D]')
+        except ValueError:
+            # Alguna fecha no es válida: se convierte una a una y las inválidas quedan sin fecha (NaT)
+            self.created = np.array([_parse_day(day) for day in created_days], dtype='datetime64[D]')
+
+    def __len__(self):
+        return len(self.effort)
+
+    @classmethod
+    def from_columns(cls, assigned_to, priorities, statuses, efforts, fechas):
+        """
+        Carga las columnas desde listas paralelas de valores, una por campo.
+
+        Args:
+            assigned_to: Personas asignadas (None o '' = sin asignar)
+            priorities: Prioridades
+            statuses: Status
+            efforts: Horas estimadas (None = sin estimar; admite Decimal)
+            fechas: Fechas de creación, como datetime o cadena ISO
+
+        Returns:
+            TaskColumns: Las columnas cargadas
+        """
+        # Una pasada por columna con map/comprensiones (sigue siendo Python por tarea;
+        # los arrays NumPy se crean al final)
+        people = {}
+        assignee_codes = [people.setdefault(name or None, len(people)) for name in assigned_to]
+        priority_index = {value: code for code, value in enumerate(PRIORITIES)}
+        status_index = {value: code for code, value in enumerate(STATUSES)}
+        priority_codes = list(map(priority_index.get, priorities, repeat(-1)))
+        status_codes = list(map(status_index.get, statuses, repeat(-1)))
+        created = [
+            fecha[:10] if isinstance(fecha, str) else fecha.date() if isinstance(fecha, datetime) else None
+            for fecha in fechas
+        ]
+        # NumPy convierte None en nan y Decimal en float al crear el array float64
+        return cls(list(people), assignee_codes, priority_codes, status_codes, efforts, created)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Carga las columnas desde tuplas (assigned_to, priority, status, effort_hours, fecha_creacion).
+
+        Args:
+            rows: Iterable de tuplas (por ejemplo, una consulta de columnas sobre Tarea)
+
+        Returns:
+            TaskColumns: Las columnas cargadas
+        """
+        rows = list(rows)
+        return cls.from_columns(*([row[i] for row in rows] for i in range(5)))
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """
+        Carga las columnas desde objetos Task.
+
+        Args:
+            tasks: Iterable de objetos Task
+
+        Returns:
+            TaskColumns: Las columnas cargadas
+        """
+        tasks = list(tasks)
+        return cls.from_columns(
+            [task.assigned_to for task in tasks],
+            [task.priority for task in tasks],
+            [task.status for task in tasks],
+            [task.effort_hours for task in tasks],
+            [task.fecha_creacion for task in tasks]
+        )
+
+
+def _round(value):
+    return round(float(value), 2)
+
+
+def _group_totals(codes, labels, effort, open_mask):
+    """Tareas, horas totales y horas pendientes por código, con bincount."""
+    size = len(labels)
+    valid = codes >= 0
+    codes = codes[valid]
+    effort = effort[valid]
+    open_mask = open_mask[valid]
+
+    tasks = np.bincount(codes, minlength=size)
+    open_tasks = np.bincount(codes, weights=open_mask, minlength=size)
+    total = np.bincount(codes, weights=effort, minlength=size)
+    remaining = np.bincount(codes, weights=np.where(open_mask, effort, 0.0), minlength=size)
+    return [
+        {
+            'tasks': int(tasks[i]),
+            'open_tasks': int(open_tasks[i]),
+            'total_effort_hours': _round(total[i]),
+            'remaining_effort_hours': _round(remaining[i])
+        }
+        for i in range(size)
+    ]
+
+
+def workload_report(columns: TaskColumns):
+    """
+    Calcula el informe de carga de trabajo.
+
+    Las horas pendientes son las de las tareas que no están completadas. Las
+    semanas empiezan en lunes; como no se registra la fecha de finalización,
+    las tareas completadas se cuentan en la semana en que se crearon.
+
+    Args:
+        columns: TaskColumns con las tareas
+
+    Returns:
+        dict: Informe con las claves total, by_assignee, by_priority,
+        by_status, effort_percentiles y weekly
+    """
+    effort = np.nan_to_num(columns.effort, nan=0.0)
+    open_mask = columns.status != COMPLETED
+
+    # Persona: horas totales y pendientes, de más a menos carga pendiente
+    by_assignee = _group_totals(columns.assignee, columns.assignees, effort, open_mask)
+    for name, entry in zip(columns.assignees, by_assignee):
+        entry['assigned_to'] = name
+    by_assignee.sort(key=lambda entry: (-entry['remaining_effort_hours'], entry['assigned_to'] or ''))
+
+    by_priority = dict(zip(PRIORITIES, _group_totals(columns.priority, PRIORITIES, effort, open_mask)))
+    by_status = dict(zip(STATUSES, _group_totals(columns.status, STATUSES, effort, open_mask)))
+
+    # Percentiles de las tareas con esfuerzo estimado
+    estimated = columns.effort[~np.isnan(columns.effort)]
+    if len(estimated):
+        values = np.percentile(estimated, PERCENTILES)
+        effort_percentiles = {f'p{p}': _round(v) for p, v in zip(PERCENTILES, values)}
+    else:
+        effort_percentiles = {f'p{p}': None for p in PERCENTILES}
+
+    # Semanas (lunes) de creación: el 1970-01-01 fue jueves
+    dated = ~np.isnat(columns.created)
+    days = columns.created[dated].astype(np.int64)
+    weeks = days - (days + 3) % 7
+    week_values, week_index = np.unique(weeks, return_inverse=True)
+    created = np.bincount(week_index, minlength=len(week_values))
+    completed = np.bincount(week_index, weights=~open_mask[dated], minlength=len(week_values))
+    weekly = [
+        {'week': str(np.datetime64(int(week), 'D')), 'created': int(c), 'completed': int(d)}
+        for week, c, d in zip(week_values, created, completed)
+    ]
+
+    return {
+        'total': len(columns),
+        'total_effort_hours': _round(effort.sum()),
+        'remaining_effort_hours': _round(effort[open_mask].sum()),
+        'by_assignee': by_assignee,
+        'by_priority': by_priority,
+        'by_status': by_status,
+        'effort_percentiles': effort_percentiles,
+        'weekly': weekly
+    }
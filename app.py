@@ -1,15 +1,33 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_file
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm.exc import StaleDataError
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
-from decimal import Decimal
+from markupsafe import Markup
+from datetime import datetime, timedelta
+from serializers.task_serializer import TaskJSONProvider, row_to_dict, tarea_to_dict, task_columns
+from analytics.workload import NUMPY_AVAILABLE, TaskColumns, workload_report
+from managers.fragment_cache import FragmentCache
+from managers.job_manager import JobError, JobManager
+from managers.password_hasher import PasswordHashBusy, PasswordHasher
+from middleware.admission import AdmissionController
+from middleware.compression import ResponseCompression, strip_encoding
+from middleware.memory import MemoryProfiler
+from models.task_schema import STATUSES, TaskSchema, first_error
+import gzip
 import os
 
 app = Flask(__name__)
+app.json = TaskJSONProvider(app)
 app.config['SECRET_KEY'] = 'tu-clave-secreta-aqui-cambiar-en-produccion'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tareas.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('TASKS_DATABASE_URI', 'sqlite:///tareas.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Días tras los que una tarea completada pasa a la tabla de archivo
+app.config['ARCHIVE_AFTER_DAYS'] = float(os.environ.get('TASKS_ARCHIVE_AFTER_DAYS', 30))
+# Máximo de tareas en curso por persona al proponer trabajo (0 = sin límite)
+app.config['WIP_LIMIT'] = int(os.environ.get('TASKS_WIP_LIMIT', 0))
+# Cache de fragmentos del dashboard: entradas (una por usuario) y segundos de vida
+app.config['DASHBOARD_CACHE_SIZE'] = int(os.environ.get('TASKS_DASHBOARD_CACHE_SIZE', 256))
+app.config['DASHBOARD_CACHE_TTL'] = float(os.environ.get('TASKS_DASHBOARD_CACHE_TTL', 300))
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
@@ -17,6 +35,29 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Por favor, inicia sesión para acceder a esta página.'
 
+# Control de admisión en /tasks: límites de ritmo por usuario (o por IP sin sesión),
+# concurrencia y cola acotada
+admission = AdmissionController(
+    app,
+    client_key=lambda: f'usuario:{current_user.id}' if current_user.is_authenticated else request.remote_addr
+)
+
+# Perfil de memoria por petición con tracemalloc (TASKS_MEMORY_PROFILE=1 o POST /debug/memory).
+# Se registra antes que la compresión para que su medición la incluya
+memory = MemoryProfiler(app)
+
+# Compresión gzip/deflate de las respuestas JSON y NDJSON
+compression = ResponseCompression(app)
+
+# Trabajos en segundo plano (exportar, importar, archivar, reindexar): tabla y
+# resultados en la carpeta de instancia, junto a la base de datos
+app.config['JOBS_FILE'] = os.environ.get('TASKS_JOBS_FILE', os.path.join(app.instance_path, 'jobs.json'))
+app.config['JOBS_DIR'] = os.environ.get('TASKS_JOBS_DIR', os.path.join(app.instance_path, 'job_results'))
+jobs = JobManager(app)
+
+# Hash de contraseñas en un pool de procesos acotado, fuera de los hilos de las peticiones
+passwords = PasswordHasher(app)
+
 # Modelos
 class Usuario(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -27,12 +68,23 @@ class Usuario(UserMixin, db.Model):
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        valid, new_hash = passwords.verify(self.password_hash, password)
+        if new_hash:
+            # Hash con parámetros anticuados: se guarda el nuevo con el siguiente commit
+            self.password_hash = new_hash
+        return valid
 
 class Tarea(db.Model):
+    # AUTOINCREMENT: los ids de tareas archivadas no se reutilizan.
+    # Índice por persona y estado para GET /tasks/next y los listados por persona
+    __table_args__ = (
+        db.Index('ix_tarea_assigned_to_status', 'assigned_to', 'status'),
+        {'sqlite_autoincrement': True},
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -42,9 +94,109 @@ class Tarea(db.Model):
     assigned_to = db.Column(db.String(100), nullable=True)  # string, persona del equipo
     creador_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    # Versión para concurrencia optimista: SQLAlchemy la aumenta en cada UPDATE
+    # y falla (StaleDataError) si otra petición la cambió entretanto
+    version = db.Column(db.Integer, nullable=False, default=1)
 
     creador = db.relationship('Usuario', foreign_keys=[creador_id], backref='tareas_creadas')
 
+    __mapper_args__ = {'version_id_col': version}
+
+class TareaArchivada(db.Model):
+    """Tareas completadas archivadas: fuera de la tabla activa de tareas"""
+    __tablename__ = 'tarea_archivada'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    priority = db.Column(db.String(20))
+    effort_hours = db.Column(db.Numeric(10, 2), nullable=True)
+    status = db.Column(db.String(20))
+    assigned_to = db.Column(db.String(100), nullable=True)
+    creador_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
+    fecha_creacion = db.Column(db.DateTime)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    fecha_archivado = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Columnas que se copian al archivar y al restaurar
+ARCHIVE_COLUMNS = ('id', 'title', 'description', 'priority', 'effort_hours',
+                   'status', 'assigned_to', 'creador_id', 'fecha_creacion', 'version')
+
+# Validación de las tareas de la tabla tarea: effort_hours Numeric(10, 2) y longitudes de las columnas
+TAREA_SCHEMA = TaskSchema(decimal_digits=10, max_lengths={'title': 200, 'assigned_to': 100})
+
+# Orden de trabajo: prioridad de mayor a menor urgencia y status que cuentan como trabajo en curso
+PRIORITY_ORDER = ('bloqueante', 'alta', 'media', 'baja')
+WIP_STATUSES = ('en_progreso', 'en_revision')
+
+# Informe de carga en cache: {'report': (marca de la tabla de tareas, informe)}
+analytics_cache = {}
+
+# Fragmentos renderizados del dashboard por usuario. Ámbitos: None para los
+# administradores (ven todas las tareas) y el nombre de cada persona para
+# quien solo ve sus tareas asignadas
+dashboard_cache = FragmentCache(app.config['DASHBOARD_CACHE_SIZE'], app.config['DASHBOARD_CACHE_TTL'])
+
+def invalidate_dashboards(*assigned_to):
+    """Invalida los dashboards afectados por una escritura: administradores y personas asignadas."""
+    dashboard_cache.invalidate(None, *(nombre for nombre in assigned_to if nombre))
+
+def version_mismatch(tarea):
+    """Indica si la cabecera If-Match no corresponde a la versión actual de la tarea."""
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return False
+    # La ETag de una respuesta comprimida ("<versión>-gzip") vale igual que la original
+    return str(tarea.version) not in {strip_encoding(tag) for tag in if_match.as_set()}
+
+def task_response(tarea, status):
+    """Respuesta JSON de una tarea con su versión como ETag."""
+    response = jsonify(tarea_to_dict(tarea))
+    response.set_etag(str(tarea.version))
+    return response, status
+
+def tarea_from_data(data, creador_id):
+    """
+    Crea una Tarea (sin añadirla a la sesión) a partir de los datos de la API.
+    
+    Returns:
+        tuple: (Tarea, None) si los datos son válidos; (None, errores por campo) si no
+    """
+    values, errors = TAREA_SCHEMA.validate(data)
+    if errors:
+        return None, errors
+    return Tarea(creador_id=creador_id, **values), None
+
+def validation_error(errors):
+    """Respuesta 400 con el primer error y los errores de cada campo."""
+    return jsonify({'error': first_error(errors), 'fields': errors}), 400
+
+def archive_completed(days):
+    """
+    Mueve a la tabla de archivo las tareas completadas creadas hace más de N días.
+    
+    Returns:
+        int: Número de tareas archivadas
+    """
+    # La antigüedad se mide desde la creación: no se registra la fecha de completado
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    condition = (Tarea.status == 'completada') & (Tarea.fecha_creacion <= cutoff)
+    
+    # Copiar y borrar en la misma transacción, sin cargar las tareas en memoria
+    columns = [getattr(Tarea, name) for name in ARCHIVE_COLUMNS]
+    db.session.execute(
+        db.insert(TareaArchivada).from_select(
+            list(ARCHIVE_COLUMNS) + ['fecha_archivado'],
+            db.select(*columns, db.literal(datetime.utcnow())).where(condition)
+        )
+    )
+    archived = db.session.execute(db.delete(Tarea).where(condition)).rowcount
+    db.session.commit()
+    if archived:
+        # Puede afectar a cualquier persona: invalidar todos los dashboards
+        dashboard_cache.invalidate()
+    return archived
+
 @login_manager.user_loader
 def load_user(user_id):
     return Usuario.query.get(int(user_id))
@@ -56,6 +208,18 @@ def index():
         return redirect(url_for('dashboard'))
     return redirect(url_for('login'))
 
+# Formulario que se vuelve a mostrar si el pool de contraseñas está saturado
+PASSWORD_FORMS = {'login': 'login.html', 'register': 'register.html', 'nuevo_usuario': 'nuevo_usuario.html'}
+
+@app.errorhandler(PasswordHashBusy)
+def password_hash_busy(e):
+    headers = {'Retry-After': str(e.retry_after)}
+    template = PASSWORD_FORMS.get(request.endpoint)
+    if template is None:
+        return jsonify({'error': e.message}), 503, headers
+    flash(f'Hay demasiados inicios de sesión en curso. Inténtalo de nuevo en {e.retry_after} s.', 'error')
+    return render_template(template), 503, headers
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
@@ -65,6 +229,8 @@ def login():
         usuario = Usuario.query.filter_by(email=email).first()
         
         if usuario and usuario.check_password(password):
+            # check_password pudo renovar el hash
+            db.session.commit()
             login_user(usuario)
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('dashboard'))
@@ -115,53 +281,89 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    if current_user.es_admin:
-        tareas = Tarea.query.order_by(Tarea.fecha_creacion.desc()).all()
-    else:
-        # Filtrar por assigned_to (string) que coincida con el nombre del usuario
-        tareas = Tarea.query.filter(Tarea.assigned_to == current_user.nombre).order_by(Tarea.fecha_creacion.desc()).all()
-    
-    usuarios = Usuario.query.all() if current_user.es_admin else []
+    # La versión se lee antes de consultar: si entretanto hay una escritura, lo
+    # renderizado queda con la versión anterior y no se vuelve a servir
+    scope = None if current_user.es_admin else current_user.nombre
+    version = dashboard_cache.version(scope)
+    fragmentos = dashboard_cache.get(current_user.id, version)
     
-    estadisticas = {
-        'total': len(tareas),
-        'pendientes': len([t for t in tareas if t.status == 'pendiente']),
-        'en_progreso': len([t for t in tareas if t.status == 'en_progreso']),
-        'en_revision': len([t for t in tareas if t.status == 'en_revision']),
-        'completadas': len([t for t in tareas if t.status == 'completada'])
-    }
+    if fragmentos is None:
+        if current_user.es_admin:
+            tareas = Tarea.query.order_by(Tarea.fecha_creacion.desc()).all()
+        else:
+            # Filtrar por assigned_to (string) que coincida con el nombre del usuario
+            tareas = Tarea.query.filter(Tarea.assigned_to == current_user.nombre).order_by(Tarea.fecha_creacion.desc()).all()
+        
+        estadisticas = {
+            'total': len(tareas),
+            'pendientes': len([t for t in tareas if t.status == 'pendiente']),
+            'en_progreso': len([t for t in tareas if t.status == 'en_progreso']),
+            'en_revision': len([t for t in tareas if t.status == 'en_revision']),
+            'completadas': len([t for t in tareas if t.status == 'completada'])
+        }
+        
+        fragmentos = {
+            'estadisticas': Markup(render_template('_dashboard_estadisticas.html', estadisticas=estadisticas)),
+            'tareas': Markup(render_template('_dashboard_tareas.html', tareas=tareas))
+        }
+        dashboard_cache.put(current_user.id, version, fragmentos)
     
-    return render_template('dashboard.html', tareas=tareas, usuarios=usuarios, estadisticas=estadisticas)
+    return render_template('dashboard.html', fragmentos=fragmentos)
+
+@app.route('/dashboard/cache', methods=['GET'])
+@login_required
+def dashboard_cache_stats():
+    """Estadísticas del cache del dashboard: aciertos, fallos y tasa de aciertos (GET /dashboard/cache)"""
+    if not current_user.es_admin:
+        return jsonify({'error': 'Solo los administradores pueden ver las estadísticas del cache'}), 403
+    return jsonify(dashboard_cache.stats()), 200
+
+@app.route('/metrics', methods=['GET'])
+@login_required
+def metrics():
+    """Métricas del servidor: compresión, cache del dashboard y pool de contraseñas (GET /metrics)"""
+    if not current_user.es_admin:
+        return jsonify({'error': 'Solo los administradores pueden ver las métricas'}), 403
+    return jsonify({
+        'compression': compression.stats(),
+        'dashboard_cache': dashboard_cache.stats(),
+        'password_hashing': passwords.stats(),
+    }), 200
+
+@app.route('/debug/memory', methods=['GET', 'POST'])
+@login_required
+def memory_profile():
+    """Perfil de memoria por endpoint (GET, ?top=N) y activarlo o desactivarlo sin reiniciar (POST)"""
+    if not current_user.es_admin:
+        return jsonify({'error': 'Solo los administradores pueden ver el perfil de memoria'}), 403
+    try:
+        if request.method == 'POST':
+            memory.configure(request.get_json(silent=True) or {})
+            return jsonify(memory.stats()), 200
+        return jsonify(memory.stats(int(request.args.get('top', 0)))), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 # Rutas de tareas
 @app.route('/tareas/nueva', methods=['GET', 'POST'])
 @login_required
 def nueva_tarea():
+    usuarios = Usuario.query.all() if current_user.es_admin else [current_user]
+    
     if request.method == 'POST':
-        title = request.form.get('title')
-        description = request.form.get('description')
-        priority = request.form.get('priority', 'media')
-        effort_hours = request.form.get('effort_hours')
-        status = request.form.get('status', 'pendiente')
-        assigned_to = request.form.get('assigned_to', '').strip()
-        
-        tarea = Tarea(
-            title=title,
-            description=description,
-            priority=priority,
-            effort_hours=Decimal(effort_hours) if effort_hours else None,
-            status=status,
-            assigned_to=assigned_to if assigned_to else None,
-            creador_id=current_user.id
-        )
+        tarea, errors = tarea_from_data(request.form.to_dict(), current_user.id)
+        if errors:
+            for message in errors.values():
+                flash(message, 'error')
+            return render_template('nueva_tarea.html', usuarios=usuarios), 400
         
         db.session.add(tarea)
         db.session.commit()
+        invalidate_dashboards(tarea.assigned_to)
         
         flash('Tarea creada exitosamente', 'success')
         return redirect(url_for('dashboard'))
     
-    usuarios = Usuario.query.all() if current_user.es_admin else [current_user]
     return render_template('nueva_tarea.html', usuarios=usuarios)
 
 @app.route('/tareas/<int:tarea_id>/editar', methods=['GET', 'POST'])
@@ -174,21 +376,24 @@ def editar_tarea(tarea_id):
         flash('No tienes permiso para editar esta tarea', 'error')
         return redirect(url_for('dashboard'))
     
+    usuarios = Usuario.query.all() if current_user.es_admin else [current_user]
+    
     if request.method == 'POST':
-        tarea.title = request.form.get('title')
-        tarea.description = request.form.get('description')
-        tarea.priority = request.form.get('priority', 'media')
-        effort_hours = request.form.get('effort_hours')
-        tarea.effort_hours = Decimal(effort_hours) if effort_hours else None
-        tarea.status = request.form.get('status', 'pendiente')
-        assigned_to = request.form.get('assigned_to', '').strip()
-        tarea.assigned_to = assigned_to if assigned_to else None
+        values, errors = TAREA_SCHEMA.validate(request.form.to_dict())
+        if errors:
+            for message in errors.values():
+                flash(message, 'error')
+            return render_template('editar_tarea.html', tarea=tarea, usuarios=usuarios), 400
+        
+        anterior = tarea.assigned_to
+        for field, value in values.items():
+            setattr(tarea, field, value)
         
         db.session.commit()
+        invalidate_dashboards(anterior, tarea.assigned_to)
         flash('Tarea actualizada exitosamente', 'success')
         return redirect(url_for('dashboard'))
     
-    usuarios = Usuario.query.all() if current_user.es_admin else [current_user]
     return render_template('editar_tarea.html', tarea=tarea, usuarios=usuarios)
 
 @app.route('/tareas/<int:tarea_id>/eliminar', methods=['POST'])
@@ -203,6 +408,7 @@ def eliminar_tarea(tarea_id):
     
     db.session.delete(tarea)
     db.session.commit()
+    invalidate_dashboards(tarea.assigned_to)
     flash('Tarea eliminada exitosamente', 'success')
     return redirect(url_for('dashboard'))
 
@@ -212,10 +418,18 @@ def cambiar_estado_tarea(tarea_id):
     tarea = Tarea.query.get_or_404(tarea_id)
     nuevo_status = request.json.get('status')
     
-    if nuevo_status in ['pendiente', 'en_progreso', 'en_revision', 'completada']:
+    if version_mismatch(tarea):
+        return jsonify({'success': False, 'mensaje': 'La tarea fue modificada por otra persona'}), 412
+    
+    if nuevo_status in STATUSES:
         tarea.status = nuevo_status
-        db.session.commit()
-        return jsonify({'success': True, 'mensaje': 'Estado actualizado'})
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            return jsonify({'success': False, 'mensaje': 'La tarea fue modificada por otra persona'}), 412
+        invalidate_dashboards(tarea.assigned_to)
+        return jsonify({'success': True, 'mensaje': 'Estado actualizado', 'version': tarea.version})
     
     return jsonify({'success': False, 'mensaje': 'Estado inválido'}), 400
 
@@ -266,40 +480,15 @@ def create_task():
     try:
         data = request.get_json()
         
-        if not data or not data.get('title'):
-            return jsonify({'error': 'El campo title es requerido'}), 400
-        
-        tarea = Tarea(
-            title=data.get('title'),
-            description=data.get('description'),
-            priority=data.get('priority', 'media'),
-            effort_hours=Decimal(str(data.get('effort_hours'))) if data.get('effort_hours') else None,
-            status=data.get('status', 'pendiente'),
-            assigned_to=data.get('assigned_to'),
-            creador_id=current_user.id
-        )
-        
-        # Validar prioridad
-        if tarea.priority not in ['baja', 'media', 'alta', 'bloqueante']:
-            return jsonify({'error': 'Prioridad inválida. Debe ser: baja, media, alta, bloqueante'}), 400
-        
-        # Validar status
-        if tarea.status not in ['pendiente', 'en_progreso', 'en_revision', 'completada']:
-            return jsonify({'error': 'Status inválido. Debe ser: pendiente, en_progreso, en_revision, completada'}), 400
+        tarea, errors = tarea_from_data(data or {}, current_user.id)
+        if errors:
+            return validation_error(errors)
         
         db.session.add(tarea)
         db.session.commit()
+        invalidate_dashboards(tarea.assigned_to)
         
-        return jsonify({
-            'id': tarea.id,
-            'title': tarea.title,
-            'description': tarea.description,
-            'priority': tarea.priority,
-            'effort_hours': float(tarea.effort_hours) if tarea.effort_hours else None,
-            'status': tarea.status,
-            'assigned_to': tarea.assigned_to,
-            'fecha_creacion': tarea.fecha_creacion.isoformat()
-        }), 201
+        return task_response(tarea, 201)
         
     except Exception as e:
         db.session.rollback()
@@ -311,25 +500,21 @@ def get_all_tasks():
     """Obtener todas las tareas (GET /tasks)"""
     try:
         # Los administradores ven todas las tareas, los usuarios solo las asignadas a ellos
-        if current_user.es_admin:
-            tareas = Tarea.query.order_by(Tarea.fecha_creacion.desc()).all()
-        else:
-            tareas = Tarea.query.filter(
-                Tarea.assigned_to == current_user.nombre
-            ).order_by(Tarea.fecha_creacion.desc()).all()
-        
-        tasks_list = []
-        for tarea in tareas:
-            tasks_list.append({
-                'id': tarea.id,
-                'title': tarea.title,
-                'description': tarea.description,
-                'priority': tarea.priority,
-                'effort_hours': float(tarea.effort_hours) if tarea.effort_hours else None,
-                'status': tarea.status,
-                'assigned_to': tarea.assigned_to,
-                'fecha_creacion': tarea.fecha_creacion.isoformat()
-            })
+        # Solo se seleccionan las columnas necesarias: tuplas, sin objetos ORM
+        query = Tarea.query.with_entities(*task_columns(Tarea))
+        if not current_user.es_admin:
+            query = query.filter(Tarea.assigned_to == current_user.nombre)
+        rows = query.order_by(Tarea.fecha_creacion.desc()).all()
+        
+        # Las tareas archivadas solo se leen si se piden explícitamente
+        if request.args.get('include_archived') in ('1', 'true'):
+            archived = TareaArchivada.query.with_entities(*task_columns(TareaArchivada))
+            if not current_user.es_admin:
+                archived = archived.filter(TareaArchivada.assigned_to == current_user.nombre)
+            rows.extend(archived)
+            rows.sort(key=lambda row: row.fecha_creacion or datetime.min, reverse=True)
+        
+        tasks_list = [row_to_dict(row) for row in rows]
         
         return jsonify({
             'total': len(tasks_list),
@@ -339,35 +524,120 @@ def get_all_tasks():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/tasks/next', methods=['GET'])
+@login_required
+def next_tasks():
+    """Próximas tareas pendientes por prioridad, esfuerzo y antigüedad (GET /tasks/next?assigned_to=&k=&wip_limit=)"""
+    try:
+        try:
+            k = int(request.args.get('k') or 10)
+            wip_limit = request.args.get('wip_limit', '')
+            wip_limit = int(wip_limit) if wip_limit != '' else app.config['WIP_LIMIT']
+        except ValueError:
+            return jsonify({'error': 'k y wip_limit deben ser números enteros'}), 400
+        
+        if not 1 <= k <= 100:
+            return jsonify({'error': 'k debe estar entre 1 y 100'}), 400
+        if wip_limit < 0:
+            return jsonify({'error': 'wip_limit no puede ser negativo'}), 400
+        
+        # Los administradores eligen la persona; los usuarios solo ven su propio trabajo
+        assigned_to = request.args.get('assigned_to') if current_user.es_admin else current_user.nombre
+        
+        # Tareas en curso por persona (usa el índice assigned_to, status)
+        wip_query = db.session.query(Tarea.assigned_to, db.func.count()).filter(
+            Tarea.status.in_(WIP_STATUSES), Tarea.assigned_to.isnot(None))
+        if assigned_to is not None:
+            wip_query = wip_query.filter(Tarea.assigned_to == assigned_to)
+        wip = dict(wip_query.group_by(Tarea.assigned_to).all())
+        
+        priority_rank = db.case({priority: rank for rank, priority in enumerate(PRIORITY_ORDER)},
+                                value=Tarea.priority, else_=len(PRIORITY_ORDER))
+        query = Tarea.query.with_entities(*task_columns(Tarea)).filter(Tarea.status == 'pendiente')
+        if assigned_to is not None:
+            query = query.filter(Tarea.assigned_to == assigned_to)
+        query = query.order_by(priority_rank, Tarea.effort_hours.is_(None), Tarea.effort_hours,
+                               Tarea.fecha_creacion, Tarea.id)
+        
+        if not wip_limit:
+            rows = query.limit(k).all()
+        elif assigned_to is not None:
+            rows = query.limit(max(min(k, wip_limit - wip.get(assigned_to, 0)), 0)).all()
+        else:
+            # Límite por persona: recorrer en orden saltando a quien ya no tiene hueco
+            rows, capacity = [], {}
+            for row in query.yield_per(100):
+                if row.assigned_to:
+                    remaining = capacity.setdefault(row.assigned_to, wip_limit - wip.get(row.assigned_to, 0))
+                    if remaining <= 0:
+                        continue
+                    capacity[row.assigned_to] = remaining - 1
+                rows.append(row)
+                if len(rows) == k:
+                    break
+        
+        result = {'k': k, 'wip_limit': wip_limit, 'tasks': [row_to_dict(row) for row in rows]}
+        if assigned_to is not None:
+            result['assigned_to'] = assigned_to
+            result['wip'] = wip.get(assigned_to, 0)
+        return jsonify(result), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/tasks/analytics', methods=['GET'])
+@login_required
+def tasks_analytics():
+    """Informe de carga de trabajo por persona, prioridad, status y semana (GET /tasks/analytics)"""
+    try:
+        if not current_user.es_admin:
+            return jsonify({'error': 'Solo los administradores pueden ver el informe de carga'}), 403
+        if not NUMPY_AVAILABLE:
+            return jsonify({'error': 'Los informes de carga requieren numpy (pip install numpy)'}), 501
+        
+        # Marca de la tabla: cambia con cada alta, baja o modificación (version aumenta en cada UPDATE)
+        stamp = tuple(db.session.query(
+            db.func.count(Tarea.id), db.func.max(Tarea.id), db.func.sum(Tarea.version)
+        ).one())
+        
+        cached = analytics_cache.get('report')
+        if cached is None or cached[0] != stamp:
+            # Una sola consulta de columnas, sin objetos ORM, cargada en arrays NumPy
+            rows = db.session.query(Tarea.assigned_to, Tarea.priority, Tarea.status,
+                                    Tarea.effort_hours, Tarea.fecha_creacion)
+            cached = (stamp, workload_report(TaskColumns.from_rows(rows)))
+            analytics_cache['report'] = cached
+        
+        return jsonify(cached[1]), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/tasks/<int:task_id>', methods=['GET'])
 @login_required
 def get_task(task_id):
     """Obtener una tarea específica (GET /tasks/<id>)"""
     try:
-        tarea = Tarea.query.get_or_404(task_id)
+        row = Tarea.query.with_entities(*task_columns(Tarea), Tarea.creador_id).filter(Tarea.id == task_id).first()
+        
+        if row is None:
+            return jsonify({'error': 'Tarea no encontrada'}), 404
         
         # Verificar permisos: admin o usuario asignado o creador
-        if not current_user.es_admin and tarea.assigned_to != current_user.nombre and tarea.creador_id != current_user.id:
+        if not current_user.es_admin and row.assigned_to != current_user.nombre and row.creador_id != current_user.id:
             return jsonify({'error': 'No tienes permiso para acceder a esta tarea'}), 403
         
-        return jsonify({
-            'id': tarea.id,
-            'title': tarea.title,
-            'description': tarea.description,
-            'priority': tarea.priority,
-            'effort_hours': float(tarea.effort_hours) if tarea.effort_hours else None,
-            'status': tarea.status,
-            'assigned_to': tarea.assigned_to,
-            'fecha_creacion': tarea.fecha_creacion.isoformat()
-        }), 200
+        response = jsonify(row_to_dict(row))
+        response.set_etag(str(row.version))
+        return response, 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/tasks/<int:task_id>', methods=['PUT'])
+@app.route('/tasks/<int:task_id>', methods=['PUT', 'PATCH'])
 @login_required
 def update_task(task_id):
-    """Actualizar una tarea (PUT /tasks/<id>)"""
+    """Actualizar una tarea (PUT o PATCH /tasks/<id>, solo los campos enviados; admite If-Match)"""
     try:
         tarea = Tarea.query.get_or_404(task_id)
         
@@ -375,47 +645,32 @@ def update_task(task_id):
         if not current_user.es_admin and tarea.creador_id != current_user.id:
             return jsonify({'error': 'No tienes permiso para actualizar esta tarea'}), 403
         
+        # Concurrencia optimista: la versión enviada en If-Match debe seguir vigente
+        if version_mismatch(tarea):
+            return jsonify({'error': 'La tarea fue modificada por otra petición'}), 412
+        
         data = request.get_json()
         
         if not data:
             return jsonify({'error': 'No se proporcionaron datos para actualizar'}), 400
         
-        # Actualizar campos si están presentes
-        if 'title' in data:
-            tarea.title = data['title']
-        
-        if 'description' in data:
-            tarea.description = data['description']
+        # Solo se validan y actualizan los campos enviados
+        values, errors = TAREA_SCHEMA.validate(data, partial=True)
+        if errors:
+            return validation_error(errors)
         
-        if 'priority' in data:
-            if data['priority'] not in ['baja', 'media', 'alta', 'bloqueante']:
-                return jsonify({'error': 'Prioridad inválida. Debe ser: baja, media, alta, bloqueante'}), 400
-            tarea.priority = data['priority']
-        
-        if 'effort_hours' in data:
-            tarea.effort_hours = Decimal(str(data['effort_hours'])) if data['effort_hours'] else None
-        
-        if 'status' in data:
-            if data['status'] not in ['pendiente', 'en_progreso', 'en_revision', 'completada']:
-                return jsonify({'error': 'Status inválido. Debe ser: pendiente, en_progreso, en_revision, completada'}), 400
-            tarea.status = data['status']
-        
-        if 'assigned_to' in data:
-            tarea.assigned_to = data['assigned_to'] if data['assigned_to'] else None
+        anterior = tarea.assigned_to
+        for field, value in values.items():
+            setattr(tarea, field, value)
         
         db.session.commit()
+        invalidate_dashboards(anterior, tarea.assigned_to)
         
-        return jsonify({
-            'id': tarea.id,
-            'title': tarea.title,
-            'description': tarea.description,
-            'priority': tarea.priority,
-            'effort_hours': float(tarea.effort_hours) if tarea.effort_hours else None,
-            'status': tarea.status,
-            'assigned_to': tarea.assigned_to,
-            'fecha_creacion': tarea.fecha_creacion.isoformat()
-        }), 200
+        return task_response(tarea, 200)
         
+    except StaleDataError:
+        db.session.rollback()
+        return jsonify({'error': 'La tarea fue modificada por otra petición'}), 412
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -433,6 +688,7 @@ def delete_task(task_id):
         
         db.session.delete(tarea)
         db.session.commit()
+        invalidate_dashboards(tarea.assigned_to)
         
         return jsonify({
             'message': 'Tarea eliminada exitosamente',
@@ -443,10 +699,240 @@ def delete_task(task_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/tasks/archive', methods=['POST'])
+@login_required
+def archive_tasks():
+    """Archivar tareas completadas antiguas (POST /tasks/archive)"""
+    try:
+        if not current_user.es_admin:
+            return jsonify({'error': 'Solo los administradores pueden archivar tareas'}), 403
+        
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        days = data.get('older_than_days', app.config['ARCHIVE_AFTER_DAYS'])
+        if not isinstance(days, (int, float)) or days < 0:
+            return jsonify({'error': 'older_than_days debe ser un número no negativo'}), 400
+        
+        return jsonify({'archived': archive_completed(days)}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/tasks/<int:task_id>/restore', methods=['POST'])
+@login_required
+def restore_task(task_id):
+    """Restaurar una tarea archivada (POST /tasks/<id>/restore)"""
+    try:
+        archivada = db.session.get(TareaArchivada, task_id)
+        
+        if archivada is None:
+            if db.session.get(Tarea, task_id) is not None:
+                return jsonify({'error': 'La tarea no está archivada'}), 409
+            return jsonify({'error': 'Tarea archivada no encontrada'}), 404
+        
+        # Verificar permisos: admin o creador
+        if not current_user.es_admin and archivada.creador_id != current_user.id:
+            return jsonify({'error': 'No tienes permiso para restaurar esta tarea'}), 403
+        
+        # Copiar tal cual, conservando también la versión
+        columns = [getattr(TareaArchivada, name) for name in ARCHIVE_COLUMNS]
+        db.session.execute(
+            db.insert(Tarea).from_select(
+                list(ARCHIVE_COLUMNS),
+                db.select(*columns).where(TareaArchivada.id == task_id)
+            )
+        )
+        assigned_to = archivada.assigned_to
+        db.session.delete(archivada)
+        db.session.commit()
+        invalidate_dashboards(assigned_to)
+        
+        return task_response(db.session.get(Tarea, task_id), 200)
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Trabajos en segundo plano. Cada función recibe el JobContext del trabajo y
+# devuelve el resumen del resultado; se ejecutan en los hilos del JobManager,
+# con su propia sesión de base de datos
+EXPORT_BATCH = 1000
+IMPORT_BATCH = 500
+
+def export_job(job):
+    """Exporta a NDJSON con gzip las tareas visibles para quien encoló el trabajo."""
+    query = Tarea.query.with_entities(*task_columns(Tarea))
+    if job.params['assigned_to'] is not None:
+        query = query.filter(Tarea.assigned_to == job.params['assigned_to'])
+    total = query.count()
+    job.progress(0, total, 'Exportando tareas')
+    
+    exported = 0
+    with gzip.open(job.result_path('tareas.ndjson.gz'), 'wb', compresslevel=6) as f:
+        for row in query.order_by(Tarea.id).yield_per(EXPORT_BATCH):
+            f.write(app.json.dumps(row_to_dict(row)).encode('utf-8') + b'\n')
+            exported += 1
+            if exported % EXPORT_BATCH == 0:
+                job.progress(exported, total)
+    
+    job.progress(exported, total)
+    return {'exported': exported}
+
+def import_job(job):
+    """Crea tareas a partir de una lista; las inválidas se omiten y se informa de su posición."""
+    items = job.params.get('tasks')
+    if not isinstance(items, list):
+        raise ValueError('tasks debe ser una lista de tareas')
+    
+    # Validación de todo el lote en una pasada; solo se construyen las tareas válidas
+    valid, invalid = TAREA_SCHEMA.validate_many(items)
+    errors = [{'index': item['index'], 'error': first_error(item['errors']), 'fields': item['errors']}
+              for item in invalid]
+    creador_id = job.params['creador_id']
+    
+    imported, assigned = 0, set()
+    job.progress(0, len(valid), 'Importando tareas')
+    # Una transacción por lote: los escritores de la API no esperan a toda la importación
+    for start in range(0, len(valid), IMPORT_BATCH):
+        pending = [Tarea(creador_id=creador_id, **values) for index, values in valid[start:start + IMPORT_BATCH]]
+        db.session.add_all(pending)
+        db.session.commit()
+        imported += len(pending)
+        assigned.update(tarea.assigned_to for tarea in pending)
+        job.progress(imported, len(valid))
+    
+    if imported:
+        invalidate_dashboards(*assigned)
+    return {'received': len(items), 'imported': imported, 'failed': len(errors), 'errors': errors[:100]}
+
+def archive_job(job):
+    """Archiva las tareas completadas antiguas (older_than_days, por defecto ARCHIVE_AFTER_DAYS)."""
+    days = job.params.get('older_than_days', app.config['ARCHIVE_AFTER_DAYS'])
+    if not isinstance(days, (int, float)) or days < 0:
+        raise ValueError('older_than_days debe ser un número no negativo')
+    job.progress(0, None, 'Archivando tareas completadas')
+    return {'archived': archive_completed(days)}
+
+def reindex_job(job):
+    """Reconstruye los índices de la base de datos y actualiza las estadísticas del planificador."""
+    job.progress(0, 2, 'Reconstruyendo índices')
+    db.session.execute(db.text('REINDEX'))
+    job.progress(1, 2, 'Actualizando estadísticas')
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+    job.progress(2, 2)
+    return {'tasks': db.session.query(db.func.count(Tarea.id)).scalar()}
+
+jobs.register('export', export_job)
+jobs.register('import', import_job)
+jobs.register('archive', archive_job)
+jobs.register('reindex', reindex_job)
+
+# Tipos de trabajo que solo pueden encolar los administradores
+ADMIN_JOBS = ('archive', 'reindex')
+
+def visible_job(job_id):
+    """Trabajo si existe y es de quien lo pide (o quien lo pide es administrador); si no, None."""
+    job = jobs.get(job_id)
+    if job is None or (not current_user.es_admin and job['owner'] != current_user.id):
+        return None
+    return job
+
+def job_response(job, status):
+    """Respuesta JSON de un trabajo con la URL de su resultado si se puede descargar."""
+    job = jobs.public(job)
+    if job['download']:
+        job['result_url'] = url_for('download_job_result', job_id=job['id'])
+    response = jsonify(job)
+    if status == 202:
+        response.headers['Location'] = url_for('get_job', job_id=job['id'])
+    return response, status
+
+@app.route('/jobs', methods=['POST'])
+@login_required
+def create_job():
+    """Encolar un trabajo en segundo plano; responde 202 sin esperar a que termine (POST /jobs)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        job_type = data.get('type')
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params debe ser un objeto'}), 400
+        if job_type in ADMIN_JOBS and not current_user.es_admin:
+            return jsonify({'error': 'Solo los administradores pueden encolar este trabajo'}), 403
+        
+        # Quien encola el trabajo determina qué tareas ve y de quién son las que crea
+        params['creador_id'] = current_user.id
+        params['assigned_to'] = None if current_user.es_admin else current_user.nombre
+        
+        return job_response(jobs.submit(job_type, params, owner=current_user.id), 202)
+    
+    except JobError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['GET'])
+@login_required
+def get_jobs():
+    """Trabajos más recientes: todos para los administradores, los propios para el resto (GET /jobs)"""
+    try:
+        owner = None if current_user.es_admin else current_user.id
+        job_list = jobs.recent(owner=owner)
+        return jsonify({'total': len(job_list), 'jobs': job_list}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Estado, progreso y resumen de un trabajo (GET /jobs/<id>)"""
+    try:
+        job = visible_job(job_id)
+        if job is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        return job_response(job, 200)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+@login_required
+def download_job_result(job_id):
+    """Descargar el archivo de resultado de un trabajo terminado (GET /jobs/<id>/result)"""
+    try:
+        if visible_job(job_id) is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        path, download_name = jobs.result_file(job_id)
+        return send_file(path, as_attachment=True, download_name=download_name)
+    
+    except JobError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Inicializar base de datos
+def add_version_columns():
+    """Añade la columna version a las tablas de tareas creadas antes de que existiera."""
+    inspector = db.inspect(db.engine)
+    for table in ('tarea', 'tarea_archivada'):
+        if table in inspector.get_table_names():
+            if 'version' not in {column['name'] for column in inspector.get_columns(table)}:
+                db.session.execute(db.text(f'ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
+    db.session.commit()
+
 def init_db():
     with app.app_context():
         db.create_all()
+        add_version_columns()
+        # create_all no añade índices nuevos a tablas que ya existían
+        for index in Tarea.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
         print("Base de datos inicializada correctamente")
 
 if __name__ == '__main__':
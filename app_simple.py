@@ -3,7 +3,15 @@ Aplicación Flask principal para gestión de tareas.
 Usa TaskManager y archivo JSON para almacenar tareas.
 """
 
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify, request
+from middleware.admission import AdmissionController
+from middleware.assets import StaticAssets
+from middleware.compression import ResponseCompression
+from middleware.memory import MemoryProfiler
+from managers.memory_profile import measure_store_load
+from managers.job_manager import JobManager
+from managers.task_jobs import register_task_jobs
+from routes.job_routes import job_bp
 from routes.task_routes import task_bp
 import os
 
@@ -14,10 +22,65 @@ app.config['SECRET_KEY'] = 'tu-clave-secreta-aqui-cambiar-en-produccion'
 # Registrar las rutas de tareas
 app.register_blueprint(task_bp)
 
+# Trabajos en segundo plano (exportar, importar, archivar, reindexar) y sus rutas
+jobs = JobManager(app)
+register_task_jobs(jobs)
+app.register_blueprint(job_bp)
+
+# Control de admisión en /tasks: límites de ritmo por IP, concurrencia y cola acotada
+admission = AdmissionController(app)
+
+# Estáticos con hash en el nombre, gzip precalculado y cache inmutable (index.html apunta a ellos)
+assets = StaticAssets(app)
+
+# Perfil de memoria por petición con tracemalloc (TASKS_MEMORY_PROFILE=1 o POST /debug/memory si
+# MEMORY_DEBUG_ROUTES está activo).
+# Se registra antes que la compresión para que su medición la incluya
+memory = MemoryProfiler(app)
+
+# Compresión gzip/deflate de las respuestas JSON y NDJSON (también en streaming)
+compression = ResponseCompression(app)
+
 @app.route('/')
 def index():
     """Ruta raíz - Sirve la interfaz web"""
-    return send_from_directory('static', 'index.html')
+    return assets.serve_index()
+
+@app.route('/metrics')
+def metrics():
+    """Métricas del servidor: compresión de respuestas"""
+    return {'compression': compression.stats()}
+
+def memory_stats():
+    """Perfil de memoria por endpoint; con ?top=N, puntos del código con más memoria del almacén"""
+    try:
+        top = int(request.args.get('top', 0))
+    except ValueError:
+        return jsonify({'error': 'top debe ser un número entero'}), 400
+    return memory.stats(top)
+
+def memory_configure():
+    """Activa o desactiva el perfil de memoria sin reiniciar: {"enabled": bool, "frames": N, "reset": bool}"""
+    try:
+        memory.configure(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return memory.stats()
+
+def memory_store_load():
+    """Mide la memoria de una lectura completa del almacén (load_tasks + Task.from_dict)"""
+    try:
+        return measure_store_load(int(request.args.get('top', 10)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Las rutas de depuración de memoria activan tracemalloc y leen el almacén completo:
+# solo se registran si MEMORY_DEBUG_ROUTES está activo (TASKS_MEMORY_DEBUG_ROUTES=1,
+# TASKS_MEMORY_PROFILE=1 o modo debug)
+if app.config['MEMORY_DEBUG_ROUTES']:
+    app.add_url_rule('/debug/memory', view_func=memory_stats, methods=['GET'])
+    app.add_url_rule('/debug/memory', view_func=memory_configure, methods=['POST'])
+    app.add_url_rule('/debug/memory/load', view_func=memory_store_load, methods=['GET'])
 
 @app.route('/api')
 def api_info():
@@ -26,10 +89,25 @@ def api_info():
         'message': 'API de Gestión de Tareas',
         'endpoints': {
             'GET /tasks': 'Obtener todas las tareas',
+            'GET /tasks/stream': 'Obtener todas las tareas en NDJSON',
+            'GET /tasks/next': 'Próximas tareas por prioridad (assigned_to, k, wip_limit)',
+            'GET /tasks/analytics': 'Informe de carga de trabajo (requiere numpy)',
             'GET /tasks/<id>': 'Obtener una tarea específica',
             'POST /tasks': 'Crear una nueva tarea',
             'PUT /tasks/<id>': 'Actualizar una tarea',
-            'DELETE /tasks/<id>': 'Eliminar una tarea'
+            'PATCH /tasks/<id>': 'Modificar campos de una tarea (admite If-Match)',
+            'DELETE /tasks/<id>': 'Eliminar una tarea',
+            'POST /tasks/batch': 'Aplicar varias operaciones de forma atómica',
+            'POST /tasks/archive': 'Archivar las tareas completadas antiguas',
+            'POST /tasks/<id>/restore': 'Restaurar una tarea archivada',
+            'POST /jobs': 'Encolar un trabajo (export, import, archive, reindex)',
+            'GET /jobs': 'Listar los trabajos recientes',
+            'GET /jobs/<id>': 'Estado y progreso de un trabajo',
+            'GET /jobs/<id>/result': 'Descargar el resultado de un trabajo',
+            'GET /metrics': 'Métricas de compresión de respuestas',
+            'GET /debug/memory': 'Perfil de memoria por endpoint (?top=N; con MEMORY_DEBUG_ROUTES)',
+            'POST /debug/memory': 'Activar o desactivar el perfil de memoria (con MEMORY_DEBUG_ROUTES)',
+            'GET /debug/memory/load': 'Memoria de una lectura completa del almacén (con MEMORY_DEBUG_ROUTES)'
         }
     }
 
@@ -48,6 +126,7 @@ if __name__ == '__main__':
     print("   GET    /tasks/<id>  - Obtener una tarea específica")
     print("   POST   /tasks       - Crear una nueva tarea")
     print("   PUT    /tasks/<id>  - Actualizar una tarea")
+    print("   PATCH  /tasks/<id>  - Modificar campos de una tarea")
     print("   DELETE /tasks/<id>  - Eliminar una tarea")
     print("\n✅ Servidor ejecutándose en http://localhost:5000")
     print("=" * 60)
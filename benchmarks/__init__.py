@@ -0,0 +1,3 @@
+"""
+Scripts de benchmark para la aplicación de gestión de tareas.
+"""
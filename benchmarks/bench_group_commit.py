@@ -0,0 +1,84 @@
+"""
+Benchmark: POST /tasks concurrentes con y sin agrupación de escrituras.
+
+Cada hilo usa su propio cliente de pruebas de Flask contra app_simple.py y
+crea tareas en un tasks.json temporal. Se compara el throughput con
+escritura directa (un guardado por petición) y con GroupCommitWriter.
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.bench_group_commit
+    python -m benchmarks.bench_group_commit --threads 32 --requests 50 --initial 5000
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from app_simple import app
+from managers.task_manager import TaskManager
+from benchmarks.bench_snapshot import make_tasks
+
+
+def run_case(group_commit, threads, requests_per_thread, initial):
+    """Ejecuta un caso y devuelve (segundos, tareas finales, estadísticas de lotes)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Se mide el almacén, no el control de admisión
+        app.config['ADMISSION_ENABLED'] = False
+        TaskManager.JSON_FILE = os.path.join(tmp, 'tasks.json')
+        TaskManager._snapshot = None
+        TaskManager.GROUP_COMMIT = group_commit
+        TaskManager._group_writer = None
+        TaskManager.save_tasks(make_tasks(initial))
+        
+        barrier = threading.Barrier(threads + 1)
+        
+        def worker(n):
+            client = app.test_client()
+            barrier.wait()
+            for i in range(requests_per_thread):
+                response = client.post('/tasks', json={'title': f'Hilo {n} - {i}', 'priority': 'alta'})
+                assert response.status_code == 201, response.data
+        
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for w in workers:
+            w.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        
+        stats = TaskManager._group_writer.stats() if TaskManager._group_writer else None
+        if TaskManager._group_writer:
+            TaskManager._group_writer.stop()
+        
+        TaskManager._snapshot = None
+        count = len(TaskManager.load_tasks())
+        return elapsed, count, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=25, help='Peticiones por hilo')
+    parser.add_argument('--initial', type=int, default=2000, help='Tareas iniciales en el almacén')
+    args = parser.parse_args()
+    
+    total = args.threads * args.requests
+    expected = args.initial + total
+    print(f"{total} POST /tasks con {args.threads} hilos sobre {args.initial} tareas iniciales\n")
+    for group_commit in (False, True):
+        elapsed, count, stats = run_case(group_commit, args.threads, args.requests, args.initial)
+        label = 'agrupado' if group_commit else 'directo'
+        line = f"{label:>9}: {elapsed:7.2f} s  {total / elapsed:9.1f} POST/s  tareas={count}"
+        if count != expected:
+            line += f"  (¡se esperaban {expected}!)"
+        if stats:
+            line += f"  lotes={stats['batches']}  media={stats['avg_batch']:.1f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: latencia de la API de tareas durante una avalancha de inicios de sesión.
+
+Para cada modo de cálculo de los hashes de contraseña (en el hilo de la
+petición o en el pool de procesos de PasswordHasher) arranca app.py con una
+base de datos temporal y mide la latencia de GET /tasks:
+    - en reposo
+    - mientras --logins hilos hacen POST /login sin parar (tras un 503
+      esperan un poco, como un cliente que respeta Retry-After)
+
+Cada modo se ejecuta en un proceso aparte, porque la configuración del pool
+se lee al importar app.py.
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.bench_login_storm
+    python -m benchmarks.bench_login_storm --logins 32 --seconds 5 --workers 2
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+MODES = {
+    'hilo de la petición': 0,
+    'pool de procesos': None,
+}
+
+# Pausa de un cliente tras un 503 (segundos)
+BACKOFF = 0.2
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def measure_api(client, stop):
+    """Hace GET /tasks en bucle hasta que se active stop; devuelve las latencias en ms."""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = client.get('/tasks')
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def run_mode(logins, seconds):
+    """Ejecuta un modo dentro del proceso actual (configurado por el entorno) e imprime el resultado en JSON."""
+    import app as application
+    
+    application.init_db()
+    flask_app, db = application.app, application.db
+    with flask_app.app_context():
+        admin = application.Usuario(nombre='Admin', email='admin@example.com', es_admin=True)
+        admin.set_password('secreto')
+        db.session.add(admin)
+        db.session.flush()
+        for i in range(200):
+            db.session.add(application.Tarea(title=f'Tarea {i}', creador_id=admin.id))
+        db.session.commit()
+    
+    api = flask_app.test_client()
+    api.post('/login', data={'email': 'admin@example.com', 'password': 'secreto'})
+    
+    def api_phase(storm):
+        stop = threading.Event()
+        results = {'ok': 0, 'rejected': 0}
+        lock = threading.Lock()
+        
+        def login_loop():
+            client = flask_app.test_client()
+            while not stop.is_set():
+                response = client.post('/login', data={'email': 'admin@example.com', 'password': 'secreto'})
+                with lock:
+                    results['ok' if response.status_code == 302 else 'rejected'] += 1
+                if response.status_code == 503:
+                    time.sleep(BACKOFF)
+        
+        threads = [threading.Thread(target=login_loop) for _ in range(logins if storm else 0)]
+        for thread in threads:
+            thread.start()
+        timer = threading.Timer(seconds, stop.set)
+        timer.start()
+        latencies = measure_api(api, stop)
+        for thread in threads:
+            thread.join()
+        return {
+            'requests': len(latencies),
+            'p50': percentile(latencies, 0.5),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies),
+            'logins_ok': results['ok'] / seconds,
+            'logins_rejected': results['rejected'],
+        }
+    
+    result = {'idle': api_phase(False), 'storm': api_phase(True), 'hasher': application.passwords.stats()}
+    print(json.dumps(result))
+
+
+def run(logins, seconds, workers):
+    print(f"{logins} hilos iniciando sesión, {seconds} s por fase\n")
+    print(f"{'modo':<22} | {'fase':<9} | {'GET /tasks':>10} | {'p50 ms':>8} | {'p99 ms':>8} | {'max ms':>8} | {'logins/s':>8} | {'503':>5}")
+    print('-' * 97)
+    for name, mode_workers in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                TASKS_DATABASE_URI=f"sqlite:///{os.path.join(tmp, 'tareas.db')}",
+                TASKS_JOBS_FILE=os.path.join(tmp, 'jobs.json'),
+                TASKS_JOBS_DIR=os.path.join(tmp, 'job_results'),
+                TASKS_ADMISSION='0',
+                TASKS_PASSWORD_HASH_WORKERS=str(workers if mode_workers is None else mode_workers),
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_login_storm', '--run-mode',
+                 '--logins', str(logins), '--seconds', str(seconds)],
+                env=env, check=True, capture_output=True, text=True
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        for phase in ('idle', 'storm'):
+            data = result[phase]
+            print(f"{name:<22} | {'reposo' if phase == 'idle' else 'avalancha':<9} | {data['requests']:>10} | "
+                  f"{data['p50']:>8.1f} | {data['p99']:>8.1f} | {data['max']:>8.1f} | "
+                  f"{data['logins_ok']:>8.1f} | {data['logins_rejected']:>5}")
+        check = result['hasher']['operations']['check']
+        print(f"{'':<22}   contraseñas: {check['count']} comprobaciones, media {check['avg_ms']} ms "
+              f"(espera {check['avg_wait_ms']} ms), {result['hasher']['rejected']} rechazadas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=16, help='Hilos haciendo POST /login a la vez')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Duración de cada fase')
+    parser.add_argument('--workers', type=int, default=2, help='Procesos del pool de contraseñas')
+    parser.add_argument('--run-mode', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_mode:
+        run_mode(args.logins, args.seconds)
+    else:
+        run(args.logins, args.seconds, args.workers)
+
+
+if __name__ == '__main__':
+    main()
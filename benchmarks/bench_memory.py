@@ -0,0 +1,142 @@
+"""
+Benchmark: bytes por tarea en cada representación del almacén.
+
+Para cada tamaño genera tareas sintéticas y mide, con tracemalloc, la memoria
+que ocupa cada representación en el proceso, y el tamaño en disco de los
+formatos persistentes:
+    - tasks.json en disco y los diccionarios de json.load
+    - objetos Task (Task.from_dict) y la instantánea con sus índices; las
+      cadenas de las tareas son las mismas que las de los diccionarios, así que
+      una tarea cargada ocupa la suma de ambas filas
+    - instantánea binaria (archivo y apertura con mmap)
+    - tabla de memoria compartida (registros + cadenas)
+    - archivo frío NDJSON con gzip
+    - respuesta de GET /tasks (JSON codificado) y de jsonify sobre to_dict
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 1000 100000 --top 5
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+
+from flask import Flask, jsonify
+
+from benchmarks.bench_snapshot import make_tasks
+from managers.archive_store import TaskArchive
+from managers.memory_profile import measure
+from managers.snapshot_store import TaskSnapshotFile, write_snapshot
+from managers.task_cache import TaskResponseCache
+from managers.task_codec import encode_tasks
+from managers.task_manager import TaskSnapshot
+from models.task import Task
+
+
+def representations(tasks, tmp):
+    """
+    Mide cada representación de las tareas.
+    
+    Returns:
+        List[tuple]: (representación, tipo 'memoria' o 'disco', bytes, pico en bytes o None)
+    """
+    rows = []
+    json_path = os.path.join(tmp, 'tasks.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump([task.to_dict() for task in tasks], f, indent=2, ensure_ascii=False)
+    rows.append(('tasks.json', 'disco', os.path.getsize(json_path), None))
+    
+    def load_json():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    dicts, report = measure(load_json)
+    rows.append(('dicts (json.load)', 'memoria', report['net_bytes'], report['peak_bytes']))
+    
+    loaded, report = measure(lambda: [Task.from_dict(data) for data in dicts])
+    rows.append(('objetos Task (from_dict, sin cadenas)', 'memoria', report['net_bytes'], report['peak_bytes']))
+    del dicts
+    
+    def build_snapshot():
+        snapshot = TaskSnapshot(1, loaded)
+        snapshot.created_index()
+        for assigned_to in {task.assigned_to for task in loaded}:
+            snapshot.by_assignee(assigned_to)
+        return snapshot
+    
+    snapshot, report = measure(build_snapshot)
+    rows.append(('índices de la instantánea', 'memoria', report['net_bytes'], report['peak_bytes']))
+    
+    snap_path = os.path.join(tmp, 'tasks.snap')
+    write_snapshot(snap_path, tasks)
+    rows.append(('instantánea binaria', 'disco', os.path.getsize(snap_path), None))
+    snapshot_file, report = measure(TaskSnapshotFile, snap_path)
+    rows.append(('instantánea binaria (mmap, montón)', 'memoria', report['net_bytes'], report['peak_bytes']))
+    snapshot_file.close()
+    
+    (records, strings), report = measure(encode_tasks, tasks)
+    rows.append(('memoria compartida', 'memoria', len(records) + len(strings), report['peak_bytes']))
+    del records, strings
+    
+    archive_path = os.path.join(tmp, 'archive.ndjson.gz')
+    TaskArchive(archive_path).append(tasks)
+    rows.append(('archivo frío (NDJSON gzip)', 'disco', os.path.getsize(archive_path), None))
+    
+    cache = TaskResponseCache()
+    payload, report = measure(cache.build_list_payload, loaded)
+    rows.append(('respuesta GET /tasks (cache)', 'memoria', len(payload), report['peak_bytes']))
+    del payload, cache
+    
+    app = Flask(__name__)
+    with app.app_context():
+        response, report = measure(lambda: jsonify({'total': len(loaded), 'tasks': [t.to_dict() for t in loaded]}))
+    rows.append(('jsonify(to_dict) de /tasks', 'memoria', response.calculate_content_length(), report['peak_bytes']))
+    del response, snapshot, loaded
+    gc.collect()
+    return rows
+
+
+def load_sites(tasks, tmp, top):
+    """Puntos del código que más memoria reservan al cargar tasks.json con Task.from_dict."""
+    json_path = os.path.join(tmp, 'tasks.json')
+    
+    def load():
+        with open(json_path, 'r', encoding='utf-8') as f:
+            return [Task.from_dict(data) for data in json.load(f)]
+    
+    _, report = measure(load, limit=top, include=())
+    return report['top_sites']
+
+
+def run(sizes, top):
+    for size in sizes:
+        tasks = make_tasks(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = representations(tasks, tmp)
+            print(f"\n{size} tareas")
+            print(f"{'representación':<40} | {'tipo':<7} | {'bytes/tarea':>11} | {'pico/tarea':>10} | {'total MB':>9}")
+            print('-' * 90)
+            for name, kind, total, peak in rows:
+                peak_text = f'{peak / size:>10.1f}' if peak is not None else f"{'-':>10}"
+                print(f"{name:<40} | {kind:<7} | {total / size:>11.1f} | {peak_text} | {total / 1e6:>9.2f}")
+            
+            if top:
+                print(f"\nPuntos con más memoria al cargar tasks.json (json.load + Task.from_dict):")
+                for site in load_sites(tasks, tmp, top):
+                    print(f"  {site['bytes'] / size:>8.1f} B/tarea  {site['blocks']:>9} bloques  {site['site']}")
+        del tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--top', type=int, default=5, help='Puntos del código a mostrar (0 = ninguno)')
+    args = parser.parse_args()
+    run(args.sizes, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: tiempo de apertura en frío de tasks.json frente a la instantánea binaria.
+
+Para cada tamaño genera tareas sintéticas, las guarda en ambos formatos y mide:
+    - JSON: json.load + Task.from_dict de todas las tareas
+    - Instantánea: abrir con mmap + buscar una tarea por id
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --sizes 1000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from models.task import Task
+from managers.snapshot_store import TaskSnapshotFile, write_snapshot
+
+
+def make_tasks(count):
+    """Genera tareas sintéticas con todos los campos rellenos."""
+    return [
+        Task(
+            id=i,
+            title=f'Tarea {i}',
+            description=f'Descripción de la tarea número {i} para el benchmark',
+            priority=Task.PRIORITIES[i % len(Task.PRIORITIES)],
+            effort_hours=(i % 40) / 2,
+            status=Task.STATUSES[i % len(Task.STATUSES)],
+            assigned_to=f'Persona {i % 25}'
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def best_of(repeat, func):
+    """Devuelve el mejor tiempo (en segundos) de varias ejecuciones."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, repeat):
+    print(f"{'tareas':>10} | {'JSON (ms)':>12} | {'instantánea (ms)':>17} | {'bytes JSON':>12} | {'bytes snap':>12}")
+    print('-' * 76)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'tasks.json')
+        snap_path = os.path.join(tmp, 'tasks.snap')
+        for size in sizes:
+            tasks = make_tasks(size)
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump([task.to_dict() for task in tasks], f, indent=2, ensure_ascii=False)
+            write_snapshot(snap_path, tasks)
+            del tasks
+            
+            def open_json():
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    [Task.from_dict(data) for data in json.load(f)]
+            
+            def open_snapshot():
+                with TaskSnapshotFile(snap_path) as snapshot:
+                    snapshot.get(size // 2)
+            
+            json_time = best_of(repeat, open_json)
+            snap_time = best_of(repeat, open_snapshot)
+            print(f"{size:>10} | {json_time * 1000:>12.2f} | {snap_time * 1000:>17.3f} | "
+                  f"{os.path.getsize(json_path):>12} | {os.path.getsize(snap_path):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
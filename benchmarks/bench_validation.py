@@ -0,0 +1,83 @@
+"""
+Benchmark: validación de lotes de tareas con el esquema compilado.
+
+Para cada tamaño genera registros sintéticos (un 5 % inválidos) y mide:
+    - Por tarea: Task.from_dict + Task.validate de cada registro (como se
+      importaba antes)
+    - validate_many: TASK_SCHEMA (effort_hours float, almacén JSON)
+    - validate_many: esquema de la tabla tarea (effort_hours Decimal)
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.bench_validation
+    python -m benchmarks.bench_validation --sizes 10000 100000 --repeat 3
+"""
+
+import argparse
+import time
+
+from models.task import Task
+from models.task_schema import PRIORITIES, STATUSES, TASK_SCHEMA, TaskSchema
+
+
+def make_records(count):
+    """Genera registros como los de una importación; uno de cada 20 es inválido."""
+    records = []
+    for i in range(count):
+        record = {
+            'title': f'Tarea {i}',
+            'description': f'Descripción de la tarea número {i}',
+            'priority': PRIORITIES[i % len(PRIORITIES)],
+            'effort_hours': (i % 40) / 2,
+            'status': STATUSES[i % len(STATUSES)],
+            'assigned_to': f'Persona {i % 25}',
+        }
+        if i % 20 == 0:
+            record['priority'] = 'urgente'
+        records.append(record)
+    return records
+
+
+def best_of(repeat, func):
+    """Devuelve el mejor tiempo (en segundos) de varias ejecuciones."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_task(records):
+    valid = []
+    for data in records:
+        task = Task.from_dict(data)
+        if task.validate()[0]:
+            valid.append(task)
+    return valid
+
+
+def run(sizes, repeat):
+    tarea_schema = TaskSchema(decimal_digits=10, max_lengths={'title': 200, 'assigned_to': 100})
+    print(f"{'registros':>10} | {'por tarea (ms)':>15} | {'float (ms)':>11} | {'Decimal (ms)':>13} | {'registros/s':>12}")
+    print('-' * 76)
+    for size in sizes:
+        records = make_records(size)
+        old = best_of(repeat, lambda: per_task(records))
+        batch = best_of(repeat, lambda: TASK_SCHEMA.validate_many(records))
+        decimal = best_of(repeat, lambda: tarea_schema.validate_many(records))
+        valid, invalid = TASK_SCHEMA.validate_many(records)
+        assert len(valid) + len(invalid) == size and len(invalid) == (size + 19) // 20
+        print(f"{size:>10} | {old * 1000:>15.1f} | {batch * 1000:>11.1f} | {decimal * 1000:>13.1f} | "
+              f"{size / batch:>12,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validación de lotes de tareas')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+"""
+Prueba de estrés: operaciones concurrentes mezcladas contra el almacén de tareas.
+
+Cada worker (hilo de un ThreadPoolExecutor o proceso de un ProcessPoolExecutor)
+usa su propio cliente de pruebas de Flask contra app_simple.py y mezcla altas,
+PATCH de sus propias tareas, incrementos con If-Match de un contador
+compartido, bajas y lecturas. Al terminar se comprueban los invariantes:
+
+    - IDs únicos: dos tareas vivas nunca comparten ID. El almacén JSON
+      calcula el siguiente ID como el máximo + 1, así que el ID de la última
+      tarea borrada puede volver a entregarse; eso no cuenta como duplicado.
+    - Ninguna escritura perdida: cada tarea creada sigue ahí (salvo las
+      borradas), cada PATCH confirmado dejó su versión y su valor, y el
+      contador compartido vale exactamente el número de incrementos confirmados.
+    - Integridad de los archivos: tasks.json (o los shards) se puede leer y
+      coincide con la instantánea en memoria y, con memoria compartida, con la tabla.
+
+Para cada backend y modo se informa de operaciones por segundo según la
+concurrencia. Backends: json (un tasks.json), group (agrupación de
+escrituras), shards (TASKS_SHARD_DIR) y shm (memoria compartida). Entre
+procesos solo shm coordina a los escritores, por eso es el único backend que
+se prueba con procesos por defecto; con --process-backends json se puede
+comprobar que sin él se pierden escrituras.
+
+Ejecutar desde la raíz del proyecto:
+    python -m benchmarks.stress_store
+    python -m benchmarks.stress_store --levels 1,4,16 --operations 100 --backends json,shm
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app_simple import app
+from managers.shard_store import ShardedTaskStore
+from managers.task_manager import TaskManager
+from benchmarks.bench_snapshot import make_tasks
+
+BACKENDS = ('json', 'group', 'shards', 'shm')
+
+# Mezcla de operaciones: (nombre, peso)
+OPERATION_MIX = (
+    ('create', 30),
+    ('patch', 25),
+    ('increment', 10),
+    ('delete', 10),
+    ('list', 10),
+    ('get', 15),
+)
+
+# Reintentos de un incremento del contador que recibe 412
+MAX_INCREMENT_RETRIES = 50
+
+
+def configure(config):
+    """
+    Apunta TaskManager al almacén de un caso y descarta el estado del anterior.
+    
+    Args:
+        config: Diccionario con backend, directory y shm_name
+    """
+    directory = config['directory']
+    backend = config['backend']
+    if TaskManager._group_writer is not None:
+        TaskManager._group_writer.stop()
+    # Se mide el almacén, no el control de admisión
+    app.config['ADMISSION_ENABLED'] = False
+    TaskManager.JSON_FILE = os.path.join(directory, 'tasks.json')
+    TaskManager.ARCHIVE_FILE = os.path.join(directory, 'tasks_archive.ndjson.gz')
+    TaskManager.SNAPSHOT_FILE = ''
+    TaskManager.SHARD_DIR = os.path.join(directory, 'shards') if backend == 'shards' else ''
+    TaskManager.GROUP_COMMIT = backend == 'group'
+    TaskManager.SHARED_MEMORY_NAME = config['shm_name'] if backend == 'shm' else ''
+    TaskManager._group_writer = None
+    TaskManager._archive = None
+    TaskManager._shared = None
+    TaskManager._shared_seq = None
+    TaskManager._snapshot = None
+    TaskManager._file_stamp = None
+    TaskManager.cache.invalidate()
+
+
+# Barrera del proceso worker (la recibe _init_process)
+_barrier = None
+
+
+def _init_process(config, barrier):
+    """Inicializador de cada proceso del pool."""
+    global _barrier
+    configure(config)
+    _barrier = barrier
+
+
+def run_worker(worker, operations, seed, counter_id, barrier=None):
+    """
+    Ejecuta las operaciones de un worker y devuelve su registro.
+    
+    Cada worker solo modifica y borra las tareas que él mismo creó, de modo
+    que el estado final de cada una es predecible; el contador compartido es
+    la única tarea que modifican todos.
+    
+    Args:
+        worker: Número de worker
+        operations: Número de operaciones a ejecutar
+        seed: Semilla del generador aleatorio
+        counter_id: ID de la tarea contador
+        barrier: Barrera para empezar todos a la vez (en procesos, la del inicializador)
+    
+    Returns:
+        dict: created (título → ID), deleted (títulos), updates (ID → [n,
+        último valor]), increments, operations y errors
+    """
+    rng = random.Random(seed)
+    names = [name for name, _ in OPERATION_MIX]
+    weights = [weight for _, weight in OPERATION_MIX]
+    client = app.test_client()
+    log = {'created': {}, 'deleted': [], 'updates': {}, 'increments': 0,
+           'operations': 0, 'errors': []}
+    alive = []
+    
+    (barrier or _barrier).wait(timeout=120)
+    for i in range(operations):
+        operation = rng.choices(names, weights)[0]
+        if operation in ('patch', 'delete') and not alive:
+            operation = 'create'
+        
+        if operation == 'create':
+            title = f'w{worker}-{i}'
+            response = client.post('/tasks', json={'title': title, 'priority': 'media'})
+            if response.status_code == 201:
+                task_id = response.get_json()['id']
+                log['created'][title] = task_id
+                alive.append((task_id, title))
+            else:
+                log['errors'].append(f'POST {response.status_code}')
+        
+        elif operation == 'patch':
+            task_id = rng.choice(alive)[0]
+            value = f'w{worker}-{i}'
+            response = client.patch(f'/tasks/{task_id}', json={'description': value})
+            if response.status_code == 200:
+                entry = log['updates'].setdefault(task_id, [0, None])
+                entry[0] += 1
+                entry[1] = value
+            else:
+                log['errors'].append(f'PATCH {task_id} {response.status_code}')
+        
+        elif operation == 'increment':
+            for _ in range(MAX_INCREMENT_RETRIES):
+                current = client.get(f'/tasks/{counter_id}')
+                hours = current.get_json()['effort_hours']
+                response = client.patch(f'/tasks/{counter_id}', json={'effort_hours': hours + 1},
+                                        headers={'If-Match': current.headers['ETag']})
+                if response.status_code != 412:
+                    break
+            if response.status_code == 200:
+                log['increments'] += 1
+            else:
+                log['errors'].append(f'incremento {response.status_code}')
+        
+        elif operation == 'delete':
+            task_id, title = alive.pop(rng.randrange(len(alive)))
+            response = client.delete(f'/tasks/{task_id}')
+            if response.status_code == 200:
+                log['deleted'].append(title)
+                log['updates'].pop(task_id, None)
+            else:
+                log['errors'].append(f'DELETE {task_id} {response.status_code}')
+        
+        elif operation == 'list':
+            response = client.get('/tasks')
+            if response.status_code != 200:
+                log['errors'].append(f'GET /tasks {response.status_code}')
+        
+        else:
+            task_id = rng.choice(alive)[0] if alive else counter_id
+            response = client.get(f'/tasks/{task_id}')
+            if response.status_code != 200:
+                log['errors'].append(f'GET {task_id} {response.status_code}')
+        
+        log['operations'] += 1
+    return log
+
+
+def _read_store(config):
+    """Lee las tareas directamente de disco (como diccionarios), sin pasar por TaskManager."""
+    if config['backend'] == 'shards':
+        store = ShardedTaskStore(TaskManager.SHARD_DIR, TaskManager.SHARD_MAX_TASKS)
+        return [task.to_dict() for task in store.load()]
+    with open(TaskManager.JSON_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check_invariants(config, logs, initial, counter_id):
+    """
+    Comprueba el estado final del almacén frente a los registros de los workers.
+    
+    Returns:
+        List[str]: Invariantes violados (vacía si todo es correcto)
+    """
+    problems = []
+    try:
+        on_disk = _read_store(config)
+    except Exception as e:
+        return [f'el almacén en disco no se puede leer: {e}']
+    disk = {}
+    for data in on_disk:
+        if data['id'] in disk:
+            problems.append(f"ID {data['id']} duplicado en disco")
+        disk[data['id']] = data
+    
+    # Lo que ve un proceso nuevo debe coincidir con el disco y, con shm, con la tabla
+    TaskManager._snapshot = None
+    TaskManager._shared_seq = None
+    memory = {task.id: task.to_dict() for task in TaskManager.snapshot().tasks}
+    if memory != disk:
+        problems.append(f'la instantánea ({len(memory)} tareas) no coincide con el disco ({len(disk)})')
+    table = TaskManager._shared_table()
+    if table is not None:
+        shared = {task.id: task.to_dict() for task in table.read_tasks()[1]}
+        if shared != disk:
+            problems.append('la memoria compartida no coincide con el disco')
+    
+    # Altas que siguen vivas (no borradas), por ID
+    holders = {}
+    for log in logs:
+        deleted = set(log['deleted'])
+        for title, task_id in log['created'].items():
+            if task_id <= counter_id:
+                problems.append(f'ID {task_id} de una tarea inicial entregado al alta {title}')
+            elif title in deleted:
+                holders.setdefault(task_id, [])
+            else:
+                holders.setdefault(task_id, []).append(title)
+        problems.extend(f'error inesperado: {error}' for error in log['errors'][:3])
+    
+    for task_id, titles in holders.items():
+        if len(titles) > 1:
+            problems.append(f"ID {task_id} entregado a dos altas vivas ({', '.join(titles)})")
+        elif not titles:
+            if task_id in disk:
+                problems.append(f'la tarea {task_id} borrada sigue en el almacén')
+        elif task_id not in disk:
+            problems.append(f'alta perdida: {titles[0]} (ID {task_id})')
+        elif disk[task_id]['title'] != titles[0]:
+            problems.append(f"la tarea {task_id} tiene el título {disk[task_id]['title']!r} "
+                            f"en lugar de {titles[0]!r}")
+    
+    for log in logs:
+        for task_id, (count, value) in log['updates'].items():
+            data = disk.get(task_id)
+            if data is None:
+                continue
+            if data['version'] != 1 + count or data['description'] != value:
+                problems.append(f"PATCH perdido en la tarea {task_id}: versión {data['version']}, "
+                                f"se esperaba {1 + count}")
+    
+    increments = sum(log['increments'] for log in logs)
+    counter = disk.get(counter_id)
+    if counter is None or counter['effort_hours'] != increments:
+        problems.append(f"contador = {counter and counter['effort_hours']}, "
+                        f"se esperaba {increments} incrementos")
+    
+    expected_total = initial + 1 + sum(len(titles) for titles in holders.values())
+    if len(disk) != expected_total:
+        problems.append(f'{len(disk)} tareas en el almacén, se esperaban {expected_total}')
+    return problems
+
+
+def run_case(backend, mode, workers, operations, initial):
+    """
+    Ejecuta un caso y devuelve (segundos, operaciones, invariantes violados).
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'backend': backend, 'directory': tmp,
+                  'shm_name': f'tasks_stress_{os.getpid()}_{workers}_{mode}'}
+        configure(config)
+        
+        # Tareas iniciales y contador compartido (effort_hours = incrementos)
+        tasks = make_tasks(initial + 1)
+        counter = tasks[-1]
+        counter.title, counter.effort_hours = 'Contador', 0.0
+        TaskManager.save_tasks(tasks)
+        counter_id = counter.id
+        
+        seeds = [(n, operations, workers * 1000 + n, counter_id) for n in range(workers)]
+        if mode == 'threads':
+            barrier = threading.Barrier(workers + 1)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(run_worker, *args, barrier) for args in seeds]
+                barrier.wait(timeout=120)
+                start = time.perf_counter()
+                logs = [future.result() for future in futures]
+                elapsed = time.perf_counter() - start
+        else:
+            context = multiprocessing.get_context('spawn')
+            barrier = context.Barrier(workers + 1)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_process, initargs=(config, barrier)) as pool:
+                futures = [pool.submit(run_worker, *args) for args in seeds]
+                barrier.wait(timeout=120)
+                start = time.perf_counter()
+                logs = [future.result() for future in futures]
+                elapsed = time.perf_counter() - start
+        
+        if TaskManager._group_writer is not None:
+            TaskManager._group_writer.stop()
+            TaskManager._group_writer = None
+        
+        problems = check_invariants(config, logs, initial, counter_id)
+        
+        table = TaskManager._shared_table()
+        if table is not None:
+            table.unlink()
+            TaskManager._shared = None
+            try:
+                os.unlink(table._lock_path)
+            except OSError:
+                pass
+        configure({'backend': 'json', 'directory': tmp, 'shm_name': ''})
+        return elapsed, sum(log['operations'] for log in logs), problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--levels', default='1,2,4,8', help='Concurrencias a probar, separadas por comas')
+    parser.add_argument('--operations', type=int, default=50, help='Operaciones por worker')
+    parser.add_argument('--initial', type=int, default=200, help='Tareas iniciales en el almacén')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='Backends a probar con hilos')
+    parser.add_argument('--process-backends', default='shm', help="Backends a probar con procesos ('' = ninguno)")
+    args = parser.parse_args()
+    
+    levels = [int(level) for level in args.levels.split(',')]
+    cases = [(backend, 'threads') for backend in args.backends.split(',') if backend]
+    cases += [(backend, 'processes') for backend in args.process_backends.split(',') if backend]
+    for backend, _ in cases:
+        if backend not in BACKENDS:
+            parser.error(f"backend desconocido: {backend} (usar {', '.join(BACKENDS)})")
+    
+    print(f"{args.operations} operaciones por worker sobre {args.initial} tareas iniciales\n")
+    print(f"{'backend':>8} {'modo':>10} {'workers':>8} {'ops':>7} {'seg':>8} {'ops/s':>9}  resultado")
+    failed = False
+    for backend, mode in cases:
+        for workers in levels:
+            elapsed, total, problems = run_case(backend, mode, workers, args.operations, args.initial)
+            status = 'OK' if not problems else f'FALLO ({len(problems)})'
+            print(f"{backend:>8} {mode:>10} {workers:>8} {total:>7} {elapsed:>8.2f} {total / elapsed:>9.1f}  {status}")
+            for problem in problems[:5]:
+                print(f"{'':>10}- {problem}")
+            failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Conversor entre tasks.json y la instantánea binaria de tareas.
+
+Uso:
+    python convert_tasks.py to-snapshot tasks.json tasks.snap
+    python convert_tasks.py to-json tasks.snap tasks.json
+
+Para que app_simple.py arranque desde la instantánea, definir
+TASKS_SNAPSHOT_FILE=tasks.snap.
+"""
+
+import argparse
+
+from managers.snapshot_store import json_to_snapshot, snapshot_to_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Conversor entre tasks.json e instantáneas binarias')
+    parser.add_argument('command', choices=['to-snapshot', 'to-json'])
+    parser.add_argument('source', help='Archivo de origen')
+    parser.add_argument('target', help='Archivo de destino')
+    args = parser.parse_args()
+    
+    if args.command == 'to-snapshot':
+        count = json_to_snapshot(args.source, args.target)
+    else:
+        count = snapshot_to_json(args.source, args.target)
+    print(f"{count} tareas convertidas: {args.source} → {args.target}")
+
+
+if __name__ == '__main__':
+    main()
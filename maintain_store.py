@@ -0,0 +1,99 @@
+"""
+Mantenimiento del almacén JSON de tareas (app_simple.py) sin el servidor.
+
+Uso:
+    python maintain_store.py verify
+    python maintain_store.py stats [--json]
+    python maintain_store.py compact [--target N]
+    python maintain_store.py reindex [--manifest] [--snapshot tasks.snap]
+
+verify comprueba tasks.json (o los shards), la instantánea binaria y el
+archivo frío, y termina con código 1 si encuentra errores. compact une shards
+pequeños, reescribe el archivo frío y borra temporales y shards abandonados.
+reindex regenera la instantánea binaria y, con --manifest, reconstruye el
+manifest de los shards a partir de sus archivos. stats muestra tamaños,
+tareas, bytes por tarea, recuentos y latencias de lectura.
+
+Por defecto se usa la misma configuración que el servidor (TASKS_SHARD_DIR,
+TASKS_SNAPSHOT_FILE, TASKS_ARCHIVE_FILE...). Las particiones del almacén se
+procesan en --workers procesos (por defecto, uno por CPU). compact y reindex
+reescriben archivos: ejecutarlos con el servidor parado.
+"""
+
+import argparse
+import json
+import sys
+
+from managers.store_maintenance import StoreMaintenance
+from managers.task_manager import TaskManager
+
+
+def print_sections(sections):
+    for section in sections:
+        print(f"\n{section['name']}: {section['path'] or '-'}")
+        for key, value in section.items():
+            if key in ('name', 'path', 'errors', 'warnings', 'ascending'):
+                continue
+            print(f"  {key}: {value}")
+        for warning in section['warnings']:
+            print(f"  aviso: {warning}")
+        for error in section['errors']:
+            print(f"  error: {error}")
+        hidden = section['error_count'] - len(section['errors'])
+        if hidden > 0:
+            print(f"  ... y {hidden} errores más")
+
+
+def print_actions(report):
+    for action in report['actions']:
+        print(action)
+    for error in report['errors']:
+        print(f"error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mantenimiento del almacén JSON de tareas')
+    parser.add_argument('command', choices=['verify', 'stats', 'compact', 'reindex'])
+    parser.add_argument('--file', default=TaskManager.JSON_FILE, help='tasks.json')
+    parser.add_argument('--shard-dir', default=TaskManager.SHARD_DIR, help='Directorio de shards')
+    parser.add_argument('--snapshot', default=TaskManager.SNAPSHOT_FILE, help='Instantánea binaria')
+    parser.add_argument('--archive-file', default=TaskManager.ARCHIVE_FILE, help='Archivo frío de tareas')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos (por defecto, uno por CPU)')
+    parser.add_argument('--target', type=int, default=None,
+                        help='compact: tareas máximas por shard al unirlos (por defecto, TASKS_SHARD_MAX_TASKS / 2)')
+    parser.add_argument('--manifest', action='store_true', help='reindex: reconstruir manifest.json de los shards')
+    parser.add_argument('--json', action='store_true', help='Mostrar el informe en JSON')
+    args = parser.parse_args()
+    
+    maintenance = StoreMaintenance(
+        args.file, args.shard_dir, args.snapshot, args.archive_file,
+        workers=args.workers, max_shard_tasks=TaskManager.SHARD_MAX_TASKS,
+        log=(lambda message: None) if args.json else print
+    )
+    if args.command == 'verify':
+        report = maintenance.verify()
+    elif args.command == 'stats':
+        report = maintenance.stats()
+    elif args.command == 'compact':
+        report = maintenance.compact(args.target)
+    else:
+        report = maintenance.reindex(args.manifest)
+    
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    elif 'sections' in report:
+        print_sections(report['sections'])
+    else:
+        print_actions(report)
+    
+    if 'sections' in report:
+        failed = any(section['error_count'] for section in report['sections'])
+    else:
+        failed = bool(report['errors'])
+    if args.command == 'verify' and not args.json:
+        print('\nOK' if report['ok'] else '\nSe encontraron errores')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
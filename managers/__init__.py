@@ -2,7 +2,9 @@
 Módulo de gestores para la aplicación de gestión de tareas.
 """
 
+from .task_cache import TaskResponseCache
 from .task_manager import TaskManager
+from .unit_of_work import OperationError, TaskUnitOfWork
 
-__all__ = ['TaskManager']
+__all__ = ['OperationError', 'TaskManager', 'TaskResponseCache', 'TaskUnitOfWork']
 
@@ -0,0 +1,172 @@
+"""
+Clase TaskArchive: archivo frío de tareas completadas, en NDJSON comprimido con gzip.
+
+Las tareas archivadas salen del almacén activo (tasks.json) para que las
+cargas y listados solo trabajen con las tareas abiertas. El archivo solo
+crece por el final (cada lote es un miembro gzip nuevo) y solo se reescribe
+entero al restaurar tareas.
+
+Cada lote se comprime completo antes de añadirlo con una sola escritura, y
+la lectura se detiene sin error en un último miembro truncado (un proceso
+que murió a mitad de escritura): las tareas de ese lote siguen en el almacén
+activo, que se guarda después de archivar. El siguiente append reescribe el
+archivo sin ese final para que los lotes nuevos no queden detrás.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from models.task import Task
+from managers.snapshot_store import file_stamp
+
+
+class TaskArchive:
+    """Tareas archivadas en un NDJSON comprimido con gzip"""
+
+    def __init__(self, path):
+        """
+        Inicializa el archivo
+
+        Args:
+            path: Ruta del archivo .ndjson.gz
+        """
+        self.path = path
+        self._max_id = 0
+        self._truncated = False
+        self._scan_stamp = None
+
+    def append(self, tasks):
+        """
+        Añade tareas al final del archivo.
+
+        Args:
+            tasks: Lista de objetos Task
+        """
+        if not tasks:
+            return
+        self._scan()
+        if self._truncated:
+            self._rewrite(list(self.iter_tasks()))
+
+        lines = ''.join(json.dumps(task.to_dict(), ensure_ascii=False) + '\n' for task in tasks)
+        # El miembro gzip se construye entero antes de tocar el archivo
+        member = gzip.compress(lines.encode('utf-8'))
+        with open(self.path, 'ab') as f:
+            size = f.tell()
+            try:
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # No dejar un miembro a medias delante de los lotes siguientes
+                f.truncate(size)
+                raise
+
+        # El archivo sigue íntegro: basta con actualizar el mayor id sin recorrerlo
+        self._max_id = max([self._max_id] + [task.id for task in tasks if task.id is not None])
+        self._scan_stamp = file_stamp(self.path)
+
+    def iter_tasks(self):
+        """
+        Recorre las tareas archivadas sin cargarlas todas en memoria.
+
+        Returns:
+            Iterator[Task]: Tareas archivadas en el orden en que se archivaron
+        """
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        yield Task.from_dict(json.loads(line))
+            except EOFError:
+                self._truncated = True
+                print(f"{self.path}: último lote truncado, se ignora (ver maintain_store.py verify)")
+
+    def load(self):
+        """
+        Carga todas las tareas archivadas.
+
+        Returns:
+            List[Task]: Tareas archivadas ordenadas por id
+        """
+        return sorted(self.iter_tasks(), key=lambda task: task.id)
+
+    def get(self, task_id):
+        """
+        Busca una tarea archivada por id.
+
+        Returns:
+            Task o None: La tarea encontrada o None si no está archivada
+        """
+        for task in self.iter_tasks():
+            if task.id == task_id:
+                return task
+        return None
+
+    def contains(self, task_id):
+        """
+        Indica si una tarea está archivada.
+
+        Solo recorre el archivo si el id no supera el mayor id archivado.
+
+        Returns:
+            bool: True si hay una tarea archivada con ese id
+        """
+        return task_id <= self.max_id() and self.get(task_id) is not None
+
+    def max_id(self):
+        """
+        Obtiene el mayor id archivado, para no reutilizarlo en tareas nuevas.
+
+        Se recalcula solo cuando el archivo cambia.
+
+        Returns:
+            int: Mayor id archivado (0 si no hay ninguno)
+        """
+        self._scan()
+        return self._max_id
+
+    def _scan(self):
+        """Recorre el archivo si cambió: mayor id y si termina en un lote truncado."""
+        stamp = file_stamp(self.path)
+        if stamp != self._scan_stamp:
+            self._truncated = False
+            self._max_id = max((task.id for task in self.iter_tasks() if task.id is not None), default=0)
+            self._scan_stamp = stamp
+
+    def remove(self, task_ids):
+        """
+        Quita tareas del archivo reescribiéndolo.
+
+        Args:
+            task_ids: IDs de las tareas a quitar
+
+        Returns:
+            List[Task]: Las tareas quitadas
+        """
+        task_ids = set(task_ids)
+        kept, removed = [], []
+        for task in self.iter_tasks():
+            (removed if task.id in task_ids else kept).append(task)
+        if not removed:
+            return []
+        self._rewrite(kept)
+        return removed
+
+    def _rewrite(self, tasks):
+        """Reescribe el archivo completo, en un único miembro, con las tareas indicadas."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for task in tasks:
+                    f.write(json.dumps(task.to_dict(), ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,132 @@
+"""
+Clase CreationIndex: índice ordenado de las tareas por fecha de creación.
+
+Cada entrada es (timestamp, id), con la fecha ISO de fecha_creacion ya
+convertida a segundos desde la época, de modo que las consultas por rango
+comparan números en lugar de parsear cadenas. Las entradas se mantienen
+ordenadas con bisect: un rango cuesta O(log N + k) y el listado de más
+reciente a más antigua es el índice recorrido al revés, sin ordenar nada.
+"""
+
+import math
+from bisect import bisect_left, insort
+from datetime import datetime
+
+# Clave de las tareas sin fecha válida: quedan al principio y fuera de cualquier rango
+UNDATED = -math.inf
+
+
+def creation_timestamp(value):
+    """
+    Convierte una fecha ISO ('YYYY-MM-DD' o fecha y hora) en segundos desde la época.
+    
+    Las fechas sin zona horaria se interpretan en hora local, igual que las
+    que genera Task.
+    
+    Args:
+        value: Cadena ISO 8601
+    
+    Returns:
+        float o None: El timestamp, o None si el valor no es una fecha válida
+    """
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+class CreationIndex:
+    """Lista ordenada de (timestamp de creación, id) de una colección de tareas"""
+    
+    __slots__ = ('_keys',)
+    
+    def __init__(self, keys=None):
+        """
+        Inicializa el índice (usar build para construirlo desde tareas)
+        
+        Args:
+            keys: Lista ya ordenada de tuplas (timestamp, id)
+        """
+        self._keys = keys if keys is not None else []
+    
+    @staticmethod
+    def _key(task):
+        stamp = creation_timestamp(task.fecha_creacion)
+        return (UNDATED if stamp is None else stamp, task.id)
+    
+    @classmethod
+    def build(cls, tasks):
+        """
+        Construye el índice parseando una vez la fecha de cada tarea.
+        
+        Args:
+            tasks: Iterable de objetos Task
+        
+        Returns:
+            CreationIndex: El índice
+        """
+        keys = [cls._key(task) for task in tasks]
+        keys.sort()
+        return cls(keys)
+    
+    def updated(self, old_tasks, new_tasks):
+        """
+        Deriva el índice de la versión siguiente sin volver a ordenar.
+        
+        El índice actual no se modifica (pertenece a una instantánea inmutable):
+        se copia y en la copia se quitan y reinsertan con bisect solo las
+        tareas que cambiaron.
+        
+        Args:
+            old_tasks: Tareas modificadas tal como estaban (None = no existía),
+                sin repetir ninguna
+            new_tasks: Las mismas tareas tal como quedan (None = eliminada)
+        
+        Returns:
+            CreationIndex: El índice de la nueva versión
+        """
+        keys = list(self._keys)
+        for old, new in zip(old_tasks, new_tasks):
+            old_key = self._key(old) if old is not None else None
+            new_key = self._key(new) if new is not None else None
+            if old_key == new_key:
+                continue
+            if old_key is not None:
+                position = bisect_left(keys, old_key)
+                if position < len(keys) and keys[position] == old_key:
+                    del keys[position]
+            if new_key is not None:
+                insort(keys, new_key)
+        return CreationIndex(keys)
+    
+    def ids_between(self, after=None, before=None, newest_first=False):
+        """
+        Obtiene los IDs de las tareas creadas en un rango, en O(log N + k).
+        
+        El rango es semiabierto: after <= creación < before. Sin límites se
+        devuelven todas las tareas (las que no tienen fecha válida, como las
+        más antiguas); con algún límite, las que no tienen fecha se excluyen.
+        
+        Args:
+            after: Timestamp mínimo incluido (None = sin límite)
+            before: Timestamp máximo excluido (None = sin límite)
+            newest_first: Si True, de más reciente a más antigua
+        
+        Returns:
+            List[int]: IDs ordenados por fecha de creación (y por ID en caso de empate)
+        """
+        keys = self._keys
+        if after is not None:
+            start = bisect_left(keys, (after,))
+        elif before is not None:
+            start = bisect_left(keys, (UNDATED, math.inf))
+        else:
+            start = 0
+        end = bisect_left(keys, (before,)) if before is not None else len(keys)
+        
+        if newest_first:
+            return [keys[i][1] for i in range(end - 1, start - 1, -1)]
+        return [keys[i][1] for i in range(start, end)]
+    
+    def __len__(self):
+        return len(self._keys)
@@ -0,0 +1,125 @@
+"""
+Clase FragmentCache: cache de fragmentos HTML renderizados, con LRU y caducidad.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """
+    Cache en memoria de fragmentos renderizados por clave y versión de datos.
+    
+    Cada entrada pertenece a un ámbito (por ejemplo, "todas las tareas" o "las
+    tareas de una persona") con su propio contador de versión. Las escrituras
+    invalidan solo los ámbitos afectados aumentando su contador; las entradas
+    de una versión anterior dejan de servirse. El tamaño se limita con
+    expulsión LRU y cada entrada caduca tras ttl segundos, lo que además acota
+    lo desactualizado que puede quedar un proceso cuando otro escribe.
+    """
+    
+    def __init__(self, max_entries=256, ttl=300.0, clock=time.monotonic):
+        """
+        Inicializa el cache
+        
+        Args:
+            max_entries: Número máximo de entradas a conservar
+            ttl: Segundos de vida de cada entrada (0 = sin caducidad)
+            clock: Función que devuelve el instante actual en segundos
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'misses', 'stale', 'expired', 'evictions', 'invalidations'), 0)
+    
+    def version(self, scope):
+        """
+        Obtiene la versión actual de un ámbito.
+        
+        Args:
+            scope: Ámbito de datos (cualquier valor hashable)
+        
+        Returns:
+            tuple: Versión que identifica el estado actual del ámbito
+        """
+        return (self._generation, self._versions.get(scope, 0))
+    
+    def get(self, key, version):
+        """
+        Obtiene una entrada si sigue en la versión indicada y no ha caducado.
+        
+        Args:
+            key: Clave de la entrada
+            version: Versión actual de su ámbito (ver version)
+        
+        Returns:
+            El valor guardado, o None si no está, es de otra versión o caducó
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            
+            entry_version, expires, value = entry
+            if entry_version != version or (expires is not None and self._clock() >= expires):
+                del self._entries[key]
+                self._stats['stale' if entry_version != version else 'expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+    
+    def put(self, key, version, value):
+        """
+        Guarda una entrada, expulsando la menos usada si se supera max_entries.
+        
+        Args:
+            key: Clave de la entrada
+            version: Versión del ámbito con la que se calculó el valor
+            value: Valor a guardar
+        """
+        expires = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (version, expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def invalidate(self, *scopes):
+        """
+        Invalida los ámbitos indicados; sin argumentos, todos.
+        
+        Args:
+            scopes: Ámbitos cuyos datos cambiaron
+        """
+        with self._lock:
+            if not scopes:
+                self._generation += 1
+                self._entries.clear()
+            for scope in set(scopes):
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+            self._stats['invalidations'] += 1
+    
+    def stats(self):
+        """
+        Estadísticas de uso del cache.
+        
+        Returns:
+            dict: Aciertos, fallos (y cuántos por versión antigua o caducidad),
+            expulsiones, invalidaciones, entradas actuales y tasa de aciertos
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
@@ -0,0 +1,150 @@
+"""
+Clase GroupCommitWriter: agrupa escrituras concurrentes en un único guardado.
+
+Las modificaciones se encolan y un único hilo escritor las aplica por lotes:
+carga las tareas una vez, aplica todas las modificaciones pendientes, guarda
+una sola vez y despierta a la vez a todas las peticiones que esperaban.
+"""
+
+import queue
+import threading
+import time
+
+
+class _Mutation:
+    """Modificación pendiente y su resultado."""
+    
+    __slots__ = ('apply', 'done', 'result', 'error')
+    
+    def __init__(self, apply):
+        self.apply = apply
+        self.done = threading.Event()
+        self.result = False
+        self.error = None
+
+
+class GroupCommitWriter:
+    """Hilo escritor que aplica y guarda las modificaciones por lotes"""
+    
+    def __init__(self, load, save, lock, max_delay=0.001, max_batch=256):
+        """
+        Inicializa el escritor (el hilo arranca con la primera modificación)
+        
+        Args:
+            load: Función sin argumentos que devuelve la lista de Task actual
+            save: Función save(tasks, changed_ids) que guarda y devuelve bool
+            lock: Función que devuelve el context manager de bloqueo de escritura
+            max_delay: Segundos máximos que espera un lote a que lleguen más modificaciones
+            max_batch: Número máximo de modificaciones por lote
+        """
+        self.load = load
+        self.save = save
+        self.lock = lock
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.batches = 0
+        self.mutations = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def submit(self, apply):
+        """
+        Encola una modificación y espera a que su lote quede guardado.
+        
+        Args:
+            apply: Función apply(tasks) que modifica la lista en su sitio y
+                devuelve la lista de IDs modificados (vacía si no aplica). Si
+                lanza una excepción no debe haber modificado la lista
+        
+        Returns:
+            bool: True si la modificación se aplicó y se guardó
+        """
+        self._ensure_started()
+        mutation = _Mutation(apply)
+        self._queue.put(mutation)
+        mutation.done.wait()
+        if mutation.error is not None:
+            raise mutation.error
+        return mutation.result
+    
+    def stats(self):
+        """
+        Devuelve estadísticas del escritor.
+        
+        Returns:
+            dict: Lotes guardados, modificaciones y tamaño medio de lote
+        """
+        return {
+            'batches': self.batches,
+            'mutations': self.mutations,
+            'avg_batch': self.mutations / self.batches if self.batches else 0.0
+        }
+    
+    def stop(self):
+        """Detiene el hilo escritor tras guardar lo que quede en cola."""
+        with self._start_lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+    
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='task-group-commit', daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            
+            # Reunir más modificaciones hasta llenar el lote o agotar la espera
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    timeout = deadline - time.monotonic()
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._commit(batch)
+    
+    def _commit(self, batch):
+        """Aplica un lote completo con una sola carga y un solo guardado."""
+        try:
+            with self.lock():
+                tasks = self.load()
+                changed_ids = []
+                for mutation in batch:
+                    try:
+                        mutation_ids = mutation.apply(tasks)
+                    except Exception as e:
+                        mutation.error = e
+                        continue
+                    if mutation_ids:
+                        mutation.result = True
+                        changed_ids.extend(mutation_ids)
+                
+                if changed_ids and not self.save(tasks, changed_ids=changed_ids):
+                    for mutation in batch:
+                        mutation.result = False
+        except Exception as e:
+            for mutation in batch:
+                mutation.result = False
+                mutation.error = mutation.error or e
+        finally:
+            self.batches += 1
+            self.mutations += len(batch)
+            # Confirmar a todas las peticiones del lote a la vez
+            for mutation in batch:
+                mutation.done.set()
@@ -0,0 +1,351 @@
+"""
+Clase JobManager: trabajos en segundo plano para las operaciones largas.
+
+Las exportaciones, importaciones, reindexados y archivados pueden tardar
+minutos; ejecutados dentro de la petición ocuparían un hilo del servidor todo
+ese tiempo. En su lugar se encolan como trabajos: la petición responde al
+momento con el ID del trabajo, un grupo acotado de hilos lo ejecuta y el
+cliente consulta su estado y progreso y, al terminar, descarga el resultado.
+
+Los trabajos se guardan en una tabla JSON (escrita de forma atómica) para que
+su estado y sus resultados sobrevivan a un reinicio. Los que estaban en cola
+o en ejecución al reiniciar se marcan como fallidos.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+class JobError(Exception):
+    """Error al encolar o consultar un trabajo"""
+    
+    def __init__(self, status, message):
+        """
+        Args:
+            status: Código HTTP que corresponde al error
+            message: Descripción del error
+        """
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class JobContext:
+    """Acceso de un trabajo en ejecución a su progreso y a su archivo de resultado"""
+    
+    __slots__ = ('job_id', 'params', '_manager')
+    
+    def __init__(self, manager, job_id, params):
+        self._manager = manager
+        self.job_id = job_id
+        self.params = params
+    
+    def progress(self, done, total=None, message=None):
+        """
+        Informa del progreso del trabajo.
+        
+        Args:
+            done: Elementos procesados
+            total: Elementos totales (None si no se conocen)
+            message: Descripción opcional de la fase actual
+        """
+        self._manager._update(self.job_id, progress={'done': done, 'total': total}, message=message)
+    
+    def result_path(self, filename):
+        """
+        Ruta del archivo de resultado descargable del trabajo.
+        
+        Args:
+            filename: Nombre con el que se descargará (por ejemplo tasks.ndjson.gz)
+        
+        Returns:
+            str: Ruta en la que el trabajo debe escribir el resultado
+        """
+        return self._manager._attach_file(self.job_id, filename)
+
+
+class JobManager:
+    """
+    Extensión de Flask que ejecuta trabajos en un grupo acotado de hilos.
+    
+    Cada tipo de trabajo se registra con register(tipo, función); la función
+    recibe un JobContext y devuelve un diccionario con el resumen del
+    resultado. Se ejecuta dentro del contexto de la aplicación.
+    
+    Configuración (app.config, con valores por defecto desde el entorno):
+        JOBS_FILE: Tabla de trabajos (TASKS_JOBS_FILE, jobs.json)
+        JOBS_DIR: Directorio de resultados (TASKS_JOBS_DIR, job_results)
+        JOBS_WORKERS: Trabajos en ejecución a la vez (TASKS_JOBS_WORKERS, 2)
+        JOBS_MAX_PENDING: Trabajos en cola o en ejecución como máximo
+            (TASKS_JOBS_MAX_PENDING, 16)
+        JOBS_KEEP: Trabajos terminados que se conservan, con sus resultados
+            (TASKS_JOBS_KEEP, 200)
+    """
+    
+    STATUSES = ('queued', 'running', 'succeeded', 'failed')
+    
+    # Segundos mínimos entre dos escrituras de la tabla por cambios de progreso
+    PERSIST_INTERVAL = 1.0
+    
+    def __init__(self, app=None):
+        """
+        Inicializa el gestor de trabajos
+        
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+        """
+        self._handlers = {}
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._persisted = 0.0
+        self._executor = None
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Lee la configuración, carga la tabla de trabajos y crea el grupo de hilos."""
+        app.config.setdefault('JOBS_FILE', os.environ.get('TASKS_JOBS_FILE', 'jobs.json'))
+        app.config.setdefault('JOBS_DIR', os.environ.get('TASKS_JOBS_DIR', 'job_results'))
+        app.config.setdefault('JOBS_WORKERS', int(os.environ.get('TASKS_JOBS_WORKERS', 2)))
+        app.config.setdefault('JOBS_MAX_PENDING', int(os.environ.get('TASKS_JOBS_MAX_PENDING', 16)))
+        app.config.setdefault('JOBS_KEEP', int(os.environ.get('TASKS_JOBS_KEEP', 200)))
+        self.app = app
+        self.path = app.config['JOBS_FILE']
+        self.directory = app.config['JOBS_DIR']
+        self.max_pending = app.config['JOBS_MAX_PENDING']
+        self.keep = app.config['JOBS_KEEP']
+        self._executor = ThreadPoolExecutor(app.config['JOBS_WORKERS'], thread_name_prefix='job')
+        app.extensions['jobs'] = self
+        self._load()
+    
+    def register(self, job_type, handler):
+        """
+        Registra un tipo de trabajo.
+        
+        Args:
+            job_type: Nombre del tipo (por ejemplo "export")
+            handler: Función que recibe un JobContext y devuelve un diccionario
+                con el resumen del resultado; si lanza una excepción, el
+                trabajo falla con su mensaje
+        """
+        self._handlers[job_type] = handler
+    
+    @property
+    def job_types(self):
+        """Tipos de trabajo registrados."""
+        return sorted(self._handlers)
+    
+    def _load(self):
+        """Carga la tabla de trabajos; los interrumpidos por un reinicio pasan a fallidos."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                jobs = json.load(f)
+        except FileNotFoundError:
+            jobs = []
+        except (OSError, ValueError) as e:
+            print(f"Error al leer la tabla de trabajos: {e}")
+            jobs = []
+        
+        now = datetime.now().isoformat()
+        interrupted = False
+        with self._lock:
+            self._jobs.clear()
+            for job in jobs:
+                if job['status'] in ('queued', 'running'):
+                    job.update(status='failed', finished_at=now,
+                               error='Trabajo interrumpido al reiniciar el servidor')
+                    interrupted = True
+                self._jobs[job['id']] = job
+            if interrupted:
+                self._persist()
+    
+    def _persist(self):
+        """Escribe la tabla de trabajos de forma atómica. Debe llamarse con _lock tomado."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(list(self._jobs.values()), f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._persisted = time.monotonic()
+    
+    def _prune(self):
+        """Descarta los trabajos terminados más antiguos por encima de keep. Con _lock tomado."""
+        finished = [job for job in self._jobs.values() if job['status'] in ('succeeded', 'failed')]
+        for job in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job['id']]
+            if job.get('result_file'):
+                try:
+                    os.unlink(os.path.join(self.directory, job['result_file']))
+                except FileNotFoundError:
+                    pass
+    
+    def submit(self, job_type, params=None, owner=None):
+        """
+        Encola un trabajo.
+        
+        Args:
+            job_type: Tipo de trabajo registrado
+            params: Diccionario de parámetros para la función del trabajo (no
+                se guarda en la tabla: puede ser grande, como una importación)
+            owner: Identificador de quien lo encola (None = anónimo)
+        
+        Returns:
+            dict: El trabajo encolado (ver public)
+        
+        Raises:
+            JobError: 400 si el tipo no existe; 503 si la cola está llena
+        """
+        handler = self._handlers.get(job_type)
+        if handler is None:
+            raise JobError(400, f"Tipo de trabajo inválido. Debe ser: {', '.join(self.job_types)}")
+        
+        job = {
+            'id': uuid.uuid4().hex[:16],
+            'type': job_type,
+            'status': 'queued',
+            'owner': owner,
+            'progress': {'done': 0, 'total': None},
+            'message': None,
+            'result': None,
+            'error': None,
+            'result_file': None,
+            'download_name': None,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self._lock:
+            pending = sum(1 for other in self._jobs.values() if other['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                raise JobError(503, 'Demasiados trabajos pendientes; inténtalo más tarde')
+            self._jobs[job['id']] = job
+            self._prune()
+            self._persist()
+            snapshot = dict(job)
+        
+        self._executor.submit(self._run, handler, JobContext(self, job['id'], params or {}))
+        return self.public(snapshot)
+    
+    def _run(self, handler, context):
+        """Ejecuta un trabajo en un hilo del grupo y registra su resultado."""
+        self._update(context.job_id, status='running', started_at=datetime.now().isoformat(), persist=True)
+        try:
+            with self.app.app_context():
+                result = handler(context)
+        except Exception as e:
+            self._update(context.job_id, status='failed', error=str(e),
+                         finished_at=datetime.now().isoformat(), persist=True)
+        else:
+            self._update(context.job_id, status='succeeded', result=result,
+                         finished_at=datetime.now().isoformat(), persist=True)
+    
+    def _update(self, job_id, persist=False, **fields):
+        """
+        Modifica campos de un trabajo.
+        
+        Los cambios de estado se guardan siempre; los de progreso, como mucho
+        cada PERSIST_INTERVAL segundos (la consulta ve siempre el valor actual).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if fields.get('message') is None:
+                fields.pop('message', None)
+            job.update(fields)
+            if persist or time.monotonic() - self._persisted >= self.PERSIST_INTERVAL:
+                self._persist()
+    
+    def _attach_file(self, job_id, filename):
+        """Asocia al trabajo un archivo de resultado y devuelve su ruta."""
+        os.makedirs(self.directory, exist_ok=True)
+        stored = f'{job_id}-{filename}'
+        self._update(job_id, result_file=stored, download_name=filename)
+        return os.path.join(self.directory, stored)
+    
+    def get(self, job_id):
+        """
+        Obtiene un trabajo.
+        
+        Args:
+            job_id: ID del trabajo
+        
+        Returns:
+            dict o None: Copia del trabajo (con campos internos), o None si no existe
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+    
+    def recent(self, owner=None, limit=50):
+        """
+        Obtiene los trabajos más recientes.
+        
+        Args:
+            owner: Si no es None, solo los de ese propietario
+            limit: Número máximo de trabajos
+        
+        Returns:
+            List[dict]: Trabajos de más reciente a más antiguo (ver public)
+        """
+        with self._lock:
+            jobs = [dict(job) for job in reversed(self._jobs.values())
+                    if owner is None or job['owner'] == owner]
+        return [self.public(job) for job in jobs[:limit]]
+    
+    def result_file(self, job_id):
+        """
+        Obtiene el archivo de resultado de un trabajo terminado.
+        
+        Args:
+            job_id: ID del trabajo
+        
+        Returns:
+            tuple: (ruta del archivo, nombre de descarga)
+        
+        Raises:
+            JobError: 404 si el trabajo no existe o no tiene archivo; 409 si
+                aún no ha terminado con éxito
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise JobError(404, 'Trabajo no encontrado')
+        if job['status'] != 'succeeded':
+            raise JobError(409, f"El trabajo no ha terminado con éxito (estado: {job['status']})")
+        path = os.path.join(self.directory, job['result_file']) if job['result_file'] else None
+        if path is None or not os.path.exists(path):
+            raise JobError(404, 'El trabajo no tiene archivo de resultado')
+        return os.path.abspath(path), job['download_name']
+    
+    @staticmethod
+    def public(job):
+        """
+        Representación de un trabajo para la API, sin los campos internos.
+        
+        Args:
+            job: Trabajo tal como se guarda en la tabla
+        
+        Returns:
+            dict: Trabajo con 'download' indicando si tiene archivo de resultado
+        """
+        data = {key: value for key, value in job.items() if key not in ('result_file', 'download_name')}
+        data['download'] = job['status'] == 'succeeded' and bool(job['result_file'])
+        return data
+    
+    def shutdown(self, wait=True):
+        """Detiene el grupo de hilos (por defecto, esperando a los trabajos en curso)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
@@ -0,0 +1,128 @@
+"""
+Medición de memoria con tracemalloc para las rutas críticas del almacén.
+
+measure ejecuta una función y devuelve cuánta memoria dejó reservada (neta),
+el pico durante la llamada y los puntos del código que más reservaron.
+measure_store_load aplica measure a una lectura completa del almacén
+(TaskManager: json.load + Task.from_dict, shards o instantánea binaria).
+"""
+
+import os
+import tracemalloc
+
+from managers.task_manager import TaskManager
+
+# Archivos de las rutas críticas: las reservas hechas desde ellos (en cualquier
+# marco de la pila) son las que se atribuyen a load_tasks y Task.from_dict
+HOT_PATH_FILES = (
+    os.path.join('*', 'managers', 'task_manager.py'),
+    os.path.join('*', 'models', 'task.py'),
+)
+
+# Marcos de pila que se guardan por reserva al activar tracemalloc desde aquí
+DEFAULT_FRAMES = 25
+
+
+def _site(frame):
+    """Archivo (relativo al directorio actual si está dentro) y línea de un marco."""
+    filename = frame.filename
+    try:
+        relative = os.path.relpath(filename)
+        if not relative.startswith('..'):
+            filename = relative
+    except ValueError:
+        pass
+    return f'{filename}:{frame.lineno}'
+
+
+def _hot_path_filters(include):
+    return [tracemalloc.Filter(True, pattern, all_frames=True) for pattern in include]
+
+
+def top_sites(snapshot, limit=10, include=HOT_PATH_FILES):
+    """
+    Puntos del código con más memoria reservada en una instantánea de tracemalloc.
+    
+    Args:
+        snapshot: tracemalloc.Snapshot
+        limit: Número máximo de puntos
+        include: Patrones de archivo; solo cuentan las reservas con alguno de
+            ellos en su pila (vacío = todas)
+    
+    Returns:
+        List[dict]: Punto (archivo:línea), bytes y número de bloques, de mayor a menor
+    """
+    if include:
+        snapshot = snapshot.filter_traces(_hot_path_filters(include))
+    return [
+        {'site': _site(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def measure(func, *args, limit=10, include=HOT_PATH_FILES, **kwargs):
+    """
+    Ejecuta una función midiendo la memoria que reserva.
+    
+    Si tracemalloc no estaba activo se activa solo durante la llamada.
+    
+    Args:
+        func: Función a medir
+        limit: Número máximo de puntos del código en el informe
+        include: Patrones de archivo para los puntos del código (ver top_sites)
+    
+    Returns:
+        tuple: (resultado de la función, informe) con el informe como
+        diccionario: net_bytes (memoria que sigue reservada al terminar,
+        incluido el resultado), peak_bytes (pico durante la llamada) y
+        top_sites (puntos que más memoria neta reservaron)
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(DEFAULT_FRAMES)
+    try:
+        before = tracemalloc.take_snapshot()
+        current_before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        
+        result = func(*args, **kwargs)
+        
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    
+    if include:
+        before = before.filter_traces(_hot_path_filters(include))
+        after = after.filter_traces(_hot_path_filters(include))
+    sites = [
+        {'site': _site(stat.traceback[0]), 'bytes': stat.size_diff, 'blocks': stat.count_diff}
+        for stat in after.compare_to(before, 'lineno')[:limit]
+        if stat.size_diff > 0
+    ]
+    return result, {
+        'net_bytes': current - current_before,
+        'peak_bytes': peak - current_before,
+        'top_sites': sites,
+    }
+
+
+def measure_store_load(limit=10):
+    """
+    Mide una lectura completa del almacén de tareas, como la de load_tasks tras
+    un cambio del archivo, sin publicar una nueva instantánea.
+    
+    Args:
+        limit: Número máximo de puntos del código en el informe
+    
+    Returns:
+        dict: Informe de measure más el número de tareas y los bytes netos por tarea
+    """
+    tasks, report = measure(TaskManager._read_source, TaskManager._stat_file(), limit=limit)
+    report['tasks'] = len(tasks)
+    report['bytes_per_task'] = round(report['net_bytes'] / len(tasks), 1) if len(tasks) else None
+    close = getattr(tasks, 'close', None)
+    if close is not None:
+        close()
+    return report
@@ -0,0 +1,301 @@
+"""
+Clase PasswordHasher: hash y comprobación de contraseñas en un pool de procesos.
+
+Los hashes de contraseña de werkzeug (scrypt, pbkdf2) son lentos a propósito.
+Calculados en el hilo de la petición, una avalancha de inicios de sesión (por
+ejemplo, tras un despliegue) ocupa todos los hilos del servidor y la CPU, y
+la API de tareas deja de responder. Aquí se calculan en un pool de procesos
+de tamaño fijo, con un límite propio de operaciones en curso: las que no
+caben se rechazan al momento (PasswordHashBusy, que la aplicación convierte
+en 503 con Retry-After) en lugar de acumularse.
+
+Al comprobar una contraseña correcta cuyo hash usa otros parámetros que los
+configurados (otro método, más o menos iteraciones...), se calcula un hash
+nuevo para que la aplicación lo guarde: los hashes se actualizan solos a
+medida que los usuarios inician sesión.
+
+El pool se arranca con la primera operación de contraseña y no al importar la
+aplicación: los scripts que solo importan app.py (migrate_tasks.py...) y el
+proceso vigilante del recargador de Flask no crean procesos.
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class PasswordHashBusy(Exception):
+    """No hay capacidad para más operaciones de contraseña en este momento"""
+    
+    def __init__(self, message, retry_after):
+        """
+        Args:
+            message: Descripción del motivo
+            retry_after: Segundos tras los que conviene reintentar
+        """
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+def _timed(func, *args):
+    """Ejecuta func en el proceso del pool y devuelve (resultado, segundos transcurridos en él)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _hash_prefix(pwhash):
+    """Método y parámetros de un hash de werkzeug ('scrypt:32768:8:1$sal$hash' → 'scrypt:32768:8:1')."""
+    return pwhash.split('$', 1)[0]
+
+
+class PasswordHasher:
+    """
+    Extensión de Flask que calcula los hashes de contraseña en un pool acotado.
+    
+    Configuración (app.config, con valores por defecto desde el entorno):
+        PASSWORD_HASH_METHOD: Método de werkzeug para los hashes nuevos
+            (TASKS_PASSWORD_HASH_METHOD, scrypt); por ejemplo
+            'pbkdf2:sha256:600000'
+        PASSWORD_HASH_WORKERS: Procesos del pool (TASKS_PASSWORD_HASH_WORKERS, 2);
+            0 calcula los hashes en el hilo de la petición
+        PASSWORD_HASH_QUEUE: Operaciones que pueden esperar a un proceso libre
+            (TASKS_PASSWORD_HASH_QUEUE, 8); más allá se rechazan
+        PASSWORD_HASH_TIMEOUT: Segundos máximos de espera por una operación
+            (TASKS_PASSWORD_HASH_TIMEOUT, 10)
+    """
+    
+    OPERATIONS = ('hash', 'check')
+    
+    def __init__(self, app=None):
+        """
+        Inicializa el gestor de contraseñas
+        
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+        """
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._in_flight = 0
+        self.method = 'scrypt'
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = 10.0
+        self._prefix = None
+        self._stats = {operation: self._empty_stats() for operation in self.OPERATIONS}
+        self._rejected = 0
+        self._timeouts = 0
+        self._rehashed = 0
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        """Lee la configuración; el pool se arranca con la primera operación."""
+        app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get('TASKS_PASSWORD_HASH_METHOD', 'scrypt'))
+        app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.environ.get('TASKS_PASSWORD_HASH_WORKERS', 2)))
+        app.config.setdefault('PASSWORD_HASH_QUEUE', int(os.environ.get('TASKS_PASSWORD_HASH_QUEUE', 8)))
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', float(os.environ.get('TASKS_PASSWORD_HASH_TIMEOUT', 10)))
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.workers = max(app.config['PASSWORD_HASH_WORKERS'], 0)
+        self.max_pending = self.workers + max(app.config['PASSWORD_HASH_QUEUE'], 0)
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        app.extensions['password_hasher'] = self
+        
+        if self.workers:
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+    
+    def _start_pool(self):
+        """
+        Crea el pool y arranca todos sus procesos. Debe llamarse con _pool_lock tomado.
+        
+        Todos los procesos se arrancan a la vez, con un hash vacío cada uno,
+        para que ninguna petición posterior espere a que se cree uno. El
+        primer hash también comprueba el método configurado.
+        """
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [self._executor.submit(generate_password_hash, '', self.method) for _ in range(self.workers)]
+        self._prefix = _hash_prefix(futures[0].result())
+        for future in futures[1:]:
+            future.result()
+    
+    @staticmethod
+    def _empty_stats():
+        return {'count': 0, 'errors': 0, 'total_seconds': 0.0, 'hash_seconds': 0.0, 'max_seconds': 0.0}
+    
+    def _record(self, operation, total, hashing=None, error=False):
+        with self._lock:
+            stats = self._stats[operation]
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_seconds'] += total
+            stats['hash_seconds'] += total if hashing is None else hashing
+            stats['max_seconds'] = max(stats['max_seconds'], total)
+    
+    def _retry_after(self):
+        """Segundos estimados hasta que se vacíe la cola, según el tiempo medio de hash."""
+        with self._lock:
+            count = sum(stats['count'] for stats in self._stats.values())
+            seconds = sum(stats['hash_seconds'] for stats in self._stats.values())
+        average = seconds / count if count else 0.1
+        return max(1, math.ceil(average * self.max_pending / max(self.workers, 1)))
+    
+    def _call(self, operation, func, *args):
+        """
+        Ejecuta func en el pool respetando el límite de operaciones en curso.
+        
+        Raises:
+            PasswordHashBusy: Si no hay hueco o se agota PASSWORD_HASH_TIMEOUT
+        """
+        start = time.perf_counter()
+        if self.workers and self._executor is None:
+            with self._pool_lock:
+                if self._executor is None:
+                    self._start_pool()
+        if self._executor is None:
+            try:
+                result = func(*args)
+            except Exception:
+                self._record(operation, time.perf_counter() - start, error=True)
+                raise
+            self._record(operation, time.perf_counter() - start)
+            return result
+        
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordHashBusy('Demasiadas operaciones de contraseña en curso', self._retry_after())
+        
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._submit(func, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # El hueco se libera cuando el proceso termina, aunque se haya dejado de esperar
+        future.add_done_callback(self._release)
+        
+        try:
+            result, hashing = future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            self._record(operation, time.perf_counter() - start, error=True)
+            raise PasswordHashBusy('Tiempo de espera agotado para la operación de contraseña', self._retry_after())
+        except Exception:
+            self._record(operation, time.perf_counter() - start, error=True)
+            raise
+        self._record(operation, time.perf_counter() - start, hashing)
+        return result
+    
+    def _submit(self, func, *args):
+        executor = self._executor
+        try:
+            return executor.submit(_timed, func, *args)
+        except BrokenProcessPool:
+            # Un proceso del pool murió (por ejemplo, por falta de memoria): recrear el pool
+            with self._pool_lock:
+                if self._executor is executor:
+                    executor.shutdown(wait=False)
+                    self._start_pool()
+            return self._executor.submit(_timed, func, *args)
+    
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+    
+    def hash(self, password):
+        """
+        Calcula el hash de una contraseña con el método configurado.
+        
+        Returns:
+            str: Hash en el formato de werkzeug
+        
+        Raises:
+            PasswordHashBusy: Si el pool está saturado
+        """
+        return self._call('hash', generate_password_hash, password, self.method)
+    
+    def needs_rehash(self, pwhash):
+        """Indica si un hash usa otro método o parámetros que los configurados."""
+        if self._prefix is None:
+            # Sin pool (o aún sin arrancar): el prefijo sale de un hash calculado aquí
+            self._prefix = _hash_prefix(generate_password_hash('', self.method))
+        return _hash_prefix(pwhash) != self._prefix
+    
+    def verify(self, pwhash, password):
+        """
+        Comprueba una contraseña y, si es correcta y su hash está anticuado,
+        calcula uno nuevo con el método configurado.
+        
+        Args:
+            pwhash: Hash guardado
+            password: Contraseña introducida
+        
+        Returns:
+            tuple: (es_correcta, hash nuevo a guardar o None)
+        
+        Raises:
+            PasswordHashBusy: Si el pool está saturado
+        """
+        if not pwhash or password is None:
+            return False, None
+        if not self._call('check', check_password_hash, pwhash, password):
+            return False, None
+        if not self.needs_rehash(pwhash):
+            return True, None
+        try:
+            new_hash = self.hash(password)
+        except PasswordHashBusy:
+            # Se intentará de nuevo en el próximo inicio de sesión
+            return True, None
+        with self._lock:
+            self._rehashed += 1
+        return True, new_hash
+    
+    def stats(self):
+        """
+        Métricas del pool de contraseñas.
+        
+        Returns:
+            dict: Configuración, operaciones en curso, rechazadas, agotadas y
+            rehechas, y por operación: número, errores, tiempo medio y máximo
+            (total y de cálculo; la diferencia es la espera en cola)
+        """
+        with self._lock:
+            operations = {}
+            for operation, stats in self._stats.items():
+                count = stats['count']
+                operations[operation] = {
+                    'count': count,
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_seconds'] / count * 1000, 2) if count else None,
+                    'avg_hash_ms': round(stats['hash_seconds'] / count * 1000, 2) if count else None,
+                    'avg_wait_ms': round((stats['total_seconds'] - stats['hash_seconds']) / count * 1000, 2) if count else None,
+                    'max_ms': round(stats['max_seconds'] * 1000, 2),
+                }
+            return {
+                'method': self._prefix or self.method,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'rehashed': self._rehashed,
+                'operations': operations,
+            }
+    
+    def shutdown(self):
+        """Detiene los procesos del pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,96 @@
+"""
+Selección de las próximas tareas a trabajar ("next work").
+
+Solo se proponen tareas pendientes, ordenadas por prioridad (bloqueante >
+alta > media > baja), después por esfuerzo estimado (las que no lo tienen,
+al final) y por antigüedad. Las candidatas se reparten en un cubo por
+prioridad y de cada cubo solo se ordena lo que se llega a extraer (heapq),
+así que elegir K tareas entre N cuesta O(N + K log N) en lugar de ordenar todo.
+
+Con un límite de trabajo en curso (WIP), a cada persona solo se le proponen
+tantas tareas como le falten para llegar al límite, contando las que ya tiene
+en curso.
+"""
+
+import heapq
+import math
+from collections import Counter
+
+
+# Prioridades de mayor a menor urgencia
+PRIORITY_ORDER = ('bloqueante', 'alta', 'media', 'baja')
+
+# Status de las tareas que se pueden empezar y de las que cuentan como trabajo en curso
+READY_STATUS = 'pendiente'
+WIP_STATUSES = ('en_progreso', 'en_revision')
+
+
+def _order_key(task):
+    """Clave de orden dentro de una misma prioridad: esfuerzo, antigüedad e id."""
+    effort = task.effort_hours if task.effort_hours is not None else math.inf
+    return (effort, task.fecha_creacion or '', task.id)
+
+
+def wip_counts(tasks):
+    """
+    Cuenta las tareas en curso de cada persona.
+
+    Args:
+        tasks: Iterable de objetos Task
+
+    Returns:
+        Counter: assigned_to → número de tareas en curso
+    """
+    return Counter(task.assigned_to for task in tasks
+                   if task.status in WIP_STATUSES and task.assigned_to)
+
+
+def select_next(tasks, k, wip_limit=None, wip=None):
+    """
+    Elige las K próximas tareas pendientes.
+
+    Args:
+        tasks: Iterable de objetos Task
+        k: Número máximo de tareas a devolver
+        wip_limit: Máximo de tareas en curso por persona (None o 0 = sin límite)
+        wip: Counter de tareas en curso por persona (se calcula si es None)
+
+    Returns:
+        List[Task]: Hasta K tareas en el orden en que conviene empezarlas
+    """
+    tasks = list(tasks)
+    buckets = {priority: [] for priority in PRIORITY_ORDER}
+    for task in tasks:
+        if task.status == READY_STATUS and task.priority in buckets:
+            buckets[task.priority].append((_order_key(task), task))
+
+    capacity = None
+    if wip_limit:
+        if wip is None:
+            wip = wip_counts(tasks)
+        capacity = {}
+
+    selected = []
+    for priority in PRIORITY_ORDER:
+        bucket = buckets[priority]
+        if not bucket:
+            continue
+
+        if capacity is None and len(bucket) > k - len(selected):
+            # Sin límite WIP basta con los menores del cubo
+            selected.extend(task for _, task in heapq.nsmallest(k - len(selected), bucket))
+            break
+
+        heapq.heapify(bucket)
+        while bucket and len(selected) < k:
+            _, task = heapq.heappop(bucket)
+            if capacity is not None and task.assigned_to:
+                remaining = capacity.setdefault(task.assigned_to, wip_limit - wip[task.assigned_to])
+                if remaining <= 0:
+                    continue
+                capacity[task.assigned_to] = remaining - 1
+            selected.append(task)
+
+        if len(selected) >= k:
+            break
+    return selected
@@ -0,0 +1,179 @@
+"""
+Clase ShardedTaskStore: almacenamiento de tareas repartido en varios archivos JSON.
+
+Las tareas se reparten por rangos de id en archivos "shard" dentro de un
+directorio, descritos por un pequeño manifest.json:
+
+    {"generation": 7, "shards": [{"file": "shard-0001.json", "start_id": 1},
+                                 {"file": "shard-0002.json", "start_id": 1001}]}
+
+Cada shard contiene las tareas con start_id <= id < start_id del siguiente
+shard (el último no tiene límite superior). Al modificar una tarea solo se
+reescribe su shard y el manifest; cuando un shard supera max_shard_tasks se
+divide en trozos de la mitad de ese tamaño.
+
+Al dividir, los shards nuevos y el manifest que los incluye se escriben antes
+de recortar el shard original: si el proceso se interrumpe entre medias, el
+original aún conserva las tareas movidas y load descarta esas copias porque
+quedan fuera de su rango.
+"""
+
+import bisect
+import json
+import os
+import tempfile
+
+from models.task import Task
+
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _write_json_atomic(path, data, indent=None):
+    """Escribe un JSON en un temporal y lo reemplaza de forma atómica."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ShardedTaskStore:
+    """Tareas repartidas por rangos de id en varios archivos JSON"""
+    
+    def __init__(self, directory, max_shard_tasks=1000):
+        """
+        Inicializa el almacén
+        
+        Args:
+            directory: Directorio con manifest.json y los shards
+            max_shard_tasks: Número de tareas a partir del cual un shard se divide
+        """
+        self.directory = directory
+        self.max_shard_tasks = max_shard_tasks
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+    
+    def exists(self):
+        """Indica si el almacén ya tiene manifest."""
+        return os.path.exists(self.manifest_path)
+    
+    def _read_manifest(self):
+        if not self.exists():
+            return {'generation': 0, 'shards': [{'file': 'shard-0001.json', 'start_id': 1}]}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _read_shard(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return []
+        with open(path, 'r', encoding='utf-8') as f:
+            return [Task.from_dict(data) for data in json.load(f)]
+    
+    def _write_shard(self, name, tasks):
+        _write_json_atomic(
+            os.path.join(self.directory, name),
+            [task.to_dict() for task in tasks],
+            indent=2
+        )
+    
+    @staticmethod
+    def _shard_index(starts, task_id):
+        """Índice del shard cuyo rango contiene task_id."""
+        return max(bisect.bisect_right(starts, task_id) - 1, 0)
+    
+    def load(self):
+        """
+        Carga todas las tareas, recorriendo los shards en orden de id.
+        
+        Returns:
+            List[Task]: Lista de objetos Task ordenada por id
+        """
+        shards = self._read_manifest()['shards']
+        tasks = []
+        for index, shard in enumerate(shards):
+            shard_tasks = self._read_shard(shard['file'])
+            if index + 1 < len(shards):
+                # Copias que quedaron en un shard dividido sin llegar a recortarlo
+                end_id = shards[index + 1]['start_id']
+                shard_tasks = [task for task in shard_tasks if task.id < end_id]
+            shard_tasks.sort(key=lambda task: task.id)
+            tasks.extend(shard_tasks)
+        return tasks
+    
+    def save(self, tasks, changed_ids=None):
+        """
+        Guarda las tareas reescribiendo solo los shards afectados.
+        
+        Args:
+            tasks: Lista completa de objetos Task
+            changed_ids: IDs de las tareas modificadas (None reescribe todos los shards)
+        
+        Returns:
+            int: Número de shards reescritos
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self._read_manifest()
+        shards = manifest['shards']
+        starts = [shard['start_id'] for shard in shards]
+        
+        # Repartir las tareas por shard
+        grouped = [[] for _ in shards]
+        for task in tasks:
+            grouped[self._shard_index(starts, task.id)].append(task)
+        
+        if changed_ids is None:
+            dirty = set(range(len(shards)))
+        else:
+            dirty = {self._shard_index(starts, task_id) for task_id in changed_ids}
+        
+        # Dividir los shards modificados que superan el umbral
+        used = {shard['file'] for shard in shards}
+        new_shards, new_grouped, new_dirty, truncated = [], [], set(), set()
+        for index, (shard, shard_tasks) in enumerate(zip(shards, grouped)):
+            pieces = self._split(shard_tasks) if index in dirty else [shard_tasks]
+            for number, piece in enumerate(pieces):
+                entry = shard
+                if number > 0:
+                    entry = {'file': self._new_shard_name(used), 'start_id': piece[0].id}
+                    used.add(entry['file'])
+                elif len(pieces) > 1:
+                    truncated.add(len(new_shards))
+                if index in dirty:
+                    new_dirty.add(len(new_shards))
+                new_shards.append(entry)
+                new_grouped.append(piece)
+        dirty = new_dirty
+        
+        # Primero los shards nuevos (y los que no pierden tareas), luego el
+        # manifest que los incluye y por último el recorte de los divididos
+        for index in sorted(dirty - truncated):
+            self._write_shard(new_shards[index]['file'], new_grouped[index])
+        
+        manifest['shards'] = new_shards
+        manifest['generation'] = manifest.get('generation', 0) + 1
+        _write_json_atomic(self.manifest_path, manifest, indent=2)
+        
+        for index in sorted(truncated):
+            self._write_shard(new_shards[index]['file'], new_grouped[index])
+        return len(dirty)
+    
+    def _split(self, shard_tasks):
+        """Divide un shard que supera max_shard_tasks en trozos de la mitad de ese tamaño."""
+        if len(shard_tasks) <= self.max_shard_tasks:
+            return [shard_tasks]
+        shard_tasks = sorted(shard_tasks, key=lambda task: task.id)
+        size = max(self.max_shard_tasks // 2, 1)
+        return [shard_tasks[i:i + size] for i in range(0, len(shard_tasks), size)]
+    
+    @staticmethod
+    def _new_shard_name(used):
+        """Nombre de archivo libre para un shard nuevo."""
+        number = len(used) + 1
+        while f'shard-{number:04d}.json' in used:
+            number += 1
+        return f'shard-{number:04d}.json'
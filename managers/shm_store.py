@@ -0,0 +1,223 @@
+"""
+Clase SharedTaskTable: tabla de tareas en memoria compartida entre procesos.
+
+Permite que varios procesos (por ejemplo, los workers de gunicorn que ejecutan
+app_simple.py) lean las mismas tareas sin volver a parsear tasks.json cada uno.
+
+Formato del segmento:
+    - Cabecera de HEADER_SIZE bytes: magic, secuencia, número de registros,
+      bytes usados del heap de cadenas y marca (mtime, tamaño, inodo) del
+      tasks.json (o manifest) del que procede el contenido.
+    - Tabla de registros de tamaño fijo, uno por tarea (ver task_codec).
+    - Heap de cadenas UTF-8, referenciadas desde los registros por (offset, longitud).
+
+La secuencia funciona como seqlock: el escritor la deja impar mientras
+modifica el segmento y par al terminar. Los lectores copian los datos y
+reintentan si la secuencia cambió o era impar. Los escritores se excluyen
+entre procesos con flock sobre un archivo de bloqueo.
+"""
+
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from managers.task_codec import RECORD, decode_task, encode_tasks
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+MAGIC = b'TASKSHM3'
+
+# magic, secuencia, número de registros, bytes usados del heap, marca del archivo origen
+HEADER = struct.Struct('<8sQIIqqQ')
+HEADER_SIZE = 64
+SEQ_OFFSET = 8
+
+
+def _untrack(shm):
+    """
+    Evita que el resource_tracker elimine el segmento al salir este proceso.
+    
+    El segmento es compartido por todos los workers y debe sobrevivir a
+    cualquiera de ellos; se elimina explícitamente con unlink().
+    """
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+class SharedTaskTable:
+    """Tabla de tareas en un segmento de memoria compartida"""
+    
+    def __init__(self, lock_path):
+        """
+        Inicializa la tabla; el segmento se abre con attach_or_create
+        
+        Args:
+            lock_path: Ruta del archivo usado como bloqueo entre procesos
+        """
+        self._shm = None
+        self._buf = None
+        self._lock_path = lock_path
+        self._lock_fd = None
+        self._lock_depth = 0
+        self._thread_lock = threading.RLock()
+    
+    @classmethod
+    def attach_or_create(cls, name, size, loader, source_stamp=None):
+        """
+        Abre el segmento compartido o lo crea e inicializa si no existe.
+        
+        El segmento sobrevive a los reinicios del servidor. Si la marca del
+        archivo origen guardada en la cabecera no coincide con la actual (el
+        archivo se editó, se restauró o lo reescribió maintain_store.py con
+        el servidor parado), el contenido se vuelve a cargar con loader: el
+        archivo manda sobre el segmento.
+        
+        Args:
+            name: Nombre del segmento
+            size: Tamaño en bytes del segmento si hay que crearlo
+            loader: Función sin argumentos que devuelve la lista de Task
+                inicial (se llama al crear el segmento o si está obsoleto)
+            source_stamp: Función sin argumentos que devuelve la marca
+                (mtime, tamaño, inodo) del archivo origen, o None si no existe
+        
+        Returns:
+            SharedTaskTable: La tabla lista para usar
+        """
+        if fcntl is None:
+            raise RuntimeError("La memoria compartida requiere fcntl (no disponible en este sistema)")
+        
+        table = cls(os.path.join(tempfile.gettempdir(), f'{name}.lock'))
+        
+        # Crear e inicializar bajo el bloqueo: ningún otro proceso ve un segmento a medias
+        with table.lock():
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+                created = False
+            except FileNotFoundError:
+                shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, HEADER_SIZE))
+                created = True
+            _untrack(shm)
+            
+            table._shm = shm
+            table._buf = shm.buf
+            stamp = source_stamp() if source_stamp is not None else None
+            if created or bytes(table._buf[:len(MAGIC)]) != MAGIC:
+                HEADER.pack_into(table._buf, 0, MAGIC, 0, 0, 0, 0, 0, 0)
+                table.write_tasks(loader(), stamp)
+            elif source_stamp is not None and table.source_stamp() != stamp:
+                table.write_tasks(loader(), stamp)
+        return table
+    
+    @contextmanager
+    def lock(self):
+        """
+        Bloqueo exclusivo de escritura entre procesos (reentrante en el proceso).
+        """
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+                    os.close(self._lock_fd)
+                    self._lock_fd = None
+    
+    def sequence(self):
+        """
+        Obtiene la secuencia actual; cambia con cada escritura de cualquier proceso.
+        
+        Returns:
+            int: Número de secuencia
+        """
+        return struct.unpack_from('<Q', self._buf, SEQ_OFFSET)[0]
+    
+    def source_stamp(self):
+        """
+        Marca del archivo origen guardada con el contenido actual.
+        
+        Returns:
+            tuple o None: (mtime_ns, tamaño, inodo), o None si no se guardó
+        """
+        stamp = HEADER.unpack_from(self._buf, 0)[4:]
+        return stamp if stamp != (0, 0, 0) else None
+    
+    def write_tasks(self, tasks, source_stamp=None):
+        """
+        Reemplaza el contenido de la tabla. Debe llamarse con lock() tomado.
+        
+        Args:
+            tasks: Lista de objetos Task
+            source_stamp: Marca (mtime_ns, tamaño, inodo) del archivo que
+                corresponde a este contenido, o None
+        
+        Returns:
+            int: Nueva secuencia tras la escritura
+        
+        Raises:
+            ValueError: Si las tareas no caben en el segmento o tienen valores inválidos
+        """
+        records, heap = encode_tasks(tasks)
+        data = records + heap
+        count, heap_used = len(tasks), len(heap)
+        if HEADER_SIZE + len(data) > len(self._buf):
+            raise ValueError(
+                f"Las tareas ({HEADER_SIZE + len(data)} bytes) no caben en el segmento "
+                f"de memoria compartida ({len(self._buf)} bytes)"
+            )
+        
+        seq = self.sequence()
+        # Secuencia impar: los lectores saben que hay una escritura en curso
+        struct.pack_into('<Q', self._buf, SEQ_OFFSET, seq + 1)
+        self._buf[HEADER_SIZE:HEADER_SIZE + len(data)] = data
+        HEADER.pack_into(self._buf, 0, MAGIC, seq + 1, count, heap_used, *(source_stamp or (0, 0, 0)))
+        struct.pack_into('<Q', self._buf, SEQ_OFFSET, seq + 2)
+        return seq + 2
+    
+    def _read_consistent(self):
+        """Copia cabecera y datos, reintentando mientras haya una escritura en curso."""
+        while True:
+            _, seq, count, heap_used = HEADER.unpack_from(self._buf, 0)[:4]
+            if seq & 1:
+                time.sleep(0)
+                continue
+            end = min(HEADER_SIZE + count * RECORD.size + heap_used, len(self._buf))
+            data = bytes(self._buf[HEADER_SIZE:end])
+            if self.sequence() == seq:
+                return seq, count, data
+    
+    def read_tasks(self):
+        """
+        Lee todas las tareas de la tabla.
+        
+        Returns:
+            tuple: (secuencia leída, List[Task])
+        """
+        seq, count, data = self._read_consistent()
+        heap_offset = count * RECORD.size
+        return seq, [decode_task(data, 0, heap_offset, i) for i in range(count)]
+    
+    def close(self):
+        """Cierra el segmento en este proceso (los demás procesos siguen usándolo)."""
+        self._buf = None
+        self._shm.close()
+    
+    def unlink(self):
+        """Elimina el segmento del sistema. Llamar solo al apagar todos los workers."""
+        # unlink() da de baja el segmento en el resource_tracker: volver a registrarlo
+        resource_tracker.register(self._shm._name, 'shared_memory')
+        self._shm.unlink()
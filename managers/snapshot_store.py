@@ -0,0 +1,265 @@
+"""
+Clase TaskSnapshotFile: instantánea binaria de las tareas, abierta con mmap.
+
+Formato del archivo:
+    - Cabecera de HEADER_SIZE bytes: magic, versión del formato, número de
+      tareas, marca (mtime, tamaño, inodo) del tasks.json del que procede y
+      posiciones de la tabla de registros y de la sección de cadenas.
+    - Tabla de registros de tamaño fijo ordenada por id (ver task_codec).
+    - Sección de cadenas UTF-8 referenciadas por (offset, longitud).
+
+Abrir una instantánea solo lee la cabecera: los registros se decodifican al
+accederlos, así que el tiempo de apertura no depende del número de tareas.
+
+Para convertir entre tasks.json y la instantánea, ver convert_tasks.py.
+"""
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from models.task import Task
+from managers.task_codec import RECORD, decode_task, encode_tasks, record_id, relocate_strings
+
+
+MAGIC = b'TASKSNP1'
+FORMAT_VERSION = 2
+
+# magic, versión, número de tareas, mtime_ns/tamaño/inodo del JSON de origen,
+# posición de la tabla de registros, posición de la sección de cadenas
+HEADER = struct.Struct('<8sIIqqQQQ')
+HEADER_SIZE = 64
+
+
+def file_stamp(path):
+    """
+    Devuelve la marca (mtime, tamaño, inodo) de un archivo o None si no existe.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def write_snapshot(path, tasks, source_stamp=None):
+    """
+    Escribe una instantánea binaria de forma atómica.
+    
+    Args:
+        path: Ruta del archivo de instantánea
+        tasks: Lista de objetos Task
+        source_stamp: Marca del tasks.json que representa (o None)
+    """
+    tasks = sorted(tasks, key=lambda task: task.id)
+    records, strings = encode_tasks(tasks)
+    mtime_ns, size, ino = source_stamp or (0, 0, 0)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(tasks), mtime_ns, size, ino,
+        HEADER_SIZE, HEADER_SIZE + len(records)
+    )
+    
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header.ljust(HEADER_SIZE, b'\0'))
+            f.write(records)
+            f.write(strings)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class SnapshotWriter:
+    """
+    Escribe una instantánea por partes, sin tener todas las tareas en memoria.
+    
+    Cada parte es una tabla de registros con su sección de cadenas (ver
+    encode_tasks); las partes deben llegar en orden de id. Los registros se
+    escriben directamente tras la cabecera y las cadenas en un temporal
+    aparte, que se copia al final al hacer commit().
+    """
+    
+    def __init__(self, path, source_stamp=None):
+        """
+        Inicializa el escritor
+        
+        Args:
+            path: Ruta final del archivo de instantánea
+            source_stamp: Marca del tasks.json que representa (o None)
+        """
+        self.path = path
+        self.source_stamp = source_stamp
+        self.count = 0
+        self.last_id = None
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        self._file = os.fdopen(fd, 'w+b')
+        self._file.write(b'\0' * HEADER_SIZE)
+        self._strings = tempfile.TemporaryFile(dir=directory)
+        self._strings_size = 0
+    
+    def append(self, records, strings):
+        """
+        Añade una parte codificada con encode_tasks.
+        
+        Args:
+            records: Tabla de registros, con offsets relativos a strings
+            strings: Sección de cadenas de la parte
+        
+        Raises:
+            ValueError: Si la parte no empieza con un id mayor que el último escrito
+        """
+        if not records:
+            return
+        first_id = record_id(records, 0, 0)
+        if self.last_id is not None and first_id <= self.last_id:
+            raise ValueError(f"Las tareas no llegan en orden de id ({first_id} tras {self.last_id})")
+        self._file.write(relocate_strings(records, self._strings_size))
+        self._strings.write(strings)
+        self._strings_size += len(strings)
+        self.count += len(records) // RECORD.size
+        self.last_id = record_id(records, 0, len(records) // RECORD.size - 1)
+    
+    def commit(self):
+        """Completa el archivo y lo reemplaza de forma atómica."""
+        try:
+            strings_offset = HEADER_SIZE + self.count * RECORD.size
+            self._strings.seek(0)
+            shutil.copyfileobj(self._strings, self._file)
+            mtime_ns, size, ino = self.source_stamp or (0, 0, 0)
+            header = HEADER.pack(
+                MAGIC, FORMAT_VERSION, self.count, mtime_ns, size, ino,
+                HEADER_SIZE, strings_offset
+            )
+            self._file.seek(0)
+            self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+            self._file.close()
+            self._strings.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+    
+    def abort(self):
+        """Descarta lo escrito."""
+        self._file.close()
+        self._strings.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+class TaskSnapshotFile:
+    """
+    Instantánea binaria de solo lectura, con decodificación perezosa.
+    
+    Se comporta como una secuencia de Task ordenada por id. Cada tarea se
+    decodifica la primera vez que se accede y después se reutiliza el mismo
+    objeto, que no debe modificarse.
+    """
+    
+    def __init__(self, path):
+        """
+        Abre la instantánea
+        
+        Args:
+            path: Ruta del archivo de instantánea
+        
+        Raises:
+            ValueError: Si el archivo no es una instantánea válida
+        """
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self._mm) < HEADER_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path} no es una instantánea de tareas")
+        (magic, version, self._count, mtime_ns, size, ino,
+         self._records_offset, self._strings_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} no es una instantánea de tareas (formato {version})")
+        
+        self.source_stamp = (mtime_ns, size, ino) if (mtime_ns, size, ino) != (0, 0, 0) else None
+        self._decoded = {}
+    
+    def __len__(self):
+        return self._count
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('índice de tarea fuera de rango')
+        task = self._decoded.get(index)
+        if task is None:
+            task = decode_task(self._mm, self._records_offset, self._strings_offset, index)
+            self._decoded[index] = task
+        return task
+    
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+    
+    def get(self, task_id):
+        """
+        Busca una tarea por id con búsqueda binaria sobre la tabla de registros.
+        
+        Args:
+            task_id: ID de la tarea
+        
+        Returns:
+            Task o None: La tarea encontrada o None si no existe
+        """
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if record_id(self._mm, self._records_offset, mid) < task_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and record_id(self._mm, self._records_offset, lo) == task_id:
+            return self[lo]
+        return None
+    
+    def close(self):
+        """Cierra el mapeo del archivo."""
+        self._mm.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def json_to_snapshot(json_path, snapshot_path):
+    """
+    Convierte un tasks.json en una instantánea binaria.
+    
+    Returns:
+        int: Número de tareas convertidas
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        tasks = [Task.from_dict(data) for data in json.load(f)]
+    write_snapshot(snapshot_path, tasks, file_stamp(json_path))
+    return len(tasks)
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    """
+    Convierte una instantánea binaria en un tasks.json.
+    
+    Returns:
+        int: Número de tareas convertidas
+    """
+    with TaskSnapshotFile(snapshot_path) as snapshot:
+        tasks_data = [task.to_dict() for task in snapshot]
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(tasks_data, f, indent=2, ensure_ascii=False)
+    return len(tasks_data)
@@ -0,0 +1,1242 @@
+"""
+Clase StoreMaintenance: mantenimiento del almacén JSON de tareas sin el servidor.
+
+Operaciones (ver maintain_store.py):
+    - verify: comprueba en una pasada que todas las tareas se leen y son
+      válidas, que no hay ids repetidos, que los shards respetan su rango y
+      que la instantánea binaria y el archivo frío están íntegros.
+    - compact: une shards pequeños o vacíos, reescribe el archivo frío en un
+      solo miembro gzip y borra los temporales que dejaron escrituras
+      interrumpidas y los shards que ya no están en el manifest.
+    - reindex: reconstruye la instantánea binaria y, si se pide, el
+      manifest de los shards a partir de los archivos de shard.
+    - stats: tamaño, número de tareas, bytes por tarea, recuentos por campo y
+      latencias de lectura de cada parte del almacén.
+
+El almacén se recorre por particiones de tamaño acotado, así que la memoria
+usada no depende de su tamaño total:
+    - tasks.json escrito por la aplicación (indent=2) se parte por rangos de
+      bytes. Cada tarea empieza en una línea "  {" y, como JSON no admite
+      saltos de línea dentro de las cadenas, esa marca solo aparece al
+      principio de un elemento. En otros formatos se lee en una sola pasada.
+    - con shards, cada shard es una partición.
+    - la instantánea binaria se parte por rangos de registros.
+Las particiones se procesan en paralelo en varios procesos. El archivo frío
+es un flujo gzip y solo puede recorrerse en orden.
+
+compact y reindex reescriben archivos del almacén: deben ejecutarse con el
+servidor parado.
+"""
+
+import glob
+import gzip
+import json
+import mmap
+import os
+import random
+import tempfile
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from models.task import Task
+from managers.shard_store import MANIFEST_FILE, ShardedTaskStore, _write_json_atomic
+from managers.snapshot_store import (
+    HEADER, HEADER_SIZE, FORMAT_VERSION, MAGIC, SnapshotWriter, TaskSnapshotFile,
+    file_stamp, write_snapshot
+)
+from managers.task_codec import NULL_LENGTH, RECORD, decode_task, encode_tasks
+
+
+# Bytes leídos cada vez y tamaño de cada partición de tasks.json
+READ_CHUNK = 1024 * 1024
+PARTITION_BYTES = 16 * 1024 * 1024
+
+# Tamaño máximo de un elemento de tasks.json; uno mayor se da por corrupto
+MAX_ITEM_BYTES = 16 * 1024 * 1024
+
+# Registros de la instantánea por partición
+SNAPSHOT_PARTITION_RECORDS = 200000
+
+# Principio de cada tarea en un tasks.json escrito con indent=2
+ITEM_MARK = b'\n  {'
+
+# Los ids hasta este valor se registran en un mapa de bits (16 MB); el resto en un conjunto
+DENSE_IDS = 1 << 27
+
+# Errores que se detallan por sección (el resto solo se cuentan)
+MAX_REPORTED_ERRORS = 20
+
+# Antigüedad mínima (segundos) de un temporal para considerarlo abandonado
+TMP_MIN_AGE = 60
+
+# Búsquedas por id para medir la latencia de la instantánea
+SNAPSHOT_PROBES = 1000
+
+
+def iter_json_array(path, chunk_size=READ_CHUNK, max_item_chars=MAX_ITEM_BYTES):
+    """
+    Recorre los elementos de un archivo con un array JSON sin cargarlo entero.
+    
+    Args:
+        path: Ruta del archivo (por ejemplo tasks.json)
+        chunk_size: Caracteres que se leen cada vez
+        max_item_chars: Tamaño máximo de un elemento
+    
+    Returns:
+        Iterator: Cada elemento del array, ya decodificado
+    
+    Raises:
+        ValueError: Si el archivo no contiene un array JSON válido
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, consumed = '', 0, 0
+        
+        def skip_whitespace():
+            # Avanza hasta el siguiente carácter significativo, leyendo más si hace falta
+            nonlocal buffer, pos, consumed
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                more = f.read(chunk_size)
+                if not more:
+                    return ''
+                consumed += len(buffer)
+                buffer, pos = more, 0
+        
+        if skip_whitespace() != '[':
+            raise ValueError(f'{path} no contiene un array JSON')
+        pos += 1
+        if skip_whitespace() == ']':
+            return
+        
+        while True:
+            while True:
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError as e:
+                    # Elemento partido entre dos lecturas: descartar lo ya procesado y leer más
+                    more = f.read(chunk_size)
+                    if not more:
+                        raise ValueError(f'{path}: JSON inválido en el carácter {consumed + e.pos}: {e.msg}')
+                    if len(buffer) - pos > max_item_chars:
+                        raise ValueError(
+                            f'{path}: JSON inválido o elemento de más de {max_item_chars} '
+                            f'caracteres en el carácter {consumed + pos}'
+                        )
+                    consumed += pos
+                    buffer, pos = buffer[pos:] + more, 0
+            yield item
+            
+            separator = skip_whitespace()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f'{path}: se esperaba "," o "]" en el carácter {consumed + pos}')
+            pos += 1
+            skip_whitespace()
+
+
+def check_task_data(data):
+    """
+    Convierte y valida un elemento del almacén.
+    
+    Además de Task.validate comprueba lo que Task.from_dict acepta sin
+    quejarse: id entero positivo, versión entera y fecha ISO.
+    
+    Args:
+        data: Elemento tal como se leyó del JSON
+    
+    Returns:
+        tuple: (Task, None) si es válido o (None, mensaje de error)
+    """
+    if not isinstance(data, dict):
+        return None, f"el elemento no es un objeto ({type(data).__name__})"
+    task_id = data.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool) or task_id < 1:
+        return None, f"id inválido: {task_id!r}"
+    version = data.get('version', 1)
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        return None, f"tarea {task_id}: versión inválida: {version!r}"
+    effort_hours = data.get('effort_hours')
+    if effort_hours is not None and (not isinstance(effort_hours, (int, float)) or isinstance(effort_hours, bool)):
+        return None, f"tarea {task_id}: effort_hours no es un número: {effort_hours!r}"
+    return check_task(Task.from_dict(data))
+
+
+def check_task(task):
+    """
+    Valida una tarea ya convertida (Task.validate y fecha de creación).
+    
+    Returns:
+        tuple: (Task, None) si es válida o (None, mensaje de error)
+    """
+    valid, error = task.validate()
+    if not valid:
+        return None, f"tarea {task.id}: {error}"
+    try:
+        datetime.fromisoformat(task.fecha_creacion)
+    except (TypeError, ValueError):
+        return None, f"tarea {task.id}: fecha_creacion inválida: {task.fecha_creacion!r}"
+    return task, None
+
+
+class IdSet:
+    """
+    Conjunto de ids de tarea compacto: un bit por id hasta DENSE_IDS y un
+    conjunto normal para los mayores.
+    
+    Los procesos de cada partición devuelven su IdSet empaquetado (pack) y
+    el proceso principal los une (merge) detectando los repetidos.
+    """
+    
+    __slots__ = ('_bits', '_sparse')
+    
+    def __init__(self):
+        self._bits = bytearray()
+        self._sparse = set()
+    
+    def add(self, task_id):
+        """
+        Añade un id.
+        
+        Returns:
+            bool: True si el id ya estaba
+        """
+        if task_id >= DENSE_IDS:
+            if task_id in self._sparse:
+                return True
+            self._sparse.add(task_id)
+            return False
+        byte, bit = task_id >> 3, 1 << (task_id & 7)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        if self._bits[byte] & bit:
+            return True
+        self._bits[byte] |= bit
+        return False
+    
+    def __contains__(self, task_id):
+        if task_id >= DENSE_IDS:
+            return task_id in self._sparse
+        byte = task_id >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (task_id & 7)))
+    
+    def pack(self):
+        """
+        Empaqueta el conjunto para enviarlo entre procesos.
+        
+        Returns:
+            tuple: (primer byte ocupado, bytes del mapa desde ahí, ids grandes)
+        """
+        bits = bytes(self._bits).rstrip(b'\0')
+        start = len(bits) - len(bits.lstrip(b'\0'))
+        return start, bits[start:], sorted(self._sparse)
+    
+    def merge(self, packed, limit=MAX_REPORTED_ERRORS):
+        """
+        Une un conjunto empaquetado con pack.
+        
+        Returns:
+            tuple: (número de ids que ya estaban, hasta limit de esos ids)
+        """
+        start, bits, sparse = packed
+        repeated = []
+        count = 0
+        if bits:
+            end = start + len(bits)
+            if end > len(self._bits):
+                self._bits.extend(bytes(end - len(self._bits)))
+            current = int.from_bytes(self._bits[start:end], 'little')
+            new = int.from_bytes(bits, 'little')
+            both = current & new
+            if both:
+                count += bin(both).count('1')
+                while both and len(repeated) < limit:
+                    lowest = both & -both
+                    repeated.append(start * 8 + lowest.bit_length() - 1)
+                    both ^= lowest
+            self._bits[start:end] = (current | new).to_bytes(len(bits), 'little')
+        for task_id in sparse:
+            if task_id in self._sparse:
+                count += 1
+                if len(repeated) < limit:
+                    repeated.append(task_id)
+            self._sparse.add(task_id)
+        return count, repeated
+
+
+class _PartitionScan:
+    """Resultado en curso del recorrido de una partición."""
+    
+    __slots__ = ('location', 'min_id', 'max_id', 'encode', 'tasks', 'errors', 'error_count',
+                 'ids', 'first_id', 'last_id', 'lowest_id', 'highest_id', 'ascending', 'closed', 'status', 'priority',
+                 'assigned', 'created', 'effort', 'encoded')
+    
+    def __init__(self, part):
+        self.location = part['location']
+        self.min_id = part.get('min_id')
+        self.max_id = part.get('max_id')
+        self.encode = part.get('encode', False)
+        self.tasks = 0
+        self.errors = []
+        self.error_count = 0
+        self.ids = IdSet()
+        self.first_id = self.last_id = None
+        self.lowest_id = self.highest_id = None
+        self.ascending = True
+        self.closed = False
+        self.status = Counter()
+        self.priority = Counter()
+        self.assigned = Counter()
+        self.created = [None, None]
+        self.effort = 0.0
+        self.encoded = []
+    
+    def error(self, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            if not message.startswith(self.location):
+                message = f"{self.location}: {message}"
+            self.errors.append(message)
+    
+    def wants_detail(self):
+        """Indica si el próximo error se va a detallar (para no calcular su posición en balde)."""
+        return len(self.errors) < MAX_REPORTED_ERRORS
+    
+    def data(self, data):
+        """Registra un elemento leído del JSON."""
+        task, error = check_task_data(data)
+        if error:
+            self.error(error)
+        else:
+            self.task(task)
+    
+    def task(self, task):
+        """Registra una tarea válida."""
+        task_id = task.id
+        if self.ids.add(task_id):
+            self.error(f"id {task_id} repetido")
+            return
+        if (self.min_id is not None and task_id < self.min_id) or (self.max_id is not None and task_id > self.max_id):
+            self.error(f"la tarea {task_id} está fuera del rango del shard ({self.min_id}-{self.max_id or ''})")
+        if self.last_id is not None and task_id < self.last_id:
+            self.ascending = False
+        if self.first_id is None:
+            self.first_id = self.lowest_id = self.highest_id = task_id
+        self.last_id = task_id
+        self.lowest_id = min(self.lowest_id, task_id)
+        self.highest_id = max(self.highest_id, task_id)
+        self.tasks += 1
+        self.status[task.status] += 1
+        self.priority[task.priority] += 1
+        self.assigned[task.assigned_to] += 1
+        created = task.fecha_creacion
+        if self.created[0] is None or created < self.created[0]:
+            self.created[0] = created
+        if self.created[1] is None or created > self.created[1]:
+            self.created[1] = created
+        self.effort += task.effort_hours or 0
+        if self.encode:
+            self.encoded.append(task)
+    
+    def result(self, seconds):
+        encoded = None
+        if self.encode and self.ascending and not self.error_count:
+            encoded = encode_tasks(self.encoded)
+        return {
+            'location': self.location,
+            'tasks': self.tasks,
+            'errors': self.errors,
+            'error_count': self.error_count,
+            'ids': self.ids.pack(),
+            'first_id': self.first_id,
+            'last_id': self.last_id,
+            'lowest_id': self.lowest_id,
+            'highest_id': self.highest_id,
+            'ascending': self.ascending,
+            'closed': self.closed,
+            'status': self.status,
+            'priority': self.priority,
+            'assigned': self.assigned,
+            'created': tuple(self.created),
+            'effort': self.effort,
+            'encoded': encoded,
+            'seconds': seconds,
+        }
+
+
+def _skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in ' \t\r\n':
+        pos += 1
+    return pos
+
+
+def _scan_json_piece(piece, base, scan, opening, closing):
+    """
+    Recorre un trozo de tasks.json formado por elementos completos.
+    
+    Args:
+        piece: Bytes del trozo (empieza al principio de un elemento, o en el "[")
+        base: Posición del trozo en el archivo, para situar los errores
+        scan: _PartitionScan de la partición
+        opening: Si el trozo debe empezar por "["
+        closing: Si es el último trozo del archivo (puede cerrar el array)
+    """
+    try:
+        text = piece.decode('utf-8')
+    except UnicodeDecodeError as e:
+        scan.error(f"byte {base + e.start}: UTF-8 inválido")
+        return
+    
+    def where(pos):
+        return f"byte {base + len(text[:pos].encode('utf-8'))}" if scan.wants_detail() else ''
+    
+    decoder = json.JSONDecoder()
+    pos = _skip_whitespace(text, 0)
+    if opening:
+        if not text.startswith('[', pos):
+            scan.error(f"{where(pos)}: el archivo no empieza por '['")
+            return
+        pos += 1
+    
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if pos >= len(text):
+            return
+        if scan.closed:
+            scan.error(f"{where(pos)}: contenido tras el final del array")
+            return
+        try:
+            item, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError as e:
+            scan.error(f"{where(e.pos)}: JSON inválido ({e.msg})")
+            # Seguir en la siguiente tarea
+            pos = text.find('\n  {', e.pos + 1)
+            if pos == -1:
+                return
+            continue
+        scan.data(item)
+        
+        pos = _skip_whitespace(text, end)
+        separator = text[pos:pos + 1]
+        if separator == ',':
+            pos += 1
+        elif separator == ']' and closing:
+            scan.closed = True
+            pos += 1
+        else:
+            scan.error(f"{where(pos)}: se esperaba ',' o ']' tras la tarea")
+            pos = text.find('\n  {', pos)
+            if pos == -1:
+                return
+
+
+def _scan_json_range(part, scan):
+    """Recorre los bytes [start, stop) de un tasks.json con indent=2."""
+    start, stop = part['start'], part['stop']
+    with open(part['path'], 'rb') as f:
+        f.seek(start)
+        remaining = stop - start
+        carry, base, first = b'', start, True
+        skipping = False
+        while remaining > 0 or carry:
+            data = f.read(min(READ_CHUNK, remaining)) if remaining > 0 else b''
+            remaining -= len(data)
+            buf = carry + data
+            if skipping:
+                # Tras un elemento demasiado grande, continuar en la siguiente tarea
+                index = buf.find(ITEM_MARK)
+                if index == -1:
+                    base += len(buf)
+                    carry = b''
+                    continue
+                base += index
+                buf = buf[index:]
+                skipping = False
+            if remaining > 0:
+                cut = buf.rfind(ITEM_MARK)
+                if cut <= 0:
+                    if len(buf) > MAX_ITEM_BYTES:
+                        scan.error(f"byte {base}: JSON inválido o tarea de más de {MAX_ITEM_BYTES} bytes")
+                        base += len(buf)
+                        carry, skipping = b'', True
+                    else:
+                        carry = buf
+                    continue
+                piece, carry = buf[:cut], buf[cut:]
+            else:
+                piece, carry = buf, b''
+            _scan_json_piece(piece, base, scan, opening=first and part['first'], closing=part['last'])
+            base += len(piece)
+            first = False
+    if part['last'] and not scan.closed:
+        scan.error("el array no se cierra: el archivo está truncado")
+
+
+def _scan_json_stream(part, scan):
+    """Recorre un tasks.json en cualquier formato, en una sola pasada."""
+    try:
+        for data in iter_json_array(part['path']):
+            scan.data(data)
+    except (ValueError, UnicodeDecodeError) as e:
+        scan.error(str(e))
+
+
+def _scan_shard(part, scan):
+    """Recorre un archivo de shard (acotado por max_shard_tasks)."""
+    try:
+        with open(part['path'], 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        scan.error("el archivo del shard no existe")
+        return
+    except (ValueError, UnicodeDecodeError) as e:
+        scan.error(f"JSON inválido: {e}")
+        return
+    if not isinstance(data, list):
+        scan.error("el shard no contiene un array JSON")
+        return
+    for item in data:
+        scan.data(item)
+
+
+def _scan_snapshot_range(part, scan):
+    """Comprueba y decodifica los registros [start, stop) de una instantánea binaria."""
+    with open(part['path'], 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        records_offset, strings_offset = part['records_offset'], part['strings_offset']
+        strings_size = len(mm) - strings_offset
+        for index in range(part['start'], part['stop']):
+            fields = RECORD.unpack_from(mm, records_offset + index * RECORD.size)
+            task_id, priority, status = fields[0], fields[3], fields[4]
+            problem = None
+            if priority >= len(Task.PRIORITIES) or status >= len(Task.STATUSES):
+                problem = "código de prioridad o status fuera de rango"
+            for i in (5, 7, 9, 11):
+                offset, length = fields[i], fields[i + 1]
+                if length != NULL_LENGTH and offset + length > strings_size:
+                    problem = "cadena fuera de la sección de cadenas"
+            if scan.last_id is not None and task_id <= scan.last_id:
+                problem = f"id {task_id} fuera de orden (tras {scan.last_id})"
+            if problem is None:
+                try:
+                    task = decode_task(mm, records_offset, strings_offset, index)
+                except UnicodeDecodeError:
+                    problem = "cadena con UTF-8 inválido"
+            if problem is None:
+                task, problem = check_task(task)
+            if problem is not None:
+                scan.error(f"registro {index}: {problem}")
+            else:
+                scan.task(task)
+    finally:
+        mm.close()
+
+
+_SCANNERS = {
+    'json': _scan_json_range,
+    'json_stream': _scan_json_stream,
+    'shard': _scan_shard,
+    'snapshot': _scan_snapshot_range,
+}
+
+
+def scan_partition(part):
+    """
+    Recorre una partición del almacén (se ejecuta en un proceso del pool).
+    
+    Args:
+        part: Descripción de la partición (tipo, ruta, rango y opciones)
+    
+    Returns:
+        dict: Tareas, errores, ids, recuentos, tiempo y, si se pidió, las
+        tareas codificadas para la instantánea
+    """
+    scan = _PartitionScan(part)
+    start = time.perf_counter()
+    _SCANNERS[part['kind']](part, scan)
+    return scan.result(time.perf_counter() - start)
+
+
+def merge_shard_files(directory, files, target):
+    """
+    Une varios shards en uno nuevo (se ejecuta en un proceso del pool).
+    
+    Returns:
+        int: Número de tareas del shard nuevo
+    """
+    tasks = []
+    for name in files:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                tasks.extend(json.load(f))
+    tasks.sort(key=lambda data: data['id'])
+    _write_json_atomic(os.path.join(directory, target), tasks, indent=2)
+    return len(tasks)
+
+
+def json_partitions(path, partition_bytes=PARTITION_BYTES, encode=False):
+    """
+    Parte tasks.json en rangos de bytes que empiezan al principio de una tarea.
+    
+    Si el archivo no tiene el formato que escribe la aplicación (indent=2),
+    devuelve una única partición que se recorre en una sola pasada.
+    
+    Returns:
+        List[dict]: Particiones en orden
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if not f.read(len(ITEM_MARK) + 1).startswith(b'[' + ITEM_MARK):
+            return [{'kind': 'json_stream', 'path': path, 'location': path, 'encode': encode}]
+        
+        bounds = [0]
+        for offset in range(partition_bytes, size, partition_bytes):
+            if offset <= bounds[-1]:
+                continue
+            # Siguiente principio de tarea a partir de offset
+            f.seek(offset)
+            position, tail = offset, b''
+            while True:
+                data = f.read(READ_CHUNK)
+                if not data:
+                    position = None
+                    break
+                buf = tail + data
+                index = buf.find(ITEM_MARK)
+                if index != -1:
+                    position += index - len(tail)
+                    break
+                tail = buf[-(len(ITEM_MARK) - 1):]
+                position += len(data)
+            if position is None:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+        bounds.append(size)
+    
+    return [
+        {
+            'kind': 'json', 'path': path, 'start': start, 'stop': stop,
+            'first': index == 0, 'last': index == len(bounds) - 2,
+            'location': f"{path} [{start}-{stop})", 'encode': encode,
+        }
+        for index, (start, stop) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class StoreMaintenance:
+    """Operaciones de mantenimiento sobre los archivos del almacén"""
+    
+    def __init__(self, json_file, shard_dir='', snapshot_file='', archive_file='',
+                 workers=None, max_shard_tasks=1000, log=print):
+        """
+        Inicializa el mantenimiento
+        
+        Args:
+            json_file: Ruta de tasks.json
+            shard_dir: Directorio de shards (vacío = un único tasks.json)
+            snapshot_file: Instantánea binaria (vacío = sin instantánea)
+            archive_file: Archivo frío de tareas completadas
+            workers: Procesos para las particiones (None = número de CPUs)
+            max_shard_tasks: Tareas a partir de las que un shard se divide
+            log: Función para mostrar el progreso
+        """
+        self.json_file = json_file
+        self.shard_dir = shard_dir
+        self.snapshot_file = snapshot_file
+        self.archive_file = archive_file
+        self.workers = workers or os.cpu_count() or 1
+        self.max_shard_tasks = max_shard_tasks
+        self.log = log
+    
+    # Particiones y ejecución en paralelo
+    
+    def _store(self):
+        """Devuelve el ShardedTaskStore si el almacén usa shards ya creados, o None."""
+        if not self.shard_dir:
+            return None
+        store = ShardedTaskStore(self.shard_dir, self.max_shard_tasks)
+        return store if store.exists() else None
+    
+    def _source_stamp(self):
+        """Marca que el servidor compara con la de la instantánea (ver TaskManager._stat_file)."""
+        if self.shard_dir:
+            return file_stamp(os.path.join(self.shard_dir, MANIFEST_FILE))
+        return file_stamp(self.json_file)
+    
+    def _active_partitions(self, section, encode=False):
+        """
+        Particiones del almacén activo (shards o tasks.json).
+        
+        Los problemas del manifest se añaden a la sección.
+        
+        Returns:
+            List[dict]: Particiones en orden de id (o de archivo)
+        """
+        store = self._store()
+        if store is None:
+            if self.shard_dir:
+                section['warnings'].append(
+                    f"{self.shard_dir} no tiene manifest: el servidor creará los shards desde {self.json_file}"
+                )
+            section['path'] = self.json_file
+            if not os.path.exists(self.json_file):
+                section['warnings'].append(f"{self.json_file} no existe")
+                return []
+            section['bytes'] = os.path.getsize(self.json_file)
+            return json_partitions(self.json_file, encode=encode)
+        
+        section['path'] = self.shard_dir
+        try:
+            with open(store.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            shards = manifest['shards']
+            starts = [shard['start_id'] for shard in shards]
+            files = [shard['file'] for shard in shards]
+        except (ValueError, KeyError, TypeError) as e:
+            self._error(section, f"{store.manifest_path} ilegible ({e}); reconstruirlo con reindex --manifest")
+            return []
+        if starts != sorted(set(starts)):
+            self._error(section, f"{store.manifest_path}: los shards no están en orden de start_id")
+        
+        self._shard_leftovers(section, set(files))
+        partitions = []
+        for index, (name, start_id) in enumerate(zip(files, starts)):
+            path = os.path.join(self.shard_dir, name)
+            if not os.path.exists(path):
+                section['warnings'].append(f"{path} no existe (se trata como vacío)")
+                continue
+            section['bytes'] = section.get('bytes', 0) + os.path.getsize(path)
+            partitions.append({
+                'kind': 'shard', 'path': path, 'location': path, 'encode': encode,
+                'min_id': start_id if index else None,
+                'max_id': starts[index + 1] - 1 if index + 1 < len(starts) else None,
+            })
+        return partitions
+    
+    def _shard_leftovers(self, section, referenced):
+        """Añade avisos por los shards que no están en el manifest y los temporales."""
+        for path in sorted(glob.glob(os.path.join(self.shard_dir, 'shard-*.json'))):
+            if os.path.basename(path) not in referenced:
+                section['warnings'].append(f"{path} no está en el manifest (se borra con compact)")
+        for path in self._stale_temporaries():
+            section['warnings'].append(f"{path}: temporal de una escritura interrumpida (se borra con compact)")
+    
+    def _stale_temporaries(self):
+        """Temporales de escrituras atómicas (tmp*.tmp) abandonados en los directorios del almacén."""
+        directories = {os.path.dirname(os.path.abspath(path)) for path in
+                       (self.json_file, self.snapshot_file, self.archive_file) if path}
+        if self.shard_dir:
+            directories.add(os.path.abspath(self.shard_dir))
+        now = time.time()
+        stale = []
+        for directory in sorted(directories):
+            for path in sorted(glob.glob(os.path.join(directory, 'tmp*.tmp'))):
+                try:
+                    if now - os.path.getmtime(path) >= TMP_MIN_AGE:
+                        stale.append(path)
+                except OSError:
+                    pass
+        return stale
+    
+    def _run(self, func, jobs):
+        """
+        Ejecuta func sobre cada elemento de jobs en varios procesos.
+        
+        Como mucho hay dos trabajos por proceso en curso, para que los
+        resultados pendientes no llenen la memoria.
+        
+        Returns:
+            Iterator: Resultados en el mismo orden que jobs
+        """
+        jobs = list(jobs)
+        if self.workers <= 1 or len(jobs) <= 1:
+            for job in jobs:
+                yield func(*job)
+            return
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            pending = deque()
+            remaining = iter(jobs)
+            for job in remaining:
+                pending.append(pool.submit(func, *job))
+                if len(pending) >= 2 * self.workers:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                job = next(remaining, None)
+                if job is not None:
+                    pending.append(pool.submit(func, *job))
+                yield result
+    
+    def _scan(self, section, partitions, ids=None):
+        """
+        Recorre las particiones en paralelo y acumula sus resultados en la sección.
+        
+        Args:
+            section: Diccionario de la sección del informe
+            partitions: Particiones a recorrer
+            ids: IdSet en el que acumular los ids (None = uno nuevo)
+        
+        Returns:
+            Iterator[dict]: El resultado de cada partición, en orden
+        """
+        ids = ids if ids is not None else IdSet()
+        section.setdefault('tasks', 0)
+        section.setdefault('error_count', 0)
+        last_id = None
+        for result in self._run(scan_partition, ((part,) for part in partitions)):
+            section['tasks'] += result['tasks']
+            section['error_count'] += result['error_count']
+            section['errors'].extend(result['errors'][:MAX_REPORTED_ERRORS - len(section['errors'])])
+            count, repeated = ids.merge(result['ids'])
+            if count:
+                self._error(section, f"{count} ids repetidos en {result['location']} y particiones anteriores: "
+                                     f"{', '.join(map(str, repeated))}")
+            if result['first_id'] is not None:
+                if last_id is not None and result['first_id'] <= last_id:
+                    result['ascending'] = False
+                last_id = result['last_id']
+            section['ascending'] = section.get('ascending', True) and result['ascending']
+            yield result
+        section['ids'] = ids
+    
+    @staticmethod
+    def _section(name, path=None):
+        return {'name': name, 'path': path, 'tasks': 0, 'errors': [], 'error_count': 0, 'warnings': []}
+    
+    @staticmethod
+    def _error(section, message):
+        section['error_count'] += 1
+        if len(section['errors']) < MAX_REPORTED_ERRORS:
+            section['errors'].append(message)
+    
+    # verify
+    
+    def verify(self):
+        """
+        Comprueba la integridad de todo el almacén.
+        
+        Returns:
+            dict: ok y una sección por parte del almacén (activo, instantánea,
+            archivo) con tareas, errores y avisos
+        """
+        active = self._section('activo')
+        for _ in self._scan(active, self._active_partitions(active)):
+            pass
+        self.log(f"activo: {active['tasks']} tareas, {active['error_count']} errores")
+        sections = [active]
+        
+        if self.snapshot_file and os.path.exists(self.snapshot_file):
+            snapshot = self._verify_snapshot()
+            self.log(f"instantánea: {snapshot['tasks']} tareas, {snapshot['error_count']} errores")
+            sections.append(snapshot)
+        
+        if self.archive_file and os.path.exists(self.archive_file):
+            archive = self._verify_archive(active['ids'])
+            self.log(f"archivo frío: {archive['tasks']} tareas, {archive['error_count']} errores")
+            sections.append(archive)
+        
+        for section in sections:
+            section.pop('ids', None)
+        return {'ok': not any(section['error_count'] for section in sections), 'sections': sections}
+    
+    def _snapshot_partitions(self, section, encode=False):
+        """
+        Comprueba la cabecera de la instantánea y la parte en rangos de registros.
+        
+        Returns:
+            List[dict]: Particiones (vacía si la cabecera no es válida)
+        """
+        path = self.snapshot_file
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            self._error(section, "el archivo es más corto que la cabecera")
+            return []
+        (magic, version, count, mtime_ns, stamp_size, ino,
+         records_offset, strings_offset) = HEADER.unpack_from(header, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._error(section, f"no es una instantánea de tareas (formato {version})")
+            return []
+        if records_offset != HEADER_SIZE or strings_offset != records_offset + count * RECORD.size or strings_offset > size:
+            self._error(section, "la cabecera no corresponde al tamaño del archivo (instantánea truncada)")
+            return []
+        section['bytes'] = size
+        
+        stamp = (mtime_ns, stamp_size, ino)
+        if stamp != (0, 0, 0) and stamp != self._source_stamp():
+            section['warnings'].append("desactualizada: el servidor la ignora hasta regenerarla (reindex)")
+        return [
+            {
+                'kind': 'snapshot', 'path': path, 'start': start, 'stop': min(start + SNAPSHOT_PARTITION_RECORDS, count),
+                'records_offset': records_offset, 'strings_offset': strings_offset,
+                'location': f"{path} [{start}-{min(start + SNAPSHOT_PARTITION_RECORDS, count)})", 'encode': encode,
+            }
+            for start in range(0, count, SNAPSHOT_PARTITION_RECORDS)
+        ]
+    
+    def _verify_snapshot(self):
+        section = self._section('instantánea', self.snapshot_file)
+        for _ in self._scan(section, self._snapshot_partitions(section)):
+            pass
+        if not section.get('ascending', True):
+            self._error(section, "los registros no están ordenados por id")
+        return section
+    
+    def _verify_archive(self, active_ids):
+        """Recorre el archivo frío (gzip) en una sola pasada."""
+        section = self._section('archivo frío', self.archive_file)
+        section['bytes'] = os.path.getsize(self.archive_file)
+        ids = IdSet()
+        both = []
+        line_number = 0
+        try:
+            with gzip.open(self.archive_file, 'rt', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        data = json.loads(line)
+                    except ValueError as e:
+                        self._error(section, f"línea {line_number}: JSON inválido ({e})")
+                        continue
+                    task, error = check_task_data(data)
+                    if error:
+                        self._error(section, f"línea {line_number}: {error}")
+                        continue
+                    if ids.add(task.id):
+                        self._error(section, f"línea {line_number}: id {task.id} repetido")
+                        continue
+                    if task.id in active_ids:
+                        both.append(task.id)
+                    section['tasks'] += 1
+        except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+            self._error(section, f"gzip dañado o truncado tras la línea {line_number}: {e}")
+        if both:
+            section['warnings'].append(
+                f"{len(both)} tareas están a la vez activas y archivadas: {', '.join(map(str, both[:MAX_REPORTED_ERRORS]))}"
+            )
+        return section
+    
+    # stats
+    
+    def stats(self):
+        """
+        Tamaño, tareas, recuentos y latencias de cada parte del almacén.
+        
+        Returns:
+            dict: Una sección por parte del almacén
+        """
+        sections = []
+        active = self._section('activo')
+        sections.append(self._stats_section(active, self._active_partitions(active)))
+        
+        if self.snapshot_file and os.path.exists(self.snapshot_file):
+            snapshot = self._section('instantánea', self.snapshot_file)
+            self._stats_section(snapshot, self._snapshot_partitions(snapshot))
+            snapshot['latency_ms'] = self._snapshot_latency()
+            sections.append(snapshot)
+        
+        if self.archive_file and os.path.exists(self.archive_file):
+            start = time.perf_counter()
+            archive = self._verify_archive(IdSet())
+            archive['scan_seconds'] = round(time.perf_counter() - start, 3)
+            archive['bytes_per_task'] = round(archive['bytes'] / archive['tasks'], 1) if archive['tasks'] else None
+            sections.append(archive)
+        
+        for section in sections:
+            section.pop('ids', None)
+        return {'sections': sections}
+    
+    def _stats_section(self, section, partitions):
+        status, priority, assigned = Counter(), Counter(), Counter()
+        created, effort, seconds = [], 0.0, []
+        start = time.perf_counter()
+        for result in self._scan(section, partitions):
+            status.update(result['status'])
+            priority.update(result['priority'])
+            assigned.update(result['assigned'])
+            created.extend(value for value in result['created'] if value is not None)
+            effort += result['effort']
+            seconds.append(result['seconds'])
+        elapsed = time.perf_counter() - start
+        
+        size = section.get('bytes', 0)
+        section.update({
+            'bytes_per_task': round(size / section['tasks'], 1) if section['tasks'] else None,
+            'scan_seconds': round(elapsed, 3),
+            'scan_mb_per_second': round(size / 1e6 / elapsed, 1) if elapsed else None,
+            'partitions': len(seconds),
+            # Con shards es el tiempo de leer un shard: lo que cuesta cargarlo al modificar una tarea
+            'partition_ms': {
+                'p50': round(_percentile(seconds, 0.5) * 1000, 2) if seconds else None,
+                'max': round(max(seconds) * 1000, 2) if seconds else None,
+            },
+            'status': dict(status),
+            'priority': dict(priority),
+            'assignees': len(assigned),
+            'top_assignees': assigned.most_common(5),
+            'created': [min(created), max(created)] if created else None,
+            'effort_hours': round(effort, 2),
+        })
+        return section
+    
+    def _snapshot_latency(self):
+        """Tiempo de apertura y de búsqueda por id de la instantánea, en milisegundos."""
+        start = time.perf_counter()
+        try:
+            snapshot = TaskSnapshotFile(self.snapshot_file)
+        except (OSError, ValueError):
+            return None
+        opened = time.perf_counter() - start
+        with snapshot:
+            if not len(snapshot):
+                return {'open': round(opened * 1000, 3)}
+            indexes = [random.randrange(len(snapshot)) for _ in range(SNAPSHOT_PROBES)]
+            task_ids = [snapshot[index].id for index in indexes]
+            snapshot._decoded.clear()
+            timings = []
+            for task_id in task_ids:
+                start = time.perf_counter()
+                snapshot.get(task_id)
+                timings.append(time.perf_counter() - start)
+        return {
+            'open': round(opened * 1000, 3),
+            'get_p50': round(_percentile(timings, 0.5) * 1000, 4),
+            'get_p99': round(_percentile(timings, 0.99) * 1000, 4),
+        }
+    
+    # compact
+    
+    def compact(self, target=None):
+        """
+        Compacta el almacén: une shards pequeños, reescribe el archivo frío y
+        borra temporales abandonados y shards fuera del manifest.
+        
+        Args:
+            target: Tareas máximas por shard al unirlos (None = la mitad de max_shard_tasks)
+        
+        Returns:
+            dict: Acciones realizadas y errores (si hay errores no se modifica nada de esa parte)
+        """
+        report = {'actions': [], 'errors': []}
+        if self._store() is not None:
+            self._compact_shards(report, target or max(self.max_shard_tasks // 2, 1))
+        else:
+            report['actions'].append(f"{self.json_file} se reescribe entero en cada guardado: no hay nada que compactar")
+        
+        if self.archive_file and os.path.exists(self.archive_file):
+            self._compact_archive(report)
+        
+        for path in self._stale_temporaries():
+            os.unlink(path)
+            report['actions'].append(f"borrado {path}")
+        return report
+    
+    def _compact_shards(self, report, target):
+        section = self._section('activo')
+        partitions = self._active_partitions(section)
+        counts = {part['path']: result['tasks'] for part, result in zip(partitions, self._scan(section, partitions))}
+        if section['error_count']:
+            report['errors'].extend(section['errors'])
+            report['errors'].append("shards con errores: no se compactan (ver verify)")
+            return
+        
+        store = self._store()
+        with open(store.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        
+        # Agrupar shards consecutivos mientras quepan en target; los vacíos se unen siempre
+        groups = []
+        for shard in manifest['shards']:
+            count = counts.get(os.path.join(self.shard_dir, shard['file']), 0)
+            if groups and (count == 0 or groups[-1]['tasks'] + count <= target):
+                groups[-1]['shards'].append(shard)
+                groups[-1]['tasks'] += count
+            else:
+                groups.append({'shards': [shard], 'tasks': count})
+        
+        used = {shard['file'] for shard in manifest['shards']}
+        used.update(os.path.basename(path) for path in glob.glob(os.path.join(self.shard_dir, 'shard-*.json')))
+        merges, new_shards = [], []
+        for group in groups:
+            if len(group['shards']) == 1:
+                new_shards.append(group['shards'][0])
+                continue
+            name = ShardedTaskStore._new_shard_name(used)
+            used.add(name)
+            merges.append((self.shard_dir, [shard['file'] for shard in group['shards']], name))
+            new_shards.append({'file': name, 'start_id': group['shards'][0]['start_id']})
+        
+        for (_, files, name), count in zip(merges, self._run(merge_shard_files, merges)):
+            report['actions'].append(f"{', '.join(files)} → {name} ({count} tareas)")
+        
+        if merges:
+            manifest['shards'] = new_shards
+            manifest['generation'] = manifest.get('generation', 0) + 1
+            _write_json_atomic(store.manifest_path, manifest, indent=2)
+        
+        # Los archivos que ya no están en el manifest (unidos ahora o de antes)
+        referenced = {shard['file'] for shard in manifest['shards']}
+        for path in sorted(glob.glob(os.path.join(self.shard_dir, 'shard-*.json'))):
+            if os.path.basename(path) not in referenced:
+                os.unlink(path)
+                report['actions'].append(f"borrado {path}")
+        if not merges:
+            report['actions'].append(f"{len(manifest['shards'])} shards: ninguno se puede unir (máximo {target} tareas)")
+    
+    def _compact_archive(self, report):
+        """Reescribe el archivo frío (un miembro gzip por lote archivado) en un solo miembro."""
+        section = self._verify_archive(IdSet())
+        if section['error_count']:
+            report['errors'].extend(section['errors'])
+            report['errors'].append(f"{self.archive_file} con errores: no se compacta (ver verify)")
+            return
+        before = os.path.getsize(self.archive_file)
+        directory = os.path.dirname(os.path.abspath(self.archive_file))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            with gzip.open(self.archive_file, 'rb') as source, gzip.open(tmp_path, 'wb') as target:
+                for line in source:
+                    if line.strip():
+                        target.write(line)
+            os.replace(tmp_path, self.archive_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        after = os.path.getsize(self.archive_file)
+        report['actions'].append(f"{self.archive_file}: {section['tasks']} tareas, {before} → {after} bytes")
+    
+    # reindex
+    
+    def reindex(self, manifest=False):
+        """
+        Reconstruye el manifest de los shards (si se pide) y la instantánea binaria.
+        
+        Args:
+            manifest: Si True, reconstruye manifest.json a partir de los archivos de shard
+        
+        Returns:
+            dict: Acciones realizadas y errores
+        """
+        report = {'actions': [], 'errors': []}
+        if manifest:
+            if not self.shard_dir:
+                report['errors'].append("--manifest necesita un directorio de shards (TASKS_SHARD_DIR o --shard-dir)")
+                return report
+            self._rebuild_manifest(report)
+            if report['errors']:
+                return report
+        if self.snapshot_file:
+            self._rebuild_snapshot(report)
+        elif not manifest:
+            report['errors'].append("No hay instantánea configurada (TASKS_SNAPSHOT_FILE o --snapshot)")
+        return report
+    
+    def _rebuild_manifest(self, report):
+        files = sorted(os.path.basename(path) for path in glob.glob(os.path.join(self.shard_dir, 'shard-*.json')))
+        section = self._section('shards', self.shard_dir)
+        partitions = [
+            {'kind': 'shard', 'path': os.path.join(self.shard_dir, name), 'location': name}
+            for name in files
+        ]
+        # Rango de ids de cada shard no vacío, ordenados por el menor
+        shards = sorted(
+            (result['lowest_id'], result['highest_id'], name)
+            for name, result in zip(files, self._scan(section, partitions))
+            if result['tasks']
+        )
+        if section['error_count']:
+            report['errors'].extend(section['errors'])
+            report['errors'].append("shards con errores: no se reconstruye el manifest")
+            return
+        for (_, previous_max, previous), (next_min, _, name) in zip(shards, shards[1:]):
+            if next_min <= previous_max:
+                report['errors'].append(f"{previous} y {name} tienen rangos de id solapados: no se puede reconstruir el manifest")
+                return
+        
+        store = ShardedTaskStore(self.shard_dir, self.max_shard_tasks)
+        generation = 0
+        if store.exists():
+            try:
+                with open(store.manifest_path, 'r', encoding='utf-8') as f:
+                    generation = int(json.load(f).get('generation', 0))
+            except (ValueError, TypeError, AttributeError):
+                pass
+        entries = [
+            {'file': name, 'start_id': 1 if index == 0 else min_id}
+            for index, (min_id, _, name) in enumerate(shards)
+        ]
+        if not entries:
+            entries = [{'file': 'shard-0001.json', 'start_id': 1}]
+        _write_json_atomic(store.manifest_path, {'generation': generation + 1, 'shards': entries}, indent=2)
+        report['actions'].append(f"{store.manifest_path}: {len(shards)} shards, {section['tasks']} tareas")
+    
+    def _rebuild_snapshot(self, report):
+        """
+        Regenera la instantánea binaria con la marca del almacén actual.
+        
+        Las particiones se codifican en paralelo y se escriben en orden con
+        SnapshotWriter. Si las tareas no están ordenadas por id (por ejemplo
+        tras restaurar tareas del archivo), se cargan todas para ordenarlas.
+        """
+        stamp = self._source_stamp()
+        section = self._section('activo')
+        partitions = self._active_partitions(section, encode=True)
+        if section['error_count']:
+            report['errors'].extend(section['errors'])
+            return
+        
+        writer = SnapshotWriter(self.snapshot_file, stamp)
+        try:
+            for result in self._scan(section, partitions):
+                if section['error_count'] or not result['ascending']:
+                    break
+                if result['encoded'] is not None:
+                    writer.append(*result['encoded'])
+        except BaseException:
+            writer.abort()
+            raise
+        
+        if section['error_count']:
+            writer.abort()
+            report['errors'].extend(section['errors'])
+            report['errors'].append("tareas con errores: no se regenera la instantánea")
+            return
+        
+        if section['ascending']:
+            writer.commit()
+            method = f"{len(partitions)} particiones"
+        else:
+            writer.abort()
+            store = self._store()
+            if store is not None:
+                tasks = store.load()
+            else:
+                tasks = [Task.from_dict(data) for data in iter_json_array(self.json_file)]
+            write_snapshot(self.snapshot_file, tasks, stamp)
+            method = "en memoria, las tareas no están ordenadas por id"
+        
+        if self._source_stamp() != stamp:
+            report['errors'].append("El almacén cambió mientras se regeneraba la instantánea: el servidor la ignorará")
+        report['actions'].append(f"{self.snapshot_file}: {section['tasks']} tareas ({method})")
@@ -0,0 +1,149 @@
+"""
+Clase TaskResponseCache: cache de respuestas JSON ya codificadas para TaskManager.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+
+class TaskResponseCache:
+    """
+    Cache en memoria de JSON codificado para las tareas.
+    
+    Guarda dos niveles:
+        - Fragmentos: los bytes JSON de cada tarea, por ID. Se invalidan
+          cuando la tarea cambia.
+        - Payloads: la respuesta completa de un listado, por versión del
+          almacén y clave de filtro, con expulsión LRU.
+    """
+    
+    def __init__(self, max_payloads=64):
+        """
+        Inicializa el cache
+        
+        Args:
+            max_payloads: Número máximo de listados completos a conservar
+        """
+        self.max_payloads = max_payloads
+        self._fragments = {}
+        self._payloads = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def encode(data):
+        """
+        Codifica un objeto a bytes JSON compactos en UTF-8.
+        
+        Args:
+            data: Objeto serializable a JSON
+        
+        Returns:
+            bytes: JSON codificado
+        """
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    def task_fragment(self, task):
+        """
+        Obtiene los bytes JSON de una tarea, codificándola solo si no está en cache.
+        
+        Cada entrada recuerda el objeto Task del que se codificó: un lector que
+        aún use una instantánea anterior no recibe ni deja en cache bytes de
+        otra versión de la tarea.
+        
+        Args:
+            task: Objeto Task
+        
+        Returns:
+            bytes: JSON de la tarea
+        """
+        entry = self._fragments.get(task.id)
+        if entry is not None and entry[0] is task:
+            return entry[1]
+        
+        fragment = self.encode(task.to_dict())
+        with self._lock:
+            current = self._fragments.get(task.id)
+            if current is None or current[0] is not task:
+                self._fragments[task.id] = (task, fragment)
+        return fragment
+    
+    def build_list_payload(self, tasks):
+        """
+        Construye la respuesta de un listado uniendo los fragmentos de cada tarea.
+        
+        Args:
+            tasks: Lista de objetos Task
+        
+        Returns:
+            bytes: JSON con el formato {"total": N, "tasks": [...]}
+        """
+        fragments = [self.task_fragment(task) for task in tasks]
+        return b'{"total":%d,"tasks":[%b]}' % (len(fragments), b','.join(fragments))
+    
+    def build_page_payload(self, tasks, total, offset, limit):
+        """
+        Construye la respuesta de una página de un listado.
+        
+        Args:
+            tasks: Lista de objetos Task de la página
+            total: Número de tareas del listado completo
+            offset: Posición de la primera tarea de la página
+            limit: Tamaño de página pedido
+        
+        Returns:
+            bytes: JSON con el formato {"total": N, "offset": O, "limit": L, "tasks": [...]}
+        """
+        fragments = [self.task_fragment(task) for task in tasks]
+        return b'{"total":%d,"offset":%d,"limit":%d,"tasks":[%b]}' % (
+            total, offset, limit, b','.join(fragments))
+    
+    def get_payload(self, version, filter_key):
+        """
+        Busca un listado completo ya codificado.
+        
+        Args:
+            version: Versión del almacén
+            filter_key: Clave que identifica los filtros aplicados
+        
+        Returns:
+            bytes o None: El listado codificado o None si no está en cache
+        """
+        key = (version, filter_key)
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is not None:
+                self._payloads.move_to_end(key)
+            return payload
+    
+    def put_payload(self, version, filter_key, payload):
+        """
+        Guarda un listado codificado, expulsando el menos usado si se supera el límite.
+        
+        Args:
+            version: Versión del almacén
+            filter_key: Clave que identifica los filtros aplicados
+            payload: Bytes del listado
+        """
+        with self._lock:
+            self._payloads[(version, filter_key)] = payload
+            self._payloads.move_to_end((version, filter_key))
+            while len(self._payloads) > self.max_payloads:
+                self._payloads.popitem(last=False)
+    
+    def invalidate(self, task_ids=None):
+        """
+        Invalida fragmentos tras una modificación del almacén.
+        
+        Los listados completos no se borran: quedan obsoletos al cambiar la
+        versión y el LRU los expulsa.
+        
+        Args:
+            task_ids: IDs de las tareas modificadas, o None para invalidar todas
+        """
+        with self._lock:
+            if task_ids is None:
+                self._fragments.clear()
+            else:
+                for task_id in task_ids:
+                    self._fragments.pop(task_id, None)
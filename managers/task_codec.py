@@ -0,0 +1,146 @@
+"""
+Codificación binaria de tareas compartida por la memoria compartida
+(SharedTaskTable) y las instantáneas en disco (TaskSnapshotFile).
+
+Cada tarea ocupa un registro de tamaño fijo (RECORD). Las cadenas se guardan
+aparte, en una sección de cadenas UTF-8, y el registro guarda su (offset,
+longitud) dentro de esa sección. Prioridad y status se guardan como códigos
+de un byte: su índice en Task.PRIORITIES y Task.STATUSES.
+"""
+
+import math
+import struct
+
+from models.task import Task
+
+
+# id, effort_hours, versión, prioridad, status, y (offset, longitud) de
+# title, description, assigned_to y fecha_creacion
+RECORD = struct.Struct('<qdIBB2x8I')
+
+# Solo el id, al principio de cada registro (búsquedas sin decodificar el resto)
+RECORD_ID = struct.Struct('<q')
+
+# Longitud que representa una cadena None
+NULL_LENGTH = 0xFFFFFFFF
+
+PRIORITY_CODES = {value: code for code, value in enumerate(Task.PRIORITIES)}
+STATUS_CODES = {value: code for code, value in enumerate(Task.STATUSES)}
+
+
+def encode_tasks(tasks):
+    """
+    Codifica las tareas en una tabla de registros y una sección de cadenas.
+    
+    Args:
+        tasks: Lista de objetos Task
+    
+    Returns:
+        tuple: (bytes de la tabla de registros, bytes de la sección de cadenas)
+    
+    Raises:
+        ValueError: Si alguna tarea tiene una prioridad o un status no admitido
+    """
+    records = bytearray(RECORD.size * len(tasks))
+    strings = bytearray()
+    
+    def put(value):
+        if value is None:
+            return 0, NULL_LENGTH
+        data = str(value).encode('utf-8')
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+    
+    for i, task in enumerate(tasks):
+        if task.priority not in PRIORITY_CODES:
+            raise ValueError(f"Prioridad inválida en la tarea {task.id}: {task.priority}")
+        if task.status not in STATUS_CODES:
+            raise ValueError(f"Status inválido en la tarea {task.id}: {task.status}")
+        RECORD.pack_into(
+            records, i * RECORD.size,
+            task.id,
+            task.effort_hours if task.effort_hours is not None else math.nan,
+            task.version,
+            PRIORITY_CODES[task.priority],
+            STATUS_CODES[task.status],
+            *put(task.title),
+            *put(task.description),
+            *put(task.assigned_to),
+            *put(task.fecha_creacion)
+        )
+    return bytes(records), bytes(strings)
+
+
+def decode_task(buf, records_offset, strings_offset, index):
+    """
+    Decodifica un único registro a un objeto Task.
+    
+    Args:
+        buf: Buffer con la tabla de registros y la sección de cadenas
+        records_offset: Posición de la tabla de registros en buf
+        strings_offset: Posición de la sección de cadenas en buf
+        index: Índice del registro
+    
+    Returns:
+        Task: La tarea decodificada
+    """
+    (task_id, effort_hours, version, priority, status,
+     t_off, t_len, d_off, d_len, a_off, a_len, f_off, f_len) = RECORD.unpack_from(
+        buf, records_offset + index * RECORD.size)
+    
+    def get(offset, length):
+        if length == NULL_LENGTH:
+            return None
+        start = strings_offset + offset
+        return str(buf[start:start + length], 'utf-8')
+    
+    task = Task(
+        id=task_id,
+        title=get(t_off, t_len),
+        description=get(d_off, d_len),
+        priority=Task.PRIORITIES[priority],
+        effort_hours=None if math.isnan(effort_hours) else effort_hours,
+        status=Task.STATUSES[status],
+        assigned_to=get(a_off, a_len),
+        version=version
+    )
+    task.fecha_creacion = get(f_off, f_len)
+    return task
+
+
+def record_id(buf, records_offset, index):
+    """
+    Lee solo el id de un registro.
+    
+    Returns:
+        int: ID de la tarea del registro
+    """
+    return RECORD_ID.unpack_from(buf, records_offset + index * RECORD.size)[0]
+
+
+def relocate_strings(records, base):
+    """
+    Desplaza los offsets de cadena de una tabla de registros.
+    
+    Sirve para unir tablas codificadas por separado (cada una con su propia
+    sección de cadenas empezando en 0) en una sola instantánea.
+    
+    Args:
+        records: Bytes de la tabla de registros
+        base: Posición de su sección de cadenas dentro de la sección común
+    
+    Returns:
+        bytes: La tabla con los offsets desplazados
+    """
+    if not base:
+        return records
+    records = bytearray(records)
+    for position in range(0, len(records), RECORD.size):
+        fields = list(RECORD.unpack_from(records, position))
+        # (offset, longitud) de las cuatro cadenas, a partir del sexto campo
+        for i in (5, 7, 9, 11):
+            if fields[i + 1] != NULL_LENGTH:
+                fields[i] += base
+        RECORD.pack_into(records, position, *fields)
+    return bytes(records)
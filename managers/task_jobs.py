@@ -0,0 +1,138 @@
+"""
+Trabajos en segundo plano sobre el almacén JSON de tareas.
+
+Cada función recibe un JobContext (ver JobManager) y devuelve el resumen del
+resultado. Se registran todas con register_task_jobs.
+"""
+
+import gzip
+
+from managers.task_manager import TaskManager
+from models.task import Task
+from models.task_schema import TASK_SCHEMA, first_error
+
+# Tareas por lote al importar (un guardado por lote)
+IMPORT_BATCH = 500
+
+# Tareas entre dos avisos de progreso al exportar
+EXPORT_PROGRESS_EVERY = 1000
+
+# Errores de importación que se devuelven en el resumen
+MAX_REPORTED_ERRORS = 100
+
+
+def export_tasks(job):
+    """
+    Exporta las tareas a un archivo NDJSON comprimido con gzip.
+    
+    Parámetros: filters (campo → valor, ver LIST_FILTERS) e include_archived.
+    La exportación refleja una única versión del almacén.
+    """
+    filters = job.params.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise ValueError('filters debe ser un objeto')
+    include_archived = bool(job.params.get('include_archived'))
+    
+    snapshot = TaskManager.snapshot()
+    tasks = TaskManager.filter_tasks(TaskManager._listing(snapshot, include_archived), filters)
+    total = len(tasks)
+    job.progress(0, total, 'Exportando tareas')
+    
+    with gzip.open(job.result_path('tasks.ndjson.gz'), 'wb', compresslevel=6) as f:
+        for done, task in enumerate(tasks, 1):
+            f.write(TaskManager.cache.task_fragment(task) + b'\n')
+            if done % EXPORT_PROGRESS_EVERY == 0:
+                job.progress(done, total)
+    
+    job.progress(total, total)
+    return {'exported': total, 'version': snapshot.version}
+
+
+def import_tasks(job):
+    """
+    Crea tareas a partir de una lista de diccionarios.
+    
+    Parámetros: tasks (lista de tareas como en POST /tasks). Las tareas
+    reciben IDs nuevos; las inválidas se omiten y se informa de su posición.
+    Las válidas se guardan por lotes de IMPORT_BATCH, de modo que cada
+    guardado bloquea a los escritores poco tiempo.
+    """
+    items = job.params.get('tasks')
+    if not isinstance(items, list):
+        raise ValueError('tasks debe ser una lista de tareas')
+    total = len(items)
+    
+    # Validación de todo el lote en una pasada; solo se construyen las tareas válidas
+    imported = 0
+    valid_values, invalid = TASK_SCHEMA.validate_many(items)
+    errors = [{'index': item['index'], 'error': first_error(item['errors']), 'fields': item['errors']}
+              for item in invalid]
+    valid = [Task.from_dict({**values, 'fecha_creacion': items[index].get('fecha_creacion')})
+             for index, values in valid_values]
+    job.progress(0, len(valid), 'Importando tareas')
+    
+    for start in range(0, len(valid), IMPORT_BATCH):
+        unit = TaskManager.unit_of_work()
+        for task in valid[start:start + IMPORT_BATCH]:
+            unit.create(task)
+        if not TaskManager.commit_unit(unit):
+            raise RuntimeError(f'Error al guardar las tareas (importadas hasta ahora: {imported})')
+        imported += len(unit.operations)
+        job.progress(imported, len(valid))
+    
+    return {
+        'received': total,
+        'imported': imported,
+        'failed': len(errors),
+        'errors': errors[:MAX_REPORTED_ERRORS],
+    }
+
+
+def archive_tasks(job):
+    """
+    Mueve al archivo frío las tareas completadas antiguas.
+    
+    Parámetros: older_than_days (por defecto TaskManager.ARCHIVE_AFTER_DAYS).
+    """
+    older_than_days = job.params.get('older_than_days')
+    if older_than_days is not None:
+        if not isinstance(older_than_days, (int, float)) or older_than_days < 0:
+            raise ValueError('older_than_days debe ser un número positivo')
+    job.progress(0, None, 'Archivando tareas completadas')
+    return {'archived': TaskManager.archive_completed(older_than_days)}
+
+
+def reindex_tasks(job):
+    """
+    Reescribe el almacén completo y reconstruye los índices de la instantánea.
+    
+    Regenera tasks.json (o todos los shards), la instantánea binaria y la
+    tabla de memoria compartida si están activadas, y deja construidos los
+    índices por fecha de creación y por persona.
+    """
+    job.progress(0, None, 'Reescribiendo el almacén')
+    with TaskManager._writing():
+        tasks = TaskManager.load_tasks()
+        if not TaskManager.save_tasks(tasks):
+            raise RuntimeError('Error al guardar las tareas')
+    
+    job.progress(0, None, 'Construyendo índices')
+    snapshot = TaskManager.snapshot()
+    snapshot.created_index()
+    assignees = {task.assigned_to for task in snapshot.tasks}
+    for assigned_to in assignees:
+        snapshot.by_assignee(assigned_to)
+    return {'tasks': len(snapshot), 'assignees': len(assignees), 'version': snapshot.version}
+
+
+def register_task_jobs(jobs):
+    """
+    Registra los trabajos sobre tareas en un JobManager.
+    
+    Args:
+        jobs: JobManager de la aplicación
+    """
+    jobs.register('export', export_tasks)
+    jobs.register('import', import_tasks)
+    jobs.register('archive', archive_tasks)
+    jobs.register('reindex', reindex_tasks)
@@ -1,11 +1,175 @@
 """
 Clase TaskManager: gestiona el uso de tareas con el archivo JSON.
+
+Las tareas se mantienen en memoria como instantáneas inmutables (TaskSnapshot).
+Los escritores construyen una versión nueva de la colección y la publican de
+forma atómica; los lectores toman la instantánea actual sin bloquearse, y
+pueden seguir usándola aunque entretanto se publique otra versión.
+
+Con la variable de entorno TASKS_SHM_NAME las tareas se comparten además entre
+procesos mediante una tabla en memoria compartida (ver SharedTaskTable).
+Con TASKS_SNAPSHOT_FILE se mantiene una instantánea binaria de tasks.json que
+permite arrancar sin parsear el JSON (ver TaskSnapshotFile). Con
+TASKS_GROUP_COMMIT=1 las escrituras concurrentes se agrupan en un único
+guardado por lote (ver GroupCommitWriter). Con TASKS_SHARD_DIR las tareas se
+guardan repartidas en varios archivos por rango de id en lugar de en un único
+tasks.json (ver ShardedTaskStore).
+
+Las tareas completadas antiguas pueden moverse a un archivo frío comprimido
+(ver TaskArchive); los listados solo las incluyen si se piden explícitamente.
+
+Las altas, modificaciones y bajas pasan por un lote de operaciones (TaskUnitOfWork)
+que se aplica con una sola carga y un solo guardado.
+
+Cada instantánea tiene un índice ordenado por fecha de creación (CreationIndex)
+para las consultas por rango y los listados de más reciente a más antigua; al
+publicar una versión nueva se deriva del anterior actualizando solo las tareas
+modificadas.
 """
 
 import json
 import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from typing import List
+from analytics.workload import TaskColumns, workload_report
 from models.task import Task
+from managers.archive_store import TaskArchive
+from managers.date_index import CreationIndex
+from managers.task_cache import TaskResponseCache
+from managers.group_commit import GroupCommitWriter
+from managers.scheduler import select_next, wip_counts
+from managers.shard_store import ShardedTaskStore
+from managers.shm_store import SharedTaskTable
+from managers.snapshot_store import TaskSnapshotFile, file_stamp, write_snapshot
+from managers.unit_of_work import OperationError, TaskUnitOfWork
+
+
+class CorruptStoreError(Exception):
+    """tasks.json no se puede leer; no se carga ni se guarda hasta que se restaure."""
+
+
+class TaskSnapshot:
+    """
+    Versión inmutable de la colección de tareas.
+    
+    Los objetos Task de una instantánea no deben modificarse: cualquier cambio
+    se hace sobre objetos nuevos y se publica como una instantánea nueva.
+    """
+    
+    __slots__ = ('version', 'tasks', '_by_id', '_by_assignee', '_by_created')
+    
+    def __init__(self, version, tasks):
+        """
+        Inicializa la instantánea
+        
+        Args:
+            version: Número de versión del almacén
+            tasks: Iterable de objetos Task o un TaskSnapshotFile
+        """
+        self.version = version
+        if isinstance(tasks, TaskSnapshotFile):
+            # Instantánea binaria: las tareas se decodifican al accederlas
+            self.tasks = tasks
+            self._by_id = None
+        else:
+            self.tasks = tuple(tasks)
+            self._by_id = {task.id: task for task in self.tasks}
+        self._by_assignee = None
+        self._by_created = None
+    
+    def get(self, task_id):
+        """
+        Obtiene una tarea por su ID en O(1).
+        
+        Args:
+            task_id: ID de la tarea
+        
+        Returns:
+            Task o None: La tarea encontrada o None si no existe
+        """
+        if self._by_id is None:
+            return self.tasks.get(task_id)
+        return self._by_id.get(task_id)
+    
+    def by_assignee(self, assigned_to):
+        """
+        Obtiene las tareas asignadas a una persona.
+        
+        El índice por persona se construye la primera vez que se usa y sirve
+        para toda la vida de la instantánea.
+        
+        Args:
+            assigned_to: Nombre de la persona (None para las tareas sin asignar)
+        
+        Returns:
+            List[Task]: Tareas asignadas, en el orden de la instantánea
+        """
+        index = self._by_assignee
+        if index is None:
+            index = {}
+            for task in self.tasks:
+                index.setdefault(task.assigned_to, []).append(task)
+            self._by_assignee = index
+        return index.get(assigned_to, [])
+    
+    def created_index(self):
+        """
+        Obtiene el índice por fecha de creación, construyéndolo si hace falta.
+        
+        Returns:
+            CreationIndex: Índice de las tareas de la instantánea
+        """
+        index = self._by_created
+        if index is None:
+            index = CreationIndex.build(self.tasks)
+            self._by_created = index
+        return index
+    
+    def derive_indexes(self, previous, changed_ids):
+        """
+        Hereda el índice por fecha de creación de la instantánea anterior.
+        
+        Solo se hace si la anterior ya lo tenía construido; si no, se
+        construirá la primera vez que se use.
+        
+        Args:
+            previous: TaskSnapshot de la versión anterior
+            changed_ids: IDs de las tareas que cambiaron entre ambas versiones
+        """
+        index = previous._by_created
+        if index is None:
+            return
+        # Cada tarea una sola vez: el índice la quita y reinserta según su estado final
+        changed_ids = list(dict.fromkeys(changed_ids))
+        self._by_created = index.updated(
+            [previous.get(task_id) for task_id in changed_ids],
+            [self.get(task_id) for task_id in changed_ids]
+        )
+    
+    def created_between(self, after=None, before=None, newest_first=False):
+        """
+        Obtiene las tareas creadas en un rango usando el índice por fecha.
+        
+        Args:
+            after: Timestamp mínimo incluido (None = sin límite)
+            before: Timestamp máximo excluido (None = sin límite)
+            newest_first: Si True, de más reciente a más antigua
+        
+        Returns:
+            List[Task]: Tareas ordenadas por fecha de creación
+        """
+        ids = self.created_index().ids_between(after, before, newest_first)
+        return [self.get(task_id) for task_id in ids]
+    
+    def __iter__(self):
+        return iter(self.tasks)
+    
+    def __len__(self):
+        return len(self.tasks)
 
 
 class TaskManager:
@@ -13,56 +177,383 @@ class TaskManager:
     
     JSON_FILE = 'tasks.json'
     
+    # Filtros admitidos en los listados (campo → valor exacto)
+    LIST_FILTERS = ('status', 'priority', 'assigned_to')
+    
+    # Cache de JSON codificado, invalidado en cada modificación
+    cache = TaskResponseCache()
+    
+    # Instantánea publicada y marca del archivo del que procede
+    _snapshot = None
+    _file_stamp = None
+    
+    # Serializa a los escritores; los lectores nunca lo toman en el caso común
+    _write_lock = threading.RLock()
+    
+    # Máximo de tareas en curso por persona al proponer trabajo (0 = sin límite)
+    WIP_LIMIT = int(os.environ.get('TASKS_WIP_LIMIT', 0))
+    
+    # Archivo frío de tareas completadas y antigüedad (días) a partir de la que se archivan
+    ARCHIVE_FILE = os.environ.get('TASKS_ARCHIVE_FILE', 'tasks_archive.ndjson.gz')
+    ARCHIVE_AFTER_DAYS = float(os.environ.get('TASKS_ARCHIVE_AFTER_DAYS', 30))
+    _archive = None
+    
+    # Directorio de shards (vacío = un único tasks.json) y tareas por shard antes de dividirlo
+    SHARD_DIR = os.environ.get('TASKS_SHARD_DIR', '')
+    SHARD_MAX_TASKS = int(os.environ.get('TASKS_SHARD_MAX_TASKS', 1000))
+    
+    # Instantánea binaria para arrancar sin parsear tasks.json (vacío = desactivada)
+    SNAPSHOT_FILE = os.environ.get('TASKS_SNAPSHOT_FILE', '')
+    
+    # Agrupación de escrituras: espera máxima por lote (ms) y tamaño máximo de lote
+    GROUP_COMMIT = os.environ.get('TASKS_GROUP_COMMIT', '') == '1'
+    GROUP_COMMIT_MAX_DELAY_MS = float(os.environ.get('TASKS_GROUP_COMMIT_DELAY_MS', 1))
+    GROUP_COMMIT_MAX_BATCH = int(os.environ.get('TASKS_GROUP_COMMIT_BATCH', 256))
+    _group_writer = None
+    
+    # Memoria compartida entre procesos (nombre vacío = solo archivo JSON)
+    SHARED_MEMORY_NAME = os.environ.get('TASKS_SHM_NAME', '')
+    SHARED_MEMORY_SIZE = int(os.environ.get('TASKS_SHM_SIZE', 64 * 1024 * 1024))
+    _shared = None
+    _shared_seq = None
+    
     @staticmethod
-    def load_tasks():
+    def _shared_table():
         """
-        Carga tareas desde tasks.json y las convierte en objetos Task.
+        Obtiene la tabla en memoria compartida, abriéndola la primera vez.
+        
+        Returns:
+            SharedTaskTable o None: None si la memoria compartida no está activada
+        """
+        if TaskManager._shared is None and TaskManager.SHARED_MEMORY_NAME:
+            def initial_tasks():
+                store = TaskManager._shard_store()
+                if store is not None and store.exists():
+                    return store.load()
+                return TaskManager._read_json_file()
+            
+            try:
+                TaskManager._shared = SharedTaskTable.attach_or_create(
+                    TaskManager.SHARED_MEMORY_NAME, TaskManager.SHARED_MEMORY_SIZE, initial_tasks,
+                    TaskManager._stat_file
+                )
+            except CorruptStoreError:
+                raise
+            except Exception as e:
+                print(f"Memoria compartida desactivada: {e}")
+                TaskManager.SHARED_MEMORY_NAME = ''
+        return TaskManager._shared
+    
+    @staticmethod
+    @contextmanager
+    def _writing():
+        """
+        Bloqueo de escritura: entre hilos y, con memoria compartida, entre procesos.
+        """
+        with TaskManager._write_lock:
+            table = TaskManager._shared_table()
+            if table is None:
+                yield
+            else:
+                with table.lock():
+                    yield
+    
+    @staticmethod
+    def _shard_store():
+        """Devuelve el almacén por shards, o None si no está activado."""
+        if not TaskManager.SHARD_DIR:
+            return None
+        return ShardedTaskStore(TaskManager.SHARD_DIR, TaskManager.SHARD_MAX_TASKS)
+    
+    @staticmethod
+    def _stat_file():
+        """
+        Devuelve una marca (mtime, tamaño, inodo) del archivo JSON o None.
+        
+        Con shards, la marca es la del manifest, que se reescribe en cada guardado.
+        """
+        store = TaskManager._shard_store()
+        if store is not None:
+            return file_stamp(store.manifest_path)
+        return file_stamp(TaskManager.JSON_FILE)
+    
+    @staticmethod
+    def _read_file():
+        """
+        Lee tasks.json (o los shards) y lo convierte en objetos Task.
         
         Returns:
             List[Task]: Lista de objetos Task
         """
+        store = TaskManager._shard_store()
+        if store is not None:
+            return TaskManager._read_shards(store)
+        
         if not os.path.exists(TaskManager.JSON_FILE):
             # Si el archivo no existe, crear uno vacío
             TaskManager.save_tasks([])
             return []
         
+        return TaskManager._read_json_file()
+    
+    @staticmethod
+    def _read_json_file():
+        """
+        Lee tasks.json sin crearlo.
+        
+        Returns:
+            List[Task]: Lista de objetos Task ([] si no existe)
+        
+        Raises:
+            CorruptStoreError: Si tasks.json no es JSON válido. Se guarda antes una
+                copia; mientras no se restaure el archivo, ninguna lectura ni
+                escritura lo reemplaza por una colección vacía
+        """
+        if not os.path.exists(TaskManager.JSON_FILE):
+            return []
+        
         try:
             with open(TaskManager.JSON_FILE, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                
+            
             tasks = []
             for task_data in data:
                 task = Task.from_dict(task_data)
                 tasks.append(task)
             
             return tasks
-        except json.JSONDecodeError:
-            # Si el archivo está corrupto, devolver lista vacía
-            return []
+        except json.JSONDecodeError as e:
+            # Archivo corrupto: guardar una copia y no seguir como si estuviera vacío,
+            # porque el siguiente guardado reemplazaría todas las tareas
+            backup = f"{TaskManager.JSON_FILE}.corrupt-{os.stat(TaskManager.JSON_FILE).st_mtime_ns}"
+            if not os.path.exists(backup):
+                shutil.copy2(TaskManager.JSON_FILE, backup)
+            message = (f"{TaskManager.JSON_FILE} está dañado (línea {e.lineno}, columna {e.colno}: "
+                       f"{e.msg}). Copia guardada en {backup}; revisarlo con: "
+                       f"python maintain_store.py verify")
+            print(f"Error al cargar tareas: {message}")
+            raise CorruptStoreError(message) from e
         except Exception as e:
             print(f"Error al cargar tareas: {e}")
             return []
     
     @staticmethod
-    def save_tasks(tasks: List[Task]):
+    def _read_shards(store):
         """
-        Guarda la lista de Task en el archivo JSON.
+        Lee las tareas de los shards. La primera vez, si no hay manifest, los
+        crea a partir de tasks.json.
         
         Args:
-            tasks: Lista de objetos Task a guardar
+            store: ShardedTaskStore
+        
+        Returns:
+            List[Task]: Lista de objetos Task ordenada por id
         """
-        try:
-            # Convertir todas las tareas a diccionarios
-            tasks_data = [task.to_dict() for task in tasks]
+        if store.exists():
+            try:
+                return store.load()
+            except Exception as e:
+                print(f"Error al cargar tareas: {e}")
+                return []
+        
+        tasks = TaskManager._read_json_file()
+        TaskManager.save_tasks(tasks)
+        return tasks
+    
+    @staticmethod
+    def _read_source(stamp):
+        """
+        Lee las tareas desde la instantánea binaria si corresponde a la versión
+        actual de tasks.json; si no, desde el propio JSON.
+        
+        Args:
+            stamp: Marca actual de tasks.json
+        
+        Returns:
+            TaskSnapshotFile o List[Task]: Las tareas del almacén
+        """
+        if TaskManager.SNAPSHOT_FILE and stamp is not None:
+            try:
+                snapshot_file = TaskSnapshotFile(TaskManager.SNAPSHOT_FILE)
+            except (OSError, ValueError):
+                snapshot_file = None
+            if snapshot_file is not None:
+                if snapshot_file.source_stamp == stamp:
+                    return snapshot_file
+                snapshot_file.close()
+        return TaskManager._read_file()
+    
+    @staticmethod
+    def _publish(tasks, stamp, changed_ids=None):
+        """
+        Publica una nueva instantánea. Debe llamarse con _write_lock tomado.
+        
+        Args:
+            tasks: Colección de objetos Task de la nueva versión
+            stamp: Marca del archivo que corresponde a esta versión
+            changed_ids: IDs modificados respecto a la instantánea actual, para
+                actualizar sus índices en lugar de reconstruirlos (None = desconocidos)
+        
+        Returns:
+            TaskSnapshot: La instantánea publicada
+        """
+        current = TaskManager._snapshot
+        version = current.version + 1 if current is not None else 1
+        snapshot = TaskSnapshot(version, tasks)
+        if current is not None and changed_ids is not None:
+            snapshot.derive_indexes(current, changed_ids)
+        # La asignación es atómica: los lectores ven la versión anterior o la nueva
+        TaskManager._snapshot = snapshot
+        TaskManager._file_stamp = stamp
+        return snapshot
+    
+    @staticmethod
+    def snapshot():
+        """
+        Obtiene la instantánea actual de las tareas sin tomar bloqueos.
+        
+        Si el archivo fue modificado fuera de este proceso, se recarga y se
+        invalida todo el cache.
+        
+        Returns:
+            TaskSnapshot: Instantánea inmutable de la colección de tareas
+        """
+        table = TaskManager._shared_table()
+        if table is not None:
+            return TaskManager._shared_snapshot(table)
+        
+        snapshot = TaskManager._snapshot
+        if snapshot is not None and TaskManager._stat_file() == TaskManager._file_stamp:
+            return snapshot
+        
+        with TaskManager._write_lock:
+            # Otro hilo pudo recargar mientras esperábamos
+            stamp = TaskManager._stat_file()
+            if TaskManager._snapshot is not None and stamp == TaskManager._file_stamp:
+                return TaskManager._snapshot
             
-            # Guardar en el archivo JSON
-            with open(TaskManager.JSON_FILE, 'w', encoding='utf-8') as f:
-                json.dump(tasks_data, f, indent=2, ensure_ascii=False)
+            tasks = TaskManager._read_source(stamp)
+            if TaskManager._snapshot is not None and TaskManager._stat_file() == TaskManager._file_stamp:
+                # _read_file creó el archivo y ya publicó la versión
+                return TaskManager._snapshot
             
-            return True
+            TaskManager.cache.invalidate()
+            return TaskManager._publish(tasks, stamp)
+    
+    @staticmethod
+    def _shared_snapshot(table):
+        """
+        Obtiene la instantánea a partir de la memoria compartida.
+        
+        Solo se decodifica la tabla cuando otro proceso (o este) escribió
+        desde la última lectura.
+        
+        Args:
+            table: SharedTaskTable abierta
+        
+        Returns:
+            TaskSnapshot: Instantánea inmutable de la colección de tareas
+        """
+        snapshot = TaskManager._snapshot
+        if snapshot is not None and table.sequence() == TaskManager._shared_seq:
+            return snapshot
+        
+        seq, tasks = table.read_tasks()
+        with TaskManager._write_lock:
+            if TaskManager._shared_seq is not None and seq <= TaskManager._shared_seq:
+                # Otro hilo ya publicó esta versión o una posterior
+                return TaskManager._snapshot
+            TaskManager.cache.invalidate()
+            TaskManager._shared_seq = seq
+            return TaskManager._publish(tasks, None)
+    
+    @staticmethod
+    def get_version():
+        """
+        Obtiene la versión actual del almacén.
+        
+        Returns:
+            int: Versión del almacén
+        """
+        return TaskManager.snapshot().version
+    
+    @staticmethod
+    def load_tasks():
+        """
+        Carga tareas desde tasks.json y las convierte en objetos Task.
+        
+        La lista devuelta es nueva, pero los objetos Task pertenecen a la
+        instantánea actual y no deben modificarse.
+        
+        Returns:
+            List[Task]: Lista de objetos Task
+        """
+        return list(TaskManager.snapshot().tasks)
+    
+    @staticmethod
+    def save_tasks(tasks: List[Task], changed_ids=None):
+        """
+        Guarda la lista de Task en el archivo JSON (o en los shards afectados).
+        
+        El archivo se escribe en un temporal y se reemplaza de forma atómica;
+        después se actualiza la memoria compartida (si está activada) y se
+        publica la nueva instantánea.
+        
+        Args:
+            tasks: Lista de objetos Task a guardar
+            changed_ids: IDs de las tareas modificadas, para invalidar solo
+                sus fragmentos en cache (None invalida todas)
+        """
+        with TaskManager._writing():
+            try:
+                store = TaskManager._shard_store()
+                if store is not None:
+                    # Solo se reescriben los shards de las tareas modificadas
+                    store.save(tasks, changed_ids)
+                else:
+                    # Convertir todas las tareas a diccionarios
+                    tasks_data = [task.to_dict() for task in tasks]
+                    
+                    # Guardar en un temporal junto al archivo JSON y reemplazarlo
+                    directory = os.path.dirname(os.path.abspath(TaskManager.JSON_FILE))
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                    try:
+                        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                            json.dump(tasks_data, f, indent=2, ensure_ascii=False)
+                        os.replace(tmp_path, TaskManager.JSON_FILE)
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+                
+                if TaskManager.SNAPSHOT_FILE:
+                    TaskManager._write_snapshot_file(tasks)
+                
+                # Visible de inmediato para todos los procesos
+                stamp = TaskManager._stat_file()
+                table = TaskManager._shared_table()
+                shared_seq = table.write_tasks(tasks, stamp) if table is not None else None
+                
+                TaskManager.cache.invalidate(changed_ids)
+                TaskManager._publish(tasks, stamp, changed_ids)
+                if table is not None:
+                    TaskManager._shared_seq = shared_seq
+                return True
+            except Exception as e:
+                print(f"Error al guardar tareas: {e}")
+                return False
+    
+    @staticmethod
+    def _write_snapshot_file(tasks):
+        """
+        Actualiza la instantánea binaria tras guardar tasks.json.
+        
+        Un fallo aquí no invalida el guardado: la instantánea queda obsoleta y
+        se ignora en el próximo arranque.
+        """
+        try:
+            write_snapshot(TaskManager.SNAPSHOT_FILE, tasks, TaskManager._stat_file())
         except Exception as e:
-            print(f"Error al guardar tareas: {e}")
-            return False
+            print(f"Error al guardar la instantánea binaria: {e}")
     
     @staticmethod
     def get_next_id():
@@ -72,7 +563,7 @@ class TaskManager:
         Returns:
             int: Siguiente ID disponible
         """
-        tasks = TaskManager.load_tasks()
+        tasks = TaskManager.snapshot().tasks
         if not tasks:
             return 1
         
@@ -86,15 +577,104 @@ class TaskManager:
         
         Args:
             task_id: ID de la tarea
-            
+        
         Returns:
             Task o None: La tarea encontrada o None si no existe
         """
-        tasks = TaskManager.load_tasks()
-        for task in tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return TaskManager.snapshot().get(task_id)
+    
+    @staticmethod
+    def group_writer():
+        """
+        Obtiene el escritor de lotes, creándolo la primera vez.
+        
+        Returns:
+            GroupCommitWriter: Escritor compartido por todas las peticiones
+        """
+        if TaskManager._group_writer is None:
+            with TaskManager._write_lock:
+                if TaskManager._group_writer is None:
+                    TaskManager._group_writer = GroupCommitWriter(
+                        TaskManager.load_tasks,
+                        TaskManager.save_tasks,
+                        TaskManager._writing,
+                        max_delay=TaskManager.GROUP_COMMIT_MAX_DELAY_MS / 1000,
+                        max_batch=TaskManager.GROUP_COMMIT_MAX_BATCH
+                    )
+        return TaskManager._group_writer
+    
+    @staticmethod
+    def _commit(apply):
+        """
+        Aplica una modificación a la lista de tareas y la guarda.
+        
+        Con agrupación de escrituras la modificación se encola al escritor de
+        lotes; si no, se carga, modifica y guarda en este mismo hilo.
+        
+        Args:
+            apply: Función apply(tasks) que modifica la lista en su sitio y
+                devuelve la lista de IDs modificados (vacía si no aplica)
+        
+        Returns:
+            bool: True si la modificación se aplicó y se guardó
+        """
+        if TaskManager.GROUP_COMMIT:
+            return TaskManager.group_writer().submit(apply)
+        
+        with TaskManager._writing():
+            tasks = TaskManager.load_tasks()
+            changed_ids = apply(tasks)
+            if not changed_ids:
+                return False
+            return TaskManager.save_tasks(tasks, changed_ids=changed_ids)
+    
+    @staticmethod
+    def unit_of_work(operations=None):
+        """
+        Crea un lote de operaciones que no reutiliza los IDs de tareas archivadas,
+        ni al asignarlos ni cuando el cliente los indica.
+        
+        Args:
+            operations: Lista de operaciones recibida en la API (ver
+                TaskUnitOfWork.from_operations), o None para un lote vacío
+        
+        Returns:
+            TaskUnitOfWork: El lote, listo para completar y pasar a commit_unit
+        
+        Raises:
+            OperationError: Si alguna operación está mal formada
+        """
+        archive = TaskManager.archive()
+        if operations is None:
+            return TaskUnitOfWork(archive.max_id, archive.contains)
+        return TaskUnitOfWork.from_operations(operations, archive.max_id, archive.contains)
+    
+    @staticmethod
+    def commit_unit(unit: TaskUnitOfWork):
+        """
+        Aplica todas las operaciones de un lote con una sola carga y un solo guardado.
+        
+        Si una operación falla no se aplica ninguna. Los resultados de cada
+        operación quedan en unit.results.
+        
+        Args:
+            unit: TaskUnitOfWork con las operaciones
+        
+        Returns:
+            bool: True si el lote se aplicó y se guardó
+        
+        Raises:
+            OperationError: Si alguna operación falla
+        """
+        return TaskManager._commit(unit.apply)
+    
+    @staticmethod
+    def _commit_single(unit):
+        """Aplica un lote de una operación; False si falla o no se guarda."""
+        try:
+            return TaskManager.commit_unit(unit)
+        except OperationError:
+            return False
     
     @staticmethod
     def add_task(task: Task):
@@ -102,19 +682,12 @@ class TaskManager:
         Agrega una nueva tarea.
         
         Args:
-            task: Objeto Task a agregar
-            
+            task: Objeto Task a agregar (se le asigna ID si no tiene)
+        
         Returns:
             bool: True si se agregó correctamente, False en caso contrario
         """
-        tasks = TaskManager.load_tasks()
-        
-        # Asignar ID si no tiene
-        if task.id is None:
-            task.id = TaskManager.get_next_id()
-        
-        tasks.append(task)
-        return TaskManager.save_tasks(tasks)
+        return TaskManager._commit_single(TaskManager.unit_of_work().create(task))
     
     @staticmethod
     def update_task(task_id: int, updated_task: Task):
@@ -124,21 +697,11 @@ class TaskManager:
         Args:
             task_id: ID de la tarea a actualizar
             updated_task: Objeto Task con los datos actualizados
-            
+        
         Returns:
             bool: True si se actualizó correctamente, False si no se encontró
         """
-        tasks = TaskManager.load_tasks()
-        
-        for i, task in enumerate(tasks):
-            if task.id == task_id:
-                updated_task.id = task_id  # Mantener el ID original
-                if not hasattr(updated_task, 'fecha_creacion') or not updated_task.fecha_creacion:
-                    updated_task.fecha_creacion = task.fecha_creacion  # Mantener fecha de creación
-                tasks[i] = updated_task
-                return TaskManager.save_tasks(tasks)
-        
-        return False
+        return TaskManager._commit_single(TaskManager.unit_of_work().update(task_id, updated_task))
     
     @staticmethod
     def delete_task(task_id: int):
@@ -147,16 +710,257 @@ class TaskManager:
         
         Args:
             task_id: ID de la tarea a eliminar
-            
+        
         Returns:
             bool: True si se eliminó correctamente, False si no se encontró
         """
-        tasks = TaskManager.load_tasks()
+        return TaskManager._commit_single(TaskManager.unit_of_work().delete(task_id))
+    
+    @staticmethod
+    def filter_tasks(tasks: List[Task], filters=None):
+        """
+        Filtra tareas por igualdad exacta en los campos de LIST_FILTERS.
         
-        tasks = [task for task in tasks if task.id != task_id]
+        Args:
+            tasks: Lista de objetos Task
+            filters: Diccionario campo → valor (se ignoran campos no admitidos)
         
-        if len(tasks) < len(TaskManager.load_tasks()):
-            return TaskManager.save_tasks(tasks)
+        Returns:
+            List[Task]: Tareas que cumplen todos los filtros
+        """
+        criteria = [(field, value) for field, value in (filters or {}).items()
+                    if field in TaskManager.LIST_FILTERS]
+        if not criteria:
+            return tasks
+        return [task for task in tasks
+                if all(getattr(task, field) == value for field, value in criteria)]
+    
+    @staticmethod
+    def get_tasks_payload(filters=None, include_archived=False, created_range=None, newest_first=False):
+        """
+        Obtiene el listado de tareas ya codificado en JSON.
         
-        return False
-
+        El resultado se guarda en cache por versión del almacén y por filtros,
+        de modo que las lecturas repetidas no vuelven a leer ni codificar nada.
+        
+        Args:
+            filters: Diccionario campo → valor (ver LIST_FILTERS)
+            include_archived: Si True, incluye también las tareas archivadas
+            created_range: Tupla (after, before) de timestamps de creación
+                (ver CreationIndex.ids_between), o None para no limitar
+            newest_first: Si True, ordena de más reciente a más antigua
+        
+        Returns:
+            bytes: JSON con el formato {"total": N, "tasks": [...]}
+        """
+        snapshot = TaskManager.snapshot()
+        filter_key = (tuple(sorted((filters or {}).items())), include_archived, created_range, newest_first)
+        
+        payload = TaskManager.cache.get_payload(snapshot.version, filter_key)
+        if payload is None:
+            tasks = TaskManager._listing(snapshot, include_archived, created_range, newest_first)
+            tasks = TaskManager.filter_tasks(tasks, filters)
+            payload = TaskManager.cache.build_list_payload(tasks)
+            TaskManager.cache.put_payload(snapshot.version, filter_key, payload)
+        return payload
+    
+    @staticmethod
+    def get_tasks_page(offset, limit, filters=None, include_archived=False, created_range=None, newest_first=False):
+        """
+        Obtiene una página del listado de tareas ya codificada en JSON.
+        
+        Sin filtros solo se leen (y codifican, si no están en cache) las
+        tareas de la página, de modo que el coste no depende del tamaño del
+        almacén. Las páginas también se guardan en cache por versión.
+        
+        Args:
+            offset: Posición de la primera tarea de la página
+            limit: Número máximo de tareas de la página
+            filters, include_archived, created_range, newest_first: Igual que
+                en get_tasks_payload
+        
+        Returns:
+            bytes: JSON con el formato {"total": N, "offset": O, "limit": L, "tasks": [...]}
+        """
+        snapshot = TaskManager.snapshot()
+        filter_key = (tuple(sorted((filters or {}).items())), include_archived, created_range, newest_first,
+                      'page', offset, limit)
+        
+        payload = TaskManager.cache.get_payload(snapshot.version, filter_key)
+        if payload is None:
+            tasks = TaskManager._listing(snapshot, include_archived, created_range, newest_first)
+            tasks = TaskManager.filter_tasks(tasks, filters)
+            page = [tasks[index] for index in range(min(offset, len(tasks)), min(offset + limit, len(tasks)))]
+            payload = TaskManager.cache.build_page_payload(page, len(tasks), offset, limit)
+            TaskManager.cache.put_payload(snapshot.version, filter_key, payload)
+        return payload
+    
+    @staticmethod
+    def iter_tasks_ndjson(filters=None, include_archived=False, created_range=None, newest_first=False):
+        """
+        Genera el listado de tareas en formato NDJSON (una tarea por línea).
+        
+        La instantánea se toma al llamar a esta función, de modo que el flujo
+        completo refleja una única versión aunque haya escrituras en curso.
+        
+        Args:
+            filters: Diccionario campo → valor (ver LIST_FILTERS)
+            include_archived: Si True, incluye también las tareas archivadas
+            created_range: Tupla (after, before) de timestamps de creación, o None
+            newest_first: Si True, ordena de más reciente a más antigua
+        
+        Returns:
+            Iterator[bytes]: Líneas JSON terminadas en salto de línea
+        """
+        snapshot = TaskManager.snapshot()
+        tasks = TaskManager._listing(snapshot, include_archived, created_range, newest_first)
+        tasks = TaskManager.filter_tasks(tasks, filters)
+        
+        def generate():
+            for task in tasks:
+                yield TaskManager.cache.task_fragment(task) + b'\n'
+        
+        return generate()
+    
+    @staticmethod
+    def _listing(snapshot, include_archived, created_range=None, newest_first=False):
+        """
+        Tareas de un listado: solo las activas, o activas y archivadas por orden de id.
+        
+        Con rango de fechas o de más reciente a más antigua, las tareas activas
+        salen del índice por fecha de la instantánea, sin recorrerlas ni ordenarlas.
+        """
+        by_date = created_range is not None or newest_first
+        after, before = created_range or (None, None)
+        if not include_archived:
+            if by_date:
+                return snapshot.created_between(after, before, newest_first)
+            return snapshot.tasks
+        
+        hot_ids = {task.id for task in snapshot.tasks}
+        archived = [task for task in TaskManager.archive().iter_tasks() if task.id not in hot_ids]
+        tasks = list(snapshot.tasks) + archived
+        if by_date:
+            # El archivo no tiene índice: se indexa junto con las activas para esta consulta
+            return TaskSnapshot(snapshot.version, tasks).created_between(after, before, newest_first)
+        return sorted(tasks, key=lambda task: task.id)
+    
+    @staticmethod
+    def next_tasks(assigned_to=None, k=10, wip_limit=None):
+        """
+        Obtiene las K próximas tareas pendientes por prioridad, esfuerzo y antigüedad.
+        
+        Args:
+            assigned_to: Persona para la que se buscan tareas (None = todas)
+            k: Número máximo de tareas
+            wip_limit: Máximo de tareas en curso por persona (None usa
+                WIP_LIMIT; 0 = sin límite)
+        
+        Returns:
+            tuple: (List[Task] elegidas, Counter de tareas en curso por persona)
+        """
+        if wip_limit is None:
+            wip_limit = TaskManager.WIP_LIMIT
+        snapshot = TaskManager.snapshot()
+        tasks = snapshot.tasks if assigned_to is None else snapshot.by_assignee(assigned_to)
+        wip = wip_counts(tasks)
+        return select_next(tasks, k, wip_limit, wip), wip
+    
+    @staticmethod
+    def get_analytics_payload():
+        """
+        Obtiene el informe de carga de trabajo ya codificado en JSON.
+        
+        Las columnas se cargan en arrays NumPy una vez por versión del almacén
+        y el informe queda en cache hasta la siguiente modificación.
+        
+        Returns:
+            bytes: JSON del informe (ver workload_report)
+        
+        Raises:
+            RuntimeError: Si NumPy no está instalado
+        """
+        snapshot = TaskManager.snapshot()
+        payload = TaskManager.cache.get_payload(snapshot.version, 'analytics')
+        if payload is None:
+            report = workload_report(TaskColumns.from_tasks(snapshot.tasks))
+            payload = TaskResponseCache.encode(report)
+            TaskManager.cache.put_payload(snapshot.version, 'analytics', payload)
+        return payload
+    
+    @staticmethod
+    def archive():
+        """
+        Obtiene el archivo frío de tareas.
+        
+        Returns:
+            TaskArchive: Archivo de tareas completadas
+        """
+        if TaskManager._archive is None or TaskManager._archive.path != TaskManager.ARCHIVE_FILE:
+            TaskManager._archive = TaskArchive(TaskManager.ARCHIVE_FILE)
+        return TaskManager._archive
+    
+    @staticmethod
+    def archive_completed(older_than_days=None):
+        """
+        Mueve al archivo frío las tareas completadas creadas hace más de N días.
+        
+        Las tareas se añaden al archivo antes de quitarlas del almacén activo,
+        de modo que un fallo a medias nunca las pierde.
+        
+        Args:
+            older_than_days: Antigüedad mínima en días (por defecto ARCHIVE_AFTER_DAYS)
+        
+        Returns:
+            int: Número de tareas archivadas
+        """
+        if older_than_days is None:
+            older_than_days = TaskManager.ARCHIVE_AFTER_DAYS
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        
+        def is_old(task):
+            try:
+                return datetime.fromisoformat(task.fecha_creacion) < cutoff
+            except (TypeError, ValueError):
+                return False
+        
+        with TaskManager._writing():
+            tasks = TaskManager.load_tasks()
+            old = [task for task in tasks if task.status == 'completada' and is_old(task)]
+            if not old:
+                return 0
+            
+            TaskManager.archive().append(old)
+            old_ids = {task.id for task in old}
+            remaining = [task for task in tasks if task.id not in old_ids]
+            if not TaskManager.save_tasks(remaining, changed_ids=list(old_ids)):
+                return 0
+            return len(old)
+    
+    @staticmethod
+    def restore_task(task_id: int):
+        """
+        Devuelve una tarea archivada al almacén activo.
+        
+        Args:
+            task_id: ID de la tarea archivada
+        
+        Returns:
+            Task o None: La tarea restaurada, o None si no está archivada o si
+            ya existe una tarea activa con ese ID
+        """
+        with TaskManager._writing():
+            if TaskManager.snapshot().get(task_id) is not None:
+                return None
+            
+            task = TaskManager.archive().get(task_id)
+            if task is None:
+                return None
+            
+            # Primero al almacén activo, después fuera del archivo
+            tasks = TaskManager.load_tasks()
+            tasks.append(task)
+            if not TaskManager.save_tasks(tasks, changed_ids=[task_id]):
+                return None
+            TaskManager.archive().remove([task_id])
+            return task
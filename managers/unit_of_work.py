@@ -0,0 +1,235 @@
+"""
+Clase TaskUnitOfWork: lote ordenado de operaciones sobre las tareas.
+
+Las operaciones (crear, reemplazar, modificar parcialmente y eliminar) se
+aplican sobre una copia de la colección cargada una sola vez. Si todas tienen
+éxito la copia sustituye a la colección y se guarda una única vez; si alguna
+falla no se aplica ninguna.
+
+Cada tarea lleva una versión que aumenta con cada modificación. Las
+operaciones sobre tareas existentes pueden indicar la versión esperada
+(concurrencia optimista): si la tarea cambió entretanto, el lote falla con 412.
+"""
+
+from models.task import Task
+from models.task_schema import TASK_SCHEMA, first_error
+
+
+class OperationError(Exception):
+    """Error de una operación del lote; anula el lote completo."""
+    
+    def __init__(self, index, status, message):
+        """
+        Args:
+            index: Posición de la operación en el lote
+            status: Código HTTP que corresponde al error
+            message: Descripción del error
+        """
+        super().__init__(message)
+        self.index = index
+        self.status = status
+        self.message = message
+
+
+class TaskUnitOfWork:
+    """Operaciones sobre tareas que se aplican y guardan todas juntas"""
+    
+    OPERATIONS = ('create', 'update', 'patch', 'delete')
+    
+    # Número máximo de operaciones admitidas en un lote de la API
+    MAX_OPERATIONS = 1000
+    
+    def __init__(self, reserved_max_id=None, is_reserved=None):
+        """
+        Inicializa un lote vacío
+        
+        Args:
+            reserved_max_id: Función sin argumentos que devuelve el mayor ID que
+                no debe reutilizarse aunque no esté en la colección (por ejemplo,
+                el de las tareas archivadas)
+            is_reserved: Función que indica si un ID está ocupado fuera de la
+                colección; se consulta para los IDs que indica el cliente al crear
+        """
+        self.reserved_max_id = reserved_max_id
+        self.is_reserved = is_reserved
+        self.operations = []
+        self.results = []
+    
+    def create(self, task: Task):
+        """Añade la creación de una tarea; se le asigna ID si no tiene (el que tenga debe ser un entero positivo)."""
+        self.operations.append(('create', task.id, task, None))
+        return self
+    
+    def update(self, task_id: int, task: Task, expected_version=None):
+        """Añade el reemplazo completo de una tarea existente (conserva ID y fecha de creación)."""
+        self.operations.append(('update', task_id, task, expected_version))
+        return self
+    
+    def patch(self, task_id: int, fields: dict, expected_version=None):
+        """Añade la modificación de algunos campos de una tarea existente."""
+        self.operations.append(('patch', task_id, fields, expected_version))
+        return self
+    
+    def delete(self, task_id: int, expected_version=None):
+        """Añade la eliminación de una tarea."""
+        self.operations.append(('delete', task_id, None, expected_version))
+        return self
+    
+    @classmethod
+    def from_operations(cls, operations, reserved_max_id=None, is_reserved=None):
+        """
+        Crea un lote a partir de la lista de operaciones recibida en la API.
+        
+        Formato de cada operación:
+            {"op": "create", "task": {...}}
+            {"op": "update", "id": 3, "task": {...}}
+            {"op": "patch", "id": 3, "task": {"status": "completada"}, "version": 2}
+            {"op": "delete", "id": 3}
+        
+        "version" es opcional en update, patch y delete: la versión que se
+        espera que tenga la tarea.
+        
+        Args:
+            operations: Lista de diccionarios con las operaciones
+            reserved_max_id, is_reserved: Ver __init__
+        
+        Returns:
+            TaskUnitOfWork: El lote con las operaciones en el mismo orden
+        
+        Raises:
+            OperationError: Si alguna operación está mal formada o sus datos
+                no superan TASK_SCHEMA (status 400)
+        """
+        if not isinstance(operations, list) or not operations:
+            raise OperationError(None, 400, "Se requiere una lista 'operations' no vacía")
+        if len(operations) > cls.MAX_OPERATIONS:
+            raise OperationError(None, 400, f"Un lote admite como máximo {cls.MAX_OPERATIONS} operaciones")
+        
+        unit = cls(reserved_max_id, is_reserved)
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get('op') not in cls.OPERATIONS:
+                raise OperationError(index, 400, f"Operación inválida. Debe ser una de: {', '.join(cls.OPERATIONS)}")
+            
+            op = operation['op']
+            data = operation.get('task')
+            if op != 'delete' and not isinstance(data, dict):
+                raise OperationError(index, 400, f"La operación '{op}' requiere el objeto 'task'")
+            
+            task_id = operation.get('id')
+            if op != 'create' and (not isinstance(task_id, int) or isinstance(task_id, bool)):
+                raise OperationError(index, 400, f"La operación '{op}' requiere un 'id' entero")
+            
+            expected_version = operation.get('version')
+            if expected_version is not None and (not isinstance(expected_version, int) or isinstance(expected_version, bool)):
+                raise OperationError(index, 400, "'version' debe ser un entero")
+            
+            if op == 'create':
+                unit.create(Task.from_dict({**data, **cls._checked(index, data)}))
+            elif op == 'update':
+                unit.update(task_id, Task.from_dict({**data, **cls._checked(index, data)}), expected_version)
+            elif op == 'patch':
+                unit.patch(task_id, cls._checked(index, data, partial=True), expected_version)
+            else:
+                unit.delete(task_id, expected_version)
+        return unit
+    
+    def apply(self, tasks):
+        """
+        Aplica todas las operaciones a la lista de tareas.
+        
+        Se trabaja sobre una copia: la lista solo se modifica (en su sitio)
+        si todas las operaciones tienen éxito. Los objetos Task existentes no
+        se modifican nunca; los cambios crean objetos nuevos.
+        
+        Args:
+            tasks: Lista de objetos Task cargada del almacén
+        
+        Returns:
+            List[int]: IDs de las tareas creadas, modificadas o eliminadas, sin repetir
+        
+        Raises:
+            OperationError: Si alguna operación falla (validación, tarea no
+                encontrada, conflicto de ID o versión distinta de la esperada)
+        """
+        working = {task.id: task for task in tasks}
+        next_id = None
+        results, changed_ids = [], []
+        
+        for index, (op, task_id, payload, expected_version) in enumerate(self.operations):
+            if op == 'create':
+                task = payload
+                if task.id is not None and (not isinstance(task.id, int) or isinstance(task.id, bool) or task.id < 1):
+                    raise OperationError(index, 400, "'id' debe ser un entero positivo")
+                self._validate(index, task)
+                if next_id is None:
+                    # Sin reutilizar IDs de la colección ni reservados
+                    reserved = self.reserved_max_id() if self.reserved_max_id else 0
+                    next_id = max(max((i for i in working if i is not None), default=0), reserved) + 1
+                if task.id is None:
+                    task.id = next_id
+                elif task.id in working:
+                    raise OperationError(index, 409, f"Ya existe una tarea con id {task.id}")
+                elif self.is_reserved is not None and self.is_reserved(task.id):
+                    raise OperationError(index, 409, f"Ya existe una tarea archivada con id {task.id}")
+                next_id = max(next_id, task.id + 1)
+                task.version = 1
+                working[task.id] = task
+                results.append({'op': op, 'status': 201, 'task': task.to_dict()})
+            
+            elif task_id not in working:
+                raise OperationError(index, 404, 'Tarea no encontrada')
+            
+            elif expected_version is not None and working[task_id].version != expected_version:
+                raise OperationError(
+                    index, 412,
+                    f"La tarea fue modificada por otra petición (versión actual {working[task_id].version})"
+                )
+            
+            elif op == 'delete':
+                del working[task_id]
+                results.append({'op': op, 'status': 200, 'id': task_id})
+            
+            else:
+                current = working[task_id]
+                if op == 'patch':
+                    data = current.to_dict()
+                    data.update(self._checked(index, payload, partial=True))
+                    task = Task.from_dict(data)
+                else:
+                    task = payload
+                # Mantener el ID y la fecha de creación originales
+                task.id = task_id
+                task.fecha_creacion = current.fecha_creacion
+                task.version = current.version + 1
+                self._validate(index, task)
+                working[task_id] = task
+                results.append({'op': op, 'status': 200, 'task': task.to_dict()})
+            
+            changed_ids.append(task_id if op != 'create' else task.id)
+        
+        tasks[:] = working.values()
+        self.results = results
+        # Una tarea creada y modificada en el mismo lote aparece una sola vez
+        return list(dict.fromkeys(changed_ids))
+    
+    @staticmethod
+    def _checked(index, data, partial=False):
+        """
+        Valida los datos recibidos con TASK_SCHEMA antes de construir un Task.
+        
+        Returns:
+            dict: Valores convertidos de los campos de la tarea
+        
+        Raises:
+            OperationError: Con el primer error de validación (status 400)
+        """
+        values, errors = TASK_SCHEMA.validate(data, partial)
+        if errors:
+            raise OperationError(index, 400, first_error(errors))
+        return values
+    
+    @staticmethod
+    def _validate(index, task):
+        is_valid, error_message = task.validate()
+        if not is_valid:
+            raise OperationError(index, 400, error_message)
@@ -0,0 +1,10 @@
+"""
+Módulo de middleware para la aplicación de gestión de tareas.
+"""
+
+from .admission import AdmissionController, AdmissionPolicy
+from .assets import StaticAssets
+from .compression import ResponseCompression
+from .memory import MemoryProfiler
+
+__all__ = ['AdmissionController', 'AdmissionPolicy', 'MemoryProfiler', 'ResponseCompression', 'StaticAssets']
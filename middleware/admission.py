@@ -0,0 +1,319 @@
+"""
+Control de admisión para las APIs de tareas.
+
+Cada petición a las rutas protegidas se clasifica en una política (lectura,
+escritura o escritura masiva) y antes de ejecutarse pasa dos controles:
+
+    - Límite de ritmo: un token bucket por cliente (usuario o dirección IP) y
+      política. Si no quedan tokens se responde 429 con Retry-After.
+    - Límite de concurrencia: como mucho CAPACITY peticiones en curso en total
+      y max_concurrent por política. Las que no caben esperan en una cola
+      acotada, ordenada por prioridad (las lecturas antes que las escrituras
+      masivas); si la cola está llena o se agota el tiempo máximo de espera,
+      se responde 503 con Retry-After.
+
+Así, ante una ráfaga, las peticiones sobrantes se rechazan enseguida en lugar
+de acumularse detrás de las reescrituras del archivo o de los bloqueos de
+SQLite, y el resto mantiene su latencia.
+"""
+
+import math
+import os
+import threading
+import time
+from bisect import insort
+from collections import OrderedDict
+from itertools import count
+
+from flask import current_app, g, jsonify, request
+
+
+class AdmissionPolicy:
+    """Límites de una clase de peticiones"""
+
+    __slots__ = ('name', 'priority', 'max_concurrent', 'max_queue', 'queue_timeout', 'rate', 'burst')
+
+    def __init__(self, name, priority, max_concurrent, max_queue, queue_timeout, rate, burst):
+        """
+        Inicializa la política
+
+        Args:
+            name: Nombre de la clase (read, write o bulk)
+            priority: Orden en la cola de espera (menor = se atiende antes)
+            max_concurrent: Peticiones de esta clase en curso a la vez
+            max_queue: Peticiones de esta clase esperando
+            queue_timeout: Segundos máximos de espera en la cola
+            rate: Peticiones por segundo sostenidas por cliente (0 = sin límite)
+            burst: Ráfaga máxima por cliente
+        """
+        self.name = name
+        self.priority = priority
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+
+
+def _env(name, default, cast=float):
+    return cast(os.environ.get(name, default))
+
+
+# Políticas por defecto; cada valor admite la variable de entorno
+# TASKS_ADMISSION_<CLASE>_<CAMPO>, por ejemplo TASKS_ADMISSION_WRITE_RATE
+DEFAULT_POLICIES = {
+    name: AdmissionPolicy(
+        name=name,
+        priority=priority,
+        max_concurrent=_env(f'TASKS_ADMISSION_{name.upper()}_CONCURRENT', concurrent, int),
+        max_queue=_env(f'TASKS_ADMISSION_{name.upper()}_QUEUE', queue, int),
+        queue_timeout=_env(f'TASKS_ADMISSION_{name.upper()}_TIMEOUT', timeout),
+        rate=_env(f'TASKS_ADMISSION_{name.upper()}_RATE', rate),
+        burst=_env(f'TASKS_ADMISSION_{name.upper()}_BURST', burst, int),
+    )
+    for name, priority, concurrent, queue, timeout, rate, burst in (
+        ('read', 0, 16, 64, 2.0, 50, 100),
+        ('write', 1, 4, 32, 1.0, 10, 20),
+        ('bulk', 2, 1, 4, 0.5, 1, 3),
+    )
+}
+
+# Peticiones en curso en total, sumando todas las clases
+CAPACITY = _env('TASKS_ADMISSION_CAPACITY', 16, int)
+
+# Rutas de escritura masiva (más baja prioridad)
+BULK_PATHS = ('/tasks/batch', '/tasks/archive')
+
+
+class TokenBucket:
+    """Token bucket: hasta burst peticiones seguidas y rate por segundo sostenidas"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        """
+        Inicializa el bucket lleno
+
+        Args:
+            rate: Tokens que se reponen por segundo
+            burst: Capacidad del bucket
+            now: Instante actual (time.monotonic)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now):
+        """
+        Consume un token si hay.
+
+        Args:
+            now: Instante actual (time.monotonic)
+
+        Returns:
+            float: 0 si se consumió; si no, segundos hasta que haya uno
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Overloaded(Exception):
+    """Petición rechazada por el control de admisión"""
+
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('key', 'policy', 'event', 'granted')
+
+    def __init__(self, key, policy):
+        self.key = key
+        self.policy = policy
+        self.event = threading.Event()
+        self.granted = False
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AdmissionGate:
+    """
+    Límite de concurrencia total y por política, con cola de espera por prioridad.
+    """
+
+    def __init__(self, capacity):
+        """
+        Inicializa la puerta
+
+        Args:
+            capacity: Peticiones en curso en total
+        """
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._active = 0
+        self._active_by = {}
+        self._waiting = []
+        self._waiting_by = {}
+        self._sequence = count()
+
+    def _can_run(self, policy):
+        return (self._active < self.capacity
+                and self._active_by.get(policy.name, 0) < policy.max_concurrent)
+
+    def _grant(self, policy):
+        self._active += 1
+        self._active_by[policy.name] = self._active_by.get(policy.name, 0) + 1
+
+    def acquire(self, policy):
+        """
+        Espera un hueco para una petición de la política.
+
+        Raises:
+            Overloaded: 503 si la cola está llena o se agota queue_timeout
+        """
+        with self._lock:
+            if self._can_run(policy):
+                self._grant(policy)
+                return
+            if self._waiting_by.get(policy.name, 0) >= policy.max_queue:
+                raise Overloaded(503, 'Servidor saturado: cola de espera llena', policy.queue_timeout)
+            waiter = _Waiter((policy.priority, next(self._sequence)), policy)
+            insort(self._waiting, waiter)
+            self._waiting_by[policy.name] = self._waiting_by.get(policy.name, 0) + 1
+
+        waiter.event.wait(policy.queue_timeout)
+
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiting.remove(waiter)
+            self._waiting_by[policy.name] -= 1
+        raise Overloaded(503, 'Servidor saturado: tiempo de espera agotado', policy.queue_timeout)
+
+    def release(self, policy):
+        """Libera el hueco de una petición y despierta a las que esperan, por prioridad."""
+        with self._lock:
+            self._active -= 1
+            self._active_by[policy.name] -= 1
+            for waiter in list(self._waiting):
+                if self._active >= self.capacity:
+                    break
+                if self._can_run(waiter.policy):
+                    self._waiting.remove(waiter)
+                    self._waiting_by[waiter.policy.name] -= 1
+                    self._grant(waiter.policy)
+                    waiter.granted = True
+                    waiter.event.set()
+
+
+class AdmissionController:
+    """
+    Extensión de Flask que aplica el control de admisión a las rutas protegidas.
+
+    Se desactiva poniendo app.config['ADMISSION_ENABLED'] = False (o la
+    variable de entorno TASKS_ADMISSION=0).
+    """
+
+    # Buckets de clientes que se conservan (los menos usados se descartan)
+    MAX_CLIENTS = 10000
+
+    def __init__(self, app=None, client_key=None, prefixes=('/tasks',),
+                 policies=None, capacity=None, bulk_paths=BULK_PATHS):
+        """
+        Inicializa el control de admisión
+
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+            client_key: Función sin argumentos que identifica al cliente de la
+                petición actual (por defecto, su dirección IP)
+            prefixes: Prefijos de ruta a los que se aplica
+            policies: Diccionario nombre → AdmissionPolicy con read, write y bulk
+            capacity: Peticiones en curso en total (por defecto CAPACITY)
+            bulk_paths: Rutas que se tratan como escritura masiva
+        """
+        self.client_key = client_key or (lambda: request.remote_addr)
+        self.prefixes = tuple(prefixes)
+        self.policies = dict(policies or DEFAULT_POLICIES)
+        self.bulk_paths = tuple(bulk_paths)
+        self.gate = AdmissionGate(capacity or CAPACITY)
+        self._buckets = OrderedDict()
+        self._buckets_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registra los hooks de la petición en la aplicación."""
+        app.config.setdefault('ADMISSION_ENABLED', os.environ.get('TASKS_ADMISSION', '1') != '0')
+        app.extensions['admission'] = self
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def classify(self):
+        """
+        Política de la petición actual, o None si no está protegida.
+
+        Returns:
+            AdmissionPolicy o None
+        """
+        path = request.path
+        if not path.startswith(self.prefixes):
+            return None
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return self.policies['read']
+        if path in self.bulk_paths:
+            return self.policies['bulk']
+        return self.policies['write']
+
+    def _check_rate(self, policy):
+        """
+        Aplica el token bucket del cliente para la política.
+
+        Raises:
+            Overloaded: 429 si el cliente superó su ritmo
+        """
+        if not policy.rate:
+            return
+        key = (policy.name, self.client_key())
+        now = time.monotonic()
+        with self._buckets_lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(policy.rate, policy.burst, now)
+                if len(self._buckets) > self.MAX_CLIENTS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            wait = bucket.take(now)
+        if wait:
+            raise Overloaded(429, 'Demasiadas peticiones: límite de ritmo superado', wait)
+
+    def _before_request(self):
+        if not current_app.config.get('ADMISSION_ENABLED', True):
+            return None
+        policy = self.classify()
+        if policy is None:
+            return None
+        try:
+            self._check_rate(policy)
+            self.gate.acquire(policy)
+        except Overloaded as e:
+            response = jsonify({'error': e.message})
+            response.status_code = e.status
+            response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+            return response
+        g.admission_policy = policy
+        return None
+
+    def _teardown_request(self, exc):
+        policy = g.pop('admission_policy', None)
+        if policy is not None:
+            self.gate.release(policy)
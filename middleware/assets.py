@@ -0,0 +1,148 @@
+"""
+Archivos estáticos con huella de contenido y versiones gzip precalculadas.
+
+Al arrancar se leen una vez los archivos del directorio estático. Cada uno se
+publica con un nombre que incluye un hash de su contenido (app.js →
+/assets/app.3f2a9c1b7d04.js), y las versiones comprimidas con gzip se
+calculan en ese momento. Como un nombre con hash nunca cambia de contenido,
+se sirve con Cache-Control immutable de un año: en las visitas siguientes el
+navegador no vuelve a pedirlo. index.html se reescribe para apuntar a esos
+nombres y es lo único que se revalida (no-cache con ETag).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+from flask import Response, abort, current_app, request
+
+# Un año: los nombres con hash no cambian nunca de contenido
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Por debajo de este tamaño gzip no compensa
+MIN_GZIP_SIZE = 256
+
+# Referencias a rutas locales en index.html (href="/..." o src="/...")
+_REFERENCE = re.compile(r'(href|src)="/([^"#?]+)"')
+
+
+class _Asset:
+    __slots__ = ('body', 'gzipped', 'mimetype', 'etag')
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        compressed = gzip.compress(body, compresslevel=9, mtime=0) if len(body) >= MIN_GZIP_SIZE else None
+        self.gzipped = compressed if compressed is not None and len(compressed) < len(body) else None
+
+
+class StaticAssets:
+    """
+    Extensión de Flask que sirve los estáticos con huella de contenido y gzip.
+
+    Registra la ruta <url_prefix>/<nombre con hash>; la página de entrada se
+    sirve con serve_index().
+    """
+
+    def __init__(self, app=None, directory='static', index='index.html', url_prefix='/assets'):
+        """
+        Inicializa el conjunto de estáticos
+
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+            directory: Directorio de los estáticos, relativo a app.root_path
+            index: Página de entrada, dentro de directory
+            url_prefix: Prefijo de las URLs con hash
+        """
+        self.directory = directory
+        self.index = index
+        self.url_prefix = url_prefix
+        self.root = None
+        self._assets = {}
+        self._urls = {}
+        self._index_asset = None
+        self._stamps = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registra la ruta de los estáticos con hash y los prepara."""
+        self.root = os.path.join(app.root_path, self.directory)
+        app.extensions['assets'] = self
+        app.add_url_rule(f'{self.url_prefix}/<path:name>', 'hashed_asset', self.serve_asset)
+        self.build()
+
+    def _sources(self):
+        """Rutas relativas (con /) de todos los archivos del directorio estático."""
+        for folder, _, files in os.walk(self.root):
+            for filename in files:
+                path = os.path.join(folder, filename)
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), path
+
+    def _stamp(self):
+        return {name: os.stat(path).st_mtime_ns for name, path in self._sources()}
+
+    def build(self):
+        """
+        Lee los estáticos, calcula sus nombres con hash y sus versiones gzip,
+        y reescribe la página de entrada para que apunte a ellos.
+        """
+        assets, urls = {}, {}
+        index_source = None
+        for name, path in self._sources():
+            with open(path, 'rb') as f:
+                body = f.read()
+            if name == self.index:
+                index_source = body
+                continue
+            stem, extension = os.path.splitext(name)
+            hashed = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}{extension}'
+            mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            assets[hashed] = _Asset(body, mimetype)
+            urls[name] = f'{self.url_prefix}/{hashed}'
+
+        index_asset = None
+        if index_source is not None:
+            html = _REFERENCE.sub(
+                lambda match: f'{match.group(1)}="{urls.get(match.group(2), "/" + match.group(2))}"',
+                index_source.decode('utf-8')
+            )
+            index_asset = _Asset(html.encode('utf-8'), 'text/html')
+
+        self._assets, self._urls, self._index_asset = assets, urls, index_asset
+        self._stamps = self._stamp()
+
+    def _respond(self, asset, cache_control):
+        """Respuesta de un estático, comprimida con gzip si el cliente lo admite."""
+        gzip_ok = asset.gzipped is not None and request.accept_encodings['gzip'] > 0
+        response = Response(asset.gzipped if gzip_ok else asset.body, mimetype=asset.mimetype)
+        if gzip_ok:
+            response.headers['Content-Encoding'] = 'gzip'
+        if asset.gzipped is not None:
+            response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = cache_control
+        # Cada codificación es una representación distinta: su propia ETag
+        response.set_etag(f'{asset.etag}-gzip' if gzip_ok else asset.etag)
+        return response.make_conditional(request)
+
+    def serve_asset(self, name):
+        """Sirve un estático por su nombre con hash (cache inmutable)."""
+        asset = self._assets.get(name)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, IMMUTABLE)
+
+    def serve_index(self):
+        """
+        Sirve la página de entrada, que se revalida siempre (no-cache con ETag).
+
+        En modo debug se reconstruye si algún estático cambió desde el arranque.
+        """
+        if current_app.debug and self._stamp() != self._stamps:
+            self.build()
+        if self._index_asset is None:
+            abort(404)
+        return self._respond(self._index_asset, 'no-cache')
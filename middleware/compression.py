@@ -0,0 +1,194 @@
+"""
+Compresión gzip/deflate de las respuestas JSON y NDJSON.
+
+La codificación se negocia con Accept-Encoding (gzip si el cliente lo admite
+al menos tanto como deflate). Las respuestas completas solo se comprimen si
+superan un tamaño mínimo; las respuestas en streaming (como /tasks/stream) se
+comprimen por partes a medida que se generan, vaciando el compresor cada
+cierto número de bytes para que el cliente reciba datos sin esperar al final.
+
+Se lleva la cuenta, por codificación, de los bytes antes y después de
+comprimir y del tiempo de CPU empleado (ver stats).
+"""
+
+import os
+import threading
+import time
+import zlib
+
+from flask import request
+
+# Parámetro wbits de zlib: gzip lleva cabecera gzip; "deflate" en HTTP es formato zlib
+WBITS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+# Tipos de contenido que se comprimen
+COMPRESSIBLE = ('application/json', 'application/x-ndjson')
+
+# En streaming, bytes de entrada tras los que se vacía el compresor
+STREAM_FLUSH_BYTES = 64 * 1024
+
+
+def strip_encoding(etag):
+    """
+    Quita de una ETag el sufijo -gzip o -deflate que se añade al comprimir.
+
+    Las precondiciones (If-Match) comparan versiones: una ETag recibida de una
+    respuesta comprimida identifica la misma versión que la original.
+
+    Args:
+        etag: ETag sin comillas
+
+    Returns:
+        str: La ETag de la representación sin comprimir
+    """
+    for encoding in WBITS:
+        if etag.endswith(f'-{encoding}'):
+            return etag[:-len(encoding) - 1]
+    return etag
+
+
+class ResponseCompression:
+    """
+    Extensión de Flask que comprime las respuestas JSON y NDJSON.
+
+    Configuración (app.config, con valores por defecto desde el entorno):
+        COMPRESS_LEVEL: Nivel de compresión 1-9 (TASKS_COMPRESS_LEVEL, 6)
+        COMPRESS_MIN_SIZE: Bytes mínimos para comprimir una respuesta
+            completa (TASKS_COMPRESS_MIN_SIZE, 1024)
+    """
+
+    def __init__(self, app=None):
+        """
+        Inicializa la compresión
+
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+        """
+        self._lock = threading.Lock()
+        self._stats = {encoding: self._empty_stats() for encoding in WBITS}
+        self._skipped_small = 0
+        if app is not None:
+            self.init_app(app)
+
+    @staticmethod
+    def _empty_stats():
+        return {'responses': 0, 'streamed': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0}
+
+    def init_app(self, app):
+        """Lee la configuración y registra el hook que comprime las respuestas."""
+        app.config.setdefault('COMPRESS_LEVEL', int(os.environ.get('TASKS_COMPRESS_LEVEL', 6)))
+        app.config.setdefault('COMPRESS_MIN_SIZE', int(os.environ.get('TASKS_COMPRESS_MIN_SIZE', 1024)))
+        self.app = app
+        app.extensions['compression'] = self
+        app.after_request(self._after_request)
+
+    @staticmethod
+    def _negotiate():
+        """Codificación preferida por el cliente entre gzip y deflate, o None."""
+        accepted = request.accept_encodings
+        gzip_quality, deflate_quality = accepted['gzip'], accepted['deflate']
+        if gzip_quality and gzip_quality >= deflate_quality:
+            return 'gzip'
+        if deflate_quality:
+            return 'deflate'
+        return None
+
+    def _record(self, encoding, streamed, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            stats = self._stats[encoding]
+            stats['responses'] += 1
+            stats['streamed'] += streamed
+            stats['bytes_in'] += bytes_in
+            stats['bytes_out'] += bytes_out
+            stats['cpu_seconds'] += cpu_seconds
+
+    def _after_request(self, response):
+        if (response.mimetype not in COMPRESSIBLE
+                or 'Content-Encoding' in response.headers
+                or request.method == 'HEAD'
+                or response.status_code < 200 or response.status_code in (204, 304)):
+            return response
+
+        # La respuesta depende de Accept-Encoding aunque esta vez no se comprima
+        response.vary.add('Accept-Encoding')
+        encoding = self._negotiate()
+        if encoding is None:
+            return response
+
+        level = self.app.config['COMPRESS_LEVEL']
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.app.config['COMPRESS_MIN_SIZE']:
+                with self._lock:
+                    self._skipped_small += 1
+                return response
+            # El cliente ya tiene esta representación comprimida: 304 sin comprimir nada
+            etag, weak = response.get_etag()
+            if etag and request.method == 'GET' and request.if_none_match.contains_weak(f'{etag}-{encoding}'):
+                response.set_etag(f'{etag}-{encoding}', weak)
+                return response.make_conditional(request)
+            start = time.thread_time()
+            compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+            compressed = compressor.compress(data) + compressor.flush()
+            self._record(encoding, False, len(data), len(compressed), time.thread_time() - start)
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        # Cada codificación es una representación distinta: su propia ETag
+        # (para If-Match, ver strip_encoding)
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
+
+    def _compress_stream(self, chunks, encoding, level):
+        """Comprime un iterable de fragmentos a medida que se genera."""
+        compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+        bytes_in = bytes_out = pending = 0
+        cpu_seconds = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                start = time.thread_time()
+                output = compressor.compress(chunk)
+                pending += len(chunk)
+                if pending >= STREAM_FLUSH_BYTES:
+                    output += compressor.flush(zlib.Z_SYNC_FLUSH)
+                    pending = 0
+                cpu_seconds += time.thread_time() - start
+                bytes_in += len(chunk)
+                bytes_out += len(output)
+                if output:
+                    yield output
+            start = time.thread_time()
+            output = compressor.flush()
+            cpu_seconds += time.thread_time() - start
+            bytes_out += len(output)
+            yield output
+            self._record(encoding, True, bytes_in, bytes_out, cpu_seconds)
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        """
+        Métricas de compresión por codificación.
+
+        Returns:
+            dict: Por codificación, respuestas (y cuántas en streaming), bytes
+            antes y después, ratio (después / antes) y segundos de CPU; además,
+            respuestas no comprimidas por ser menores que COMPRESS_MIN_SIZE
+        """
+        with self._lock:
+            result = {encoding: dict(stats) for encoding, stats in self._stats.items()}
+            skipped = self._skipped_small
+        for stats in result.values():
+            stats['ratio'] = round(stats['bytes_out'] / stats['bytes_in'], 4) if stats['bytes_in'] else None
+            stats['cpu_seconds'] = round(stats['cpu_seconds'], 6)
+        result['skipped_small'] = skipped
+        return result
@@ -0,0 +1,193 @@
+"""
+Perfil de memoria por petición con tracemalloc, activable en caliente.
+
+Con el perfil activo, cada petición anota la memoria reservada al empezar,
+pone a cero el pico de tracemalloc y, al terminar, registra el pico y la
+memoria neta que dejó reservada. Los datos se agregan por endpoint y se
+conservan las últimas peticiones.
+
+El pico de tracemalloc es global al proceso: con varias peticiones a la vez,
+el pico de cada una incluye lo que reservaron las demás en ese intervalo
+(es una cota superior). Para medir una ruta concreta conviene hacerlo con un
+solo hilo o sin tráfico concurrente.
+"""
+
+import os
+import threading
+import tracemalloc
+from collections import deque
+
+from flask import g, request
+
+from managers.memory_profile import top_sites
+
+
+class MemoryProfiler:
+    """
+    Extensión de Flask que mide el pico de memoria de cada petición.
+
+    Configuración (app.config, con valores por defecto desde el entorno):
+        MEMORY_PROFILE: Activo desde el arranque (TASKS_MEMORY_PROFILE=1)
+        MEMORY_PROFILE_FRAMES: Marcos de pila por reserva; más marcos
+            permiten atribuir las reservas a load_tasks o Task.from_dict
+            aunque ocurran dentro de json (TASKS_MEMORY_PROFILE_FRAMES, 10)
+        MEMORY_DEBUG_ROUTES: La aplicación registra las rutas /debug/memory
+            (TASKS_MEMORY_DEBUG_ROUTES=1; por defecto solo con MEMORY_PROFILE
+            o en modo debug)
+
+    Se activa y desactiva sin reiniciar con enable() y disable().
+    """
+
+    # Peticiones recientes que se conservan
+    RECENT = 100
+
+    def __init__(self, app=None):
+        """
+        Inicializa el perfil (inactivo)
+
+        Args:
+            app: Aplicación Flask (o None y llamar después a init_app)
+        """
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._started_tracing = False
+        self.frames = 10
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Lee la configuración y registra los hooks de la petición."""
+        app.config.setdefault('MEMORY_PROFILE', os.environ.get('TASKS_MEMORY_PROFILE', '') == '1')
+        app.config.setdefault('MEMORY_PROFILE_FRAMES', int(os.environ.get('TASKS_MEMORY_PROFILE_FRAMES', 10)))
+        app.config.setdefault(
+            'MEMORY_DEBUG_ROUTES',
+            os.environ.get('TASKS_MEMORY_DEBUG_ROUTES', '') == '1' or app.config['MEMORY_PROFILE'] or app.debug
+        )
+        self.frames = app.config['MEMORY_PROFILE_FRAMES']
+        app.extensions['memory_profiler'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if app.config['MEMORY_PROFILE']:
+            self.enable()
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def enable(self, frames=None):
+        """
+        Activa el perfil (y tracemalloc, si no estaba activo).
+
+        Args:
+            frames: Marcos de pila por reserva (None = MEMORY_PROFILE_FRAMES).
+                Solo se aplica si tracemalloc no estaba ya activo
+        """
+        with self._lock:
+            if frames is not None:
+                self.frames = frames
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._started_tracing = True
+            self._enabled = True
+
+    def disable(self):
+        """Desactiva el perfil y detiene tracemalloc si lo activó el perfil."""
+        with self._lock:
+            self._enabled = False
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def configure(self, data):
+        """
+        Aplica los cambios pedidos a la API: {"enabled": bool, "frames": N, "reset": bool}.
+
+        Raises:
+            ValueError: Si el cuerpo no es un objeto o algún valor no es válido
+        """
+        if not isinstance(data, dict):
+            raise ValueError('El cuerpo debe ser un objeto JSON')
+        enabled, frames = data.get('enabled'), data.get('frames')
+        if enabled is not None and not isinstance(enabled, bool):
+            raise ValueError('enabled debe ser true o false')
+        if frames is not None and (not isinstance(frames, int) or isinstance(frames, bool) or not 1 <= frames <= 100):
+            raise ValueError('frames debe ser un entero entre 1 y 100')
+        if enabled is False:
+            self.disable()
+        elif enabled or frames is not None:
+            self.enable(frames)
+        if data.get('reset'):
+            self.reset()
+
+    def reset(self):
+        """Borra las estadísticas acumuladas."""
+        with self._lock:
+            self._endpoints = {}
+            self._recent = deque(maxlen=self.RECENT)
+
+    def _before_request(self):
+        if self._enabled and tracemalloc.is_tracing():
+            g.memory_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+    def _after_request(self, response):
+        start = g.pop('memory_start', None)
+        if start is None or not tracemalloc.is_tracing():
+            return response
+
+        current, peak = tracemalloc.get_traced_memory()
+        # En streaming el cuerpo se genera después: solo cuenta lo reservado hasta aquí
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'peak_bytes': peak - start,
+            'net_bytes': current - start,
+            'response_bytes': None if response.is_streamed else response.calculate_content_length(),
+        }
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                request.endpoint or '<sin endpoint>',
+                {'requests': 0, 'peak_bytes_max': 0, 'peak_bytes_total': 0, 'net_bytes_total': 0}
+            )
+            stats['requests'] += 1
+            stats['peak_bytes_max'] = max(stats['peak_bytes_max'], record['peak_bytes'])
+            stats['peak_bytes_total'] += record['peak_bytes']
+            stats['net_bytes_total'] += record['net_bytes']
+            self._recent.append(record)
+        return response
+
+    def stats(self, top=0):
+        """
+        Estado del perfil y memoria por endpoint.
+
+        Args:
+            top: Si es mayor que 0, incluye los top puntos del código con más
+                memoria reservada en este momento por load_tasks y Task.from_dict
+
+        Returns:
+            dict: Estado, memoria trazada actual y pico, por endpoint
+            (peticiones, pico máximo y medio, memoria neta media) y
+            peticiones recientes
+        """
+        with self._lock:
+            endpoints = {name: dict(stats) for name, stats in self._endpoints.items()}
+            recent = list(self._recent)
+        for stats in endpoints.values():
+            stats['peak_bytes_avg'] = round(stats.pop('peak_bytes_total') / stats['requests'])
+            stats['net_bytes_avg'] = round(stats.pop('net_bytes_total') / stats['requests'])
+
+        tracing = tracemalloc.is_tracing()
+        result = {
+            'enabled': self._enabled,
+            'tracing': tracing,
+            'frames': tracemalloc.get_traceback_limit() if tracing else self.frames,
+            'traced_bytes': tracemalloc.get_traced_memory()[0] if tracing else None,
+            'endpoints': endpoints,
+            'recent': recent,
+        }
+        if top and tracing:
+            result['top_sites'] = top_sites(tracemalloc.take_snapshot(), top)
+        return result
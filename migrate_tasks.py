@@ -0,0 +1,451 @@
+"""
+Migración y sincronización de tasks.json (app_simple.py) a tareas.db (app.py).
+
+Uso:
+    python migrate_tasks.py migrate [--source tasks.json] [--creator EMAIL]
+    python migrate_tasks.py sync [--source tasks.json] [--creator EMAIL] [--watch SEGUNDOS]
+
+migrate copia todas las tareas a la tabla tarea. El archivo se lee por
+partes, sin cargarlo entero en memoria, y las filas se insertan con
+executemany en transacciones de --batch tareas. Cada transacción guarda
+también un punto de control: si la migración se interrumpe, al repetirla
+continúa tras la última transacción confirmada.
+
+sync aplica solo los cambios desde la ejecución anterior: crea las tareas
+nuevas, actualiza las que tienen una versión mayor que la sincronizada y
+elimina (o archiva, si están en el archivo frío de tareas) las que ya no
+están en tasks.json. Con --watch se repite cada N segundos mientras el
+archivo cambie. La sincronización es en un solo sentido: tasks.json manda.
+
+Cada tarea de tasks.json se relaciona con su fila de tarea en la tabla
+tarea_json (ID en el JSON, ID en la base de datos y versión sincronizada).
+Como tasks.json no registra quién creó cada tarea, todas se asignan al
+creador indicado (por defecto, el primer administrador).
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+from app import ARCHIVE_COLUMNS, TAREA_SCHEMA, Tarea, TareaArchivada, Usuario, app, db
+from managers.archive_store import TaskArchive
+from managers.store_maintenance import iter_json_array
+from managers.task_manager import TaskManager
+from models.task_schema import first_error
+
+# Tareas por transacción
+BATCH_SIZE = 5000
+
+# Errores de conversión que se muestran
+MAX_REPORTED_ERRORS = 20
+
+# Relación entre las tareas de tasks.json y las filas de tarea
+tarea_json = db.Table(
+    'tarea_json',
+    db.Column('json_id', db.Integer, primary_key=True, autoincrement=False),
+    db.Column('tarea_id', db.Integer, nullable=False),
+    db.Column('version', db.Integer, nullable=False),
+)
+
+# Punto de control por archivo de origen
+migracion_json = db.Table(
+    'migracion_json',
+    db.Column('source', db.String(500), primary_key=True),
+    db.Column('fingerprint', db.String(100), nullable=False),
+    db.Column('items', db.Integer, nullable=False),
+    db.Column('completed', db.Boolean, nullable=False),
+    db.Column('updated_at', db.DateTime, nullable=False),
+)
+
+
+def parse_fecha(value):
+    """
+    Convierte la fecha ISO de tasks.json en datetime sin zona horaria.
+    
+    Returns:
+        datetime o None: Las fechas con zona se pasan a UTC; None si no hay fecha
+    """
+    if not value:
+        return None
+    fecha = datetime.fromisoformat(value)
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+
+def map_task(data, creador_id):
+    """
+    Convierte una tarea de tasks.json en una fila de la tabla tarea.
+    
+    Args:
+        data: Diccionario de la tarea (ver Task.to_dict)
+        creador_id: ID del usuario al que se atribuye la tarea
+    
+    Returns:
+        dict: Valores de las columnas de tarea (sin id ni version)
+    
+    Raises:
+        ValueError: Si la tarea no es válida para la tabla tarea
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('id'), int) or isinstance(data['id'], bool):
+        raise ValueError('La tarea debe ser un objeto con id entero')
+    
+    # tasks.json no limita los textos: se recortan a la longitud de las columnas
+    fields = {**data, 'priority': data.get('priority') or 'media', 'status': data.get('status') or 'pendiente'}
+    for field, length in (('title', 200), ('assigned_to', 100)):
+        if isinstance(fields.get(field), str):
+            fields[field] = fields[field][:length]
+    values, errors = TAREA_SCHEMA.validate(fields)
+    if errors:
+        raise ValueError(first_error(errors))
+    
+    try:
+        fecha_creacion = parse_fecha(data.get('fecha_creacion'))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Valor inválido: {e}')
+    
+    values['creador_id'] = creador_id
+    values['fecha_creacion'] = fecha_creacion or datetime.utcnow()
+    return values
+
+
+def file_fingerprint(path):
+    """Tamaño y fecha de modificación del archivo: cambian cada vez que se reescribe."""
+    stat = os.stat(path)
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def batched(items, size):
+    """Agrupa un iterable en listas de como mucho size elementos."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class TaskMigrator:
+    """Copia y sincroniza las tareas de un tasks.json en la base de datos de app.py"""
+    
+    def __init__(self, source=None, creator=None, batch_size=BATCH_SIZE, archive_path=None, log=print):
+        """
+        Inicializa el migrador
+        
+        Args:
+            source: Ruta de tasks.json (por defecto TaskManager.JSON_FILE)
+            creator: Email o ID del usuario al que se atribuyen las tareas
+                (por defecto, el primer administrador)
+            batch_size: Tareas por transacción
+            archive_path: Archivo frío de tareas para distinguir las
+                archivadas de las eliminadas (por defecto TaskManager.ARCHIVE_FILE)
+            log: Función que recibe los mensajes de progreso
+        """
+        self.source = os.path.abspath(source or TaskManager.JSON_FILE)
+        self.creator = creator
+        self.batch_size = batch_size
+        self.archive_path = archive_path or TaskManager.ARCHIVE_FILE
+        self.log = log
+    
+    def _creador_id(self):
+        """ID del creador indicado, o del primer administrador si no se indicó."""
+        if self.creator is None:
+            usuario = Usuario.query.filter_by(es_admin=True).order_by(Usuario.id).first()
+        elif str(self.creator).isdigit():
+            usuario = db.session.get(Usuario, int(self.creator))
+        else:
+            usuario = Usuario.query.filter_by(email=self.creator).first()
+        if usuario is None:
+            raise ValueError('No hay creador para las tareas: registra un administrador o usa --creator')
+        return usuario.id
+    
+    @staticmethod
+    def _create_tables():
+        for table in (tarea_json, migracion_json):
+            table.create(db.engine, checkfirst=True)
+    
+    def _checkpoint(self, conn):
+        return conn.execute(
+            db.select(migracion_json).where(migracion_json.c.source == self.source)
+        ).first()
+    
+    def _save_checkpoint(self, conn, fingerprint, items, completed):
+        """
+        Guarda el punto de control. Se ejecuta al principio de cada transacción:
+        al escribir, SQLite reserva la base de datos y ningún otro proceso puede
+        crear tareas hasta el commit, de modo que los IDs asignados no chocan.
+        """
+        values = {'fingerprint': fingerprint, 'items': items, 'completed': completed,
+                  'updated_at': datetime.utcnow()}
+        updated = conn.execute(
+            migracion_json.update().where(migracion_json.c.source == self.source).values(**values)
+        ).rowcount
+        if not updated:
+            conn.execute(migracion_json.insert().values(source=self.source, **values))
+    
+    @staticmethod
+    def _next_tarea_id(conn):
+        """Primer ID libre de tarea, sin reutilizar los de tareas archivadas."""
+        max_id = max(
+            conn.execute(db.select(db.func.max(Tarea.id))).scalar() or 0,
+            conn.execute(db.select(db.func.max(TareaArchivada.id))).scalar() or 0,
+        )
+        # Con AUTOINCREMENT, SQLite recuerda también los IDs de filas ya borradas. Las bases
+        # de datos creadas antes de usarlo no tienen sqlite_sequence: basta con MAX(id)
+        has_sequence = conn.execute(db.text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_sequence'"
+        )).scalar()
+        sequence = conn.execute(db.text("SELECT seq FROM sqlite_sequence WHERE name = 'tarea'")).scalar() \
+            if has_sequence else None
+        return max(max_id, sequence or 0) + 1
+    
+    def _insert(self, conn, rows):
+        """
+        Inserta tareas nuevas y su relación con tasks.json con dos executemany.
+        
+        Args:
+            conn: Conexión dentro de la transacción
+            rows: Lista de (json_id, versión en el JSON, fila de tarea)
+        
+        Returns:
+            List[dict]: Relaciones creadas (json_id, tarea_id y version)
+        """
+        next_id = self._next_tarea_id(conn)
+        tareas, relaciones = [], []
+        for offset, (json_id, json_version, row) in enumerate(rows):
+            tarea_id = next_id + offset
+            tareas.append({**row, 'id': tarea_id, 'version': 1})
+            relaciones.append({'json_id': json_id, 'tarea_id': tarea_id, 'version': json_version})
+        conn.execute(Tarea.__table__.insert(), tareas)
+        conn.execute(tarea_json.insert(), relaciones)
+        return relaciones
+    
+    def _report(self, stats, started):
+        elapsed = time.perf_counter() - started
+        rate = stats['read'] / elapsed if elapsed else 0
+        self.log(f"  {stats['read']} leídas, {stats['inserted']} creadas, {stats['updated']} actualizadas "
+                 f"({rate:,.0f} tareas/s)")
+    
+    def _reject(self, stats, item, error):
+        stats['invalid'] += 1
+        if stats['invalid'] <= MAX_REPORTED_ERRORS:
+            task_id = item.get('id') if isinstance(item, dict) else None
+            self.log(f"  Tarea omitida (id {task_id}): {error}")
+    
+    def migrate(self):
+        """
+        Copia a la tabla tarea todas las tareas de tasks.json que aún no se copiaron.
+        
+        Si una migración anterior del mismo archivo se interrumpió y el
+        archivo no ha cambiado, continúa tras el último lote confirmado; si
+        cambió, lo recorre entero y omite las tareas ya copiadas.
+        
+        Returns:
+            dict: Tareas leídas, creadas, omitidas por ya copiadas e inválidas
+        """
+        with app.app_context():
+            self._create_tables()
+            creador_id = self._creador_id()
+            fingerprint = file_fingerprint(self.source)
+            stats = dict.fromkeys(('read', 'inserted', 'updated', 'skipped', 'invalid'), 0)
+            
+            with db.engine.connect() as conn:
+                checkpoint = self._checkpoint(conn)
+                known = set(conn.execute(db.select(tarea_json.c.json_id)).scalars())
+            resume_from = 0
+            if checkpoint is not None and checkpoint.fingerprint == fingerprint:
+                if checkpoint.completed:
+                    self.log(f'{self.source} ya estaba migrado; nada que hacer')
+                    return stats
+                resume_from = checkpoint.items
+                self.log(f'Continuando la migración tras {resume_from} tareas')
+            
+            started = time.perf_counter()
+            for batch in batched(iter_json_array(self.source), self.batch_size):
+                position = stats['read'] + len(batch)
+                if position <= resume_from:
+                    stats['read'] = position
+                    stats['skipped'] += len(batch)
+                    continue
+                
+                rows = []
+                for item in batch:
+                    try:
+                        row = map_task(item, creador_id)
+                    except ValueError as e:
+                        self._reject(stats, item, e)
+                        continue
+                    if item['id'] in known:
+                        stats['skipped'] += 1
+                        continue
+                    known.add(item['id'])
+                    rows.append((item['id'], item.get('version') or 1, row))
+                
+                # Lote, relaciones y punto de control en la misma transacción
+                with db.engine.begin() as conn:
+                    self._save_checkpoint(conn, fingerprint, position, False)
+                    if rows:
+                        self._insert(conn, rows)
+                stats['read'] = position
+                stats['inserted'] += len(rows)
+                self._report(stats, started)
+            
+            with db.engine.begin() as conn:
+                self._save_checkpoint(conn, fingerprint, stats['read'], True)
+            return stats
+    
+    def sync(self):
+        """
+        Aplica a la base de datos los cambios de tasks.json desde la última ejecución.
+        
+        Returns:
+            dict: Tareas leídas, creadas, actualizadas, eliminadas, archivadas
+            e inválidas (None si el archivo no cambió desde la última vez)
+        """
+        with app.app_context():
+            self._create_tables()
+            fingerprint = file_fingerprint(self.source)
+            with db.engine.connect() as conn:
+                checkpoint = self._checkpoint(conn)
+                if checkpoint is not None and checkpoint.completed and checkpoint.fingerprint == fingerprint:
+                    return None
+                synced = {json_id: (tarea_id, version) for json_id, tarea_id, version
+                          in conn.execute(db.select(tarea_json))}
+            
+            creador_id = self._creador_id()
+            stats = dict.fromkeys(('read', 'inserted', 'updated', 'deleted', 'archived', 'invalid'), 0)
+            seen = set()
+            started = time.perf_counter()
+            
+            for batch in batched(iter_json_array(self.source), self.batch_size):
+                new_rows, changed = [], []
+                for item in batch:
+                    # Una tarea inválida con id conocido conserva su fila tal como está
+                    json_id = item.get('id') if isinstance(item, dict) else None
+                    if isinstance(json_id, int) and not isinstance(json_id, bool):
+                        seen.add(json_id)
+                    try:
+                        row = map_task(item, creador_id)
+                    except ValueError as e:
+                        self._reject(stats, item, e)
+                        continue
+                    json_version = item.get('version') or 1
+                    if json_id not in synced:
+                        new_rows.append((json_id, json_version, row))
+                    elif json_version > synced[json_id][1]:
+                        # El creador de una tarea ya sincronizada no cambia
+                        del row['creador_id']
+                        changed.append({**row, 'b_tarea_id': synced[json_id][0],
+                                        'b_json_id': json_id, 'b_version': json_version})
+                
+                with db.engine.begin() as conn:
+                    self._save_checkpoint(conn, fingerprint, stats['read'], False)
+                    relaciones = self._insert(conn, new_rows) if new_rows else []
+                    if changed:
+                        self._update(conn, changed)
+                # Una tarea repetida en el archivo no se vuelve a crear
+                for relacion in relaciones:
+                    synced[relacion['json_id']] = (relacion['tarea_id'], relacion['version'])
+                stats['read'] += len(batch)
+                stats['inserted'] += len(new_rows)
+                stats['updated'] += len(changed)
+                self._report(stats, started)
+            
+            missing = [json_id for json_id in synced if json_id not in seen]
+            with db.engine.begin() as conn:
+                self._save_checkpoint(conn, fingerprint, stats['read'], True)
+                if missing:
+                    stats['archived'], stats['deleted'] = self._remove(conn, missing)
+            return stats
+    
+    @staticmethod
+    def _update(conn, changed):
+        """Actualiza con executemany las tareas modificadas y su versión sincronizada."""
+        # version + 1: las peticiones de app.py con la versión anterior en If-Match fallan con 412
+        conn.execute(
+            Tarea.__table__.update()
+            .where(Tarea.id == db.bindparam('b_tarea_id'))
+            .values(version=Tarea.version + 1),
+            changed
+        )
+        conn.execute(
+            tarea_json.update()
+            .where(tarea_json.c.json_id == db.bindparam('b_json_id'))
+            .values(version=db.bindparam('b_version')),
+            [{'b_json_id': row['b_json_id'], 'b_version': row['b_version']} for row in changed]
+        )
+    
+    def _remove(self, conn, json_ids):
+        """
+        Quita de tarea las tareas que ya no están en tasks.json.
+        
+        Las que están en el archivo frío de tareas pasan a tarea_archivada;
+        las demás se eliminan.
+        
+        Returns:
+            tuple: (archivadas, eliminadas)
+        """
+        pending = set(json_ids)
+        archived_json = {task.id for task in TaskArchive(self.archive_path).iter_tasks() if task.id in pending} \
+            if os.path.exists(self.archive_path) else set()
+        rows = conn.execute(db.select(tarea_json).where(tarea_json.c.json_id.in_(pending))).all()
+        to_archive = [tarea_id for json_id, tarea_id, _ in rows if json_id in archived_json]
+        to_delete = [tarea_id for json_id, tarea_id, _ in rows if json_id not in archived_json]
+        
+        if to_archive:
+            columns = [getattr(Tarea, name) for name in ARCHIVE_COLUMNS]
+            conn.execute(
+                db.insert(TareaArchivada).from_select(
+                    list(ARCHIVE_COLUMNS) + ['fecha_archivado'],
+                    db.select(*columns, db.literal(datetime.utcnow())).where(Tarea.id.in_(to_archive))
+                )
+            )
+        archived = conn.execute(db.delete(Tarea).where(Tarea.id.in_(to_archive))).rowcount if to_archive else 0
+        deleted = conn.execute(db.delete(Tarea).where(Tarea.id.in_(to_delete))).rowcount if to_delete else 0
+        conn.execute(db.delete(tarea_json).where(tarea_json.c.json_id.in_(pending)))
+        return archived, deleted
+    
+    def watch(self, interval):
+        """Sincroniza cada interval segundos, mientras no se interrumpa (Ctrl+C)."""
+        self.log(f'Sincronizando {self.source} cada {interval} s (Ctrl+C para terminar)')
+        try:
+            while True:
+                stats = self.sync()
+                if stats is not None:
+                    self.log(f'{datetime.now():%H:%M:%S} {stats}')
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migración y sincronización de tasks.json a tareas.db')
+    parser.add_argument('command', choices=['migrate', 'sync'])
+    parser.add_argument('--source', default=TaskManager.JSON_FILE, help='Archivo tasks.json de origen')
+    parser.add_argument('--creator', help='Email o ID del usuario al que se atribuyen las tareas '
+                                          '(por defecto, el primer administrador)')
+    parser.add_argument('--batch', type=int, default=BATCH_SIZE, help='Tareas por transacción')
+    parser.add_argument('--watch', type=float, metavar='SEGUNDOS',
+                        help='Con sync: repetir la sincronización cada N segundos')
+    args = parser.parse_args()
+    
+    migrator = TaskMigrator(args.source, args.creator, args.batch)
+    started = time.perf_counter()
+    if args.command == 'migrate':
+        stats = migrator.migrate()
+    elif args.watch:
+        migrator.watch(args.watch)
+        return
+    else:
+        stats = migrator.sync()
+    if stats is None:
+        print(f'{args.source} no ha cambiado desde la última sincronización')
+    else:
+        print(f'{stats} en {time.perf_counter() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -3,14 +3,18 @@ Clase Task: representa una tarea con los datos del interfaz.
 """
 
 from datetime import datetime
-from decimal import Decimal
+from models.task_schema import PRIORITIES, STATUSES, TASK_SCHEMA, first_error
 
 
 class Task:
     """Clase que representa una tarea"""
     
+    # Valores admitidos, en orden; el índice sirve de código compacto en los formatos binarios
+    PRIORITIES = PRIORITIES
+    STATUSES = STATUSES
+    
     def __init__(self, id=None, title=None, description=None, priority='media', 
-                 effort_hours=None, status='pendiente', assigned_to=None):
+                 effort_hours=None, status='pendiente', assigned_to=None, version=1):
         """
         Inicializa una tarea
         
@@ -22,6 +26,7 @@ class Task:
             effort_hours: Número decimal, horas estimadas para completar la tarea
             status: Estado (pendiente, en_progreso, en_revision, completada)
             assigned_to: String, persona del equipo a la que se asigna
+            version: Versión de la tarea; aumenta con cada modificación
         """
         self.id = id
         self.title = title
@@ -30,6 +35,7 @@ class Task:
         self.effort_hours = float(effort_hours) if effort_hours is not None else None
         self.status = status
         self.assigned_to = assigned_to
+        self.version = version
         self.fecha_creacion = datetime.now().isoformat() if not hasattr(self, 'fecha_creacion') else self.fecha_creacion
     
     def to_dict(self):
@@ -47,7 +53,8 @@ class Task:
             'effort_hours': self.effort_hours,
             'status': self.status,
             'assigned_to': self.assigned_to,
-            'fecha_creacion': self.fecha_creacion
+            'fecha_creacion': self.fecha_creacion,
+            'version': self.version
         }
     
     @classmethod
@@ -68,7 +75,8 @@ class Task:
             priority=data.get('priority', 'media'),
             effort_hours=data.get('effort_hours'),
             status=data.get('status', 'pendiente'),
-            assigned_to=data.get('assigned_to')
+            assigned_to=data.get('assigned_to'),
+            version=data.get('version') or 1
         )
         # Si hay fecha_creacion en el diccionario, usarla; si no, mantener la generada en __init__
         if 'fecha_creacion' in data and data['fecha_creacion']:
@@ -77,24 +85,12 @@ class Task:
     
     def validate(self):
         """
-        Valida que los datos de la tarea sean correctos.
+        Valida que los datos de la tarea sean correctos (ver TASK_SCHEMA).
         
         Returns:
             tuple: (bool, str) - (es_valido, mensaje_error)
         """
-        if not self.title:
-            return False, "El campo 'title' es requerido"
-        
-        valid_priorities = ['baja', 'media', 'alta', 'bloqueante']
-        if self.priority not in valid_priorities:
-            return False, f"Prioridad inválida. Debe ser una de: {', '.join(valid_priorities)}"
-        
-        valid_statuses = ['pendiente', 'en_progreso', 'en_revision', 'completada']
-        if self.status not in valid_statuses:
-            return False, f"Status inválido. Debe ser uno de: {', '.join(valid_statuses)}"
-        
-        if self.effort_hours is not None and self.effort_hours < 0:
-            return False, "effort_hours debe ser un número positivo"
-        
+        errors = TASK_SCHEMA.errors_for(self)
+        if errors:
+            return False, first_error(errors)
         return True, ""
-
@@ -0,0 +1,220 @@
+"""
+Clase TaskSchema: reglas de validación de las tareas, compiladas una sola vez.
+
+La usan tanto Task (app_simple.py, almacén JSON) como Tarea (app.py, base de
+datos). Cada esquema elige al crearse la función de conversión de cada campo
+(por ejemplo, effort_hours como float o como Decimal con dos decimales) y
+guarda los valores admitidos en frozensets, de modo que validar un registro
+no construye listas ni decide nada por campo.
+
+validate comprueba un registro y validate_many un lote completo en una sola
+pasada. Los errores se devuelven por campo: {'priority': 'Prioridad inválida...'}.
+"""
+
+import math
+from decimal import Decimal, InvalidOperation
+
+
+# Valores admitidos, en orden; el índice sirve de código compacto en los formatos binarios
+PRIORITIES = ('baja', 'media', 'alta', 'bloqueante')
+STATUSES = ('pendiente', 'en_progreso', 'en_revision', 'completada')
+
+# Clave de los errores que afectan al registro completo y no a un campo
+RECORD = '__all__'
+
+_CENTS = Decimal('0.01')
+
+
+class FieldError(ValueError):
+    """Valor no válido para un campo; el mensaje es el que se devuelve al cliente."""
+
+
+def _text(name, required=False, max_length=None, blank_as_none=False):
+    """Conversión de un campo de texto."""
+    def coerce(value):
+        if value is None or (blank_as_none and isinstance(value, str) and not value.strip()):
+            if required:
+                raise FieldError(f"El campo '{name}' es requerido")
+            return None
+        if not isinstance(value, str):
+            raise FieldError(f"El campo '{name}' debe ser un texto")
+        if blank_as_none:
+            value = value.strip()
+        if required and not value:
+            raise FieldError(f"El campo '{name}' es requerido")
+        if max_length is not None and len(value) > max_length:
+            raise FieldError(f"El campo '{name}' admite como máximo {max_length} caracteres")
+        return value
+    return coerce
+
+
+def _choice(values, message):
+    """Conversión de un campo con valores fijos."""
+    allowed = frozenset(values)
+    
+    def coerce(value):
+        # Los valores no hashables (listas, objetos) tampoco son válidos
+        if isinstance(value, str) and value in allowed:
+            return value
+        raise FieldError(message)
+    return coerce
+
+
+def _hours_number(value):
+    """Convierte effort_hours a float; None o '' son 'sin estimar'."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+        raise FieldError("effort_hours debe ser un número")
+    try:
+        number = float(value)
+    except ValueError:
+        raise FieldError("effort_hours debe ser un número")
+    if not math.isfinite(number):
+        raise FieldError("effort_hours debe ser un número")
+    if number < 0:
+        raise FieldError("effort_hours debe ser un número positivo")
+    return number
+
+
+def _hours_decimal(max_digits):
+    """Conversión de effort_hours a Decimal con dos decimales (columna Numeric(max_digits, 2))."""
+    limit = Decimal(10) ** (max_digits - 2)
+    
+    def coerce(value):
+        if value is None or value == '':
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+            raise FieldError("effort_hours debe ser un número")
+        try:
+            number = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise FieldError("effort_hours debe ser un número")
+        if not number.is_finite():
+            raise FieldError("effort_hours debe ser un número")
+        if number < 0:
+            raise FieldError("effort_hours debe ser un número positivo")
+        number = number.quantize(_CENTS)
+        if number >= limit:
+            raise FieldError(f"effort_hours debe ser menor que {limit}")
+        return number
+    return coerce
+
+
+def first_error(errors):
+    """
+    Mensaje del primer error, en el orden de los campos del esquema.
+    
+    Args:
+        errors: Diccionario campo → mensaje devuelto por validate
+    
+    Returns:
+        str: Mensaje de error (para las respuestas con un único 'error')
+    """
+    return next(iter(errors.values()))
+
+
+class TaskSchema:
+    """
+    Esquema compilado de los campos editables de una tarea.
+    
+    Los campos que faltan en un registro completo toman su valor por defecto
+    (priority 'media', status 'pendiente', el resto None); title es requerido.
+    """
+    
+    FIELDS = ('title', 'description', 'priority', 'effort_hours', 'status', 'assigned_to')
+    
+    __slots__ = ('_rules',)
+    
+    def __init__(self, decimal_digits=None, max_lengths=None):
+        """
+        Compila las reglas del esquema
+        
+        Args:
+            decimal_digits: Si se indica, effort_hours se convierte a Decimal
+                con dos decimales y como máximo este número de dígitos; si no,
+                a float
+            max_lengths: Diccionario campo → longitud máxima de los textos
+        """
+        max_lengths = max_lengths or {}
+        hours = _hours_decimal(decimal_digits) if decimal_digits else _hours_number
+        # (campo, valor si falta, conversión) en el orden en que se informan los errores
+        self._rules = (
+            ('title', None, _text('title', required=True, max_length=max_lengths.get('title'))),
+            ('description', None, _text('description', max_length=max_lengths.get('description'))),
+            ('priority', 'media', _choice(PRIORITIES, f"Prioridad inválida. Debe ser una de: {', '.join(PRIORITIES)}")),
+            ('effort_hours', None, hours),
+            ('status', 'pendiente', _choice(STATUSES, f"Status inválido. Debe ser uno de: {', '.join(STATUSES)}")),
+            ('assigned_to', None, _text('assigned_to', max_length=max_lengths.get('assigned_to'), blank_as_none=True)),
+        )
+    
+    def validate(self, data, partial=False):
+        """
+        Valida y convierte un registro.
+        
+        Args:
+            data: Diccionario con los campos de la tarea (los demás se ignoran)
+            partial: Si True, solo se validan los campos presentes (PATCH)
+        
+        Returns:
+            tuple: (valores convertidos, errores por campo); los errores están
+            vacíos si el registro es válido
+        """
+        values, errors = {}, {}
+        for name, default, coerce in self._rules:
+            if name in data:
+                value = data[name]
+            elif partial:
+                continue
+            else:
+                value = default
+            try:
+                values[name] = coerce(value)
+            except FieldError as e:
+                errors[name] = str(e)
+        return values, errors
+    
+    def validate_many(self, records, partial=False):
+        """
+        Valida y convierte un lote de registros en una sola pasada.
+        
+        Args:
+            records: Iterable de diccionarios
+            partial: Si True, solo se validan los campos presentes
+        
+        Returns:
+            tuple: (válidos, inválidos). válidos es una lista de (posición,
+            valores convertidos); inválidos, una lista de
+            {'index': posición, 'errors': errores por campo}
+        """
+        validate = self.validate
+        valid, invalid = [], []
+        for index, data in enumerate(records):
+            if not isinstance(data, dict):
+                invalid.append({'index': index, 'errors': {RECORD: 'La tarea debe ser un objeto'}})
+                continue
+            values, errors = validate(data, partial)
+            if errors:
+                invalid.append({'index': index, 'errors': errors})
+            else:
+                valid.append((index, values))
+        return valid, invalid
+    
+    def errors_for(self, obj):
+        """
+        Valida los atributos de un objeto ya construido (Task o Tarea).
+        
+        Returns:
+            dict: Errores por campo (vacío si es válido)
+        """
+        errors = {}
+        for name, default, coerce in self._rules:
+            try:
+                coerce(getattr(obj, name))
+            except FieldError as e:
+                errors[name] = str(e)
+        return errors
+
+
+# Esquema de las tareas del almacén JSON (Task): effort_hours como float
+TASK_SCHEMA = TaskSchema()
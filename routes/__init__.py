@@ -2,7 +2,8 @@
 Módulo de rutas para la aplicación de gestión de tareas.
 """
 
+from .job_routes import job_bp
 from .task_routes import task_bp
 
-__all__ = ['task_bp']
+__all__ = ['job_bp', 'task_bp']
 
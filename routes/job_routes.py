@@ -0,0 +1,100 @@
+"""
+Archivo de rutas para los trabajos en segundo plano.
+Todas las rutas llaman al JobManager de la aplicación (app.extensions['jobs']).
+"""
+
+from flask import Blueprint, current_app, request, jsonify, send_file, url_for
+from managers.job_manager import JobError
+
+# Crear Blueprint para las rutas de trabajos
+job_bp = Blueprint('jobs', __name__)
+
+
+def _jobs():
+    """JobManager registrado en la aplicación actual."""
+    return current_app.extensions['jobs']
+
+
+def _job_response(job, status):
+    """Respuesta JSON de un trabajo con la URL de su resultado si se puede descargar."""
+    if job['download']:
+        job['result_url'] = url_for('jobs.download_job_result', job_id=job['id'])
+    response = jsonify(job)
+    if status == 202:
+        response.headers['Location'] = url_for('jobs.get_job', job_id=job['id'])
+    return response, status
+
+
+@job_bp.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    POST /jobs → encola un trabajo y responde 202 sin esperar a que termine.
+    
+    Body: {"type": "export" | "import" | "archive" | "reindex", "params": {...}}
+    
+    La cabecera Location apunta a GET /jobs/<id>, donde se consulta el
+    estado y el progreso.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'error': 'params debe ser un objeto'}), 400
+        
+        job = _jobs().submit(data.get('type'), params)
+        
+        return _job_response(job, 202)
+    except JobError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    """
+    GET /jobs → devuelve los trabajos más recientes (?limit=N, por defecto 50).
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', 50))
+        except ValueError:
+            return jsonify({'error': 'limit debe ser un número entero'}), 400
+        
+        jobs = _jobs().recent(limit=max(limit, 0))
+        
+        return jsonify({'total': len(jobs), 'jobs': jobs}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    GET /jobs/<id> → devuelve el estado, el progreso y el resumen de un trabajo.
+    """
+    try:
+        job = _jobs().get(job_id)
+        if job is None:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        
+        return _job_response(_jobs().public(job), 200)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@job_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def download_job_result(job_id):
+    """
+    GET /jobs/<id>/result → descarga el archivo de resultado de un trabajo terminado.
+    """
+    try:
+        path, download_name = _jobs().result_file(job_id)
+        
+        return send_file(path, as_attachment=True, download_name=download_name)
+    except JobError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -3,27 +3,213 @@ Archivo de rutas para la gestión de tareas.
 Todas las rutas llaman a la clase TaskManager.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+from analytics.workload import NUMPY_AVAILABLE
+from managers.date_index import creation_timestamp
 from managers.task_manager import TaskManager
+from managers.unit_of_work import OperationError
+from middleware.compression import strip_encoding
 from models.task import Task
+from models.task_schema import TASK_SCHEMA, first_error
 
 # Crear Blueprint para las rutas de tareas
 task_bp = Blueprint('tasks', __name__)
 
+# Tamaño máximo de página de GET /tasks?limit=
+MAX_PAGE_SIZE = 500
+
+
+def _list_filters():
+    """Obtiene de la query string los filtros admitidos por los listados."""
+    return {field: request.args[field] for field in TaskManager.LIST_FILTERS
+            if field in request.args}
+
+
+def _include_archived():
+    """Indica si la petición pide incluir las tareas archivadas (?include_archived=1)."""
+    return request.args.get('include_archived', '').lower() in ('1', 'true')
+
+
+def _created_query():
+    """
+    Lee de la query string el rango de creación y el orden por fecha.
+    
+    created_after (incluido) y created_before (excluido) son fechas ISO
+    ('YYYY-MM-DD' o fecha y hora); order=newest u order=oldest ordena por
+    fecha de creación.
+    
+    Returns:
+        tuple: (created_range, newest_first); created_range es None si no
+        se pide rango ni orden por fecha
+    
+    Raises:
+        ValueError: Si una fecha o el orden no son válidos
+    """
+    bounds = []
+    for name in ('created_after', 'created_before'):
+        value = request.args.get(name, '')
+        stamp = creation_timestamp(value) if value else None
+        if value and stamp is None:
+            raise ValueError(f"{name} debe ser una fecha ISO (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)")
+        bounds.append(stamp)
+    
+    order = request.args.get('order', '')
+    if order not in ('', 'id', 'newest', 'oldest'):
+        raise ValueError("order debe ser uno de: id, newest, oldest")
+    
+    if bounds == [None, None] and order in ('', 'id'):
+        return None, False
+    return tuple(bounds), order == 'newest'
+
+
+def _expected_version():
+    """
+    Obtiene la versión esperada de la cabecera If-Match (ETag "<versión>").
+    
+    También se acepta la ETag de la respuesta comprimida ("<versión>-gzip").
+    
+    Returns:
+        int o None: None si no hay precondición (o es "*"); 0 si la ETag no
+        corresponde a ninguna versión, de modo que la precondición falla
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    for tag in if_match.as_set():
+        tag = strip_encoding(tag)
+        if tag.isdigit():
+            return int(tag)
+    return 0
+
+
+def _int_arg(name, default):
+    """
+    Lee un parámetro entero de la query string.
+    
+    Raises:
+        ValueError: Si el valor no es un entero
+    """
+    value = request.args.get(name, '')
+    return int(value) if value != '' else default
+
+
+def _task_response(task_data, status):
+    """Respuesta JSON de una tarea con su versión como ETag."""
+    response = jsonify(task_data)
+    response.set_etag(str(task_data['version']))
+    return response, status
+
 
 @task_bp.route('/tasks', methods=['GET'])
 def get_all_tasks():
     """
     GET /tasks → devuelve todas las tareas.
+    
+    Admite filtros opcionales por query string: status, priority, assigned_to,
+    created_after y created_before, y el orden order=newest u order=oldest.
+    Las tareas archivadas solo se incluyen con include_archived=1.
+    
+    Con limit (y opcionalmente offset) devuelve solo esa página, con su ETag:
+    con If-None-Match responde 304 si la página no ha cambiado.
+    """
+    try:
+        try:
+            created_range, newest_first = _created_query()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            limit = _int_arg('limit', None)
+            offset = _int_arg('offset', 0)
+        except ValueError:
+            return jsonify({'error': 'limit y offset deben ser números enteros'}), 400
+        
+        if limit is None:
+            payload = TaskManager.get_tasks_payload(_list_filters(), _include_archived(),
+                                                    created_range, newest_first)
+            return Response(payload, mimetype='application/json'), 200
+        
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return jsonify({'error': f'limit debe estar entre 1 y {MAX_PAGE_SIZE}'}), 400
+        if offset < 0:
+            return jsonify({'error': 'offset no puede ser negativo'}), 400
+        
+        payload = TaskManager.get_tasks_page(offset, limit, _list_filters(), _include_archived(),
+                                             created_range, newest_first)
+        response = Response(payload, mimetype='application/json')
+        response.add_etag()
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/stream', methods=['GET'])
+def stream_tasks():
+    """
+    GET /tasks/stream → devuelve todas las tareas en NDJSON (una por línea).
+    
+    El flujo completo sale de una única instantánea del almacén, aunque haya
+    escrituras mientras se envía. Admite los mismos filtros que GET /tasks.
+    """
+    try:
+        try:
+            created_range, newest_first = _created_query()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        lines = TaskManager.iter_tasks_ndjson(_list_filters(), _include_archived(),
+                                              created_range, newest_first)
+        
+        return Response(lines, mimetype='application/x-ndjson'), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/next', methods=['GET'])
+def next_tasks():
+    """
+    GET /tasks/next → las K próximas tareas pendientes a empezar.
+    
+    Query string: assigned_to (opcional), k (por defecto 10, máximo 100) y
+    wip_limit (máximo de tareas en curso por persona; por defecto
+    TaskManager.WIP_LIMIT, 0 = sin límite). Orden: prioridad, esfuerzo y antigüedad.
+    """
+    try:
+        try:
+            k = _int_arg('k', 10)
+            wip_limit = _int_arg('wip_limit', TaskManager.WIP_LIMIT)
+        except ValueError:
+            return jsonify({'error': 'k y wip_limit deben ser números enteros'}), 400
+        
+        if not 1 <= k <= 100:
+            return jsonify({'error': 'k debe estar entre 1 y 100'}), 400
+        if wip_limit < 0:
+            return jsonify({'error': 'wip_limit no puede ser negativo'}), 400
+        
+        assigned_to = request.args.get('assigned_to')
+        tasks, wip = TaskManager.next_tasks(assigned_to, k, wip_limit)
+        
+        result = {'k': k, 'wip_limit': wip_limit, 'tasks': [task.to_dict() for task in tasks]}
+        if assigned_to is not None:
+            result['assigned_to'] = assigned_to
+            result['wip'] = wip[assigned_to]
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/analytics', methods=['GET'])
+def tasks_analytics():
+    """
+    GET /tasks/analytics → informe de carga: horas totales y pendientes por
+    persona, reparto por prioridad y status, percentiles de esfuerzo y
+    tareas creadas y completadas por semana.
     """
     try:
-        tasks = TaskManager.load_tasks()
-        tasks_dict = [task.to_dict() for task in tasks]
+        if not NUMPY_AVAILABLE:
+            return jsonify({'error': 'Los informes de carga requieren numpy (pip install numpy)'}), 501
         
-        return jsonify({
-            'total': len(tasks_dict),
-            'tasks': tasks_dict
-        }), 200
+        return Response(TaskManager.get_analytics_payload(), mimetype='application/json'), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -32,14 +218,20 @@ def get_all_tasks():
 def get_task(task_id):
     """
     GET /tasks/<id> → devuelve una tarea específica.
+    
+    Con include_archived=1 también busca en las tareas archivadas.
     """
     try:
         task = TaskManager.get_task_by_id(task_id)
+        if task is None and _include_archived():
+            task = TaskManager.archive().get(task_id)
         
         if task is None:
             return jsonify({'error': 'Tarea no encontrada'}), 404
         
-        return jsonify(task.to_dict()), 200
+        response = Response(TaskManager.cache.task_fragment(task), mimetype='application/json')
+        response.set_etag(str(task.version))
+        return response, 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -50,25 +242,25 @@ def create_task():
     POST /tasks → crea una tarea nueva.
     """
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({'error': 'No se proporcionaron datos'}), 400
         
-        # Crear objeto Task desde el diccionario
-        task = Task.from_dict(data)
-        
-        # Validar la tarea
-        is_valid, error_message = task.validate()
-        if not is_valid:
-            return jsonify({'error': error_message}), 400
+        # Validar los datos recibidos antes de construir el Task
+        values, errors = TASK_SCHEMA.validate(data)
+        if errors:
+            return jsonify({'error': first_error(errors)}), 400
         
-        # Agregar la tarea usando TaskManager
-        if TaskManager.add_task(task):
-            return jsonify(task.to_dict()), 201
+        # Crear la tarea en un lote de una operación (asigna ID)
+        unit = TaskManager.unit_of_work().create(Task.from_dict({**data, **values}))
+        if TaskManager.commit_unit(unit):
+            return _task_response(unit.results[0]['task'], 201)
         else:
             return jsonify({'error': 'Error al guardar la tarea'}), 500
-            
+    
+    except OperationError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -76,34 +268,60 @@ def create_task():
 @task_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
     """
-    PUT /tasks/<id> → modifica una tarea existente.
+    PUT /tasks/<id> → reemplaza una tarea existente.
+    
+    Admite If-Match igual que PATCH.
     """
     try:
-        # Verificar que la tarea existe
-        existing_task = TaskManager.get_task_by_id(task_id)
-        if existing_task is None:
-            return jsonify({'error': 'Tarea no encontrada'}), 404
-        
-        data = request.get_json()
+        data = request.get_json(silent=True)
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({'error': 'No se proporcionaron datos para actualizar'}), 400
         
-        # Crear objeto Task con los datos actualizados
-        updated_task = Task.from_dict(data)
+        values, errors = TASK_SCHEMA.validate(data)
+        if errors:
+            return jsonify({'error': first_error(errors)}), 400
+        
+        # Comprobar y reemplazar con una sola carga y un solo guardado
+        unit = TaskManager.unit_of_work().update(task_id, Task.from_dict({**data, **values}), _expected_version())
+        if TaskManager.commit_unit(unit):
+            return _task_response(unit.results[0]['task'], 200)
+        else:
+            return jsonify({'error': 'Error al actualizar la tarea'}), 500
+    
+    except OperationError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/<int:task_id>', methods=['PATCH'])
+def patch_task(task_id):
+    """
+    PATCH /tasks/<id> → modifica solo los campos enviados.
+    
+    Con la cabecera If-Match: "<versión>" (la ETag de GET /tasks/<id>) el
+    cambio solo se aplica si la tarea sigue en esa versión; si otra petición
+    la modificó entretanto responde 412.
+    """
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not isinstance(data, dict):
+            return jsonify({'error': 'No se proporcionaron datos para actualizar'}), 400
         
-        # Validar la tarea
-        is_valid, error_message = updated_task.validate()
-        if not is_valid:
-            return jsonify({'error': error_message}), 400
+        values, errors = TASK_SCHEMA.validate(data, partial=True)
+        if errors:
+            return jsonify({'error': first_error(errors)}), 400
         
-        # Actualizar la tarea usando TaskManager
-        if TaskManager.update_task(task_id, updated_task):
-            updated_task = TaskManager.get_task_by_id(task_id)
-            return jsonify(updated_task.to_dict()), 200
+        unit = TaskManager.unit_of_work().patch(task_id, values, _expected_version())
+        if TaskManager.commit_unit(unit):
+            return _task_response(unit.results[0]['task'], 200)
         else:
             return jsonify({'error': 'Error al actualizar la tarea'}), 500
-            
+    
+    except OperationError as e:
+        return jsonify({'error': e.message}), e.status
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -112,22 +330,93 @@ def update_task(task_id):
 def delete_task(task_id):
     """
     DELETE /tasks/<id> → elimina una tarea.
+    
+    Admite If-Match igual que PATCH.
     """
     try:
-        # Verificar que la tarea existe
-        existing_task = TaskManager.get_task_by_id(task_id)
-        if existing_task is None:
-            return jsonify({'error': 'Tarea no encontrada'}), 404
-        
-        # Eliminar la tarea usando TaskManager
-        if TaskManager.delete_task(task_id):
+        unit = TaskManager.unit_of_work().delete(task_id, _expected_version())
+        if TaskManager.commit_unit(unit):
             return jsonify({
                 'message': 'Tarea eliminada exitosamente',
                 'id': task_id
             }), 200
         else:
             return jsonify({'error': 'Error al eliminar la tarea'}), 500
-            
+    
+    except OperationError as e:
+        return jsonify({'error': e.message}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/batch', methods=['POST'])
+def batch_tasks():
+    """
+    POST /tasks/batch → aplica varias operaciones de forma atómica.
+    
+    Body: {"operations": [{"op": "create", "task": {...}},
+                          {"op": "update", "id": 3, "task": {...}},
+                          {"op": "patch", "id": 3, "task": {...}, "version": 2},
+                          {"op": "delete", "id": 3}]}
+    
+    Las operaciones se aplican en orden con una sola carga y un solo guardado:
+    o se aplican todas o ninguna. Si una falla, la respuesta lleva su código,
+    el error y su posición ("index") en el lote.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        
+        unit = TaskManager.unit_of_work(data.get('operations'))
+        if TaskManager.commit_unit(unit):
+            return jsonify({'results': unit.results}), 200
+        else:
+            return jsonify({'error': 'Error al guardar las tareas'}), 500
+    
+    except OperationError as e:
+        return jsonify({'error': e.message, 'index': e.index}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@task_bp.route('/tasks/archive', methods=['POST'])
+def archive_tasks():
+    """
+    POST /tasks/archive → mueve al archivo las tareas completadas antiguas.
+    
+    Body opcional: {"older_than_days": N} (por defecto TaskManager.ARCHIVE_AFTER_DAYS).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+        older_than_days = data.get('older_than_days')
+        
+        if older_than_days is not None:
+            if not isinstance(older_than_days, (int, float)) or older_than_days < 0:
+                return jsonify({'error': 'older_than_days debe ser un número positivo'}), 400
+        
+        archived = TaskManager.archive_completed(older_than_days)
+        
+        return jsonify({'archived': archived}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+@task_bp.route('/tasks/<int:task_id>/restore', methods=['POST'])
+def restore_task(task_id):
+    """
+    POST /tasks/<id>/restore → devuelve una tarea archivada al almacén activo.
+    """
+    try:
+        if TaskManager.get_task_by_id(task_id) is not None:
+            return jsonify({'error': 'La tarea no está archivada'}), 409
+        
+        task = TaskManager.restore_task(task_id)
+        if task is None:
+            return jsonify({'error': 'Tarea archivada no encontrada'}), 404
+        
+        return jsonify(task.to_dict()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,13 @@
+"""
+Módulo de serializadores para la aplicación de gestión de tareas.
+"""
+
+from .task_serializer import (
+    TASK_FIELDS,
+    TaskJSONProvider,
+    row_to_dict,
+    tarea_to_dict,
+    task_columns,
+)
+
+__all__ = ['TASK_FIELDS', 'TaskJSONProvider', 'row_to_dict', 'tarea_to_dict', 'task_columns']
@@ -0,0 +1,109 @@
+"""
+Serialización de tareas (Tarea) para la API REST de app.py.
+
+Las consultas de solo lectura seleccionan únicamente las columnas necesarias
+como tuplas (with_entities), sin hidratar objetos ORM, y las respuestas se
+codifican con un proveedor JSON compacto que evita el trabajo extra de Flask.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+
+
+# Orden de los campos en cada tupla y en cada diccionario de respuesta
+TASK_FIELDS = (
+    'id',
+    'title',
+    'description',
+    'priority',
+    'effort_hours',
+    'status',
+    'assigned_to',
+    'fecha_creacion',
+    'version',
+)
+
+
+def task_columns(model):
+    """
+    Devuelve las columnas del modelo en el orden de TASK_FIELDS.
+
+    Args:
+        model: Clase del modelo SQLAlchemy (Tarea)
+
+    Returns:
+        tuple: Columnas para usar con query.with_entities(*columnas)
+    """
+    return tuple(getattr(model, field) for field in TASK_FIELDS)
+
+
+def row_to_dict(row):
+    """
+    Convierte una tupla de columnas (ver TASK_FIELDS) en el diccionario de la API.
+
+    Args:
+        row: Tupla o Row con los valores en el orden de TASK_FIELDS
+
+    Returns:
+        dict: Diccionario con los datos de la tarea
+    """
+    task_id, title, description, priority, effort_hours, status, assigned_to, fecha_creacion, version = row[:9]
+    return {
+        'id': task_id,
+        'title': title,
+        'description': description,
+        'priority': priority,
+        'effort_hours': float(effort_hours) if effort_hours is not None else None,
+        'status': status,
+        'assigned_to': assigned_to,
+        'fecha_creacion': fecha_creacion.isoformat() if fecha_creacion else None,
+        'version': version
+    }
+
+
+def tarea_to_dict(tarea):
+    """
+    Convierte un objeto Tarea ya cargado en el diccionario de la API.
+
+    Args:
+        tarea: Objeto Tarea
+
+    Returns:
+        dict: Diccionario con los datos de la tarea
+    """
+    return row_to_dict(tuple(getattr(tarea, field) for field in TASK_FIELDS))
+
+
+def _default(obj):
+    """Convierte los tipos que json no sabe serializar."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Objeto de tipo {type(obj).__name__} no es serializable a JSON")
+
+
+# Codificador preconstruido: sin sort_keys, sin indentación y sin escapar UTF-8
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+
+class TaskJSONProvider(JSONProvider):
+    """
+    Proveedor JSON compacto para Flask.
+
+    A diferencia del proveedor por defecto no ordena claves ni indenta en modo
+    debug, y reutiliza un único codificador para todas las respuestas.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('ensure_ascii', False)
+            return json.dumps(obj, **kwargs)
+        return _encoder.encode(obj)
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
@@ -1,37 +1,257 @@
 const API_BASE = 'http://localhost:5000';
 
+// Tareas por página al pedir el listado (GET /tasks?offset=&limit=)
+const PAGE_SIZE = 50;
+
+// Filas que se renderizan por encima y por debajo de la zona visible
+const OVERSCAN = 5;
+
+// Estado del listado en el cliente. Solo se piden las páginas que llegan a
+// verse y solo existen en el DOM las tarjetas de la zona visible.
+const taskList = {
+    tasksById: new Map(),   // id → tarea
+    order: [],              // posición → id (huecos en las posiciones aún no cargadas)
+    total: null,            // tareas en el servidor (null hasta la primera página)
+    cards: new Map(),       // id (o 'hueco-<posición>') → tarjeta en el DOM
+    pending: new Set(),     // offsets de las páginas que se están pidiendo
+    etags: new Map(),       // offset → ETag de la página, para revalidar con If-None-Match
+    generation: 0,          // aumenta cuando cambian las posiciones; descarta páginas en vuelo
+    rowHeight: 0,
+    frame: null
+};
+
 // Cargar tareas al iniciar
 document.addEventListener('DOMContentLoaded', () => {
+    window.addEventListener('scroll', scheduleRender, { passive: true });
+    window.addEventListener('resize', () => {
+        taskList.rowHeight = 0;
+        scheduleRender();
+    });
     loadTasks();
 });
 
-// Cargar todas las tareas
+// Cargar las tareas: la primera página o, si ya hay tareas, revalidar las visibles
 async function loadTasks() {
+    if (taskList.total === null) {
+        await loadPage(0);
+        return;
+    }
+    
+    // Las posiciones fuera de la zona visible se olvidan y se pedirán al llegar a ellas
+    const [first, last] = visibleRange();
+    const firstPage = Math.floor(first / PAGE_SIZE) * PAGE_SIZE;
+    const kept = taskList.order.slice(firstPage, last);
+    taskList.order = new Array(taskList.total);
+    kept.forEach((id, index) => {
+        taskList.order[firstPage + index] = id;
+    });
+    for (const offset of [...taskList.etags.keys()]) {
+        if (offset < firstPage || offset >= last) {
+            taskList.etags.delete(offset);
+        }
+    }
+    
+    const pages = [];
+    for (let offset = firstPage; offset < Math.max(last, 1); offset += PAGE_SIZE) {
+        pages.push(loadPage(offset, true));
+    }
+    await Promise.all(pages);
+}
+
+// Pedir una página del listado; con revalidate, solo si cambió desde la última vez
+async function loadPage(offset, revalidate = false) {
+    if (taskList.pending.has(offset)) {
+        return;
+    }
+    taskList.pending.add(offset);
+    const generation = taskList.generation;
+    
     try {
-        const response = await fetch(`${API_BASE}/tasks`);
+        const headers = {};
+        const etag = taskList.etags.get(offset);
+        if (revalidate && etag) {
+            headers['If-None-Match'] = etag;
+        }
+        const response = await fetch(`${API_BASE}/tasks?offset=${offset}&limit=${PAGE_SIZE}`, {
+            headers: headers,
+            cache: 'no-store'
+        });
+        
+        // La página ya no corresponde a las posiciones actuales: se volverá a pedir
+        if (generation !== taskList.generation || response.status === 304) {
+            return;
+        }
         const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error || response.statusText);
+        }
         
-        displayTasks(data.tasks || []);
+        applyPage(data, response.headers.get('ETag'));
     } catch (error) {
         showMessage('Error al cargar las tareas: ' + error.message, 'error');
+    } finally {
+        taskList.pending.delete(offset);
+        scheduleRender();
     }
 }
 
-// Mostrar tareas en el contenedor
-function displayTasks(tasks) {
-    const container = document.getElementById('tasksContainer');
+// Incorporar una página recibida al estado local
+function applyPage(data, etag) {
+    const ids = data.tasks.map(task => task.id);
+    const current = taskList.order.slice(data.offset, data.offset + ids.length);
+    const moved = current.some((id, index) => id !== undefined && id !== ids[index]);
     
-    if (tasks.length === 0) {
-        container.innerHTML = `
-            <div class="empty-state">
-                <h3>📭 No hay tareas</h3>
-                <p>Crea tu primera tarea para comenzar</p>
-            </div>
-        `;
+    // Otra persona creó o eliminó tareas: las posiciones conocidas ya no valen.
+    // Las tareas (y sus tarjetas) se conservan por id y se reutilizan.
+    if (data.total !== taskList.total || moved) {
+        resetPositions(data.total);
+    }
+    
+    data.tasks.forEach((task, index) => {
+        taskList.order[data.offset + index] = task.id;
+        upsertTask(task);
+    });
+    if (etag) {
+        taskList.etags.set(data.offset, etag);
+    }
+}
+
+// Olvidar las posiciones conocidas (no las tareas) con un nuevo total
+function resetPositions(total) {
+    taskList.total = total;
+    taskList.order = new Array(total);
+    taskList.etags.clear();
+    taskList.generation++;
+}
+
+// Guardar una tarea y actualizar su tarjeta solo si cambió
+function upsertTask(task) {
+    const previous = taskList.tasksById.get(task.id);
+    taskList.tasksById.set(task.id, task);
+    
+    const card = taskList.cards.get(task.id);
+    if (card && (!previous || previous.version !== task.version)) {
+        const updated = createCard(task);
+        updated.style.top = card.style.top;
+        card.replaceWith(updated);
+        taskList.cards.set(task.id, updated);
+    }
+}
+
+// Quitar una tarea del listado local
+function removeTask(id) {
+    const index = taskList.order.indexOf(id);
+    if (index !== -1) {
+        taskList.order.splice(index, 1);
+        taskList.total--;
+        // Las posiciones siguientes se desplazan: las páginas ya pedidas no coinciden
+        taskList.etags.clear();
+        taskList.generation++;
+    }
+    taskList.tasksById.delete(id);
+    const card = taskList.cards.get(id);
+    if (card) {
+        card.remove();
+        taskList.cards.delete(id);
+    }
+    scheduleRender();
+}
+
+// Añadir una tarea recién creada (el listado va por id, así que queda al final)
+function appendTask(task) {
+    if (taskList.total === null) {
+        loadTasks();
+        return;
+    }
+    taskList.order[taskList.total] = task.id;
+    taskList.total++;
+    taskList.generation++;
+    upsertTask(task);
+    scheduleRender();
+}
+
+// Redibujar como mucho una vez por fotograma
+function scheduleRender() {
+    if (taskList.frame === null) {
+        taskList.frame = requestAnimationFrame(renderTasks);
+    }
+}
+
+// Alto de cada fila (tarjeta + separación), definido en la hoja de estilos
+function rowHeight() {
+    if (!taskList.rowHeight) {
+        const container = document.getElementById('tasksContainer');
+        taskList.rowHeight = parseFloat(getComputedStyle(container).getPropertyValue('--task-row-height')) || 300;
+    }
+    return taskList.rowHeight;
+}
+
+// Posiciones [primera, última) del listado que están en pantalla, con margen
+function visibleRange() {
+    const list = document.getElementById('tasksList');
+    const height = rowHeight();
+    const top = list.getBoundingClientRect().top;
+    const first = Math.max(0, Math.floor(-top / height) - OVERSCAN);
+    const last = Math.min(taskList.total || 0, Math.ceil((window.innerHeight - top) / height) + OVERSCAN);
+    return [first, Math.max(first, last)];
+}
+
+// Mostrar solo las tarjetas de la zona visible, reutilizando las que ya existen
+function renderTasks() {
+    taskList.frame = null;
+    const list = document.getElementById('tasksList');
+    
+    document.getElementById('tasksLoading').style.display = taskList.total === null ? 'block' : 'none';
+    document.getElementById('tasksEmpty').style.display = taskList.total === 0 ? 'block' : 'none';
+    if (taskList.total === null) {
         return;
     }
     
-    container.innerHTML = tasks.map(task => `
+    const height = rowHeight();
+    list.style.height = `${taskList.total * height}px`;
+    const [first, last] = visibleRange();
+    
+    const visible = new Set();
+    for (let index = first; index < last; index++) {
+        const id = taskList.order[index];
+        const key = id === undefined ? `hueco-${index}` : id;
+        visible.add(key);
+        
+        let card = taskList.cards.get(key);
+        if (!card) {
+            card = id === undefined ? createPlaceholder() : createCard(taskList.tasksById.get(id));
+            taskList.cards.set(key, card);
+            list.appendChild(card);
+        }
+        const top = `${index * height}px`;
+        if (card.style.top !== top) {
+            card.style.top = top;
+        }
+    }
+    
+    for (const [key, card] of taskList.cards) {
+        if (!visible.has(key)) {
+            card.remove();
+            taskList.cards.delete(key);
+        }
+    }
+    
+    // Pedir las páginas con huecos en la zona visible
+    for (let offset = Math.floor(first / PAGE_SIZE) * PAGE_SIZE; offset < last; offset += PAGE_SIZE) {
+        const end = Math.min(offset + PAGE_SIZE, last);
+        for (let index = Math.max(offset, first); index < end; index++) {
+            if (taskList.order[index] === undefined) {
+                loadPage(offset);
+                break;
+            }
+        }
+    }
+}
+
+// Crear la tarjeta de una tarea
+function createCard(task) {
+    const template = document.createElement('template');
+    template.innerHTML = `
         <div class="task-card">
             <div class="task-header">
                 <div>
@@ -57,7 +277,26 @@ function displayTasks(tasks) {
                 <button class="btn btn-danger" onclick="deleteTask(${task.id})">🗑️ Eliminar</button>
             </div>
         </div>
-    `).join('');
+    `;
+    return template.content.firstElementChild;
+}
+
+// Tarjeta provisional para una posición cuya página aún no ha llegado
+function createPlaceholder() {
+    const card = document.createElement('div');
+    card.className = 'task-card task-card-placeholder';
+    card.textContent = 'Cargando...';
+    return card;
+}
+
+// Mostrar una posición del listado en pantalla
+function revealTask(id) {
+    const index = taskList.order.indexOf(id);
+    if (index !== -1) {
+        const list = document.getElementById('tasksList');
+        const top = list.getBoundingClientRect().top + window.scrollY + index * rowHeight();
+        window.scrollTo({ top: top, behavior: 'smooth' });
+    }
 }
 
 // Mostrar formulario para crear tarea
@@ -65,13 +304,16 @@ function showCreateForm() {
     document.getElementById('formTitle').textContent = 'Nueva Tarea';
     document.getElementById('taskFormElement').reset();
     document.getElementById('taskId').value = '';
+    document.getElementById('taskVersion').value = '';
     document.getElementById('taskForm').style.display = 'block';
     document.getElementById('taskForm').scrollIntoView({ behavior: 'smooth' });
+    scheduleRender();
 }
 
 // Ocultar formulario
 function hideForm() {
     document.getElementById('taskForm').style.display = 'none';
+    scheduleRender();
 }
 
 // Editar tarea
@@ -79,9 +321,19 @@ async function editTask(id) {
     try {
         const response = await fetch(`${API_BASE}/tasks/${id}`);
         const task = await response.json();
+        if (response.status === 404) {
+            showMessage('La tarea ya no existe', 'error');
+            removeTask(id);
+            return;
+        }
+        if (!response.ok) {
+            throw new Error(task.error || response.statusText);
+        }
+        upsertTask(task);
         
         document.getElementById('formTitle').textContent = 'Editar Tarea';
         document.getElementById('taskId').value = task.id;
+        document.getElementById('taskVersion').value = task.version || '';
         document.getElementById('title').value = task.title || '';
         document.getElementById('description').value = task.description || '';
         document.getElementById('priority').value = task.priority || 'media';
@@ -113,12 +365,15 @@ async function saveTask(event) {
     try {
         let response;
         if (taskId) {
-            // Actualizar tarea existente
+            // Actualizar tarea existente, solo si nadie la modificó desde que se abrió el formulario
+            const headers = { 'Content-Type': 'application/json' };
+            const taskVersion = document.getElementById('taskVersion').value;
+            if (taskVersion) {
+                headers['If-Match'] = `"${taskVersion}"`;
+            }
             response = await fetch(`${API_BASE}/tasks/${taskId}`, {
-                method: 'PUT',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
+                method: 'PATCH',
+                headers: headers,
                 body: JSON.stringify(taskData)
             });
         } else {
@@ -133,9 +388,23 @@ async function saveTask(event) {
         }
         
         if (response.ok) {
+            // La respuesta trae la tarea guardada: solo cambia su tarjeta
+            const task = await response.json();
             showMessage(taskId ? 'Tarea actualizada exitosamente' : 'Tarea creada exitosamente', 'success');
             hideForm();
-            loadTasks();
+            if (taskId) {
+                upsertTask(task);
+            } else {
+                appendTask(task);
+                revealTask(task.id);
+            }
+        } else if (response.status === 412) {
+            showMessage('La tarea fue modificada por otra persona. Vuelve a abrirla para ver los cambios.', 'error');
+            refreshTask(Number(taskId));
+        } else if (response.status === 404) {
+            showMessage('La tarea ya no existe', 'error');
+            hideForm();
+            removeTask(Number(taskId));
         } else {
             const error = await response.json();
             showMessage('Error: ' + (error.error || 'No se pudo guardar la tarea'), 'error');
@@ -156,9 +425,9 @@ async function deleteTask(id) {
             method: 'DELETE'
         });
         
-        if (response.ok) {
-            showMessage('Tarea eliminada exitosamente', 'success');
-            loadTasks();
+        if (response.ok || response.status === 404) {
+            showMessage(response.ok ? 'Tarea eliminada exitosamente' : 'La tarea ya no existe', response.ok ? 'success' : 'error');
+            removeTask(id);
         } else {
             const error = await response.json();
             showMessage('Error: ' + (error.error || 'No se pudo eliminar la tarea'), 'error');
@@ -168,6 +437,20 @@ async function deleteTask(id) {
     }
 }
 
+// Volver a leer una sola tarea del servidor
+async function refreshTask(id) {
+    try {
+        const response = await fetch(`${API_BASE}/tasks/${id}`, { cache: 'no-store' });
+        if (response.status === 404) {
+            removeTask(id);
+        } else if (response.ok) {
+            upsertTask(await response.json());
+        }
+    } catch (error) {
+        showMessage('Error al cargar la tarea: ' + error.message, 'error');
+    }
+}
+
 // Mostrar mensaje
 function showMessage(text, type) {
     const messageDiv = document.getElementById('message');
@@ -0,0 +1,70 @@
+"""
+Fixtures comunes: cliente de app_simple.py sobre un directorio temporal y
+base de datos de app.py en un archivo SQLite temporal.
+"""
+
+import os
+import tempfile
+
+# app.py lee la configuración del entorno al importarse: base de datos y
+# trabajos fuera del proyecto y hashes de contraseña rápidos y sin pool
+_SQL_DIR = tempfile.mkdtemp(prefix='tareas-tests-')
+_SQL_FILE = os.path.join(_SQL_DIR, 'tareas.db')
+os.environ['TASKS_DATABASE_URI'] = f'sqlite:///{_SQL_FILE}'
+os.environ['TASKS_JOBS_FILE'] = os.path.join(_SQL_DIR, 'jobs.json')
+os.environ['TASKS_JOBS_DIR'] = os.path.join(_SQL_DIR, 'job_results')
+os.environ['TASKS_PASSWORD_HASH_WORKERS'] = '0'
+os.environ['TASKS_PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+
+import pytest
+
+import app_simple
+from managers.task_cache import TaskResponseCache
+from managers.task_manager import TaskManager
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Cliente de pruebas con un almacén JSON vacío en tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(TaskManager, 'cache', TaskResponseCache())
+    monkeypatch.setattr(TaskManager, '_snapshot', None)
+    monkeypatch.setattr(TaskManager, '_file_stamp', None)
+    monkeypatch.setattr(TaskManager, '_archive', None)
+    monkeypatch.setattr(TaskManager, '_shared', None)
+    # Sin límites de ritmo: todas las peticiones vienen de la misma IP
+    monkeypatch.setitem(app_simple.app.config, 'ADMISSION_ENABLED', False)
+    return app_simple.app.test_client()
+
+
+@pytest.fixture
+def database():
+    """
+    Base de datos de app.py vacía (sin tablas); el test crea el esquema que necesite.
+
+    Returns:
+        module: El módulo app, con app y db
+    """
+    import app as sql_app
+    with sql_app.app.app_context():
+        sql_app.db.session.remove()
+        sql_app.db.engine.dispose()
+    if os.path.exists(_SQL_FILE):
+        os.remove(_SQL_FILE)
+    sql_app.dashboard_cache.invalidate()
+    yield sql_app
+    with sql_app.app.app_context():
+        sql_app.db.session.remove()
+        sql_app.db.engine.dispose()
+
+
+@pytest.fixture
+def sql_client(database):
+    """Cliente de app.py con el esquema actual y un administrador con la sesión iniciada."""
+    database.init_db()
+    client = database.app.test_client()
+    response = client.post('/register', data={'nombre': 'Admin', 'email': 'admin@example.com',
+                                              'password': 'secreto123', 'confirm_password': 'secreto123'})
+    assert response.status_code in (200, 302)
+    client.post('/login', data={'email': 'admin@example.com', 'password': 'secreto123'})
+    return client
@@ -0,0 +1,75 @@
+"""
+Control de admisión: límite de ritmo por cliente y concurrencia con cola.
+"""
+
+import threading
+
+import pytest
+from flask import Flask
+
+from middleware.admission import AdmissionController, AdmissionGate, AdmissionPolicy, Overloaded, TokenBucket
+
+
+def policy(name, priority=0, concurrent=1, queue=1, timeout=1.0, rate=0, burst=1):
+    return AdmissionPolicy(name, priority, concurrent, queue, timeout, rate, burst)
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=2, burst=2, now=0.0)
+    
+    assert bucket.take(0.0) == 0 and bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0
+
+
+def test_gate_rejects_when_queue_is_full():
+    gate = AdmissionGate(capacity=1)
+    write = policy('write', queue=0)
+    gate.acquire(write)
+    
+    with pytest.raises(Overloaded) as error:
+        gate.acquire(write)
+    assert error.value.status == 503
+    gate.release(write)
+    gate.acquire(write)
+
+
+def test_gate_wakes_waiters_by_priority():
+    gate = AdmissionGate(capacity=1)
+    read, bulk = policy('read', 0, concurrent=2, queue=2), policy('bulk', 2, concurrent=2, queue=2)
+    gate.acquire(read)
+    order = []
+    
+    def wait(p):
+        gate.acquire(p)
+        order.append(p.name)
+        gate.release(p)
+    
+    threads = [threading.Thread(target=wait, args=(p,)) for p in (bulk, read)]
+    for thread in threads:
+        thread.start()
+    while len(gate._waiting) < 2:
+        pass
+    gate.release(read)
+    for thread in threads:
+        thread.join(timeout=5)
+    
+    assert order == ['read', 'bulk']
+
+
+def test_rate_limit_answers_429_with_retry_after():
+    app = Flask(__name__)
+    app.add_url_rule('/tasks', 'tasks', lambda: 'ok', methods=['GET', 'POST'])
+    app.add_url_rule('/otra', 'otra', lambda: 'ok')
+    policies = {'read': policy('read', rate=1, burst=2, concurrent=4),
+                'write': policy('write', rate=1, burst=1), 'bulk': policy('bulk', rate=1, burst=1)}
+    controller = AdmissionController(app, policies=policies, capacity=4)
+    client = app.test_client()
+    
+    assert [client.get('/tasks').status_code for _ in range(3)] == [200, 200, 429]
+    limited = client.get('/tasks')
+    assert limited.headers['Retry-After'] == '1'
+    assert client.post('/tasks').status_code == 200
+    assert client.get('/otra').status_code == 200
+    # Cada petición admitida libera su hueco al terminar
+    assert controller.gate._active == 0
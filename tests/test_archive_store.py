@@ -0,0 +1,77 @@
+"""
+Archivo frío de tareas completadas (TaskArchive y sus rutas).
+"""
+
+import os
+
+from managers.archive_store import TaskArchive
+from models.task import Task
+
+
+def make_tasks(*ids):
+    return [Task(id=i, title=f'Tarea {i}', status='completada') for i in ids]
+
+
+def truncate_last_member(path, size_before):
+    """Simula un proceso que murió a mitad del último append."""
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(size_before + (size - size_before) // 2)
+
+
+def test_truncated_tail_is_ignored(tmp_path):
+    archive = TaskArchive(str(tmp_path / 'archive.ndjson.gz'))
+    archive.append(make_tasks(1, 2))
+    size = os.path.getsize(archive.path)
+    archive.append(make_tasks(*range(3, 200)))
+    truncate_last_member(archive.path, size)
+    
+    reopened = TaskArchive(archive.path)
+    assert [task.id for task in reopened.load()][:2] == [1, 2]
+    assert reopened.get(1).title == 'Tarea 1'
+
+
+def test_append_after_truncated_tail_is_readable(tmp_path):
+    archive = TaskArchive(str(tmp_path / 'archive.ndjson.gz'))
+    archive.append(make_tasks(1, 2))
+    size = os.path.getsize(archive.path)
+    archive.append(make_tasks(*range(3, 200)))
+    truncate_last_member(archive.path, size)
+    
+    reopened = TaskArchive(archive.path)
+    reopened.append(make_tasks(500))
+    
+    ids = [task.id for task in TaskArchive(archive.path).load()]
+    assert ids[:2] == [1, 2] and ids[-1] == 500
+    assert reopened.max_id() == 500
+
+
+def test_create_cannot_reuse_archived_id(client):
+    client.post('/tasks', json={'id': 5, 'title': 'Hecha', 'status': 'completada'})
+    assert client.post('/tasks/archive', json={'older_than_days': 0}).get_json() == {'archived': 1}
+    
+    response = client.post('/tasks', json={'id': 5, 'title': 'Otra'})
+    assert response.status_code == 409
+    batch = client.post('/tasks/batch', json={'operations': [{'op': 'create', 'task': {'id': 5, 'title': 'Otra'}}]})
+    assert batch.status_code == 409
+    
+    # Los ids libres por debajo del mayor archivado siguen disponibles
+    assert client.post('/tasks', json={'id': 3, 'title': 'Libre'}).status_code == 201
+    assert client.post('/tasks/5/restore').get_json()['title'] == 'Hecha'
+
+
+def test_archive_moves_only_old_completed_tasks(client):
+    client.post('/tasks', json={'title': 'Antigua', 'status': 'completada', 'fecha_creacion': '2020-01-01T00:00:00'})
+    client.post('/tasks', json={'title': 'Reciente', 'status': 'completada'})
+    client.post('/tasks', json={'title': 'Abierta', 'fecha_creacion': '2020-01-01T00:00:00'})
+    
+    assert client.post('/tasks/archive', json={'older_than_days': 30}).get_json() == {'archived': 1}
+    
+    assert [t['title'] for t in client.get('/tasks').get_json()['tasks']] == ['Reciente', 'Abierta']
+    archived = client.get('/tasks?include_archived=1').get_json()
+    assert sorted(t['title'] for t in archived['tasks']) == ['Abierta', 'Antigua', 'Reciente']
+    
+    assert client.post('/tasks/2/restore').status_code == 409
+    assert client.post('/tasks/99/restore').status_code == 404
+    assert client.post('/tasks/1/restore').get_json()['title'] == 'Antigua'
+    assert client.get('/tasks').get_json()['total'] == 3
@@ -0,0 +1,64 @@
+"""
+Lote atómico de operaciones (POST /tasks/batch y TaskUnitOfWork).
+"""
+
+from managers.unit_of_work import TaskUnitOfWork
+
+
+def titles(client):
+    return {task['id']: task['title'] for task in client.get('/tasks').get_json()['tasks']}
+
+
+def test_batch_applies_operations_in_order(client):
+    client.post('/tasks', json={'title': 'Borrar'})
+    client.post('/tasks', json={'title': 'Cambiar'})
+    
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': {'title': 'Nueva'}},
+        {'op': 'patch', 'id': 3, 'task': {'status': 'en_progreso'}},
+        {'op': 'update', 'id': 2, 'task': {'title': 'Cambiada'}},
+        {'op': 'delete', 'id': 1},
+    ]})
+    
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [(r['op'], r['status']) for r in results] == [
+        ('create', 201), ('patch', 200), ('update', 200), ('delete', 200)]
+    assert results[1]['task']['status'] == 'en_progreso'
+    assert titles(client) == {2: 'Cambiada', 3: 'Nueva'}
+
+
+def test_failed_operation_rolls_back_the_batch(client):
+    client.post('/tasks', json={'title': 'Original'})
+    
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': {'title': 'No debe quedar'}},
+        {'op': 'patch', 'id': 1, 'task': {'title': 'No debe cambiar'}},
+        {'op': 'delete', 'id': 99},
+    ]})
+    
+    assert response.status_code == 404
+    assert response.get_json()['index'] == 2
+    assert titles(client) == {1: 'Original'}
+
+
+def test_stale_version_fails_with_412(client):
+    client.post('/tasks', json={'title': 'Original'})
+    client.patch('/tasks/1', json={'title': 'Segunda versión'})
+    
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'patch', 'id': 1, 'task': {'title': 'Tarde'}, 'version': 1},
+    ]})
+    
+    assert response.status_code == 412
+    assert titles(client) == {1: 'Segunda versión'}
+
+
+def test_batch_size_is_limited(client):
+    operations = [{'op': 'create', 'task': {'title': 'x'}}] * (TaskUnitOfWork.MAX_OPERATIONS + 1)
+    
+    response = client.post('/tasks/batch', json={'operations': operations})
+    
+    assert response.status_code == 400
+    assert client.post('/tasks/batch', json={'operations': []}).status_code == 400
+    assert titles(client) == {}
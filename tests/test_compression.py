@@ -0,0 +1,69 @@
+"""
+Compresión de las respuestas JSON y NDJSON (ResponseCompression), también en streaming.
+"""
+
+import gzip
+import json
+import zlib
+
+import pytest
+
+import app_simple
+from middleware import compression as compression_module
+
+
+def create_tasks(client, count):
+    for i in range(count):
+        assert client.post('/tasks', json={'title': f'Tarea {i}', 'description': 'x' * 200}).status_code == 201
+
+
+def test_stream_is_gzipped_ndjson(client):
+    create_tasks(client, 20)
+    before = app_simple.compression.stats()['gzip']['streamed']
+    
+    response = client.get('/tasks/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+    
+    lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+    assert [json.loads(line)['title'] for line in lines] == [f'Tarea {i}' for i in range(20)]
+    assert app_simple.compression.stats()['gzip']['streamed'] == before + 1
+
+
+def test_stream_flushes_in_parts(client, monkeypatch):
+    # Con un umbral mínimo cada tarea se vacía por separado y cada parte se puede descomprimir ya
+    monkeypatch.setattr(compression_module, 'STREAM_FLUSH_BYTES', 1)
+    create_tasks(client, 5)
+    
+    response = client.get('/tasks/stream', headers={'Accept-Encoding': 'deflate'}, buffered=False)
+    assert response.headers['Content-Encoding'] == 'deflate'
+    decompressor = zlib.decompressobj()
+    parts = [decompressor.decompress(chunk) for chunk in response.response]
+    response.close()
+    
+    received = [part for part in parts if part]
+    assert len(received) >= 5
+    assert b''.join(parts).count(b'\n') == 5
+
+
+@pytest.mark.parametrize('accept, expected', [
+    ('gzip', 'gzip'), ('deflate', 'deflate'), ('gzip;q=0.5, deflate', 'deflate'), ('identity', None),
+])
+def test_negotiated_encoding(client, accept, expected):
+    create_tasks(client, 20)
+    response = client.get('/tasks', headers={'Accept-Encoding': accept})
+    assert response.headers.get('Content-Encoding') == expected
+    
+    data = response.get_data()
+    if expected is not None:
+        data = zlib.decompress(data, compression_module.WBITS[expected])
+    assert json.loads(data)['total'] == 20
+
+
+def test_small_response_is_not_compressed(client):
+    before = app_simple.compression.stats()['skipped_small']
+    response = client.get('/tasks/999', headers={'Accept-Encoding': 'gzip'})
+    
+    assert 'Content-Encoding' not in response.headers
+    assert app_simple.compression.stats()['skipped_small'] == before + 1
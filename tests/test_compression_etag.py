@@ -0,0 +1,34 @@
+"""
+If-Match con la ETag de una respuesta comprimida (ver strip_encoding).
+"""
+
+import pytest
+
+from middleware.compression import strip_encoding
+
+
+@pytest.mark.parametrize('etag, expected', [
+    ('5-gzip', '5'), ('5-deflate', '5'), ('5', '5'), ('gzip', 'gzip'),
+])
+def test_strip_encoding(etag, expected):
+    assert strip_encoding(etag) == expected
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate'])
+def test_if_match_round_trip_with_compressed_etag(client, encoding):
+    # Una descripción larga supera COMPRESS_MIN_SIZE y la respuesta se comprime
+    created = client.post('/tasks', json={'title': 'Larga', 'description': 'x' * 4096})
+    task_id = created.get_json()['id']
+    
+    response = client.get(f'/tasks/{task_id}', headers={'Accept-Encoding': encoding})
+    assert response.headers['Content-Encoding'] == encoding
+    etag = response.headers['ETag']
+    assert etag == f'"1-{encoding}"'
+    
+    updated = client.patch(f'/tasks/{task_id}', json={'status': 'en_progreso'}, headers={'If-Match': etag})
+    assert updated.status_code == 200
+    assert updated.get_json()['version'] == 2
+    
+    # La misma ETag ya no corresponde a la versión actual
+    stale = client.patch(f'/tasks/{task_id}', json={'status': 'completada'}, headers={'If-Match': etag})
+    assert stale.status_code == 412
@@ -0,0 +1,41 @@
+"""
+tasks.json dañado: se guarda una copia y no se sobrescribe con una colección vacía.
+"""
+
+import glob
+import json
+
+import pytest
+
+from managers.task_manager import CorruptStoreError, TaskManager
+
+
+def test_corrupt_file_is_backed_up_and_never_overwritten(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    damaged = '[{"id": 1, "title": "Primera"'
+    with open('tasks.json', 'w', encoding='utf-8') as f:
+        f.write(damaged)
+    
+    with pytest.raises(CorruptStoreError):
+        TaskManager.load_tasks()
+    assert client.get('/tasks').status_code == 500
+    assert client.post('/tasks', json={'title': 'Segunda'}).status_code == 500
+    
+    with open('tasks.json', encoding='utf-8') as f:
+        assert f.read() == damaged
+    backups = glob.glob('tasks.json.corrupt-*')
+    assert len(backups) == 1
+    with open(backups[0], encoding='utf-8') as f:
+        assert f.read() == damaged
+
+
+def test_restored_file_is_loaded_again(client):
+    with open('tasks.json', 'w', encoding='utf-8') as f:
+        f.write('{')
+    assert client.get('/tasks').status_code == 500
+    
+    with open('tasks.json', 'w', encoding='utf-8') as f:
+        json.dump([{'id': 4, 'title': 'Restaurada'}], f)
+    response = client.post('/tasks', json={'title': 'Nueva'})
+    assert response.status_code == 201
+    assert response.get_json()['id'] == 5
@@ -0,0 +1,86 @@
+"""
+Índice por fecha de creación (CreationIndex): consultas por rango y orden
+desde la API y derivación entre instantáneas.
+"""
+
+import json
+
+import pytest
+
+from managers.task_manager import TaskSnapshot
+from models.task import Task
+
+
+def create_dated(client, title, fecha):
+    response = client.post('/tasks', json={'title': title, 'fecha_creacion': fecha})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+def titles(client, query):
+    return [t['title'] for t in client.get(f'/tasks?{query}').get_json()['tasks']]
+
+
+def test_created_range_and_order(client):
+    create_dated(client, 'Marzo', '2024-03-10T09:00:00')
+    create_dated(client, 'Enero', '2024-01-05T12:00:00')
+    create_dated(client, 'Febrero', '2024-02-01T00:00:00')
+    create_dated(client, 'Abril', '2024-04-01T00:00:00')
+    
+    # created_after incluido, created_before excluido
+    assert titles(client, 'created_after=2024-02-01&created_before=2024-04-01&order=oldest') == ['Febrero', 'Marzo']
+    assert titles(client, 'created_after=2024-02-01&order=newest') == ['Abril', 'Marzo', 'Febrero']
+    assert titles(client, 'created_before=2024-02-01T00:00:00') == ['Enero']
+    assert titles(client, 'order=newest') == ['Abril', 'Marzo', 'Febrero', 'Enero']
+    
+    # El rango se combina con los demás filtros y con el streaming
+    client.patch('/tasks/1', json={'status': 'completada'})
+    assert titles(client, 'created_after=2024-01-01&status=completada') == ['Marzo']
+    lines = client.get('/tasks/stream?created_after=2024-03-01&order=newest').get_data(as_text=True).splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['Abril', 'Marzo']
+
+
+def test_created_index_follows_writes(client):
+    create_dated(client, 'Vieja', '2023-06-01T00:00:00')
+    assert titles(client, 'created_after=2024-01-01') == []
+    
+    create_dated(client, 'Nueva', '2024-06-01T00:00:00')
+    assert titles(client, 'created_after=2024-01-01') == ['Nueva']
+    client.delete('/tasks/2')
+    assert titles(client, 'created_after=2024-01-01') == []
+
+
+@pytest.mark.parametrize('query', ['created_after=ayer', 'created_before=2024-13-01', 'order=random'])
+def test_invalid_created_query(client, query):
+    response = client.get(f'/tasks?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_batch_create_then_patch_lists_task_once(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    # Construir el índice para que la siguiente versión lo derive
+    assert [t['id'] for t in client.get('/tasks?order=newest').get_json()['tasks']] == [1]
+    
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': {'id': 100, 'title': 'Nueva'}},
+        {'op': 'patch', 'id': 100, 'task': {'status': 'en_progreso'}},
+        {'op': 'patch', 'id': 1, 'task': {'priority': 'alta'}},
+        {'op': 'patch', 'id': 1, 'task': {'priority': 'baja'}},
+    ]})
+    assert response.status_code == 200
+    
+    ids = [t['id'] for t in client.get('/tasks?order=newest').get_json()['tasks']]
+    assert sorted(ids) == [1, 100]
+    assert client.get('/tasks?order=oldest').get_json()['total'] == 2
+
+
+def test_derive_indexes_with_repeated_ids():
+    first = Task(id=1, title='a')
+    previous = TaskSnapshot(1, [first])
+    previous.created_index()
+    created = Task(id=2, title='b')
+    current = TaskSnapshot(2, [first, created])
+    current.derive_indexes(previous, [2, 2, 1, 1])
+    
+    assert current.created_index().ids_between() == [1, 2]
@@ -0,0 +1,47 @@
+"""
+Cache de fragmentos del dashboard (FragmentCache) e invalidación al escribir.
+"""
+
+from managers.fragment_cache import FragmentCache
+
+
+def test_invalidation_is_scoped():
+    cache = FragmentCache()
+    cache.put('admin', cache.version(None), 'todas')
+    cache.put('ana', cache.version('ana'), 'de ana')
+    cache.put('luis', cache.version('luis'), 'de luis')
+    
+    cache.invalidate(None, 'ana')
+    
+    assert cache.get('admin', cache.version(None)) is None
+    assert cache.get('ana', cache.version('ana')) is None
+    assert cache.get('luis', cache.version('luis')) == 'de luis'
+    cache.invalidate()
+    assert cache.get('luis', cache.version('luis')) is None
+
+
+def test_entries_expire_and_are_evicted():
+    now = [0.0]
+    cache = FragmentCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    for key in ('a', 'b', 'c'):
+        cache.put(key, cache.version(None), key)
+    
+    assert cache.get('a', cache.version(None)) is None
+    assert cache.get('c', cache.version(None)) == 'c'
+    now[0] = 10.0
+    assert cache.get('c', cache.version(None)) is None
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['evictions'], stats['expired']) == (1, 1, 1)
+
+
+def test_dashboard_is_cached_until_a_write(sql_client, database):
+    hits = database.dashboard_cache.stats()['hits']
+    assert sql_client.get('/dashboard').status_code == 200
+    assert sql_client.get('/dashboard').status_code == 200
+    assert database.dashboard_cache.stats()['hits'] == hits + 1
+    
+    sql_client.post('/tasks', json={'title': 'Tarea recién creada'})
+    
+    assert 'Tarea recién creada' in sql_client.get('/dashboard').get_data(as_text=True)
+    assert database.dashboard_cache.stats()['hits'] == hits + 1
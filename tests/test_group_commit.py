@@ -0,0 +1,76 @@
+"""
+Agrupación de escrituras concurrentes (GroupCommitWriter).
+"""
+
+import threading
+from contextlib import nullcontext
+
+import pytest
+
+import app_simple
+from managers.group_commit import GroupCommitWriter
+from managers.task_manager import TaskManager
+
+
+def test_concurrent_submits_share_saves():
+    store, saves = [], []
+    
+    def save(tasks, changed_ids):
+        saves.append(list(changed_ids))
+        return True
+    
+    writer = GroupCommitWriter(lambda: store, save, nullcontext, max_delay=0.05)
+    start = threading.Barrier(20)
+    results = []
+    
+    def submit(n):
+        start.wait()
+        results.append(writer.submit(lambda tasks: tasks.append(n) or [n]))
+    
+    threads = [threading.Thread(target=submit, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.stop()
+    
+    assert results == [True] * 20
+    assert sorted(store) == list(range(20))
+    assert sorted(n for ids in saves for n in ids) == list(range(20))
+    assert writer.stats()['mutations'] == 20
+    assert len(saves) == writer.stats()['batches'] < 20
+
+
+def test_failed_mutation_does_not_affect_its_batch():
+    store = []
+    writer = GroupCommitWriter(lambda: store, lambda tasks, changed_ids: True, nullcontext)
+    
+    def fail(tasks):
+        raise ValueError('inválida')
+    
+    with pytest.raises(ValueError):
+        writer.submit(fail)
+    assert writer.submit(lambda tasks: tasks.append(1) or [1]) is True
+    assert writer.submit(lambda tasks: []) is False
+    writer.stop()
+    assert store == [1]
+
+
+def test_group_commit_keeps_every_concurrent_create(client, monkeypatch):
+    monkeypatch.setattr(TaskManager, 'GROUP_COMMIT', True)
+    monkeypatch.setattr(TaskManager, '_group_writer', None)
+    statuses = []
+    
+    def create(n):
+        statuses.append(app_simple.app.test_client().post('/tasks', json={'title': f'Tarea {n}'}).status_code)
+    
+    threads = [threading.Thread(target=create, args=(n,)) for n in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    TaskManager.group_writer().stop()
+    
+    assert statuses == [201] * 10
+    tasks = client.get('/tasks').get_json()['tasks']
+    assert sorted(task['id'] for task in tasks) == list(range(1, 11))
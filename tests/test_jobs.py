@@ -0,0 +1,74 @@
+"""
+Trabajos en segundo plano (JobManager) y sus rutas /jobs en app_simple.py.
+"""
+
+import gzip
+import json
+import time
+
+from flask import Flask
+
+from managers.job_manager import JobManager
+
+
+def wait_for(client, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f'/jobs/{job_id}').get_json()
+        if job['status'] in ('succeeded', 'failed') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.01)
+
+
+def test_import_then_export(client):
+    response = client.post('/jobs', json={'type': 'import', 'params': {'tasks': [
+        {'title': 'Primera'}, {'title': 'Mala', 'priority': 'urgente'}, {'title': 'Segunda'}]}})
+    assert response.status_code == 202
+    
+    job = wait_for(client, response.get_json()['id'])
+    assert job['status'] == 'succeeded'
+    assert job['result']['imported'] == 2
+    assert [error['index'] for error in job['result']['errors']] == [1]
+    assert client.get('/tasks').get_json()['total'] == 2
+    
+    export = wait_for(client, client.post('/jobs', json={'type': 'export'}).get_json()['id'])
+    assert export['status'] == 'succeeded' and export['download']
+    download = client.get(f"/jobs/{export['id']}/result")
+    lines = gzip.decompress(download.data).decode('utf-8').splitlines()
+    assert [json.loads(line)['title'] for line in lines] == ['Primera', 'Segunda']
+
+
+def test_invalid_jobs(client):
+    assert client.post('/jobs', json={'type': 'desconocido'}).status_code == 400
+    assert client.get('/jobs/no-existe').status_code == 404
+    
+    failed = wait_for(client, client.post('/jobs', json={'type': 'import', 'params': {'tasks': 'x'}}).get_json()['id'])
+    assert failed['status'] == 'failed'
+    assert 'tasks debe ser una lista' in failed['error']
+    assert client.get(f"/jobs/{failed['id']}/result").status_code == 409
+
+
+def test_jobs_interrupted_by_restart_are_failed(tmp_path):
+    app = Flask(__name__)
+    app.config.update(JOBS_FILE=str(tmp_path / 'jobs.json'), JOBS_DIR=str(tmp_path / 'results'))
+    (tmp_path / 'jobs.json').write_text(json.dumps([
+        {'id': 'a', 'type': 'export', 'status': 'running', 'owner': None, 'result_file': None,
+         'download_name': None},
+    ]), encoding='utf-8')
+    
+    jobs = JobManager(app)
+    
+    assert jobs.get('a')['status'] == 'failed'
+    assert json.loads((tmp_path / 'jobs.json').read_text(encoding='utf-8'))[0]['status'] == 'failed'
+    jobs.shutdown()
+
+
+def test_sql_import_job(sql_client):
+    response = sql_client.post('/jobs', json={'type': 'import', 'params': {'tasks': [
+        {'title': 'Importada', 'priority': 'alta'}, {'title': ''}]}})
+    assert response.status_code == 202
+    
+    job = wait_for(sql_client, response.get_json()['id'])
+    assert job['status'] == 'succeeded'
+    assert (job['result']['imported'], job['result']['failed']) == (1, 1)
+    assert [task['title'] for task in sql_client.get('/tasks').get_json()['tasks']] == ['Importada']
@@ -0,0 +1,35 @@
+"""
+Rutas de depuración de memoria de app_simple.py (solo con MEMORY_DEBUG_ROUTES).
+"""
+
+import os
+import subprocess
+import sys
+
+import app_simple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_memory_routes_not_registered_by_default(client):
+    assert not app_simple.app.config['MEMORY_DEBUG_ROUTES']
+    assert client.get('/debug/memory').status_code == 404
+    assert client.post('/debug/memory', json={'enabled': True}).status_code == 405
+    assert client.get('/debug/memory/load').status_code == 404
+    assert not app_simple.memory.enabled
+
+
+def test_memory_routes_enabled_by_environment(tmp_path):
+    # La configuración se lee al importar app_simple: comprobarlo en otro proceso
+    code = (
+        "import app_simple\n"
+        "client = app_simple.app.test_client()\n"
+        "assert client.get('/debug/memory').status_code == 200\n"
+        "assert client.get('/debug/memory/load').status_code == 200\n"
+        "response = client.post('/debug/memory', json=[{'enabled': True}])\n"
+        "assert response.status_code == 400, response.status_code\n"
+        "assert response.get_json() == {'error': 'El cuerpo debe ser un objeto JSON'}\n"
+    )
+    env = {**os.environ, 'TASKS_MEMORY_DEBUG_ROUTES': '1', 'PYTHONPATH': PROJECT_DIR}
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
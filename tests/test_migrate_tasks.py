@@ -0,0 +1,79 @@
+"""
+Migración y sincronización de tasks.json a tareas.db (migrate_tasks.py).
+"""
+
+import json
+
+import pytest
+
+# Esquema de tareas.db anterior a la serie: tarea sin AUTOINCREMENT ni versión
+BASELINE_SCHEMA = (
+    """CREATE TABLE usuario (
+        id INTEGER NOT NULL PRIMARY KEY, nombre VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL UNIQUE, password_hash VARCHAR(255) NOT NULL,
+        es_admin BOOLEAN, fecha_creacion DATETIME)""",
+    """CREATE TABLE tarea (
+        id INTEGER NOT NULL PRIMARY KEY, title VARCHAR(200) NOT NULL, description TEXT,
+        priority VARCHAR(20), effort_hours NUMERIC(10, 2), status VARCHAR(20),
+        assigned_to VARCHAR(100), creador_id INTEGER NOT NULL REFERENCES usuario (id),
+        fecha_creacion DATETIME)""",
+    """INSERT INTO usuario (id, nombre, email, password_hash, es_admin)
+        VALUES (1, 'Admin', 'admin@example.com', 'x', 1)""",
+    """INSERT INTO tarea (id, title, priority, status, creador_id) VALUES (7, 'Existente', 'media', 'pendiente', 1)""",
+)
+
+
+def write_tasks(path, tasks):
+    path.write_text(json.dumps(tasks), encoding='utf-8')
+
+
+@pytest.fixture
+def migrator(database, tmp_path):
+    from migrate_tasks import TaskMigrator
+    
+    def make():
+        return TaskMigrator(str(tmp_path / 'tasks.json'), archive_path=str(tmp_path / 'archive.ndjson.gz'),
+                            log=lambda message: None)
+    return make
+
+
+def tareas(database):
+    with database.app.app_context():
+        return {tarea.id: tarea.title for tarea in database.Tarea.query.order_by(database.Tarea.id)}
+
+
+def test_migrate_baseline_database(database, migrator, tmp_path):
+    with database.app.app_context():
+        with database.db.engine.begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                conn.exec_driver_sql(statement)
+    database.init_db()
+    write_tasks(tmp_path / 'tasks.json', [{'id': 1, 'title': 'Uno'}, {'id': 2, 'title': 'Dos'}])
+    
+    stats = migrator().migrate()
+    
+    assert stats['inserted'] == 2 and stats['invalid'] == 0
+    assert tareas(database) == {7: 'Existente', 8: 'Uno', 9: 'Dos'}
+
+
+def test_sync_keeps_task_that_became_invalid(database, migrator, tmp_path):
+    database.init_db()
+    with database.app.app_context():
+        admin = database.Usuario(nombre='Admin', email='admin@example.com', password_hash='x', es_admin=True)
+        database.db.session.add(admin)
+        database.db.session.commit()
+    source = tmp_path / 'tasks.json'
+    write_tasks(source, [{'id': 1, 'title': 'Uno'}, {'id': 2, 'title': 'Dos'}])
+    assert migrator().sync()['inserted'] == 2
+    
+    # Una edición inválida de la tarea 2 no debe borrar su fila
+    write_tasks(source, [{'id': 1, 'title': 'Uno'}, {'id': 2, 'title': 'Dos', 'priority': 'urgente', 'version': 2}])
+    stats = migrator().sync()
+    
+    assert stats['invalid'] == 1 and stats['deleted'] == 0 and stats['archived'] == 0
+    assert sorted(tareas(database).values()) == ['Dos', 'Uno']
+    
+    # Si la tarea desaparece del archivo, sí se elimina
+    write_tasks(source, [{'id': 1, 'title': 'Uno'}])
+    assert migrator().sync()['deleted'] == 1
+    assert list(tareas(database).values()) == ['Uno']
@@ -0,0 +1,55 @@
+"""
+Hash de contraseñas fuera del hilo de la petición (PasswordHasher).
+"""
+
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from managers.password_hasher import PasswordHashBusy, PasswordHasher
+
+
+def make_hasher(**config):
+    app = Flask(__name__)
+    app.config.update({'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'PASSWORD_HASH_WORKERS': 0, **config})
+    return PasswordHasher(app)
+
+
+def test_verify_rehashes_outdated_hashes():
+    hasher = make_hasher()
+    current = hasher.hash('secreto')
+    
+    assert hasher.verify(current, 'secreto') == (True, None)
+    assert hasher.verify(current, 'otro') == (False, None)
+    
+    valid, new_hash = hasher.verify(generate_password_hash('secreto', 'pbkdf2:sha256:2000'), 'secreto')
+    assert valid and new_hash.startswith('pbkdf2:sha256:1000$')
+    assert hasher.stats()['rehashed'] == 1
+
+
+def test_pool_rejects_when_saturated():
+    hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE=0)
+    try:
+        assert hasher.verify(hasher.hash('secreto'), 'secreto') == (True, None)
+        
+        # Ocupar el único hueco como haría una operación en curso
+        hasher._slots.acquire()
+        with pytest.raises(PasswordHashBusy) as error:
+            hasher.hash('secreto')
+        assert error.value.retry_after >= 1
+        assert hasher.stats()['rejected'] == 1
+        hasher._slots.release()
+    finally:
+        hasher.shutdown()
+
+
+def test_login_answers_503_when_busy(sql_client, database, monkeypatch):
+    def busy(*args):
+        raise PasswordHashBusy('Demasiadas operaciones de contraseña en curso', 3)
+    
+    monkeypatch.setattr(database.passwords, '_call', busy)
+    response = database.app.test_client().post('/login', data={'email': 'admin@example.com',
+                                                                'password': 'secreto123'})
+    
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '3'
@@ -0,0 +1,44 @@
+"""
+PATCH de campos sueltos y concurrencia optimista con If-Match, en ambas APIs.
+"""
+
+
+def test_patch_changes_only_sent_fields(client):
+    created = client.post('/tasks', json={'title': 'Original', 'description': 'Se conserva',
+                                          'priority': 'alta'}).get_json()
+    
+    response = client.patch('/tasks/1', json={'status': 'en_progreso'})
+    
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+    task = response.get_json()
+    assert task == {**created, 'status': 'en_progreso', 'version': 2}
+
+
+def test_if_match_guards_put_and_delete(client):
+    client.post('/tasks', json={'title': 'Original'})
+    client.patch('/tasks/1', json={'title': 'Cambiada'})
+    
+    assert client.put('/tasks/1', json={'title': 'Tarde'}, headers={'If-Match': '"1"'}).status_code == 412
+    assert client.delete('/tasks/1', headers={'If-Match': '"1"'}).status_code == 412
+    assert client.patch('/tasks/1', json={'title': 'x'}, headers={'If-Match': '"abc"'}).status_code == 412
+    assert client.get('/tasks/1').get_json()['title'] == 'Cambiada'
+    
+    assert client.put('/tasks/1', json={'title': 'A tiempo'}, headers={'If-Match': '"2"'}).status_code == 200
+    assert client.patch('/tasks/1', json={'status': 'completada'}, headers={'If-Match': '*'}).status_code == 200
+    assert client.delete('/tasks/1', headers={'If-Match': '"4"'}).status_code == 200
+
+
+def test_sql_patch_with_if_match(sql_client):
+    created = sql_client.post('/tasks', json={'title': 'Original', 'priority': 'alta'})
+    task_id = created.get_json()['id']
+    etag = created.headers['ETag']
+    
+    updated = sql_client.patch(f'/tasks/{task_id}', json={'status': 'en_progreso'}, headers={'If-Match': etag})
+    assert updated.status_code == 200
+    assert updated.get_json()['priority'] == 'alta'
+    assert updated.get_json()['version'] == 2
+    
+    stale = sql_client.patch(f'/tasks/{task_id}', json={'status': 'completada'}, headers={'If-Match': etag})
+    assert stale.status_code == 412
+    assert sql_client.get(f'/tasks/{task_id}').get_json()['status'] == 'en_progreso'
@@ -0,0 +1,14 @@
+"""
+Cuerpos JSON que no son un objeto: 400 en lugar de un error interno.
+"""
+
+import pytest
+
+
+# /debug/memory solo existe con MEMORY_DEBUG_ROUTES: ver test_memory_routes.py
+@pytest.mark.parametrize('path', ['/tasks/batch', '/tasks/archive', '/jobs'])
+@pytest.mark.parametrize('body', [[{'op': 'create'}], 'texto', 7])
+def test_non_object_body_is_rejected(client, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'El cuerpo debe ser un objeto JSON'}
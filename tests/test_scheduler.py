@@ -0,0 +1,73 @@
+"""
+Selección de las próximas tareas (select_next y GET /tasks/next).
+"""
+
+import math
+import random
+
+from managers.scheduler import PRIORITY_ORDER, select_next
+from models.task import Task
+
+
+def make_tasks(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        Task.from_dict({
+            'id': i, 'title': f'Tarea {i}', 'priority': rng.choice(PRIORITY_ORDER),
+            'status': rng.choice(['pendiente', 'pendiente', 'en_progreso', 'completada']),
+            'effort_hours': rng.choice([None, 1, 2, 3, 5]), 'assigned_to': rng.choice([None, 'ana', 'luis']),
+            'fecha_creacion': f'2024-01-{rng.randint(1, 28):02d}T00:00:00'
+        })
+        for i in range(1, count + 1)
+    ]
+
+
+def test_matches_full_sort():
+    tasks = make_tasks(300)
+    expected = sorted(
+        (task for task in tasks if task.status == 'pendiente'),
+        key=lambda task: (PRIORITY_ORDER.index(task.priority),
+                          task.effort_hours if task.effort_hours is not None else math.inf,
+                          task.fecha_creacion, task.id)
+    )
+    
+    for k in (1, 5, 50, 1000):
+        assert select_next(tasks, k) == expected[:k]
+
+
+def test_wip_limit_counts_work_in_progress():
+    tasks = [
+        Task(id=1, title='En curso', status='en_progreso', assigned_to='ana'),
+        Task(id=2, title='a', priority='bloqueante', assigned_to='ana'),
+        Task(id=3, title='b', priority='alta', assigned_to='ana'),
+        Task(id=4, title='c', priority='baja', assigned_to='luis'),
+        Task(id=5, title='d', priority='media'),
+    ]
+    
+    assert [task.id for task in select_next(tasks, 10, wip_limit=2)] == [2, 5, 4]
+    assert [task.id for task in select_next(tasks, 10)] == [2, 3, 5, 4]
+
+
+def test_next_route(client):
+    client.post('/tasks', json={'title': 'En curso', 'status': 'en_progreso', 'assigned_to': 'ana'})
+    client.post('/tasks', json={'title': 'Baja', 'priority': 'baja', 'assigned_to': 'ana'})
+    client.post('/tasks', json={'title': 'Alta', 'priority': 'alta', 'assigned_to': 'ana'})
+    
+    response = client.get('/tasks/next?assigned_to=ana&k=5&wip_limit=2')
+    
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['wip'] == 1
+    assert [task['title'] for task in data['tasks']] == ['Alta']
+    assert client.get('/tasks/next?k=0').status_code == 400
+    assert client.get('/tasks/next?wip_limit=x').status_code == 400
+
+
+def test_sql_next_route(sql_client):
+    for title, priority, effort in [('Larga', 'alta', 8), ('Corta', 'alta', 1), ('Urgente', 'bloqueante', None)]:
+        sql_client.post('/tasks', json={'title': title, 'priority': priority, 'effort_hours': effort})
+    
+    response = sql_client.get('/tasks/next?k=2&wip_limit=0')
+    
+    assert response.status_code == 200
+    assert [task['title'] for task in response.get_json()['tasks']] == ['Urgente', 'Corta']
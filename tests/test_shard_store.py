@@ -0,0 +1,74 @@
+"""
+División de shards de ShardedTaskStore y su orden de escritura, y el
+almacén por shards a través de la API de app_simple.py.
+"""
+
+import os
+
+import pytest
+
+from managers.shard_store import ShardedTaskStore
+from managers.task_manager import TaskManager
+from models.task import Task
+
+
+def make_tasks(count):
+    return [Task(id=i, title=f'Tarea {i}') for i in range(1, count + 1)]
+
+
+def test_split_keeps_all_tasks(tmp_path):
+    store = ShardedTaskStore(str(tmp_path), max_shard_tasks=4)
+    store.save(make_tasks(4))
+    store.save(make_tasks(10), changed_ids=range(5, 11))
+    
+    assert [task.id for task in store.load()] == list(range(1, 11))
+    assert len(store._read_manifest()['shards']) == 5
+
+
+def test_crash_before_truncating_split_shard(tmp_path, monkeypatch):
+    store = ShardedTaskStore(str(tmp_path), max_shard_tasks=4)
+    store.save(make_tasks(4))
+    
+    # El proceso muere al recortar el shard original, tras escribir el manifest
+    write_shard = store._write_shard
+    
+    def crash_on_original(name, tasks):
+        if name == 'shard-0001.json':
+            raise OSError('interrumpido')
+        write_shard(name, tasks)
+    
+    monkeypatch.setattr(store, '_write_shard', crash_on_original)
+    with pytest.raises(OSError):
+        store.save(make_tasks(6), changed_ids=[5, 6])
+    
+    reopened = ShardedTaskStore(str(tmp_path), max_shard_tasks=4)
+    manifest_files = {shard['file'] for shard in reopened._read_manifest()['shards']}
+    assert manifest_files == {'shard-0001.json', 'shard-0002.json', 'shard-0003.json'}
+    assert [task.id for task in reopened.load()] == [1, 2, 3, 4, 5, 6]
+
+
+def test_api_write_rewrites_only_affected_shard(client, tmp_path, monkeypatch):
+    shard_dir = tmp_path / 'shards'
+    monkeypatch.setattr(TaskManager, 'SHARD_DIR', str(shard_dir))
+    monkeypatch.setattr(TaskManager, 'SHARD_MAX_TASKS', 2)
+    for i in range(1, 7):
+        assert client.post('/tasks', json={'title': f'Tarea {i}'}).status_code == 201
+    
+    shard_files = sorted(name for name in os.listdir(shard_dir) if name.startswith('shard-'))
+    assert len(shard_files) >= 3
+    assert not os.path.exists('tasks.json')
+    
+    def contents():
+        return {name: (shard_dir / name).read_text() for name in shard_files}
+    
+    before = contents()
+    assert client.patch('/tasks/1', json={'status': 'completada'}).status_code == 200
+    after = contents()
+    assert [name for name in shard_files if before[name] != after[name]] == [shard_files[0]]
+    
+    # Un almacén nuevo sobre el mismo directorio lee las mismas tareas
+    monkeypatch.setattr(TaskManager, '_snapshot', None)
+    monkeypatch.setattr(TaskManager, '_file_stamp', None)
+    tasks = client.get('/tasks').get_json()['tasks']
+    assert [task['id'] for task in tasks] == [1, 2, 3, 4, 5, 6]
+    assert tasks[0]['status'] == 'completada'
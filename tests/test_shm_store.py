@@ -0,0 +1,72 @@
+"""
+Tabla de tareas en memoria compartida (SharedTaskTable).
+"""
+
+import uuid
+
+import pytest
+
+from managers.shm_store import SharedTaskTable, fcntl
+from managers.task_manager import TaskManager
+from models.task import Task
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason='requiere fcntl')
+
+
+@pytest.fixture
+def shm_name():
+    name = f'tareas-test-{uuid.uuid4().hex[:12]}'
+    yield name
+    try:
+        SharedTaskTable.attach_or_create(name, 4096, list).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def test_second_attach_reads_written_tasks(shm_name):
+    writer = SharedTaskTable.attach_or_create(shm_name, 64 * 1024, lambda: [Task(id=1, title='Inicial')])
+    with writer.lock():
+        seq = writer.write_tasks([Task(id=1, title='Añadida', priority='alta'), Task(id=2, title='Otra')])
+    
+    reader = SharedTaskTable.attach_or_create(shm_name, 64 * 1024, list)
+    read_seq, tasks = reader.read_tasks()
+    
+    assert read_seq == seq == reader.sequence()
+    assert [(task.id, task.title, task.priority) for task in tasks] == [
+        (1, 'Añadida', 'alta'), (2, 'Otra', 'media')]
+    reader.close()
+    writer.close()
+
+
+def test_stale_segment_is_reloaded_from_source(shm_name):
+    table = SharedTaskTable.attach_or_create(shm_name, 64 * 1024, lambda: [Task(id=1, title='Vieja')],
+                                             lambda: (1, 10, 5))
+    table.close()
+    
+    table = SharedTaskTable.attach_or_create(shm_name, 64 * 1024, lambda: [Task(id=1, title='Nueva')],
+                                             lambda: (2, 10, 5))
+    assert [task.title for task in table.read_tasks()[1]] == ['Nueva']
+    assert table.source_stamp() == (2, 10, 5)
+    table.close()
+
+
+def test_tasks_that_do_not_fit_are_rejected(shm_name):
+    table = SharedTaskTable.attach_or_create(shm_name, 4096, list)
+    before = table.read_tasks()
+    
+    with pytest.raises(ValueError):
+        with table.lock():
+            table.write_tasks([Task(id=i, title='x' * 100) for i in range(1, 200)])
+    assert table.read_tasks() == before
+    table.close()
+
+
+def test_task_manager_shares_writes_through_the_segment(client, monkeypatch, shm_name):
+    monkeypatch.setattr(TaskManager, 'SHARED_MEMORY_NAME', shm_name)
+    monkeypatch.setattr(TaskManager, '_shared_seq', None)
+    client.post('/tasks', json={'title': 'Compartida'})
+    
+    # Otro proceso abriría el mismo segmento y vería la tarea sin leer tasks.json
+    other = SharedTaskTable.attach_or_create(shm_name, 4096, list)
+    assert [task.title for task in other.read_tasks()[1]] == ['Compartida']
+    other.close()
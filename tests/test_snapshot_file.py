@@ -0,0 +1,69 @@
+"""
+Instantánea binaria de las tareas (TaskSnapshotFile) y conversión con tasks.json.
+"""
+
+import json
+
+import pytest
+
+from managers.snapshot_store import TaskSnapshotFile, file_stamp, json_to_snapshot, snapshot_to_json, write_snapshot
+from managers.task_manager import TaskManager
+from models.task import Task
+
+
+def test_round_trip_through_json(tmp_path):
+    tasks = [
+        {'id': 3, 'title': 'Tercera', 'description': 'Con acentos: ñandú', 'priority': 'alta',
+         'effort_hours': 1.5, 'status': 'en_progreso', 'assigned_to': 'ana',
+         'fecha_creacion': '2024-02-01T10:00:00', 'version': 4},
+        {'id': 1, 'title': 'Primera', 'fecha_creacion': '2024-01-01T08:00:00'},
+    ]
+    source = tmp_path / 'tasks.json'
+    source.write_text(json.dumps(tasks), encoding='utf-8')
+    
+    assert json_to_snapshot(source, tmp_path / 'tasks.snap') == 2
+    assert snapshot_to_json(tmp_path / 'tasks.snap', tmp_path / 'copia.json') == 2
+    
+    copied = json.loads((tmp_path / 'copia.json').read_text(encoding='utf-8'))
+    expected = sorted((Task.from_dict(data).to_dict() for data in tasks), key=lambda data: data['id'])
+    assert copied == expected
+
+
+def test_lookup_by_id_and_index(tmp_path):
+    path = tmp_path / 'tasks.snap'
+    write_snapshot(path, [Task(id=i, title=f'Tarea {i}') for i in (5, 1, 9)], (1, 2, 3))
+    
+    with TaskSnapshotFile(path) as snapshot:
+        assert len(snapshot) == 3
+        assert [task.id for task in snapshot] == [1, 5, 9]
+        assert snapshot[-1].title == 'Tarea 9'
+        assert snapshot.get(5).title == 'Tarea 5'
+        assert snapshot.get(4) is None
+        assert snapshot.source_stamp == (1, 2, 3)
+
+
+def test_invalid_file_is_rejected(tmp_path):
+    path = tmp_path / 'tasks.snap'
+    path.write_bytes(b'no es una instantanea' * 10)
+    
+    with pytest.raises(ValueError):
+        TaskSnapshotFile(path)
+
+
+def test_store_starts_from_current_snapshot_only(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(TaskManager, 'SNAPSHOT_FILE', str(tmp_path / 'tasks.snap'))
+    client.post('/tasks', json={'title': 'Guardada'})
+    with TaskSnapshotFile(TaskManager.SNAPSHOT_FILE) as snapshot:
+        assert snapshot.source_stamp == file_stamp('tasks.json')
+    
+    # Un arranque nuevo lee la instantánea, que corresponde al tasks.json actual
+    monkeypatch.setattr(TaskManager, '_snapshot', None)
+    monkeypatch.setattr(TaskManager, '_file_stamp', None)
+    assert isinstance(TaskManager.snapshot().tasks, TaskSnapshotFile)
+    assert [task.title for task in TaskManager.load_tasks()] == ['Guardada']
+    
+    # Si tasks.json cambió fuera del servidor, la instantánea obsoleta no se usa
+    (tmp_path / 'tasks.json').write_text(json.dumps([{'id': 2, 'title': 'Editada'}]), encoding='utf-8')
+    monkeypatch.setattr(TaskManager, '_snapshot', None)
+    monkeypatch.setattr(TaskManager, '_file_stamp', None)
+    assert [task.title for task in TaskManager.load_tasks()] == ['Editada']
@@ -0,0 +1,50 @@
+"""
+Instantáneas inmutables de TaskManager: los lectores no esperan a los escritores.
+"""
+
+import json
+import os
+import threading
+
+from managers.task_manager import TaskManager
+
+
+def test_snapshot_is_unchanged_by_later_writes(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    before = TaskManager.snapshot()
+    
+    client.put('/tasks/1', json={'title': 'Cambiada'})
+    client.post('/tasks', json={'title': 'Segunda'})
+    after = TaskManager.snapshot()
+    
+    assert after.version > before.version
+    assert [task.title for task in before] == ['Primera']
+    assert [task.title for task in after] == ['Cambiada', 'Segunda']
+    assert after.get(2).title == 'Segunda' and before.get(2) is None
+
+
+def test_reader_does_not_wait_for_writer(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    TaskManager.snapshot()
+    
+    result = []
+    with TaskManager._write_lock:
+        reader = threading.Thread(target=lambda: result.append(len(TaskManager.load_tasks())))
+        reader.start()
+        reader.join(timeout=5)
+    
+    assert result == [1]
+
+
+def test_external_change_to_file_is_reloaded(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    version = TaskManager.get_version()
+    
+    with open('tasks.json', 'w', encoding='utf-8') as f:
+        json.dump([{'id': 7, 'title': 'Externa'}], f)
+    # Forzar una marca distinta aunque el reloj del sistema de archivos sea grueso
+    stat = os.stat('tasks.json')
+    os.utime('tasks.json', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    
+    assert [task['id'] for task in client.get('/tasks').get_json()['tasks']] == [7]
+    assert TaskManager.get_version() > version
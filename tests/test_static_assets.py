@@ -0,0 +1,74 @@
+"""
+Estáticos con huella de contenido y gzip precalculado (StaticAssets).
+"""
+
+import gzip
+import re
+
+from flask import Flask
+
+from middleware.assets import IMMUTABLE, StaticAssets
+
+
+def make_app(tmp_path, script):
+    static = tmp_path / 'static'
+    static.mkdir(exist_ok=True)
+    (static / 'index.html').write_text('<script src="/app.js"></script><a href="/otra">x</a>', encoding='utf-8')
+    (static / 'app.js').write_text(script, encoding='utf-8')
+    app = Flask(__name__, root_path=str(tmp_path))
+    assets = StaticAssets(app)
+    app.add_url_rule('/', 'index', assets.serve_index)
+    return app, assets
+
+
+def script_url(client):
+    html = client.get('/').get_data(as_text=True)
+    return re.search(r'src="([^"]+)"', html).group(1)
+
+
+def test_index_points_to_hashed_names(tmp_path):
+    app, _ = make_app(tmp_path, 'console.log(1);')
+    client = app.test_client()
+    
+    index = client.get('/')
+    assert index.headers['Cache-Control'] == 'no-cache'
+    assert re.fullmatch(r'/assets/app\.[0-9a-f]{12}\.js', script_url(client))
+    assert 'href="/otra"' in index.get_data(as_text=True)
+    assert client.get('/', headers={'If-None-Match': index.headers['ETag']}).status_code == 304
+
+
+def test_assets_are_immutable_and_precompressed(tmp_path):
+    script = 'console.log("tarea");\n' * 100
+    app, _ = make_app(tmp_path, script)
+    client = app.test_client()
+    url = script_url(client)
+    
+    plain = client.get(url)
+    assert plain.headers['Cache-Control'] == IMMUTABLE
+    assert plain.get_data(as_text=True) == script
+    
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.data).decode('utf-8') == script
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    assert client.get('/assets/app.000000000000.js').status_code == 404
+
+
+def test_changed_content_gets_a_new_name(tmp_path):
+    app, assets = make_app(tmp_path, 'console.log(1);')
+    client = app.test_client()
+    old_url = script_url(client)
+    
+    (tmp_path / 'static' / 'app.js').write_text('console.log(2);', encoding='utf-8')
+    assets.build()
+    
+    assert script_url(client) != old_url
+    assert client.get(old_url).status_code == 404
+
+
+def test_app_simple_serves_fingerprinted_index(client):
+    html = client.get('/').get_data(as_text=True)
+    
+    for url in re.findall(r'(?:src|href)="(/assets/[^"]+)"', html):
+        assert client.get(url).status_code == 200
+    assert 'src="/app.js"' not in html
@@ -0,0 +1,72 @@
+"""
+Mantenimiento del almacén sin el servidor (StoreMaintenance y maintain_store.py).
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from managers.snapshot_store import TaskSnapshotFile, file_stamp
+from managers.store_maintenance import StoreMaintenance, iter_json_array
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_store(path, tasks):
+    path.write_text(json.dumps(tasks, ensure_ascii=False), encoding='utf-8')
+
+
+def maintenance(tmp_path, **kwargs):
+    return StoreMaintenance(str(tmp_path / 'tasks.json'), snapshot_file=str(tmp_path / 'tasks.snap'),
+                            workers=1, log=lambda message: None, **kwargs)
+
+
+def test_iter_json_array_reads_in_small_chunks(tmp_path):
+    tasks = [{'id': i, 'title': f'Tarea "{i}" ñ'} for i in range(1, 50)]
+    write_store(tmp_path / 'tasks.json', tasks)
+    
+    assert list(iter_json_array(tmp_path / 'tasks.json', chunk_size=7)) == tasks
+
+
+def test_verify_reports_invalid_and_repeated_tasks(tmp_path):
+    write_store(tmp_path / 'tasks.json', [
+        {'id': 1, 'title': 'Bien'}, {'id': 1, 'title': 'Repetida'}, {'id': 2, 'title': 'x', 'priority': 'urgente'}])
+    
+    report = maintenance(tmp_path).verify()
+    
+    assert not report['ok']
+    errors = ' '.join(report['sections'][0]['errors'])
+    assert 'id 1 repetido' in errors and 'Prioridad inválida' in errors
+
+
+def test_reindex_writes_current_snapshot_and_stats_count_tasks(tmp_path):
+    write_store(tmp_path / 'tasks.json', [
+        {'id': 2, 'title': 'Segunda', 'status': 'completada'}, {'id': 1, 'title': 'Primera'}])
+    tool = maintenance(tmp_path)
+    
+    report = tool.reindex()
+    
+    assert report['errors'] == []
+    with TaskSnapshotFile(tmp_path / 'tasks.snap') as snapshot:
+        assert [task.title for task in snapshot] == ['Primera', 'Segunda']
+        assert snapshot.source_stamp == file_stamp(tmp_path / 'tasks.json')
+    assert tool.verify()['ok']
+    active = tool.stats()['sections'][0]
+    assert active['tasks'] == 2
+    assert active['status'] == {'completada': 1, 'pendiente': 1}
+
+
+def test_cli_verify_exit_code(tmp_path):
+    write_store(tmp_path / 'tasks.json', [{'id': 1, 'title': 'Bien'}])
+    
+    def verify():
+        return subprocess.run([sys.executable, os.path.join(PROJECT_DIR, 'maintain_store.py'), 'verify',
+                               '--file', str(tmp_path / 'tasks.json'), '--workers', '1'],
+                              cwd=tmp_path, capture_output=True, text=True)
+    
+    assert verify().returncode == 0
+    (tmp_path / 'tasks.json').write_text('[{"id": 1, "title": "Cortada"', encoding='utf-8')
+    result = verify()
+    assert result.returncode == 1
+    assert 'Se encontraron errores' in result.stdout
@@ -0,0 +1,41 @@
+"""
+Prueba de estrés del almacén (benchmarks.stress_store) en un caso pequeño.
+"""
+
+import pytest
+
+from benchmarks import stress_store
+from managers.shm_store import fcntl
+from managers.task_manager import TaskManager
+from models.task import Task
+
+
+@pytest.fixture
+def harness(client, monkeypatch):
+    """El harness reconfigura TaskManager: restaurar su estado al terminar."""
+    for name in ('JSON_FILE', 'ARCHIVE_FILE', 'SNAPSHOT_FILE', 'SHARD_DIR', 'GROUP_COMMIT',
+                 'SHARED_MEMORY_NAME', '_group_writer', '_shared_seq'):
+        monkeypatch.setattr(TaskManager, name, getattr(TaskManager, name))
+    return stress_store
+
+
+@pytest.mark.parametrize('backend', [
+    'json', 'group', 'shards',
+    pytest.param('shm', marks=pytest.mark.skipif(fcntl is None, reason='requiere fcntl')),
+])
+def test_concurrent_threads_keep_invariants(harness, backend):
+    elapsed, operations, problems = harness.run_case(backend, 'threads', 4, 15, 20)
+    
+    assert problems == []
+    assert operations == 4 * 15
+
+
+def test_lost_write_is_reported(harness, tmp_path):
+    harness.configure({'backend': 'json', 'directory': str(tmp_path), 'shm_name': ''})
+    TaskManager.save_tasks([Task(id=1, title='Contador', effort_hours=0)])
+    log = {'created': {'perdida': 2}, 'deleted': [], 'updates': {}, 'increments': 1, 'errors': []}
+    
+    problems = harness.check_invariants({'backend': 'json'}, [log], 0, 1)
+    
+    assert any('alta perdida' in problem for problem in problems)
+    assert any('contador' in problem for problem in problems)
@@ -0,0 +1,54 @@
+"""
+Cache de JSON codificado de las tareas (TaskResponseCache).
+"""
+
+import json
+
+from managers.task_cache import TaskResponseCache
+from managers.task_manager import TaskManager
+from models.task import Task
+
+
+def test_list_payload_matches_plain_json():
+    cache = TaskResponseCache()
+    tasks = [Task(id=1, title='Añadir'), Task(id=2, title='Revisar', priority='alta')]
+    
+    payload = cache.build_list_payload(tasks)
+    
+    assert json.loads(payload) == {'total': 2, 'tasks': [task.to_dict() for task in tasks]}
+
+
+def test_fragment_is_reencoded_for_a_new_task_object():
+    cache = TaskResponseCache()
+    old = Task(id=1, title='Antes')
+    assert json.loads(cache.task_fragment(old))['title'] == 'Antes'
+    
+    new = Task.from_dict({**old.to_dict(), 'title': 'Después'})
+    assert json.loads(cache.task_fragment(new))['title'] == 'Después'
+    # Un lector con la instantánea anterior sigue recibiendo su versión
+    assert json.loads(cache.task_fragment(old))['title'] == 'Antes'
+
+
+def test_payloads_are_evicted_least_recently_used():
+    cache = TaskResponseCache(max_payloads=2)
+    cache.put_payload(1, 'a', b'1a')
+    cache.put_payload(1, 'b', b'1b')
+    assert cache.get_payload(1, 'a') == b'1a'
+    cache.put_payload(2, 'a', b'2a')
+    
+    assert cache.get_payload(1, 'b') is None
+    assert cache.get_payload(1, 'a') == b'1a'
+    assert cache.get_payload(2, 'a') == b'2a'
+
+
+def test_listing_reflects_writes(client):
+    client.post('/tasks', json={'title': 'Primera'})
+    # Las lecturas repetidas de la misma versión reutilizan el listado codificado
+    assert TaskManager.get_tasks_payload() is TaskManager.get_tasks_payload()
+    
+    client.put('/tasks/1', json={'title': 'Cambiada'})
+    client.post('/tasks', json={'title': 'Segunda'})
+    
+    listing = client.get('/tasks').get_json()
+    assert [task['title'] for task in listing['tasks']] == ['Cambiada', 'Segunda']
+    assert listing['total'] == 2
@@ -0,0 +1,50 @@
+"""
+Páginas de GET /tasks (limit/offset) con ETag, que usa la lista virtualizada de la interfaz.
+"""
+
+import pytest
+
+from routes.task_routes import MAX_PAGE_SIZE
+
+
+@pytest.fixture
+def tasks(client):
+    for n in range(1, 8):
+        client.post('/tasks', json={'title': f'Tarea {n}', 'status': 'completada' if n % 2 else 'pendiente'})
+
+
+def test_pages_cover_the_listing(client, tasks):
+    first = client.get('/tasks?limit=3').get_json()
+    last = client.get('/tasks?limit=3&offset=6').get_json()
+    
+    assert (first['total'], first['offset'], first['limit']) == (7, 0, 3)
+    assert [task['id'] for task in first['tasks']] == [1, 2, 3]
+    assert [task['id'] for task in last['tasks']] == [7]
+    assert client.get('/tasks?limit=3&offset=50').get_json()['tasks'] == []
+    
+    filtered = client.get('/tasks?limit=2&status=pendiente').get_json()
+    assert filtered['total'] == 3
+    assert [task['id'] for task in filtered['tasks']] == [2, 4]
+
+
+@pytest.mark.parametrize('query', ['limit=0', f'limit={MAX_PAGE_SIZE + 1}', 'limit=2&offset=-1', 'limit=x'])
+def test_invalid_page_parameters(client, query):
+    assert client.get(f'/tasks?{query}').status_code == 400
+
+
+@pytest.mark.parametrize('encoding', ['identity', 'gzip'])
+def test_unchanged_page_revalidates_with_304(client, tasks, encoding):
+    # Una descripción larga hace que la página supere el tamaño mínimo de compresión
+    client.patch('/tasks/1', json={'description': 'x' * 4096})
+    headers = {'Accept-Encoding': encoding}
+    page = client.get('/tasks?limit=3', headers=headers)
+    assert page.headers.get('Content-Encoding') == (None if encoding == 'identity' else encoding)
+    etag = page.headers['ETag']
+    
+    cached = client.get('/tasks?limit=3', headers={**headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    
+    client.patch('/tasks/2', json={'title': 'Cambiada'})
+    changed = client.get('/tasks?limit=3', headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
@@ -0,0 +1,25 @@
+"""
+Esquema compilado de las tareas (TaskSchema).
+"""
+
+from models.task_schema import RECORD, TASK_SCHEMA
+
+
+def test_validate_many_matches_validate():
+    records = [
+        {'title': 'Válida', 'effort_hours': '2.5'},
+        {'title': 'Inválida', 'effort_hours': True, 'priority': 'urgente'},
+        ['no', 'es', 'un', 'objeto'],
+    ]
+    valid, invalid = TASK_SCHEMA.validate_many(records)
+    
+    assert valid == [(0, TASK_SCHEMA.validate(records[0])[0])]
+    assert valid[0][1]['effort_hours'] == 2.5
+    assert invalid[0] == {'index': 1, 'errors': TASK_SCHEMA.validate(records[1])[1]}
+    assert set(invalid[0]['errors']) == {'priority', 'effort_hours'}
+    assert invalid[1] == {'index': 2, 'errors': {RECORD: 'La tarea debe ser un objeto'}}
+
+
+def test_partial_validates_only_present_fields():
+    values, errors = TASK_SCHEMA.validate({'status': 'completada'}, partial=True)
+    assert values == {'status': 'completada'} and errors == {}
@@ -0,0 +1,41 @@
+"""
+Serialización de tareas de app.py a partir de tuplas de columnas (serializers).
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from serializers import TASK_FIELDS, TaskJSONProvider, row_to_dict
+
+
+def test_row_to_dict_converts_decimal_and_dates():
+    row = (3, 'Título', None, 'alta', Decimal('2.50'), 'pendiente', 'ana', datetime(2024, 5, 1, 9, 30), 2)
+    
+    data = row_to_dict(row)
+    
+    assert list(data) == list(TASK_FIELDS)
+    assert data['effort_hours'] == 2.5
+    assert data['fecha_creacion'] == '2024-05-01T09:30:00'
+    assert row_to_dict(row[:4] + (None,) + row[5:7] + (None, 1))['effort_hours'] is None
+
+
+def test_json_provider_is_compact_and_keeps_utf8(database):
+    provider = TaskJSONProvider(database.app)
+    
+    assert provider.dumps({'title': 'Añadir', 'effort_hours': Decimal('1.5')}) == '{"title":"Añadir","effort_hours":1.5}'
+    assert provider.loads('{"a": 1}') == {'a': 1}
+
+
+def test_task_routes_return_serialized_rows(sql_client):
+    created = sql_client.post('/tasks', json={'title': 'Revisar', 'priority': 'alta', 'effort_hours': 1.25})
+    assert created.status_code == 201
+    task_id = created.get_json()['id']
+    
+    listing = sql_client.get('/tasks').get_json()
+    assert listing['total'] == 1
+    assert listing['tasks'][0] == created.get_json()
+    assert set(listing['tasks'][0]) == set(TASK_FIELDS)
+    
+    response = sql_client.get(f'/tasks/{task_id}')
+    assert response.get_json()['effort_hours'] == 1.25
+    assert response.headers['ETag'] == '"1"'
@@ -0,0 +1,78 @@
+"""
+Validación de los datos recibidos por la API JSON antes de construir un Task.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def task_id(client):
+    response = client.post('/tasks', json={'title': 'Revisar', 'effort_hours': 2})
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+
+@pytest.mark.parametrize('effort_hours', ['abc', True, [1], -1])
+def test_create_rejects_invalid_effort(client, effort_hours):
+    response = client.post('/tasks', json={'title': 'Nueva', 'effort_hours': effort_hours})
+    assert response.status_code == 400
+    assert 'effort_hours' in response.get_json()['error']
+    assert client.get('/tasks').get_json()['total'] == 0
+
+
+@pytest.mark.parametrize('method', ['put', 'patch'])
+@pytest.mark.parametrize('effort_hours', ['zz', True])
+def test_update_rejects_invalid_effort(client, task_id, method, effort_hours):
+    response = getattr(client, method)(f'/tasks/{task_id}', json={'title': 'Otra', 'effort_hours': effort_hours})
+    assert response.status_code == 400
+    assert 'effort_hours' in response.get_json()['error']
+    assert client.get(f'/tasks/{task_id}').get_json()['effort_hours'] == 2
+
+
+def test_create_converts_numeric_text(client):
+    response = client.post('/tasks', json={'title': 'Nueva', 'effort_hours': '1.5', 'assigned_to': '  Ana '})
+    assert response.status_code == 201
+    assert response.get_json()['effort_hours'] == 1.5
+    assert response.get_json()['assigned_to'] == 'Ana'
+
+
+@pytest.mark.parametrize('body', [[{'title': 'x'}], 'texto', 3])
+def test_create_rejects_non_object_body(client, body):
+    assert client.post('/tasks', json=body).status_code == 400
+
+
+@pytest.mark.parametrize('operation', [
+    {'op': 'create', 'task': {'title': 'Nueva', 'effort_hours': 'abc'}},
+    {'op': 'update', 'id': 1, 'task': {'title': 'Otra', 'effort_hours': True}},
+    {'op': 'patch', 'id': 1, 'task': {'effort_hours': 'zz'}},
+])
+def test_batch_rejects_invalid_effort(client, task_id, operation):
+    response = client.post('/tasks/batch', json={'operations': [operation]})
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 0
+    assert 'effort_hours' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('task_id', ['abc', 1.5, True, 0, -3])
+def test_create_rejects_invalid_client_id(client, task_id):
+    response = client.post('/tasks', json={'title': 'Nueva', 'id': task_id})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == "'id' debe ser un entero positivo"
+    assert client.get('/tasks').get_json()['total'] == 0
+
+
+@pytest.mark.parametrize('task_id', ['abc', 1.5, True])
+def test_batch_create_rejects_invalid_client_id(client, task_id):
+    response = client.post('/tasks/batch', json={'operations': [
+        {'op': 'create', 'task': {'title': 'Válida'}},
+        {'op': 'create', 'task': {'title': 'Nueva', 'id': task_id}},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 1
+    assert client.get('/tasks').get_json()['total'] == 0
+
+
+def test_create_accepts_integer_client_id(client):
+    response = client.post('/tasks', json={'title': 'Nueva', 'id': 42})
+    assert response.status_code == 201
+    assert client.get('/tasks/42').get_json()['title'] == 'Nueva'
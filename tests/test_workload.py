@@ -0,0 +1,32 @@
+"""
+Informe de carga de trabajo (GET /tasks/analytics y TaskColumns).
+"""
+
+import pytest
+
+from analytics.workload import NUMPY_AVAILABLE, TaskColumns, workload_report
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason='requiere numpy')
+
+
+def test_malformed_creation_date_counts_as_undated():
+    columns = TaskColumns.from_columns(
+        ['ana', None], ['alta', 'baja'], ['pendiente', 'completada'], [2, None],
+        ['2024-01-03T10:00:00', 'hola']
+    )
+    report = workload_report(columns)
+    
+    assert report['total'] == 2
+    assert report['weekly'] == [{'week': '2024-01-01', 'created': 1, 'completed': 0}]
+
+
+def test_analytics_with_malformed_creation_date(client):
+    client.post('/tasks', json={'title': 'Buena', 'assigned_to': 'ana', 'effort_hours': 3})
+    client.post('/tasks', json={'title': 'Mala', 'fecha_creacion': 'hola'})
+    assert [t['fecha_creacion'] for t in client.get('/tasks').get_json()['tasks']][-1] == 'hola'
+    
+    response = client.get('/tasks/analytics')
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['total'] == 2
+    assert sum(week['created'] for week in report['weekly']) == 1